@@ -0,0 +1,4 @@
+"""Benchmarks for the price pipeline's hot paths, with JSON results and baseline comparison."""
+from .harness import CASES, Result, bench, run_cases, compare, load_results, save_results
+
+__all__ = ["CASES", "Result", "bench", "run_cases", "compare", "load_results", "save_results"]
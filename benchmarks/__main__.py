@@ -0,0 +1,52 @@
+# python -m benchmarks [--tokens 100,1000,10000,50000] [--only 'db.*'] [--out results.json]
+#                      [--baseline benchmarks/baseline.json] [--tolerance 0.25] [--save-baseline]
+# Exits 1 if any case is slower than the baseline by more than the tolerance.
+import os, sys, argparse
+from . import cases  # registers the cases
+from .harness import run_cases, compare, load_results, save_results
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description="Hot-path benchmarks")
+    ap.add_argument("--tokens", default="100,1000,10000,50000", help="comma-separated token counts")
+    ap.add_argument("--only", default="*", help="glob over case names")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--budget-sec", type=float, default=10.0, help="stop repeating a case after this much time")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    ap.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with these results")
+    args = ap.parse_args(argv)
+
+    sizes = [int(x) for x in args.tokens.split(",") if x.strip()]
+    print(f"{'case':<40} {'tokens':>7} {'ops':>8} {'best':>10} {'per op':>12}")
+    def show(r):
+        print(f"{r.case:<40} {r.tokens:>7} {r.ops:>8} {r.sec * 1000:>8.1f}ms {r.ns_per_op / 1000:>10.2f}µs",
+              flush=True)
+    results = run_cases(sizes, args.only, args.repeat, args.budget_sec, progress=show)
+
+    if args.out:
+        save_results(args.out, results)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against (run with --save-baseline)")
+        return 0
+
+    diff = compare(results, load_results(args.baseline), args.tolerance)
+    for d in diff["improvements"]:
+        print(f"  faster  {d.key:<48} {d.base_ns / 1000:9.2f}µs → {d.ns / 1000:9.2f}µs ({d.ratio:.2f}x)")
+    for d in diff["regressions"]:
+        print(f"  SLOWER  {d.key:<48} {d.base_ns / 1000:9.2f}µs → {d.ns / 1000:9.2f}µs ({d.ratio:.2f}x)")
+    print(f"{len(diff['regressions'])} regressions, {len(diff['improvements'])} improvements, "
+          f"{len(diff['unchanged'])} unchanged, {len(diff['new'])} not in baseline "
+          f"(tolerance {args.tolerance:.0%})")
+    return 1 if diff["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
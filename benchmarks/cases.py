@@ -0,0 +1,274 @@
+# Benchmark cases: one per hot path, each parameterized by the token count.
+# Every case builds its own isolated state (a fresh Database, OHLCAggregator,
+# TimeSeriesStore, TokenLifecycle) so runs don't leak into each other.
+import os, json, time, asyncio, typing
+from trading_bot import price_watcher
+from trading_bot.db import Database
+from trading_bot.dexscreener_client import DEX_API, fetch_token_batch
+from trading_bot.indicators import (set_plan, get_plan, reset_indicators, update_all_for_bar, get_plugin,
+                                   storage_values)
+from trading_bot.indicators.spec import config_specs
+from trading_bot.lifecycle import TokenLifecycle, pipeline_hooks
+from trading_bot.ohlc_agg import OHLCAggregator, SAMPLES_PER_BAR
+from trading_bot.papertrading.base import StrategyContext
+from trading_bot.papertrading.db import paper_db
+from trading_bot.papertrading.screener import Screener
+from trading_bot.papertrading.strategies.early_momentum import EarlyMomentum
+from trading_bot.price_sources import DexScreenerProvider
+from trading_bot.records import Bar, IndicatorValue
+from trading_bot.sim.stubs import sim_mint
+from trading_bot.tsstore import TimeSeriesStore, BAR_COLUMNS
+from .harness import bench
+
+PAYLOADS = os.path.join(os.path.dirname(__file__), "payloads")
+T0 = 1_700_000_000
+BATCH = price_watcher.BATCH_SIZE
+
+
+# --- fixtures ---
+def _addresses(n: int) -> list[str]:
+    return [sim_mint(i) for i in range(n)]
+
+def _bar(addr: str, i: int, k: int = 0) -> Bar:
+    p = 1e-4 * (1 + 0.01 * ((i + k) % 7))
+    return Bar(addr, T0 + 60 * k, p, p * 1.05, p * 0.95, p * 1.01, p * 1e9, p * 8e8, SAMPLES_PER_BAR)
+
+def _plan_with_strategy() -> EarlyMomentum:
+    strat = EarlyMomentum()
+    set_plan(list(config_specs()) + strat.indicators())
+    return strat
+
+def _pair_template() -> dict:
+    with open(os.path.join(PAYLOADS, "dexscreener_pair.json")) as f:
+        return json.load(f)
+
+def dex_payload(addrs: list[str], template: typing.Optional[dict] = None, tick: int = 0) -> bytes:
+    """A /tokens/ response in the recorded shape: two pools per token (the deeper one wins)."""
+    template = template or _pair_template()
+    pairs = []
+    for i, a in enumerate(addrs):
+        for pool, liq in (("raydium", 41250.77), ("meteora", 3810.2)):
+            p = dict(template, dexId=pool, baseToken=dict(template["baseToken"], address=a),
+                     liquidity=dict(template["liquidity"], usd=liq))
+            p["priceUsd"] = f"{1e-4 * (1 + 0.001 * ((i + tick) % 50)):.10f}"
+            pairs.append(p)
+    return json.dumps({"schemaVersion": "1.0.0", "pairs": pairs}).encode()
+
+
+class _Resp:
+    __slots__ = ("content", "status_code")
+    def __init__(self, content: bytes):
+        self.content, self.status_code = content, 200
+    def raise_for_status(self) -> None:
+        pass
+    def json(self):
+        return json.loads(self.content)
+
+
+class StubDexClient:
+    """Stands in for the pooled httpx client: GET returns a prepared body per batch URL."""
+    def __init__(self, bodies: dict[str, bytes]):
+        self.bodies = bodies
+        self.requests = 0
+    async def get(self, url: str, timeout=None) -> _Resp:
+        self.requests += 1
+        return _Resp(self.bodies[url])
+
+def _batches(addrs: list[str]) -> list[list[str]]:
+    return [addrs[i:i + BATCH] for i in range(0, len(addrs), BATCH)]
+
+def _dex_client(batches: list[list[str]], tick: int = 0) -> StubDexClient:
+    template = _pair_template()
+    return StubDexClient({f"{DEX_API}/tokens/{','.join(b)}": dex_payload(b, template, tick) for b in batches})
+
+def _seed_tokens(db: Database, addrs: list[str]) -> None:
+    rows = [(a, f"Sim {i}", f"S{i}", "raydium", i % 20, f"sig{i}", "{}") for i, a in enumerate(addrs)]
+    db.writer.run(lambda c: c.executemany("""
+      INSERT INTO tokens(address, name, symbol, dex, risk, signature, rc_json) VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows))
+
+def _prefill(agg: OHLCAggregator, addrs: list[str], samples: int, ts: float) -> None:
+    # straight into the buffers: setup shouldn't print 50k progress lines
+    for a in addrs:
+        buf = agg.buffers[a]
+        buf.samples.extend((ts + 2 * k, 1e-4, 1e5, 8e4) for k in range(samples))
+        buf.first_ts = ts
+
+
+# --- cases ---
+@bench("ohlc_agg.add_sample")
+def add_sample(n: int):
+    """One poll tick: one sample per token."""
+    agg = OHLCAggregator()
+    addrs = _addresses(n)
+    _prefill(agg, addrs, 1, T0)  # tokens are already being watched
+    def run():
+        for i, a in enumerate(addrs):
+            agg.add_sample(a, price=1e-4 * (1 + i % 3 * 0.01), fdv=1e5, mc=8e4, ts=T0 + 2)
+    return run, n, None
+
+
+@bench("indicators.update_all_for_bar")
+def indicators_update(n: int):
+    _plan_with_strategy()
+    bars = [_bar(a, i, 1) for i, a in enumerate(_addresses(n))]
+    for i, b in enumerate(bars):  # warm: per-token indicator objects exist
+        update_all_for_bar(_bar(b.address, i, 0))
+    def run():
+        for b in bars:
+            update_all_for_bar(b)
+    return run, n, reset_indicators
+
+
+@bench("dexscreener.fetch_token_batch")
+def fetch_parse(n: int):
+    batches = _batches(_addresses(n))
+    client = _dex_client(batches)
+    loop = asyncio.new_event_loop()
+    async def all_batches():
+        for b in batches:
+            await fetch_token_batch(client, b)
+    return (lambda: loop.run_until_complete(all_batches())), n, loop.close
+
+
+def _db_case(n: int, call: typing.Callable[[Database, int, str], None], seed: bool = False):
+    db = Database()
+    addrs = _addresses(n)
+    if seed:
+        _seed_tokens(db, addrs)
+    def run():
+        for i, a in enumerate(addrs):
+            call(db, i, a)
+    return run, n, db.close
+
+@bench("db.upsert_safe_token")
+def db_upsert_token(n: int):
+    return _db_case(n, lambda db, i, a: db.upsert_safe_token(
+        address=a, name=f"Sim {i}", symbol=f"S{i}", dex="raydium", risk=i % 20, signature=f"sig{i}",
+        rc={"score_normalised": i % 20}))
+
+@bench("db.upsert_price")
+def db_upsert_price(n: int):
+    return _db_case(n, lambda db, i, a: db.upsert_price(
+        {"address": a, "price_usd": 1e-4, "fdv_usd": 1e5, "marketcap_usd": 8e4}), seed=True)
+
+@bench("db.insert_ohlc_1m")
+def db_insert_ohlc(n: int):
+    return _db_case(n, lambda db, i, a: db.insert_ohlc_1m(_bar(a, i)), seed=True)
+
+@bench("db.insert_ema_1m")
+def db_insert_ema(n: int):
+    return _db_case(n, lambda db, i, a: db.insert_ema_1m(
+        [IndicatorValue(a, T0, 5, 1e-4, "low"), IndicatorValue(a, T0, 20, 1e-4, "close")]), seed=True)
+
+@bench("db.insert_atr_1m")
+def db_insert_atr(n: int):
+    return _db_case(n, lambda db, i, a: db.insert_atr_1m([IndicatorValue(a, T0, 14, 1e-6)]), seed=True)
+
+@bench("db.store_bar_async")
+def db_store_bar(n: int):
+    """The watcher's path: every closed bar + its rows as one writer command, awaited concurrently."""
+    db = Database()
+    addrs = _addresses(n)
+    _seed_tokens(db, addrs)
+    ema = [IndicatorValue(a, T0, 5, 1e-4, "low") for a in addrs]
+    atr = [IndicatorValue(a, T0, 14, 1e-6) for a in addrs]
+    loop = asyncio.new_event_loop()
+    async def all_bars():
+        await asyncio.gather(*(db.store_bar_async(_bar(a, i), [ema[i]], [atr[i]]) for i, a in enumerate(addrs)))
+    def cleanup():
+        loop.close()
+        db.close()
+    return (lambda: loop.run_until_complete(all_bars())), n, cleanup
+
+
+@bench("papertrading.get_watchable_addresses")
+def watchable(n: int):
+    db = Database()
+    _seed_tokens(db, _addresses(n))
+    paper = paper_db(db)
+    for a in _addresses(n)[::50]:
+        paper.blacklist_add(a, "bench")
+    return (lambda: paper.get_watchable_addresses()), n, db.close
+
+
+@bench("EarlyMomentum.on_bar_1m")
+def on_bar(n: int):
+    """A bar for every token with indicators warm, so each one runs the entry check."""
+    strat = _plan_with_strategy()
+    db = Database()
+    addrs = _addresses(n)
+    _seed_tokens(db, addrs)
+    store = TimeSeriesStore(root=None)
+    ctx = StrategyContext(db=db, store=store)
+    strat.on_start(ctx)
+    history = [_bar(a, i, k) for i, a in enumerate(addrs) for k in range(3)]
+    for b in history:
+        update_all_for_bar(b)
+    bars = [_bar(a, i, 3) for i, a in enumerate(addrs)]
+    for b in history + bars:                 # the watcher stores each bar before dispatching it
+        store.append(b.address, b._asdict())
+    rows = [update_all_for_bar(b) for b in bars]
+    def run():
+        for b, (ema_rows, atr_rows) in zip(bars, rows):
+            strat.on_bar_1m(ctx, b, ema_rows, atr_rows)
+    def cleanup():
+        reset_indicators()
+        db.close()
+    return run, n, cleanup
+
+
+
+@bench("Screener.screen")
+def screen(n: int):
+    """The same bars as EarlyMomentum.on_bar_1m, into the screener and through its entry screen at once."""
+    strat = _plan_with_strategy()
+    columns = list(BAR_COLUMNS) + [c for spec in get_plan() for c in get_plugin(spec.kind).columns(spec)]
+    screener = Screener(columns)
+    screener.add("entry", strat.screens()["entry"])
+    addrs = _addresses(n)
+    for k in range(3):
+        for i, a in enumerate(addrs):
+            b = _bar(a, i, k)
+            update_all_for_bar(b)
+            screener.update(b, storage_values(a))
+    bars = [_bar(a, i, 3) for i, a in enumerate(addrs)]
+    for b in bars:
+        update_all_for_bar(b)
+    values = [storage_values(b.address) for b in bars]
+    def run():
+        for b, v in zip(bars, values):
+            screener.update(b, v)
+        screener.screen()
+    return run, n, reset_indicators
+
+
+def _poll_case(n: int, closes_bars: bool):
+    _plan_with_strategy()
+    db = Database()
+    addrs = _addresses(n)
+    _seed_tokens(db, addrs)
+    batches = _batches(addrs)
+    source = DexScreenerProvider(_dex_client(batches))
+    agg, store = OHLCAggregator(), TimeSeriesStore(root=None)
+    loop = asyncio.new_event_loop()
+    # _poll_once stamps samples with the wall clock; older buffers would be evicted as idle.
+    # With 29 samples buffered this tick closes a bar for every token.
+    _prefill(agg, addrs, SAMPLES_PER_BAR - 1 if closes_bars else 1, time.time() - 60)
+    lifecycle = TokenLifecycle(pipeline_hooks(agg, store))
+    tick = lambda: loop.run_until_complete(price_watcher._poll_once(source, batches, db, agg, store, lifecycle))
+    def cleanup():
+        loop.close()
+        reset_indicators()
+        db.close()
+    return tick, n, cleanup
+
+@bench("price_watcher._poll_once")
+def poll_tick(n: int):
+    """One full tick: fetch+parse every batch, upsert prices, buffer samples."""
+    return _poll_case(n, closes_bars=False)
+
+@bench("price_watcher._poll_once[bar]")
+def poll_bar_tick(n: int):
+    """The minute-boundary tick: as above, plus bar, indicators, DB write and store append per token."""
+    return _poll_case(n, closes_bars=True)
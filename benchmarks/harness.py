@@ -0,0 +1,120 @@
+# Benchmark registry, timing and baseline comparison.
+# A case is a function of the token count n that prepares fresh state and
+# returns (run, ops, cleanup); only run() is timed, best of `repeat` (fewer
+# once a case has used up `budget_sec`: slow sizes are stable on one run).
+# Results are keyed "<case>@<n>" and compared on ns per op, so baselines
+# survive changes to how many ops a case does.
+import os, sys, json, time, fnmatch, platform, contextlib, typing
+
+Prepared = tuple[typing.Callable[[], None], int, typing.Optional[typing.Callable[[], None]]]
+
+
+class Case(typing.NamedTuple):
+    name: str
+    fn: typing.Callable[[int], Prepared]
+    max_tokens: typing.Optional[int]
+
+
+class Result(typing.NamedTuple):
+    case: str
+    tokens: int
+    ops: int
+    sec: float              # best run
+    ns_per_op: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}@{self.tokens}"
+
+
+CASES: dict[str, Case] = {}
+
+def bench(name: str, *, max_tokens: typing.Optional[int] = None):
+    """Register a case; sizes above max_tokens are skipped."""
+    def deco(fn):
+        CASES[name] = Case(name, fn, max_tokens)
+        return fn
+    return deco
+
+
+def run_case(case: Case, n: int, repeat: int = 3, budget_sec: float = 10.0) -> Result:
+    best, ops, spent = float("inf"), 0, 0.0
+    for _ in range(max(1, repeat)):
+        if spent > budget_sec:
+            break
+        with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):  # hot paths print debug lines
+            run, ops, cleanup = case.fn(n)
+            try:
+                t = time.perf_counter()
+                run()
+                dt = time.perf_counter() - t
+                best, spent = min(best, dt), spent + dt
+            finally:
+                if cleanup:
+                    cleanup()
+    return Result(case.name, n, ops, best, best / max(1, ops) * 1e9)
+
+
+def run_cases(sizes: typing.Iterable[int], pattern: str = "*", repeat: int = 3, budget_sec: float = 10.0,
+              progress: typing.Optional[typing.Callable[[Result], None]] = None) -> list[Result]:
+    out = []
+    for case in CASES.values():
+        if not fnmatch.fnmatch(case.name, pattern):
+            continue
+        for n in sizes:
+            if case.max_tokens is not None and n > case.max_tokens:
+                continue
+            r = run_case(case, n, repeat, budget_sec)
+            out.append(r)
+            if progress:
+                progress(r)
+    return out
+
+
+def meta() -> dict:
+    import numpy
+    return {"python": platform.python_version(), "numpy": numpy.__version__,
+            "platform": platform.platform(), "machine": platform.machine(),
+            "cpus": os.cpu_count(), "created": int(time.time()), "argv": sys.argv[1:]}
+
+
+def save_results(path: str, results: list[Result]) -> None:
+    with open(path, "w") as f:
+        json.dump({"meta": meta(), "results": {r.key: r._asdict() for r in results}}, f, indent=1)
+
+
+def load_results(path: str) -> dict[str, dict]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+class Delta(typing.NamedTuple):
+    key: str
+    base_ns: float
+    ns: float
+
+    @property
+    def ratio(self) -> float:
+        return self.ns / self.base_ns if self.base_ns else float("inf")
+
+
+def compare(results: list[Result], baseline: dict[str, dict], tolerance: float = 0.25) -> dict[str, list]:
+    """
+    Split results present in the baseline into regressions (slower by more
+    than `tolerance`), improvements (faster by more than it) and unchanged;
+    keys missing from the baseline are listed as new.
+    """
+    out = {"regressions": [], "improvements": [], "unchanged": [], "new": []}
+    for r in results:
+        base = baseline.get(r.key)
+        if base is None:
+            out["new"].append(r.key)
+            continue
+        d = Delta(r.key, base["ns_per_op"], r.ns_per_op)
+        if d.ratio > 1 + tolerance:
+            out["regressions"].append(d)
+        elif d.ratio < 1 / (1 + tolerance):
+            out["improvements"].append(d)
+        else:
+            out["unchanged"].append(d)
+    return out
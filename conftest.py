@@ -38,3 +38,10 @@ def prices(address: str):
         generated.append(bar)
     return generated
 
+
+
+@pytest.fixture
+def price_paths():
+    """20 seeded synthetic memecoin paths × 300 steps (10 min at a 2 s poll)."""
+    from trading_bot.sim.paths import generate_paths
+    return generate_paths(20, 300, seed=7)
@@ -0,0 +1,144 @@
+# Time and allocations per 10k bars: legacy dict pipeline vs typed records.
+# Both paths start from closed 30-sample windows (sample buffering is the same
+# plain tuples either way) → build the bar → update EMA/ATR → build the DB
+# rows → hand the bar to strategies. The aggregator's debug prints and
+# SQLite are left out so only the in-memory shaping is compared.
+# Usage: python scripts/bench_bar_records.py [N_BARS]
+import os, sys, time, random, tracemalloc
+from collections import deque
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trading_bot import ohlc_agg
+from trading_bot.indicators import set_plan, reset_indicators, update_all_for_bar
+from trading_bot.indicators.spec import config_specs
+from trading_bot.records import Bar, IndicatorValue
+
+SAMPLES = ohlc_agg.SAMPLES_PER_BAR
+
+
+def _samples(n_bars: int, seed: int = 1):
+    rng = random.Random(seed)
+    p, t = 1.0, 1_700_000_000.0
+    for _ in range(n_bars * SAMPLES):
+        p *= 1 + rng.gauss(0, 0.01)
+        t += 2
+        yield t, p, p * 1e9, p * 8e8
+
+
+# --- legacy pipeline (as it was before the records change) ---
+class _DictEMA:
+    def __init__(self, length, source):
+        self.alpha, self.source, self.prev = 2.0 / (length + 1), source, None
+    def update(self, bar):
+        x = float(bar[self.source])
+        self.prev = x if self.prev is None else self.prev + self.alpha * (x - self.prev)
+        return float(self.prev)
+
+class _DictATR:
+    def __init__(self, length):
+        self.length, self.prev_close, self.atr = length, None, None
+    def update(self, bar):
+        h, l, c = float(bar["high"]), float(bar["low"]), float(bar["close"])
+        pc = self.prev_close
+        tr = h - l if pc is None else max(h - l, abs(h - pc), abs(l - pc))
+        self.atr = tr if self.atr is None else (self.atr * (self.length - 1) + tr) / self.length
+        self.prev_close = c
+        return float(self.atr)
+
+def _legacy_update(plan, objs, bar):
+    address = bar["address"]
+    ema_rows, atr_rows = [], []
+    for spec, ind in zip(plan, objs):
+        value = ind.update(bar)
+        if spec.kind == "ema":
+            ema_rows.append({"address": address, "ts_start": bar["ts_start"], "length": spec.length,
+                             "source": spec.source, "value": value})
+        elif spec.kind == "atr":
+            atr_rows.append({"address": address, "ts_start": bar["ts_start"], "length": spec.length,
+                             "value": value})
+    return ema_rows, atr_rows
+
+def _legacy_run(windows):
+    plan = config_specs()
+    objs = [_DictEMA(s.length, s.source) if s.kind == "ema" else _DictATR(s.length) for s in plan]
+    out = []
+    for items in windows:
+        prices = [p for (_, p, _, _) in items]
+        bar = {"address": "bench", "ts_start": int(items[0][0] // 60 * 60), "open": prices[0],
+               "high": max(prices), "low": min(prices), "close": prices[-1],
+               "fdv_usd": items[-1][2], "marketcap_usd": items[-1][3], "samples": SAMPLES}
+        ema_rows, atr_rows = _legacy_update(plan, objs, {
+            "address": bar["address"], "ts_start": bar["ts_start"], "open": bar["open"],
+            "high": bar["high"], "low": bar["low"], "close": bar["close"],
+        })
+        bar_for_strat = {
+            "address": bar["address"], "ts_start": bar["ts_start"], "open": bar["open"],
+            "high": bar["high"], "low": bar["low"], "close": bar["close"],
+            "marketcap_usd": bar.get("marketcap_usd"),
+        }
+        out.append((bar, bar_for_strat, ema_rows, atr_rows))
+    return out
+
+
+# --- records pipeline (ohlc_agg bar shape + the live indicator registry) ---
+def _records_run(windows):
+    reset_indicators()
+    out = []
+    for items in windows:
+        prices = [p for (_, p, _, _) in items]
+        bar = Bar("bench", int(items[0][0] // 60 * 60), prices[0], max(prices), min(prices), prices[-1],
+                  items[-1][2], items[-1][3], SAMPLES)
+        ema_rows, atr_rows = update_all_for_bar(bar)
+        out.append((bar, ema_rows, atr_rows))
+    return out
+
+
+def _windows(samples):
+    """Closed 30-sample windows, buffered the way ohlc_agg does (identical for both paths)."""
+    buf, out = deque(), []
+    for s in samples:
+        buf.append(s)
+        if len(buf) == SAMPLES:
+            out.append([buf.popleft() for _ in range(SAMPLES)])
+    return out
+
+
+def _measure(fn, windows, repeat: int = 5):
+    elapsed = float("inf")
+    for _ in range(repeat):  # best of N: scheduler noise only ever adds time
+        t0 = time.perf_counter()
+        fn(windows)
+        elapsed = min(elapsed, time.perf_counter() - t0)
+    # bytes still held when every bar's outputs are kept (e.g. by a consumer's history)
+    tracemalloc.start()
+    kept = fn(windows)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return elapsed, retained
+
+
+def _per_bar_objects():
+    """(objects, bytes) created per closed bar by each pipeline, excluding samples."""
+    bar = {"address": "x", "ts_start": 0, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+           "fdv_usd": 1.0, "marketcap_usd": 1.0, "samples": 30}
+    ind_bar = {k: bar[k] for k in ("address", "ts_start", "open", "high", "low", "close")}
+    strat_bar = dict(ind_bar, marketcap_usd=1.0)
+    rows = [{"address": "x", "ts_start": 0, "length": 5, "source": "low", "value": 1.0},
+            {"address": "x", "ts_start": 0, "length": 14, "value": 1.0}]
+    legacy = [bar, ind_bar, strat_bar, *rows]
+    records = [Bar("x", 0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 30),
+               IndicatorValue("x", 0, 5, 1.0, "low"), IndicatorValue("x", 0, 14, 1.0)]
+    return ((len(legacy), sum(map(sys.getsizeof, legacy))),
+            (len(records), sum(map(sys.getsizeof, records))))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    set_plan(config_specs())
+    windows = _windows(_samples(n))
+    print(f"{n} bars, plan={', '.join(map(str, config_specs()))}")
+    for name, fn in (("dict", _legacy_run), ("records", _records_run)):
+        elapsed, retained = _measure(fn, windows)
+        print(f"  {name:8s} {elapsed * 1e6 / n:6.2f} µs/bar   {retained / n:6.0f} B/bar allocated and kept")
+    (dn, db), (rn, rb) = _per_bar_objects()
+    print(f"  per bar: dict {dn} dicts / {db} B   records {rn} tuples / {rb} B")
@@ -0,0 +1,58 @@
+# Startup cost of the monitor: `python -X importtime` over a fresh interpreter
+# per run, reporting the cumulative import time of a module, the heaviest
+# imports under it, and the wall time of import + init() (best of N).
+# Heavy clients (websockets/httpx/requests) should only show up once a
+# connection is made, not at import.
+# Usage: python scripts/bench_startup.py [RUNS] [MODULE]
+import os, sys, subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY = ("websockets", "httpx", "requests")
+
+
+def importtime(module: str) -> dict[str, int]:
+    """Cumulative import time (µs) of every module imported by `import module`."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stderr
+    cumulative = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = (s.strip() for s in line[len("import time:"):].split("|"))
+        cumulative[name.strip()] = int(cum)
+    return cumulative
+
+
+def wall(module: str, call: str, runs: int) -> float:
+    """Best wall time (ms) of `import module` followed by `call`, in a fresh interpreter."""
+    code = (f"import time; t = time.perf_counter(); import {module}; {call}; "
+            f"print((time.perf_counter() - t) * 1000)")
+    env = {**os.environ, "SOLANASTREAM_API_KEY": os.getenv("SOLANASTREAM_API_KEY", "bench")}
+    best = float("inf")
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        best = min(best, float(out.split()[-1]))
+    return best
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    module = sys.argv[2] if len(sys.argv) > 2 else "trading_bot.new_pairs"
+    times = min((importtime(module) for _ in range(runs)), key=lambda t: t.get(module, 0))
+    total = times.get(module, 0)
+    print(f"import {module}: {total / 1000:.1f} ms cumulative (best of {runs})")
+    print("heaviest top-level imports:")
+    tops = {n: t for n, t in times.items() if "." not in n and n != module.split(".")[0]}
+    for name, us in sorted(tops.items(), key=lambda kv: -kv[1])[:8]:
+        print(f"  {name:<24} {us / 1000:7.1f} ms")
+    eager = [m for m in LAZY if m in times]
+    print(f"lazy deps imported eagerly: {', '.join(eager) or 'none'}")
+    print(f"wall import: {wall(module, 'pass', runs):.1f} ms")
+    if module == "trading_bot.new_pairs":
+        print(f"wall import + init(): {wall(module, f'{module}.init()', runs):.1f} ms")
+    print(f"wall import trading_bot.db (tools): {wall('trading_bot.db', 'pass', runs):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # Show latest prices with just the required fields.
+import time
 from trading_bot.db import get_price_snapshot
 
 rows = get_price_snapshot(20)
@@ -7,4 +8,5 @@ if not rows:
 else:
     for addr, name, sym, price, fdv, mc, ts in rows:
         print(f"{name or 'Unknown'} ({sym or ''}) {addr[:6]}.. | "
-              f"price=${price} | fdv=${fdv} | mc=${mc} | {ts}")
+              f"price=${price} | fdv=${fdv} | mc=${mc} | "
+              f"{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(ts)) + 'Z' if ts else '-'}")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script for the hot-path benchmark harness
+"""
+
+import sys
+import json
+import asyncio
+sys.path.append('.')
+
+from benchmarks import CASES, Result, run_cases, compare, load_results, save_results
+from benchmarks.cases import StubDexClient, dex_payload
+from trading_bot.dexscreener_client import DEX_API, fetch_token_batch
+
+def test_compare_splits_by_tolerance():
+    base = {f"c@{n}": {"ns_per_op": 1000.0} for n in (1, 2, 3)}
+    results = [Result("c", 1, 10, 0.0, 1300.0), Result("c", 2, 10, 0.0, 700.0),
+               Result("c", 3, 10, 0.0, 1100.0), Result("c", 4, 10, 0.0, 1.0)]
+    out = compare(results, base, tolerance=0.25)
+    assert [d.key for d in out["regressions"]] == ["c@1"]
+    assert [d.key for d in out["improvements"]] == ["c@2"]
+    assert [d.key for d in out["unchanged"]] == ["c@3"]
+    assert out["new"] == ["c@4"]
+
+def test_small_run_round_trips(tmp_path):
+    results = run_cases([100], "db.upsert_price", repeat=1)
+    assert [r.key for r in results] == ["db.upsert_price@100"]
+    assert results[0].ops == 100 and results[0].ns_per_op > 0
+    path = tmp_path / "run.json"
+    save_results(str(path), results)
+    assert load_results(str(path))["db.upsert_price@100"]["ops"] == 100
+    assert not compare(results, load_results(str(path)))["regressions"]
+
+def test_baseline_covers_every_case():
+    with open("benchmarks/baseline.json") as f:
+        keys = json.load(f)["results"]
+    assert {k.split("@")[0] for k in keys} == set(CASES)
+
+def test_payload_is_parseable():
+    addrs = ["A" * 44, "B" * 44]
+    client = StubDexClient({f"{DEX_API}/tokens/{','.join(addrs)}": dex_payload(addrs)})
+    rows = asyncio.run(fetch_token_batch(client, addrs))
+    assert sorted(r["address"] for r in rows) == addrs
+    assert all(r["price_usd"] > 0 for r in rows)
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
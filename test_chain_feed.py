@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for the push-based chain price feed against a local RPC stand-in
+"""
+
+import sys
+import asyncio
+import tempfile
+sys.path.append('.')
+
+import httpx
+from trading_bot.chain_feed import (ChainPriceFeed, RAYDIUM_AMM_V4, PUMPSWAP_AMM, WSOL, USD_MINTS,
+                                    b58encode, b58decode, decode_raydium_amm_v4, decode_pumpswap)
+from trading_bot.db import Database
+from trading_bot.journal import Journal
+from trading_bot.lifecycle import TokenLifecycle, pipeline_hooks
+from trading_bot.ohlc_agg import OHLCAggregator
+from trading_bot.sim.rpc import (RpcReplay, TOKEN_PROGRAM, pubkey, token_account, mint_account,
+                                 raydium_amm_v4_account, pumpswap_account)
+from trading_bot.tsstore import TimeSeriesStore
+
+USDC = sorted(USD_MINTS)[0]
+TOKEN_A, TOKEN_B, TOKEN_C = pubkey("mint-a"), pubkey("mint-b"), pubkey("mint-c")
+REF, POOL_A, POOL_B, POOL_C = pubkey("pool-ref"), pubkey("pool-a"), pubkey("pool-b"), pubkey("pool-c")
+V = {name: pubkey(f"vault-{name}") for name in ("ref_sol", "ref_usdc", "a_sol", "a_tok", "b_tok", "b_sol")}
+
+def _recording():
+    """SOL at $150; A (Raydium, WSOL as base) at 1e-5 SOL, B (PumpSwap) at 2e-5 SOL; C on an unknown program."""
+    accounts = {
+        REF: (RAYDIUM_AMM_V4, raydium_amm_v4_account(WSOL, USDC, V["ref_sol"], V["ref_usdc"], 9, 6)),
+        POOL_A: (RAYDIUM_AMM_V4, raydium_amm_v4_account(WSOL, TOKEN_A, V["a_sol"], V["a_tok"], 9, 6)),
+        POOL_B: (PUMPSWAP_AMM, pumpswap_account(TOKEN_B, WSOL, V["b_tok"], V["b_sol"])),
+        POOL_C: (pubkey("some-clmm-program"), bytes(1000)),
+        V["ref_sol"]: (TOKEN_PROGRAM, token_account(WSOL, 1000 * 10**9)),
+        V["ref_usdc"]: (TOKEN_PROGRAM, token_account(USDC, 150_000 * 10**6)),
+        V["a_sol"]: (TOKEN_PROGRAM, token_account(WSOL, 10 * 10**9)),
+        V["a_tok"]: (TOKEN_PROGRAM, token_account(TOKEN_A, 10**6 * 10**6)),
+        V["b_tok"]: (TOKEN_PROGRAM, token_account(TOKEN_B, 2 * 10**6 * 10**6)),
+        V["b_sol"]: (TOKEN_PROGRAM, token_account(WSOL, 40 * 10**9)),
+        WSOL: (TOKEN_PROGRAM, mint_account(0, 9)),
+        USDC: (TOKEN_PROGRAM, mint_account(10**15, 6)),
+        TOKEN_A: (TOKEN_PROGRAM, mint_account(10**15, 6)),
+        TOKEN_B: (TOKEN_PROGRAM, mint_account(10**15, 6)),
+    }
+    updates = [
+        (0.01, V["b_sol"], token_account(WSOL, 60 * 10**9)),             # B: 3e-5 SOL
+        (0.01, V["ref_usdc"], token_account(USDC, 200_000 * 10**6)),     # SOL: $200
+    ]
+    return accounts, updates
+
+async def _until(cond, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not cond():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+def _close(a, b):
+    return abs(a - b) <= 1e-9 * max(abs(a), abs(b))
+
+async def _session(replay, journal, db, agg, scenario):
+    await replay.start()
+    env = replay.env()
+    async with httpx.AsyncClient(base_url=env["SOLANA_RPC_URL"]) as rpc:
+        lifecycle = TokenLifecycle(pipeline_hooks(agg, TimeSeriesStore(root=None)))
+        feed = ChainPriceFeed(ws_url=env["SOLANA_RPC_WS_URL"], rpc=rpc, db=db, agg=agg,
+                              lifecycle=lifecycle, store=TimeSeriesStore(root=None), interval=3600,
+                              sol_usd_pool=REF, journal=journal, enabled=True)
+        task = asyncio.create_task(feed.run())
+        try:
+            assert await feed.track(TOKEN_A, POOL_A) and await feed.track(TOKEN_B, POOL_B)
+            await _until(lambda: feed.covers(TOKEN_A) and feed.covers(TOKEN_B))
+            return await scenario(feed, replay, lifecycle)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await replay.close()
+
+def test_layouts_round_trip():
+    key = pubkey("x")
+    assert b58encode(b58decode(key)) == key and b58encode(b"\0\0\1") == "112"
+    assert b58encode(b58decode(WSOL)) == WSOL
+    ray = decode_raydium_amm_v4(raydium_amm_v4_account(WSOL, TOKEN_A, V["a_sol"], V["a_tok"], base_pnl=5))
+    assert ray == (WSOL, TOKEN_A, V["a_sol"], V["a_tok"], 5, 0)
+    assert decode_pumpswap(pumpswap_account(TOKEN_B, WSOL, V["b_tok"], V["b_sol"]))[:4] == \
+        (TOKEN_B, WSOL, V["b_tok"], V["b_sol"])
+
+def test_prices_from_replayed_notifications():
+    db = Database()
+    for t in (TOKEN_A, TOKEN_B):
+        db.upsert_safe_token(address=t, name="T", symbol="T", dex="raydium", risk=1, signature="s", rc={})
+    agg = OHLCAggregator()
+    replay = RpcReplay(*_recording())
+
+    async def scenario(feed, replay, lifecycle):
+        # both orientations: A is the quote of its pool, B the base
+        assert _close(feed.price_usd(WSOL), 150.0)
+        assert _close(feed.price_usd(TOKEN_A), 1e-5 * 150) and _close(feed.price_usd(TOKEN_B), 2e-5 * 150)
+        assert await feed.track(TOKEN_C, POOL_C) is False and not feed.covers(TOKEN_C)
+
+        assert await feed.tick(now=1_700_000_000) == 2
+        assert agg.buffers[TOKEN_B].samples[-1][1:3] == (feed.price_usd(TOKEN_B), 2e-5 * 150 * 1e9)
+        assert await replay.play(speed=0) == 2
+        await _until(lambda: feed.counters["notifications"] == 2)
+        assert _close(feed.price_usd(TOKEN_A), 1e-5 * 200) and _close(feed.price_usd(TOKEN_B), 3e-5 * 200)
+
+        # socket drop: not covered (the poller takes over) until resubscribed
+        await replay.drop_connections()
+        await _until(lambda: not feed.covers(TOKEN_A))
+        await _until(lambda: feed.covers(TOKEN_A) and feed.covers(TOKEN_B))
+        assert feed.manager.sessions == 2
+
+        # retirement unsubscribes the token's vaults
+        lifecycle.blacklist(TOKEN_A)
+        await lifecycle.sweep()
+        await _until(lambda: not {V["a_sol"], V["a_tok"]} & replay.subscribed())
+        assert TOKEN_A not in feed.pools and feed.stats()["watching"] == 1
+        return feed.stats()
+
+    try:
+        stats = asyncio.run(_session(replay, Journal(None), db, agg, scenario))
+        assert stats["unsupported"] == 1 and stats["errors"] == 0
+        prices = dict(db.conn.execute("SELECT address, price_usd FROM prices").fetchall())
+        assert _close(prices[TOKEN_A], 1e-5 * 150)
+    finally:
+        db.close()
+
+def test_journal_recording_replays():
+    with tempfile.TemporaryDirectory() as d:
+        journal = Journal(d)
+
+        async def record(feed, replay, lifecycle):
+            await replay.play(speed=0)
+            await _until(lambda: feed.counters["notifications"] == 2)
+            return feed.price_usd(TOKEN_A), feed.price_usd(TOKEN_B)
+
+        live = asyncio.run(_session(RpcReplay(*_recording()), journal, None, OHLCAggregator(), record))
+        journal.close()
+
+        replay = RpcReplay.from_journal(d)
+        assert [u[1] for u in replay.updates] == [V["b_sol"], V["ref_usdc"]]
+        assert replay.accounts[V["b_sol"]][1] == token_account(WSOL, 40 * 10**9)
+        replayed = asyncio.run(_session(replay, Journal(None), None, OHLCAggregator(), record))
+        assert replayed == live
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test isolated Database instances: separate schemas, helpers, paper state and concurrent use
+"""
+
+import sys
+import sqlite3
+import asyncio
+import threading
+sys.path.append('.')
+
+from trading_bot.db import Database, default_db, get_ohlc_1m, count_tokens
+from trading_bot.indicators import INDICATORS
+from trading_bot.lifecycle import TokenLifecycle, pipeline_hooks
+from trading_bot.ohlc_agg import OHLCAggregator, SAMPLES_PER_BAR
+from trading_bot.papertrading import PaperTrader, PAPER_TRADER
+from trading_bot.papertrading.base import StrategyContext
+from trading_bot.papertrading.db import paper_db
+from trading_bot.price_watcher import ingest_batch
+from trading_bot.records import Bar
+from trading_bot.tsstore import TimeSeriesStore
+
+STRATEGY = "trading_bot.papertrading.strategies.early_momentum.EarlyMomentum"
+
+def _token(db: Database, addr: str, risk: int = 5):
+    db.upsert_safe_token(address=addr, name=addr, symbol="T", dex="raydium", risk=risk, signature="sig")
+
+def test_instances_do_not_share_data():
+    a, b = Database(), Database()
+    try:
+        assert a.path != b.path != default_db().path
+        _token(a, "iso_a")
+        a.insert_ohlc_1m(Bar("iso_a", 60, 1.0, 1.1, 0.9, 1.05, None, None, 30))
+        assert a.count_tokens() == 1 and b.count_tokens() == 0
+        assert len(a.get_ohlc_1m("iso_a")) == 1 and b.get_ohlc_1m("iso_a") == []
+        assert get_ohlc_1m("iso_a") == []                 # the module helpers use the default instance
+        assert count_tokens() == default_db().count_tokens()
+
+        # paper tables exist on every instance; helpers are bound per database
+        paper_db(a).blacklist_add("iso_a", "test")
+        assert paper_db(a).is_blacklisted("iso_a") and not paper_db(b).is_blacklisted("iso_a")
+        assert StrategyContext(db=b).paper.db is b and StrategyContext().database is default_db()
+    finally:
+        a.close()
+        b.close()
+
+def test_paper_writes_do_not_wait_for_the_writer():
+    db = Database()
+    paper = paper_db(db)
+    gate = threading.Event()
+    try:
+        busy = db.writer.submit(lambda c: gate.wait())      # the writer is stuck on a long batch
+        futs = [paper.pos_upsert("pw_tok", status="long", entry_ts=60, entry_price=1.0),
+                paper.pos_set_entry_marketcap("pw_tok", 5e5),
+                paper.blacklist_add("pw_bl", "test")]
+        # queued, not committed, but already visible to this database's strategies
+        assert not any(f.done() for f in futs)
+        assert paper.pos_get("pw_tok")[1:4] == ("long", 60, 1.0) and paper.get_entry_marketcap("pw_tok") == 5e5
+        assert paper.is_blacklisted("pw_bl")
+        gate.set()
+        busy.result()
+        paper.flush()
+        assert all(f.done() for f in futs)
+        assert db.conn.execute("SELECT status, entry_marketcap_usd FROM paper_positions").fetchall() == [("long", 5e5)]
+        paper.purge_token_data("pw_tok").result()
+        assert paper.pos_get("pw_tok") is None and db.conn.execute("SELECT COUNT(*) FROM paper_positions").fetchone() == (0,)
+    finally:
+        gate.set()
+        db.close()
+
+def test_loop_reads_wait_off_the_loop():
+    db = Database()
+    _token(db, "lr_a")
+    inserted, gate = threading.Event(), threading.Event()
+
+    def write(c):
+        c.execute("INSERT INTO tokens(address, rc_json) VALUES('lr_b', '{}')")
+        inserted.set()
+        gate.wait()                                      # the writer holds its transaction open
+
+    async def go():
+        busy = db.writer.submit(write)
+        await asyncio.get_running_loop().run_in_executor(None, inserted.wait)
+        try:                                             # the loop's connection fails fast instead of spinning
+            db.conn.execute("SELECT n FROM token_stats").fetchone()
+            assert False, "expected a table lock"
+        except sqlite3.OperationalError as e:
+            assert "locked" in str(e)
+        count = asyncio.ensure_future(db.count_tokens_async())
+        stats = asyncio.ensure_future(db.get_stats_async())
+        await asyncio.sleep(0.05)                        # the loop keeps running while both reads wait
+        assert not count.done() and not stats.done()
+        gate.set()
+        await asyncio.wrap_future(busy)
+        return await count, await stats
+
+    try:
+        n, stats = asyncio.run(go())
+        assert n == 2 and stats == db.get_stats() and stats["total"] == 2
+        assert asyncio.run(db.page_usage_async())["pages"] == db.page_usage()["pages"]
+    finally:
+        gate.set()
+        db.close()
+
+def test_pipelines_do_not_share_strategies():
+    a, b = Database(), Database()
+    ta, tb = PaperTrader(), PaperTrader()
+    try:
+        assert ta.load(a, STRATEGY) and tb.load(b, STRATEGY)
+        assert ta.ctx.paper.db is a and tb.ctx.paper.db is b
+        assert ta.indicators is not tb.indicators is not INDICATORS and ta.screener is not tb.screener
+        agg, store = OHLCAggregator(), TimeSeriesStore(root=None)
+        lifecycle = TokenLifecycle(pipeline_hooks(agg, store, ta))
+        _token(a, "pipe_tok")
+
+        async def feed():
+            for i in range(SAMPLES_PER_BAR * 3):
+                row = {"address": "pipe_tok", "price_usd": 1.0 + 0.01 * i, "fdv_usd": None, "marketcap_usd": None}
+                await ingest_batch([row], 1_700_000_000 + 2 * i, a, agg, store, lifecycle, trader=ta)
+        asyncio.run(feed())
+        # bars went through a's indicators, strategies and screener only
+        assert ta.indicators.get_values("pipe_tok") is not None and ta.screener.latest("pipe_tok")["bars"] >= 2
+        assert tb.indicators.get_values("pipe_tok") is None and tb.screener.latest("pipe_tok") is None
+        assert INDICATORS.get_values("pipe_tok") is None and "pipe_tok" in ta.strategies[0]._state
+        assert len(a.get_ohlc_1m("pipe_tok", 10)) >= 2 and b.get_ohlc_1m("pipe_tok") == []
+
+        # retiring the token clears this pipeline's state
+        lifecycle.blacklist("pipe_tok")
+        asyncio.run(lifecycle.sweep())
+        assert ta.indicators.get_values("pipe_tok") is None and "pipe_tok" not in ta.strategies[0]._state
+
+        # loading again keeps the strategies but rebinds the database
+        strategies = ta.strategies
+        assert ta.load(b) is strategies and ta.ctx.paper.db is b
+        assert PAPER_TRADER.indicators is INDICATORS
+    finally:
+        a.close()
+        b.close()
+
+def test_parallel_simulations_in_threads():
+    results = {}
+
+    def simulate(n: int):
+        db, agg = Database(), OHLCAggregator()
+        _token(db, "sim_tok")
+        for i in range(SAMPLES_PER_BAR * n):
+            bar = agg.add_sample("sim_tok", price=1.0 + i, ts=1_700_000_000 + 2 * i)
+            if bar:
+                db.insert_ohlc_1m(bar)
+        results[n] = (len(db.get_ohlc_1m("sim_tok", 100)), db.count_tokens())
+        db.close()
+
+    threads = [threading.Thread(target=simulate, args=(n,)) for n in (2, 3, 4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {2: (2, 1), 3: (3, 1), 4: (4, 1)}
+
+if __name__ == "__main__":
+    test_instances_do_not_share_data()
+    test_paper_writes_do_not_wait_for_the_writer()
+    test_loop_reads_wait_off_the_loop()
+    test_pipelines_do_not_share_strategies()
+    test_parallel_simulations_in_threads()
+    print("\n✅ Database isolation tests completed!")
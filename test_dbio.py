@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test the DB writer thread (batched transactions, per-command errors) and the read pool
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+sys.path.append('.')
+
+from trading_bot.dbio import DBWriter, ReadPool, connect
+from trading_bot.db import DB, WRITER, upsert_price_async, store_bar_async, get_ohlc_1m, get_ema_1m
+from trading_bot.records import Bar, IndicatorValue
+
+def _fresh_db():
+    path = os.path.join(tempfile.mkdtemp(), "dbio.sqlite")
+    conn = connect(path)
+    conn.execute("CREATE TABLE kv (k TEXT PRIMARY KEY, v INTEGER NOT NULL)")
+    conn.commit()
+    conn.close()
+    return path
+
+def test_writer_batches_and_isolates_failures():
+    path = _fresh_db()
+    w = DBWriter(path, batch_max=64)
+    gate = threading.Event()
+    w.submit(lambda c: gate.wait())      # hold the thread so the next commands queue up
+    futs = [w.submit(lambda c, i=i: c.execute("INSERT INTO kv VALUES(?, ?)", (f"k{i}", i)).rowcount)
+            for i in range(50)]
+    bad = w.submit(lambda c: c.execute("INSERT INTO kv VALUES('k1', NULL)"))   # duplicate key
+    gate.set()
+    assert [f.result(5) for f in futs] == [1] * 50
+    try:
+        bad.result(5)
+        assert False, "the failing command's own future carries the error"
+    except sqlite3.IntegrityError:
+        pass
+    stats = w.stats()
+    print(f"📊 Writer: {stats}")
+    # the queued inserts (and the failing one) shared a single transaction
+    assert stats["commands"] == 52 and stats["batches"] <= 2 and stats["max_batch"] >= 51 and stats["errors"] == 1
+    assert w.run(lambda c: c.execute("SELECT COUNT(*) FROM kv").fetchone()[0]) == 50
+    w.close()
+
+def test_read_pool_sees_committed_writes():
+    path = _fresh_db()
+    w, reads = DBWriter(path), ReadPool(path, size=2)
+
+    async def go():
+        await asyncio.gather(*(w.aexecute("INSERT INTO kv VALUES(?, ?)", (f"a{i}", i)) for i in range(20)))
+        rows = await asyncio.gather(*(reads.fetchone("SELECT SUM(v) FROM kv") for _ in range(4)))
+        return rows, await reads.fetchall("SELECT k FROM kv WHERE v < 3 ORDER BY v")
+
+    rows, small = asyncio.run(go())
+    assert all(r == (190,) for r in rows)
+    assert small == [("a0",), ("a1",), ("a2",)]
+    reads.close()
+    w.close()
+
+def test_readers_never_see_an_open_batch():
+    path = "file:dbio_isolation?mode=memory&cache=shared"
+    keep = connect(path)                 # the in-memory database lives while a connection is open
+    keep.execute("CREATE TABLE kv (k TEXT PRIMARY KEY, v INTEGER NOT NULL)")
+    keep.commit()
+    w, reads = DBWriter(path), ReadPool(path, size=1)
+    inserted, gate = threading.Event(), threading.Event()
+
+    def write(c):
+        c.execute("INSERT INTO kv VALUES('x', 1)")
+        inserted.set()
+        gate.wait()                      # the batch is still open (and could roll back)
+
+    async def go():
+        fut = w.submit(write)
+        await asyncio.get_running_loop().run_in_executor(None, inserted.wait)
+        read = asyncio.ensure_future(reads.fetchone("SELECT COUNT(*) FROM kv"))
+        await asyncio.sleep(0.05)
+        assert not read.done()           # waits for the commit instead of reading the open batch
+        gate.set()
+        await asyncio.wrap_future(fut)
+        return await read
+
+    try:
+        assert asyncio.run(go()) == (1,)
+    finally:
+        gate.set()
+        reads.close()
+        w.close()
+        keep.close()
+
+def test_module_writer_async_helpers():
+    addr = "dbio_async_token"
+    bar = Bar(addr, 1_700_000_040, 1.0, 1.5, 0.9, 1.2, 1e6, 5e5, 30)
+
+    async def go():
+        await upsert_price_async({"address": addr, "price_usd": 1.2, "fdv_usd": 1e6, "marketcap_usd": 5e5})
+        await store_bar_async(bar, [IndicatorValue(addr, bar.ts_start, 5, 1.1, "low")],
+                              [IndicatorValue(addr, bar.ts_start, 14, 0.3)])
+
+    asyncio.run(go())
+    # the shared main connection reads what the writer thread committed
+    assert DB.execute("SELECT price_usd FROM prices WHERE address=?", (addr,)).fetchone() == (1.2,)
+    assert get_ohlc_1m(addr, 1)[0][:2] == (bar.ts_start, 1.0)
+    assert get_ema_1m(addr, 5, 1) == [(bar.ts_start, 1.1)]
+    assert WRITER.run(lambda c: WRITER.run(lambda c2: c2 is c))   # nested run() on the writer thread
+
+def test_price_batch_is_one_writer_command():
+    from trading_bot.db import Database
+    from trading_bot.lifecycle import TokenLifecycle
+    from trading_bot.ohlc_agg import OHLCAggregator
+    from trading_bot.price_watcher import ingest_batch
+    from trading_bot.tsstore import TimeSeriesStore
+    db = Database()
+    rows = [{"address": f"batch_tok_{i}", "price_usd": 1.0 + i, "fdv_usd": 1e6, "marketcap_usd": 5e5}
+            for i in range(30)]
+    try:
+        asyncio.run(ingest_batch(rows, 1_700_000_000, db, OHLCAggregator(), TimeSeriesStore(root=None),
+                                 TokenLifecycle()))
+        assert db.writer.stats()["commands"] == 1
+        assert db.conn.execute("SELECT COUNT(*) FROM prices").fetchone() == (30,)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    test_writer_batches_and_isolates_failures()
+    test_read_pool_sees_committed_writes()
+    test_readers_never_see_an_open_batch()
+    test_module_writer_async_helpers()
+    test_price_batch_is_one_writer_command()
+    print("\n✅ DB writer/read pool tests completed!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared pooled HTTP clients against a local stub server
+"""
+
+import asyncio
+import json
+import threading
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append('.')
+
+from trading_bot import http_clients, rugcheck_client
+
+class _StubRugCheck(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+
+    def do_GET(self):
+        if "/NEWTOKEN/" in self.path:
+            body = b"unable to generate report"
+            self.send_response(400)
+        else:
+            body = json.dumps({"score_normalised": 4, "mint": self.path.split("/")[-3]}).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_shared_client_reuses_connections(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubRugCheck)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(rugcheck_client, "BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setattr(http_clients, "_metrics", {})
+
+    async def run():
+        http_clients.start_clients(["rugcheck"])
+        try:
+            results = [await rugcheck_client.get_risk_level_async(f"MINT{i}") for i in range(10)]
+            unscored = await rugcheck_client.get_risk_level_async("NEWTOKEN", retries=0)
+        finally:
+            await http_clients.close_clients()
+        return results, unscored
+
+    try:
+        results, unscored = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    stats = http_clients.client_stats()["rugcheck"]
+    print(f"📊 Stats: {stats}")
+    assert [r[0] for r in results] == [4] * 10
+    assert results[3][1]["mint"] == "MINT3"
+    assert unscored == (None, None)
+    assert stats["requests"] == 11
+    assert stats["new_connections"] == 1           # one TCP handshake for all requests
+    assert stats["reuse_rate"] > 0.9
+    assert stats["avg_handshake_ms"] > 0
+
+def test_get_client_is_shared_and_recreated_after_close():
+    async def run():
+        a = http_clients.get_client("dexscreener")
+        b = http_clients.get_client("dexscreener")
+        assert a is b
+        await http_clients.close_clients()
+        c = http_clients.get_client("dexscreener")
+        assert c is not a and not c.is_closed
+        await http_clients.close_clients()
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
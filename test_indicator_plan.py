@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for demand-driven indicator plans declared by strategies
+"""
+
+import sys
+sys.path.append('.')
+
+from trading_bot.indicators import ema_spec, atr_spec, set_plan, get_plan, slot, get_values, update_all_for_bar
+from trading_bot.indicators.spec import config_specs
+from trading_bot.papertrading.base import Strategy
+from trading_bot.papertrading.strategies.early_momentum import EarlyMomentum
+
+ADDR = "plan_test_token"
+
+class _Other(Strategy):
+    def indicators(self):
+        return [ema_spec(5, "low"), ema_spec(9, "close")]
+
+def _bar(i):
+    return {"address": ADDR, "ts_start": 1_700_000_000 + 60 * i,
+            "open": 1.0 + i, "high": 1.2 + i, "low": 0.9 + i, "close": 1.1 + i}
+
+def test_plan_is_deduplicated_union_of_declarations():
+    try:
+        specs = EarlyMomentum().indicators() + _Other().indicators()
+        plan = set_plan(specs)
+        print(f"📋 Plan: {', '.join(map(str, plan))}")
+        assert plan == [ema_spec(5, "low"), atr_spec(14), ema_spec(9, "close")]
+        assert get_plan() == plan
+
+        ema_rows, atr_rows = update_all_for_bar(_bar(0))
+        assert [(r["length"], r["source"]) for r in ema_rows] == [(5, "low"), (9, "close")]
+        assert [r["length"] for r in atr_rows] == [14]
+
+        vals = get_values(ADDR)
+        assert vals[slot(ema_spec(5, "low"))] == 0.9          # first EMA value seeds with the source
+        assert vals[slot(atr_spec(14))] == atr_rows[0]["value"]
+    finally:
+        set_plan(config_specs())
+
+def test_strategy_reads_indicators_by_slot():
+    try:
+        strat = EarlyMomentum()
+        set_plan(strat.indicators())
+        strat.on_start(None)
+        for i in range(3):
+            update_all_for_bar(_bar(i))
+        ema5_low, atr14 = strat._indicator_values(ADDR, [], [])
+        assert ema5_low is not None and atr14 is not None
+        assert ema5_low == get_values(ADDR)[slot(ema_spec(5, "low"))]
+    finally:
+        set_plan(config_specs())
+
+def test_unknown_indicator_type_is_rejected():
+    from trading_bot.indicators import IndicatorSpec
+    try:
+        set_plan([IndicatorSpec("nope", 3)])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    finally:
+        set_plan(config_specs())
+
+if __name__ == "__main__":
+    test_plan_is_deduplicated_union_of_declarations()
+    test_strategy_reads_indicators_by_slot()
+    test_unknown_indicator_type_is_rejected()
+    print("\n✅ Indicator plan tests completed!")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-token lifecycle manager and its coordinated eviction
+"""
+
+import sys
+import asyncio
+sys.path.append('.')
+
+from trading_bot.db import Database
+from trading_bot.indicators import update_all_for_bar, get_values, reset_indicators
+from trading_bot.lifecycle import Hook, TokenLifecycle, pipeline_hooks
+from trading_bot.ohlc_agg import OHLCAggregator, INACTIVITY_SEC, CLEANUP_EVERY_SEC
+from trading_bot.papertrading.base import StrategyContext
+from trading_bot.papertrading.db import paper_db
+from trading_bot.papertrading.strategies.early_momentum import EarlyMomentum
+from trading_bot.records import Bar
+from trading_bot.tsstore import TimeSeriesStore
+
+T0 = 1_700_000_000
+
+def _bar(addr, k, close=1.0):
+    return Bar(addr, T0 + 60 * k, 1.0, max(1.0, close) * 1.01, min(1.0, close) * 0.99, close, 1e5, 8e4, 30)
+
+def _pipeline(**kw):
+    agg, store, strat = OHLCAggregator(), TimeSeriesStore(root=None), EarlyMomentum()
+    ctx = StrategyContext()
+    hooks = pipeline_hooks(agg, store)[:2] + [Hook("strategy", lambda a: strat.on_evict(ctx, a)),
+                                              pipeline_hooks(agg, store)[3]]
+    return TokenLifecycle(hooks, warm_bars=3, cold_sec=100, dead_sec=1000, **kw), agg, store, strat
+
+def _feed_bar(lc, agg, store, strat, addr, k, close=1.0):
+    lc.on_sample(addr, T0 + 60 * k)
+    agg.add_sample(addr, price=close, fdv=1e5, mc=8e4, ts=T0 + 60 * k)
+    bar = _bar(addr, k, close)
+    lc.on_bar(bar)
+    update_all_for_bar(bar)
+    store.append(addr, bar._asdict())
+    strat._state.setdefault(addr, {"bars_seen": k})
+
+def test_states_and_retirement():
+    lc, agg, store, strat = _pipeline()
+    addr = "lifecycle_tok_1"
+    lc.admit(addr, now=T0)
+    assert lc.state(addr) == "new"
+    for k in range(2):
+        _feed_bar(lc, agg, store, strat, addr, k)
+    assert lc.state(addr) == "warming"
+    _feed_bar(lc, agg, store, strat, addr, 2)
+    assert lc.state(addr) == "active"
+
+    # cold: only the sample buffer goes
+    assert asyncio.run(lc.sweep(now=T0 + 120 + 100)) == {"cold": 1, "retired": 0}
+    assert lc.state(addr) == "cold" and addr not in agg.buffers
+    assert get_values(addr) is not None and addr in store and addr in strat._state
+    assert lc.on_sample(addr, T0 + 300) and lc.state(addr) == "active"
+
+    # dead after DEAD_SEC cold: every hook runs and the token is forgotten
+    asyncio.run(lc.sweep(now=T0 + 300 + 100))
+    assert asyncio.run(lc.sweep(now=T0 + 400 + 1000)) == {"cold": 0, "retired": 1}
+    assert lc.state(addr) is None
+    assert get_values(addr) is None and addr not in store and addr not in strat._state
+    assert not lc.on_sample(addr, T0 + 2000)           # late sample of a retired token
+    assert lc.watchable([addr, "other"]) == ["other"]
+    assert lc.stats()["retired"] == 1
+
+def test_rug_and_new_timeout():
+    lc, agg, store, strat = _pipeline()
+    for k, close in enumerate((1.0, 3.0, 0.2)):
+        _feed_bar(lc, agg, store, strat, "rugged_tok", k, close)
+    assert lc.state("rugged_tok") == "dead"
+    assert lc.watchable(["rugged_tok"]) == []
+    lc.admit("never_listed", now=T0)
+    assert asyncio.run(lc.sweep(now=T0 + 999))["retired"] == 1
+    assert lc.state("never_listed") == "new"
+    assert asyncio.run(lc.sweep(now=T0 + 1000))["retired"] == 1
+    assert lc.counts() == dict.fromkeys(lc.counts(), 0)
+    reset_indicators("rugged_tok")
+
+def test_positions_and_blacklist_from_db():
+    db = Database()
+    paper = paper_db(db)
+    for a in ("pos_tok", "bl_tok"):
+        db.upsert_safe_token(address=a, name=a, symbol=a, dex="raydium", risk=1, signature="s")
+    lc, agg, store, strat = _pipeline()
+    for a in ("pos_tok", "bl_tok"):
+        lc.admit(a, now=T0)
+        lc.on_sample(a, T0)
+    paper.pos_upsert("pos_tok", status="long", entry_ts=T0, entry_price=1.0)
+    paper.blacklist_add("bl_tok", "test")
+
+    async def run():
+        out = await lc.sweep(db, now=T0 + 5000)   # far past every timer
+        return out, lc.state("pos_tok")
+    out, pos_state = asyncio.run(run())
+    assert out["retired"] == 1 and pos_state == "position"
+    assert lc.state("bl_tok") is None
+    assert [r[0] for r in db.conn.execute("SELECT address FROM tokens ORDER BY address")] == ["pos_tok"]
+
+    paper.pos_upsert("pos_tok", status="ended", entry_ts=T0, entry_price=1.0)
+    lc.on_sample("pos_tok", T0 + 5000)
+    asyncio.run(lc.sweep(db, now=T0 + 5001))
+    assert lc.state("pos_tok") == "warming"
+    db.close()
+
+def test_memory_by_state():
+    lc, agg, store, strat = _pipeline()
+    for i in range(20):
+        a = f"mem_tok_{i}"
+        lc.admit(a, now=T0)
+        _feed_bar(lc, agg, store, strat, a, 0)
+    m = lc.memory_by_state()
+    assert m["warming"]["tokens"] == 20 and m["warming"]["bytes"] > 0
+    assert m["active"] == {"tokens": 0, "bytes": 0}
+    for i in range(20):
+        reset_indicators(f"mem_tok_{i}")
+
+def test_aggregator_idle_cleanup_is_periodic():
+    agg = OHLCAggregator()
+    agg.add_sample("a", price=1.0, ts=T0)
+    agg.add_sample("b", price=1.0, ts=T0 + 20)
+    t = T0 + INACTIVITY_SEC + 10
+    agg.add_sample("c", price=1.0, ts=t)
+    assert set(agg.buffers) == {"b", "c"}
+    agg.add_sample("c", price=1.0, ts=t + 15)
+    assert "b" in agg.buffers        # idle, but the last scan was under CLEANUP_EVERY_SEC ago
+    agg.add_sample("c", price=1.0, ts=t + CLEANUP_EVERY_SEC)
+    assert set(agg.buffers) == {"c"}
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline load-test harness (real new_pairs.main against local stubs)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+sys.path.append('.')
+
+def test_short_run_reports_throughput_and_latency():
+    with tempfile.TemporaryDirectory() as d:
+        out = os.path.join(d, "report.json")
+        proc = subprocess.run([sys.executable, "-m", "trading_bot.sim.loadtest", "--duration", "4",
+                               "--pairs", "20", "--pair-rate", "20", "--rug-unscored", "0", "--json", out],
+                              capture_output=True, text=True, timeout=120)
+        assert proc.returncode == 0, proc.stderr
+        report = json.load(open(out))
+    assert report["stubs"]["pairs_sent"] == 20
+    assert report["throughput"]["tokens_stored"] > 0
+    assert report["latency_ms"]["admission"]["p50"] > 0
+    assert report["latency_ms"]["event_loop_lag"]["p100"] >= report["latency_ms"]["event_loop_lag"]["p50"]
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
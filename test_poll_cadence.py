@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for adaptive per-token poll cadence
+"""
+
+import sys
+import asyncio
+sys.path.append('.')
+
+from trading_bot.db import Database
+from trading_bot.lifecycle import TokenLifecycle, pipeline_hooks
+from trading_bot.ohlc_agg import OHLCAggregator
+from trading_bot.poll_cadence import PollCadence
+from trading_bot.price_sources import PriceProvider
+from trading_bot.price_watcher import _poll_tick
+from trading_bot.sim.stubs import sim_mint
+from trading_bot.tsstore import TimeSeriesStore
+
+MOVING = [sim_mint(i) for i in range(4)]
+STATIC = [sim_mint(i) for i in range(4, 34)]
+UNKNOWN = [sim_mint(i) for i in range(34, 40)]   # never in a response
+WAKES = STATIC[0]                                # starts moving at tick 60
+
+class TickProvider(PriceProvider):
+    """Moving tokens get a new price every tick, static ones never; records who was asked when."""
+    name = "stub"
+
+    def __init__(self):
+        self.tick = 0
+        self.asked: dict[str, list[int]] = {}
+
+    async def fetch(self, addrs):
+        rows = []
+        for a in addrs:
+            self.asked.setdefault(a, []).append(self.tick)
+            if a in UNKNOWN:
+                continue
+            moving = a in MOVING or (a == WAKES and self.tick >= 60)
+            price = 1.0 + 0.001 * (self.tick % 7) if moving else 1.0
+            rows.append({"address": a, "price_usd": price, "fdv_usd": price * 1e6, "marketcap_usd": price * 1e6})
+        return rows
+
+def test_quiet_tokens_back_off_and_bars_still_close():
+    db = Database()
+    agg, store = OHLCAggregator(), TimeSeriesStore(root=None)
+    lifecycle = TokenLifecycle(pipeline_hooks(agg, store))
+    cadence = PollCadence(min_sec=2.0, max_sec=30.0, backoff=1.5)
+    cadence.sync(MOVING + STATIC + UNKNOWN)
+    source = TickProvider()
+
+    async def run():
+        requests = 0
+        for tick in range(90):           # 3 minutes of 2 s ticks, one 30-token request each at most
+            source.tick = tick
+            requests += await _poll_tick(source, cadence, tick * 2.0, 1, db, agg, store, lifecycle)
+        return requests
+
+    try:
+        requests = asyncio.run(run())
+    finally:
+        db.close()
+
+    # moving tokens are requested every tick once the 40 → 30 token start-up backlog is through
+    assert all(len(source.asked[a]) >= 88 for a in MOVING)
+    # quiet ones back off to every 30 s: a fraction of the 90 ticks
+    assert all(len(source.asked[a]) <= 15 for a in STATIC[1:] + UNKNOWN)
+    # the one that starts moving is back on every tick as soon as a poll sees it move
+    first = next(t for t in source.asked[WAKES] if t >= 60)
+    assert first <= 60 + 15 and source.asked[WAKES][-(89 - first):] == list(range(first + 1, 90))
+
+    # carried samples keep one sample per tick: 90 from tick 0 close 3 bars, 89 close 2
+    assert all(lifecycle.tokens[a].bars == (3 if source.asked[a][0] == 0 else 2) for a in MOVING + STATIC)
+    assert sum(source.asked[a][0] == 0 for a in MOVING + STATIC + UNKNOWN) == 30
+    assert all(a not in agg.buffers for a in UNKNOWN)
+
+    stats = cadence.stats()
+    assert stats["requests"] == requests <= 90
+    assert stats["useful_per_request"] > 3.5 and stats["carried"] > 20 * 80
+    assert stats["fast"] == 5 and stats["slowest"] == 35 and stats["missing"] > 0
+
+def test_due_respects_budget_and_sync_forgets_tokens():
+    cadence = PollCadence(min_sec=2.0, max_sec=8.0, backoff=2.0)
+    cadence.sync(["a", "b", "c"])
+    assert sorted(cadence.due(0.0, 10)) == ["a", "b", "c"] and len(cadence.due(0.0, 2)) == 2
+    for addr in ("a", "b"):
+        cadence.observe({"address": addr, "price_usd": 1.0}, 0.0)
+    cadence.observe({"address": "b", "price_usd": 1.0}, 2.0)   # unchanged: next in 4 s
+    assert cadence.tokens["b"].interval == 4.0 and cadence.due(4.0, 10) == ["a", "c"]
+    # most overdue first
+    assert cadence.due(10.0, 1) == ["c"]
+    # nothing carried for tokens never priced, or already requested this tick
+    assert [r["address"] for r in cadence.carry(4.0, {"a"})] == ["b"]
+    cadence.sync(["b"])
+    assert list(cadence.tokens) == ["b"] and cadence.carry(100.0, ()) == []
+
+class PushFeed:
+    """covers() whatever is in `covered`, like a chain feed whose subscriptions come and go."""
+    def __init__(self):
+        self.covered: set[str] = set()
+
+    def covers(self, address: str) -> bool:
+        return address in self.covered
+
+def test_push_covered_tokens_leave_and_rejoin_polling_per_tick():
+    db = Database()
+    agg, store = OHLCAggregator(), TimeSeriesStore(root=None)
+    lifecycle = TokenLifecycle(pipeline_hooks(agg, store))
+    cadence = PollCadence(min_sec=2.0, max_sec=30.0, backoff=1.5)
+    pushed, polled = MOVING[0], MOVING[1]
+    cadence.sync([pushed, polled])   # the watch list is not refreshed again below
+    source, feed = TickProvider(), PushFeed()
+
+    async def tick(n: int) -> None:
+        source.tick = n
+        await _poll_tick(source, cadence, n * 2.0, 1, db, agg, store, lifecycle, push_feed=feed)
+
+    async def run():
+        await tick(0)                      # both polled
+        feed.covered.add(pushed)           # subscribed: off the poller from the next tick
+        carried = cadence.counters["carried"]
+        await tick(1)
+        await tick(2)
+        assert cadence.counters["carried"] == carried   # neither requested nor carried while pushed
+        feed.covered.clear()               # socket down: back on the poller at once
+        await tick(3)
+
+    try:
+        asyncio.run(run())
+    finally:
+        db.close()
+    assert source.asked[pushed] == [0, 3]
+    assert source.asked[polled] == [0, 1, 2, 3]
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the synthetic memecoin price-path generator
+"""
+
+import sys
+import tempfile
+import numpy as np
+sys.path.append('.')
+
+from trading_bot.ohlc_agg import OHLCAggregator, SAMPLES_PER_BAR
+from trading_bot.sim.paths import PathGenerator, PathParams, generate_paths, stream_to_disk, read_chunks
+
+def test_seeded_and_chunk_continuous():
+    a = generate_paths(50, 200, seed=3)
+    b = generate_paths(50, 200, seed=3)
+    assert np.array_equal(a.price, b.price, equal_nan=True)
+    assert not np.array_equal(a.price, generate_paths(50, 200, seed=4).price, equal_nan=True)
+    g = PathGenerator(50, seed=3)
+    first, second = g.next_chunk(100), g.next_chunk(100)
+    assert second.ts[0] == first.ts[-1] + 2.0
+    assert g.step == 200
+
+def test_rows_match_fetch_token_batch_shape(price_paths):
+    rows = price_paths.rows(10)
+    assert rows and set(rows[0]) == {"address", "price_usd", "fdv_usd", "marketcap_usd"}
+    assert all(r["marketcap_usd"] <= r["fdv_usd"] for r in rows)
+    assert len(rows) == np.count_nonzero(~np.isnan(price_paths.price[:, 10]))
+
+def test_dynamics():
+    p = PathParams(rug_prob=1.0, dead_prob=0.0, pump_prob=0.0, jump_rate=0.0, missing_rate=0.0,
+                   rug_horizon=150)
+    g = PathGenerator(30, p, seed=1)
+    paths = g.next_chunk(200)
+    for i, at in enumerate(g.rug_at):
+        assert paths.price[i, at] / paths.price[i, at - 1] < 0.1   # the rug
+    dead = generate_paths(10, 100, PathParams(dead_prob=1.0, missing_rate=0.0), seed=1)
+    assert np.all(dead.price == dead.price[:, :1])
+    sparse = generate_paths(100, 500, PathParams(missing_rate=0.2), seed=1)
+    assert 0.15 < np.isnan(sparse.price).mean() < 0.25
+
+def test_feed_aggregator(price_paths):
+    bars = price_paths.feed(OHLCAggregator())
+    assert len(bars) == sum(int(np.count_nonzero(~np.isnan(row))) // SAMPLES_PER_BAR
+                            for row in price_paths.price)
+    assert all(b.low <= b.close <= b.high for b in bars)
+
+def test_stream_to_disk_round_trip():
+    with tempfile.TemporaryDirectory() as d:
+        files = stream_to_disk(d, 20, 250, chunk_steps=100, seed=5)
+        assert len(files) == 3
+        chunks = list(read_chunks(d))
+        g = PathGenerator(20, seed=5)
+        for chunk, n in zip(chunks, (100, 100, 50)):
+            assert np.array_equal(chunk.price, g.next_chunk(n).price, equal_nan=True)
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged, raced and failover price requests across providers
+"""
+
+import sys
+import random
+import asyncio
+sys.path.append('.')
+
+import httpx
+from trading_bot.price_sources import PriceProvider, PriceRouter, JupiterProvider, COOLDOWN_SEC
+from trading_bot.sim.stubs import SimServers, sim_mint
+
+ADDRS = [sim_mint(i) for i in range(3)]
+
+class StubProvider(PriceProvider):
+    """Latency drawn per request: `base` seconds, `tail` seconds with probability `tail_rate`; `down` raises."""
+    def __init__(self, name, base, tail=0.0, tail_rate=0.0, fdv=True, seed=1):
+        self.name, self.base, self.tail, self.tail_rate, self.fdv = name, base, tail, tail_rate, fdv
+        self.rng = random.Random(seed)
+        self.down = False
+        self.calls = 0
+
+    async def fetch(self, addrs):
+        self.calls += 1
+        await asyncio.sleep(self.tail if self.rng.random() < self.tail_rate else self.base)
+        if self.down:
+            raise RuntimeError(f"{self.name} unavailable")
+        return [{"address": a, "price_usd": 2.0, "fdv_usd": 2e6 if self.fdv else None,
+                 "marketcap_usd": 1e6 if self.fdv else None, "via": self.name} for a in addrs]
+
+async def _load(router, n, concurrency=25, warmup=50):
+    for i in range(0, warmup, concurrency):  # providers get their own p95 after MIN_SAMPLES
+        await asyncio.gather(*(router.fetch(ADDRS) for _ in range(concurrency)))
+    router.latencies.clear()
+    for i in range(0, n, concurrency):
+        await asyncio.gather(*(router.fetch(ADDRS) for _ in range(min(concurrency, n - i))))
+    return router.stats()
+
+def test_hedging_cuts_the_tail():
+    def run(mode):
+        slow = StubProvider("dex", 0.01, tail=0.3, tail_rate=0.02)
+        fast = StubProvider("jup", 0.02)
+        return asyncio.run(_load(PriceRouter([slow, fast], mode=mode, hedge_budget=0.1), 400)), fast
+
+    plain, _ = run("failover")
+    hedged, backup = run("hedge")
+    assert plain["p99_ms"] >= 300 and plain["hedged"] == 0
+    assert hedged["p99_ms"] < 100, hedged
+    # only the slow requests are hedged, within budget
+    assert 0 < hedged["hedged"] <= 0.1 * 450 + 5 and backup.calls == hedged["hedged"]
+    assert hedged["providers"]["dex"]["wins"] > 0.9 * 450
+
+def test_race_takes_the_fastest():
+    a, b = StubProvider("a", 0.05), StubProvider("b", 0.01)
+    router = PriceRouter([a, b], mode="race")
+    rows = asyncio.run(router.fetch(ADDRS))
+    assert {r["via"] for r in rows} == {"b"} and a.calls == b.calls == 1
+    assert router.stats()["providers"]["a"]["cancelled"] == 1
+
+def test_failover_circuit_and_recovery():
+    primary, backup = StubProvider("dex", 0.001), StubProvider("jup", 0.002, fdv=False)
+    router = PriceRouter([primary, backup], mode="hedge")
+
+    async def scenario():
+        for _ in range(25):  # dex gets a measured p95 (and the fdv/mc scale is learned from its rows)
+            await router.fetch(ADDRS)
+        primary.down = True
+        for _ in range(3):  # each request fails over within itself: no error surfaces
+            rows = await router.fetch(ADDRS)
+            assert rows[0]["via"] == "jup"
+        assert router.health["dex"].state(asyncio.get_running_loop().time()) != "up"
+        calls = primary.calls
+        rows = await router.fetch(ADDRS)  # circuit open: straight to the backup
+        assert primary.calls == calls and rows[0]["via"] == "jup"
+        # Jupiter has no fdv/mc: scaled from the last DexScreener row
+        assert rows[0]["fdv_usd"] == 2e6 and rows[0]["marketcap_usd"] == 1e6
+
+        # cooldown over: one probe rides along; its success brings dex back first
+        primary.down = False
+        router.health["dex"].down_until -= COOLDOWN_SEC
+        await router.fetch(ADDRS)
+        await asyncio.gather(*router._probes)
+        assert router.health["dex"].state(0) == "up" and router.counters["probes"] == 1
+        rows = await router.fetch(ADDRS)
+        assert rows[0]["via"] == "dex"
+
+        # everything down: the last error surfaces to the poller
+        primary.down = backup.down = True
+        for _ in range(4):
+            try:
+                await router.fetch(ADDRS)
+                assert False, "expected an error"
+            except RuntimeError:
+                pass
+        return router.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["failed"] == 4 and stats["failovers"] >= 3
+
+def test_jupiter_provider_against_sim():
+    async def run():
+        servers = SimServers(jup_latency_ms=0)
+        await servers.start()
+        try:
+            async with httpx.AsyncClient(base_url=servers.env()["JUPITER_PRICE_URL"]) as client:
+                return await JupiterProvider(client).fetch(ADDRS), servers.stats()
+        finally:
+            await servers.close()
+
+    rows, stats = asyncio.run(run())
+    assert sorted(r["address"] for r in rows) == sorted(ADDRS) and stats["jup_requests"] == 1
+    assert all(r["price_usd"] == 1e-4 and r["fdv_usd"] is None for r in rows)
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the runtime profiling controls (stack sampler, tracemalloc window, structure sizes)
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import threading
+sys.path.append('.')
+
+from trading_bot.db import Database
+from trading_bot.ohlc_agg import OHLCAggregator
+from trading_bot.profiling import Profiler, StackSampler, deep_size, estimate_size, memory_report, format_memory_report
+
+def _spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+def test_sampler_collapses_thread_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="spinner")
+    worker.start()
+    sampler = StackSampler(hz=200)
+    sampler.start()
+    time.sleep(0.3)
+    counts = sampler.stop()
+    stop.set(); worker.join()
+    assert sampler.ticks > 10
+    spinner = [s for s in counts if s.startswith("spinner;")]
+    assert spinner and all("_spin (test_profiling.py:" in s for s in spinner)
+    assert not any(s.startswith("profiler;") for s in counts)
+
+def test_round_writes_profiles_and_memory_diff(tmp_path):
+    prof = Profiler(str(tmp_path), seconds=0.3, hz=200)
+    kept = []
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGUSR2, prof.toggle)
+        os.kill(os.getpid(), signal.SIGUSR2)
+        await asyncio.sleep(0.05)
+        assert prof.running
+        for _ in range(50):
+            kept.append(bytearray(100_000))
+            time.sleep(0.005)  # busy loop thread: shows up in the samples
+        await asyncio.sleep(0.5)  # the round ends itself
+        loop.remove_signal_handler(signal.SIGUSR2)
+    asyncio.run(main())
+    assert not prof.running and prof.rounds == 1
+    files = sorted(os.listdir(tmp_path))
+    assert [f.split("-")[0] for f in files] == ["cpu", "mem"]
+    lines = (tmp_path / files[0]).read_text().splitlines()
+    assert any(l.startswith("MainThread;") and "main (test_profiling.py:" in l for l in lines)
+    assert all(l.rsplit(" ", 1)[1].isdigit() for l in lines)
+
+def test_memory_tracker_sees_growth(tmp_path):
+    prof = Profiler(str(tmp_path), seconds=60)
+    blob = []
+    async def main():
+        prof.start()
+        blob.extend(bytearray(10_000) for _ in range(200))
+        return prof.finish()
+    report = asyncio.run(main())
+    assert report["memory_total"] > 1_500_000
+    assert "test_profiling.py" in report["memory"][0][0]
+
+def test_sizes():
+    assert deep_size([1.5, "ab", (2.5,)]) > sys.getsizeof([])
+    big = {str(i): [float(i)] * 10 for i in range(5000)}
+    exact = deep_size(big)
+    assert abs(estimate_size(big) - exact) / exact < 0.1
+
+def test_memory_report():
+    db = Database()
+    agg = OHLCAggregator()
+    for i in range(40):
+        agg.add_sample(f"tok{i}", price=1.0, fdv=2.0, mc=1.0, ts=1000.0)
+    r = memory_report(agg, db)
+    assert r["ohlc_agg"]["tokens"] == 40 and r["ohlc_agg"]["samples"] == 40
+    assert r["ohlc_agg"]["bytes"] > 0
+    assert r["sqlite"]["pages"] > 0 and r["sqlite"]["bytes"] == r["sqlite"]["pages"] * r["sqlite"]["page_size"]
+    assert "🧮 Memory" in format_memory_report(r)
+    db.close()
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the deferred RugCheck re-check queue
+"""
+
+import asyncio
+import sys
+sys.path.append('.')
+
+from trading_bot.recheck_queue import RecheckQueue
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_exponential_schedule_and_admission():
+    """A mint is retried at 5s, 10s, 20s... and admitted once it gets a score."""
+    clock = FakeClock()
+    answers = {"mint1": [(None, None), (None, None), (7, {"score": 7})]}
+    admitted = []
+
+    async def check(mint):
+        return answers[mint].pop(0)
+
+    def admit(token, risk, rc):
+        admitted.append((token["mint"], risk))
+
+    q = RecheckQueue(check, admit, base_delay=5, max_attempts=5, max_size=10, clock=clock)
+
+    async def run():
+        assert q.schedule("mint1", {"mint": "mint1"})
+        assert not q.schedule("mint1", {"mint": "mint1"})    # already queued
+        assert await q.run_once() == 0                        # nothing due yet
+        assert q.next_due_in() == 5
+
+        clock.now = 5
+        assert await q.run_once() == 1                        # unscored → retry in 10s
+        assert q.next_due_in() == 10
+
+        clock.now = 15
+        assert await q.run_once() == 1                        # unscored → retry in 20s
+        assert q.next_due_in() == 20
+
+        clock.now = 35
+        assert await q.run_once() == 1                        # scored → admitted
+
+    asyncio.run(run())
+    print(f"📊 Stats: {q.stats()}")
+    assert admitted == [("mint1", 7)]
+    assert len(q) == 0
+    assert q.stats()["scored"] == 1
+
+def test_gives_up_after_max_attempts():
+    """Mints that never get a score expire after max_attempts."""
+    clock = FakeClock()
+
+    async def check(mint):
+        return None, None
+
+    q = RecheckQueue(check, lambda *a: None, base_delay=1, max_attempts=2, max_size=10, clock=clock)
+
+    async def run():
+        q.schedule("never", {"mint": "never"})
+        for t in (1, 3, 7):
+            clock.now = t
+            await q.run_once()
+
+    asyncio.run(run())
+    assert len(q) == 0
+    assert q.stats()["expired"] == 1
+    assert q.stats()["rechecks"] == 2
+
+def test_bounded_queue_evicts_oldest_and_checks_freshest_first():
+    """When full, the oldest mint is dropped; due mints are checked freshest first."""
+    clock = FakeClock()
+    order = []
+
+    async def check(mint):
+        order.append(mint)
+        return 1, {}
+
+    q = RecheckQueue(check, lambda *a: None, base_delay=5, max_size=2, concurrency=1, clock=clock)
+
+    async def run():
+        for i, mint in enumerate(["old", "mid", "new"]):
+            clock.now = i * 0.1
+            q.schedule(mint, {"mint": mint})
+        clock.now = 10
+        await q.run_once()
+
+    asyncio.run(run())
+    assert q.stats()["evicted"] == 1
+    assert order == ["new", "mid"]
+
+def test_requeued_mints_respect_the_bound():
+    """A failed re-check is re-queued within max_size: the oldest mint goes, even if it is that one."""
+    clock = FakeClock()
+
+    async def check(mint):
+        if mint == "old":                    # new mints arrive while "old" is being checked
+            clock.now = 6
+            q.schedule("b", {"mint": "b"})
+            q.schedule("c", {"mint": "c"})
+        return None, None
+
+    q = RecheckQueue(check, lambda *a: None, base_delay=5, max_attempts=5, max_size=2, clock=clock)
+
+    async def run():
+        q.schedule("old", {"mint": "old"})
+        clock.now = 5
+        await q.run_once()
+        assert len(q) == 2 and "old" not in q and q.stats()["evicted"] == 1
+        for i in range(20):                  # eviction stays bounded over many arrivals
+            clock.now = 7 + i
+            q.schedule(f"n{i}", {"mint": f"n{i}"})
+        assert len(q) == 2 and "n19" in q and "n18" in q and len(q._ages) <= 4
+
+    asyncio.run(run())
+    assert q.stats()["evicted"] == 21
+
+if __name__ == "__main__":
+    test_exponential_schedule_and_admission()
+    test_gives_up_after_max_attempts()
+    test_bounded_queue_evicts_oldest_and_checks_freshest_first()
+    test_requeued_mints_respect_the_bound()
+    print("\n✅ Re-check queue tests completed!")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test the typed Bar/IndicatorValue records through aggregator → indicators → DB
+"""
+
+import sys
+sys.path.append('.')
+
+from trading_bot.records import Bar, IndicatorValue, Sample, as_bar
+from trading_bot.ohlc_agg import add_sample, SAMPLES_PER_BAR
+from trading_bot.indicators import update_all_for_bar
+from trading_bot.db import insert_ohlc_1m, insert_ema_1m, insert_atr_1m, get_ohlc_1m, get_ema_1m
+
+def test_records_are_slotted_and_dict_compatible():
+    bar = Bar("rec_a", 60, 1.0, 1.2, 0.9, 1.1, marketcap_usd=5e5, samples=30)
+    assert not hasattr(bar, "__dict__")
+    assert bar["close"] == bar.close == 1.1
+    assert bar.get("marketcap_usd") == 5e5 and bar.get("nope", 7) == 7
+    assert as_bar(dict(bar._asdict())) == bar and as_bar(bar) is bar
+    assert Sample(1.0, 2.0).mc is None
+    try:
+        bar["nope"]
+        assert False, "unknown keys raise KeyError like a dict"
+    except KeyError:
+        pass
+
+def test_pipeline_passes_records_end_to_end():
+    addr = "rec_pipeline_token"
+    bar = None
+    for i in range(SAMPLES_PER_BAR):
+        bar = add_sample(addr, price=1.0 + i * 0.01, fdv=1e6, mc=5e5, ts=1_700_000_000 + 2 * i) or bar
+    assert isinstance(bar, Bar)
+    assert bar.open == 1.0 and bar.high == bar.close and bar.samples == SAMPLES_PER_BAR
+
+    ema_rows, atr_rows = update_all_for_bar(bar)
+    assert ema_rows and all(isinstance(r, IndicatorValue) for r in ema_rows + atr_rows)
+    assert ema_rows[0]["value"] == ema_rows[0].value
+
+    insert_ohlc_1m(bar)
+    insert_ema_1m(ema_rows)
+    insert_atr_1m(atr_rows)
+    ts_start, o, h, l, c, fdv, mc, n = get_ohlc_1m(addr, 1)[0]
+    assert (ts_start, o, c, mc, n) == (bar.ts_start, bar.open, bar.close, bar.marketcap_usd, bar.samples)
+    assert get_ema_1m(addr, ema_rows[0].length, 1)[0] == (bar.ts_start, ema_rows[0].value)
+
+if __name__ == "__main__":
+    test_records_are_slotted_and_dict_compatible()
+    test_pipeline_passes_records_end_to_end()
+    print("\n✅ Record tests completed!")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the RugCheck result cache (TTL, LRU and in-flight coalescing)
+"""
+
+import asyncio
+import threading
+import time
+import sys
+sys.path.append('.')
+
+from trading_bot.risk_cache import RiskCache, TTLCache
+
+def test_ttl_cache_expiry_and_lru():
+    """Entries expire after their TTL and the oldest entry is evicted first."""
+    cache = TTLCache(maxsize=2)
+    cache.put("a", 1, ttl=10, now=0)
+    cache.put("b", 2, ttl=1, now=0)
+    assert cache.get("a", now=5) == 1
+    assert cache.get("b", now=5) is None   # expired
+
+    cache.put("c", 3, ttl=10, now=5)
+    cache.put("d", 4, ttl=10, now=5)       # evicts "a" (least recently used)
+    assert cache.get("a", now=6) is None
+    assert cache.get("c", now=6) == 3
+    assert cache.get("d", now=6) == 4
+
+def test_risk_cache_hits_and_negative_ttl():
+    """Scored results are served from cache; unscored ones use the short TTL."""
+    calls = []
+
+    def fetch(mint):
+        calls.append(mint)
+        return (5, {"score_normalised": 5}) if mint == "good" else (None, None)
+
+    cache = RiskCache(fetch=fetch, maxsize=10, ttl=60, neg_ttl=0.05)
+
+    async def run():
+        assert await cache.get("good") == (5, {"score_normalised": 5})
+        assert await cache.get("good") == (5, {"score_normalised": 5})
+        assert await cache.get("new") == (None, None)
+        assert await cache.get("new") == (None, None)
+        await asyncio.sleep(0.06)
+        assert await cache.get("new") == (None, None)   # negative entry expired → refetch
+
+    asyncio.run(run())
+    print(f"📊 Stats: {cache.stats()}")
+    assert calls == ["good", "new", "new"]
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["saved_requests"] == 2
+
+def test_risk_cache_coalesces_concurrent_lookups():
+    """Concurrent checks of one mint share a single upstream request."""
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(mint):
+        with lock:
+            calls.append(mint)
+        time.sleep(0.05)
+        return 3, {"mint": mint}
+
+    cache = RiskCache(fetch=fetch, maxsize=10, ttl=60, neg_ttl=1)
+
+    async def run():
+        return await asyncio.gather(*(cache.get("dup") for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert all(r == (3, {"mint": "dup"}) for r in results)
+    assert calls == ["dup"]
+    assert cache.stats()["coalesced"] == 4
+    assert cache.stats()["hit_rate"] == 0.8
+
+if __name__ == "__main__":
+    test_ttl_cache_expiry_and_lru()
+    test_risk_cache_hits_and_negative_ttl()
+    test_risk_cache_coalesces_concurrent_lookups()
+    print("\n✅ Risk cache tests completed!")
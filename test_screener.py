@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the cross-sectional screener and screened strategy entries
+"""
+
+import sys
+import random
+sys.path.append('.')
+
+from trading_bot.db import Database
+from trading_bot.indicators import set_plan, get_plugin, storage_values, update_all_for_bar, reset_indicators
+from trading_bot.indicators.spec import config_specs
+from trading_bot.papertrading.base import StrategyContext
+from trading_bot.papertrading.db import paper_db
+from trading_bot.papertrading.screener import Screener, Condition
+from trading_bot.papertrading.strategies.early_momentum import EarlyMomentum, LOOKBACK
+from trading_bot.records import Bar
+from trading_bot.tsstore import BAR_COLUMNS, TimeSeriesStore
+
+T0 = 1_700_000_000
+ADDRS = [f"screen_tok_{i}" for i in range(300)]   # more than the initial rows: the arrays grow
+
+def _columns(plan):
+    return list(BAR_COLUMNS) + [c for spec in plan for c in get_plugin(spec.kind).columns(spec)]
+
+def _bars(rng, minutes):
+    """A random walk per token; some tokens skip minutes."""
+    price = {a: 1.0 for a in ADDRS}
+    for k in range(minutes):
+        out = []
+        for a in ADDRS:
+            if rng.random() < 0.1:
+                continue
+            o = price[a]
+            c = o * (1 + rng.uniform(-0.08, 0.1))
+            out.append(Bar(a, T0 + 60 * k, o, max(o, c) * 1.02, min(o, c) * 0.98, c, c * 1e6, c * 8e5, 30))
+            price[a] = c
+        yield out
+
+def _scalar_entry(history, ema5_low, atr14):
+    """EarlyMomentum's per-token rule, from a token's own bar list (newest last)."""
+    bar = history[-1]
+    prev = history[-1 - LOOKBACK:-1]
+    recent_high = max(b.high for b in prev) if prev else bar.open
+    return ema5_low is not None and atr14 is not None and bar.close > ema5_low and bar.close > recent_high
+
+def test_screen_matches_the_per_token_rule():
+    strat = EarlyMomentum()
+    try:
+        plan = set_plan(strat.indicators())
+        screener = Screener(_columns(plan))
+        screener.add("entry", strat.screens()["entry"])
+        history = {a: [] for a in ADDRS}
+        matched = 0
+        for bars in _bars(random.Random(7), 8):
+            expected = set()
+            for bar in bars:
+                update_all_for_bar(bar)
+                values = storage_values(bar.address)
+                screener.update(bar, values)
+                history[bar.address].append(bar)
+                if _scalar_entry(history[bar.address], values["ema_5_low"], values["atr_14"]):
+                    expected.add(bar.address)
+            hits = screener.screen()
+            assert set(hits.get("entry", [])) == expected
+            matched += len(expected)
+        assert matched > 50
+        # only new bars are screened: nothing since the last screen
+        assert screener.screen() == {}
+        stats = screener.stats()
+        assert stats["tokens"] == len(ADDRS) and stats["screens"] == 8 and stats["matches"] == matched
+    finally:
+        reset_indicators()
+        set_plan(config_specs())
+
+def test_conditions_are_checked_and_rows_recycled():
+    screener = Screener(BAR_COLUMNS, history=4)
+    for bad in ("close > __import__('os')", "close.real > 1", "close > nope", "close >", "x if close else 1",
+                "rolling_max(high, n=3) > 1"):
+        try:
+            screener.add("bad", bad)
+            assert False, f"expected ValueError for {bad!r}"
+        except ValueError:
+            pass
+    assert not screener.conditions and Condition("a > 1").names == {"a"}
+
+    for k, close in enumerate((1.0, 2.0, 3.0)):
+        screener.update(Bar("a", T0 + 60 * k, close, close, close, close, None, None, 30))
+    screener.update(Bar("b", T0, 5.0, 5.0, 5.0, 5.0, None, None, 30))
+    assert screener.evaluate("close > prev(close) and bars >= 3") == ["a"]
+    assert screener.evaluate("rolling_mean(close, 3) == 2 and rolling_min(low, 10) == 1") == ["a"]
+    assert screener.evaluate("fill(prev(close, 2), 0) == 0") == ["b"]       # b has no history
+    assert screener.evaluate("fdv_usd > 0") == [] and screener.evaluate("not fdv_usd > 0") == ["a", "b"]
+    assert screener.latest("a")["close"] == 3.0 and screener.latest("a")["fdv_usd"] is None
+
+    # the same minute again replaces the bar
+    screener.update(Bar("a", T0 + 120, 3.0, 3.0, 3.0, 0.5, None, None, 30))
+    assert screener.latest("a")["bars"] == 3 and screener.evaluate("close < prev(close)") == ["a"]
+
+    screener.drop("a")
+    assert screener.evaluate("close > 0") == ["b"] and screener.latest("a") is None
+    screener.update(Bar("c", T0, 1.0, 1.0, 1.0, 1.0, None, None, 30))   # reuses a's row, no stale lags
+    assert screener.evaluate("prev(close) > 0") == [] and screener.latest("c")["bars"] == 1
+
+def test_early_momentum_enters_from_screen():
+    db = Database()
+    strat = EarlyMomentum()
+    try:
+        plan = set_plan(strat.indicators())
+        ctx = StrategyContext(db=db, screener=Screener(_columns(plan)))
+        ctx.screener.add("entry", strat.screens()["entry"])
+        strat.on_start(ctx)
+        addr = ADDRS[0]
+        db.upsert_safe_token(address=addr, name="S", symbol="S", dex="raydium", risk=1, signature="s", rc={})
+        entered = None
+        for k, close in enumerate((1.0, 1.05, 1.1, 1.3)):
+            bar = Bar(addr, T0 + 60 * k, close * 0.98, close * 1.01, close * 0.97, close, 1e6, 8e5, 30)
+            ema_rows, atr_rows = update_all_for_bar(bar)
+            ctx.screener.update(bar, storage_values(addr))
+            strat.on_bar_1m(ctx, bar, ema_rows, atr_rows)          # no per-token entry check
+            assert (paper_db(db).pos_get(addr) is None) == (entered is None)
+            hits = ctx.screener.screen()
+            if "entry" in hits and entered is None:
+                strat.on_screen(ctx, "entry", hits["entry"])
+                entered = k
+        row = paper_db(db).pos_get(addr)
+        assert entered is not None and row[1] == "long"
+    finally:
+        reset_indicators()
+        set_plan(config_specs())
+        db.close()
+
+def test_early_momentum_breakout_reads_the_store():
+    db = Database()
+    store = TimeSeriesStore(root=None)
+    strat = EarlyMomentum()
+    try:
+        set_plan(strat.indicators())
+        ctx = StrategyContext(db=db, store=store)              # no screener: the per-bar entry check
+        strat.on_start(ctx)
+        flat, spiked = ADDRS[0], ADDRS[1]
+        closes = (1.0, 1.05, 1.1, 1.3)
+        for k, close in enumerate(closes):
+            for addr in (flat, spiked):
+                high = 9.0 if addr == spiked and k == 2 else close * 1.01
+                bar = Bar(addr, T0 + 60 * k, close * 0.98, high, close * 0.97, close, 1e6, 8e5, 30)
+                ema_rows, atr_rows = update_all_for_bar(bar)
+                store.append(addr, bar._asdict())               # stored before dispatch, as in the watcher
+                if k == len(closes) - 1:                        # only the breakout bar is checked
+                    strat.on_bar_1m(ctx, bar, ema_rows, atr_rows)
+        # the spike's high is only in the store (no ohlc_1m rows): it keeps that token out
+        assert db.get_ohlc_1m(flat) == []
+        assert paper_db(db).pos_get(flat)[1] == "long" and paper_db(db).pos_get(spiked) is None
+    finally:
+        reset_indicators()
+        set_plan(config_specs())
+        db.close()
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy startup: importing the monitor has no side effects until init()
+"""
+
+import os
+import subprocess
+import sys
+sys.path.append('.')
+
+_CHECK = """
+import sys
+import trading_bot.new_pairs as np_mod
+from trading_bot import db
+heavy = [m for m in ("websockets", "httpx", "requests") if m in sys.modules]
+print(heavy, db._DEFAULT is None, np_mod.API_KEY)
+"""
+
+def _run(code: str, cwd: str = "/", **env):
+    full = {k: v for k, v in os.environ.items() if k != "SOLANASTREAM_API_KEY"}
+    full.update(env)
+    # run outside the repo so the real .env is not picked up
+    code = f"import sys; sys.path.insert(0, {os.getcwd()!r})\n{code}"
+    return subprocess.run([sys.executable, "-c", code], env=full, cwd=cwd,
+                          capture_output=True, text=True, timeout=60)
+
+def test_import_is_side_effect_free():
+    out = _run(_CHECK)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.split() == ["[]", "True", "None"]
+
+def test_init_requires_api_key():
+    out = _run("import trading_bot.new_pairs as m\nfrom trading_bot.env import ConfigError\n"
+               "try:\n    m.init()\nexcept ConfigError as e:\n    print(e)")
+    assert out.returncode == 0, out.stderr
+    assert "SOLANASTREAM_API_KEY" in out.stdout
+
+def test_init_sets_up_process():
+    code = ("import trading_bot.new_pairs as m, trading_bot.db as db\n"
+            "m.init()\nprint(m.API_KEY, m.MSG['params']['api_key'], db._DEFAULT is not None)")
+    out = _run(code, SOLANASTREAM_API_KEY="k123")
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.split() == ["k123", "k123", "True"]
+
+_DOTENV_CHECK = """
+import os
+import trading_bot.new_pairs as m
+from trading_bot import price_watcher, chain_feed, tsstore
+print(os.getenv("PRICE_POLL_INTERVAL_SEC"), price_watcher.INTERVAL, tsstore.TS_STORE.segment_bars, m.URL)
+m.init()
+print(os.getenv("PRICE_POLL_INTERVAL_SEC"), price_watcher.INTERVAL, tsstore.TS_STORE.segment_bars, m.URL,
+      chain_feed.CHAIN_FEED.interval, m.API_KEY)
+"""
+
+def test_dotenv_loaded_by_init_only(tmp_path, monkeypatch):
+    for name in ("PRICE_POLL_INTERVAL_SEC", "TSSTORE_SEGMENT_BARS", "SOLANASTREAM_WS_URL"):
+        monkeypatch.delenv(name, raising=False)
+    (tmp_path / ".env").write_text("PRICE_POLL_INTERVAL_SEC=7\nTSSTORE_SEGMENT_BARS=9\n"
+                                   "SOLANASTREAM_WS_URL=wss://stream.test\nSOLANASTREAM_API_KEY=from-dotenv\n")
+    out = _run(_DOTENV_CHECK, cwd=str(tmp_path))
+    assert out.returncode == 0, out.stderr
+    imported, initialized = out.stdout.splitlines()
+    # importing leaves os.environ alone; init() loads .env and re-reads every module's settings
+    assert imported.split() == ["None", "2.0", "240", "None"]
+    assert initialized.split() == ["7", "7.0", "9", "wss://stream.test", "7.0", "from-dotenv"]
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Validate streaming and batch indicators against full-recompute reference implementations
+"""
+
+import math
+import random
+import statistics
+import sys
+sys.path.append('.')
+
+import numpy as np
+from trading_bot.indicators import (
+    IndicatorSpec, ema_spec, atr_spec, rsi_spec, vwap_spec, bb_spec, donchian_spec,
+    returns_spec, volume_z_spec, get_plugin, compute_batch, register_indicator,
+    set_plan, update_all_for_bar, storage_values,
+)
+from trading_bot.indicators.spec import config_specs
+from trading_bot.records import Bar
+
+N = 200
+
+def _bars(n=N, seed=7):
+    rng = random.Random(seed)
+    price, out = 1.0, []
+    for i in range(n):
+        o = price
+        c = max(1e-6, o * math.exp(rng.gauss(0, 0.05)))
+        h = max(o, c) * (1 + rng.random() * 0.03)
+        l = min(o, c) * (1 - rng.random() * 0.03)
+        out.append(Bar("ind_ref", 60 * i, o, h, l, c, volume=rng.uniform(100, 5000)))
+        price = c
+    return out
+
+# --- reference implementations: recompute from the full history at every bar ---
+def ref_ema(xs, n):
+    a, v = 2.0 / (n + 1.0), xs[0]
+    for x in xs[1:]:
+        v = v + a * (x - v)
+    return v
+
+def ref_atr(bars, n):
+    v = None
+    for i, b in enumerate(bars):
+        tr = b["high"] - b["low"] if i == 0 else max(b["high"] - b["low"], abs(b["high"] - bars[i-1]["close"]), abs(b["low"] - bars[i-1]["close"]))
+        v = tr if v is None else (v * (n - 1) + tr) / n
+    return v
+
+def ref_rsi(xs, n):
+    if len(xs) <= n:
+        return None
+    ch = [b - a for a, b in zip(xs, xs[1:])]
+    ag = sum(max(c, 0) for c in ch[:n]) / n
+    al = sum(max(-c, 0) for c in ch[:n]) / n
+    for c in ch[n:]:
+        ag = (ag * (n - 1) + max(c, 0)) / n
+        al = (al * (n - 1) + max(-c, 0)) / n
+    return 100.0 if al == 0 else 100 - 100 / (1 + ag / al)
+
+def ref_vwap(bars, n):
+    w = bars[-n:]
+    return sum((b["high"] + b["low"] + b["close"]) / 3 * b["volume"] for b in w) / sum(b["volume"] for b in w)
+
+def ref_bb(xs, n):
+    if len(xs) < n:
+        return None
+    w = xs[-n:]
+    m, sd = statistics.fmean(w), statistics.pstdev(w)
+    return (m, m + 2 * sd, m - 2 * sd)
+
+def ref_donchian(bars, n):
+    w = bars[-n:]
+    return (max(b["high"] for b in w), min(b["low"] for b in w))
+
+def ref_ret(xs, n):
+    return xs[-1] / xs[-1 - n] - 1 if len(xs) > n else None
+
+def ref_volz(vols, n):
+    if len(vols) < n:
+        return None
+    w = vols[-n:]
+    return (vols[-1] - statistics.fmean(w)) / statistics.pstdev(w)
+
+CASES = [
+    (ema_spec(5, "low"),  lambda bs: ref_ema([b["low"] for b in bs], 5)),
+    (atr_spec(14),        lambda bs: ref_atr(bs, 14)),
+    (rsi_spec(14),        lambda bs: ref_rsi([b["close"] for b in bs], 14)),
+    (vwap_spec(20),       lambda bs: ref_vwap(bs, 20)),
+    (bb_spec(20),         lambda bs: ref_bb([b["close"] for b in bs], 20)),
+    (donchian_spec(10),   lambda bs: ref_donchian(bs, 10)),
+    (returns_spec(3),     lambda bs: ref_ret([b["close"] for b in bs], 3)),
+    (volume_z_spec(30),   lambda bs: ref_volz([b["volume"] for b in bs], 30)),
+]
+
+def _close(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, tuple):
+        return all(math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-9) for x, y in zip(a, b))
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+def test_streaming_matches_reference():
+    bars = _bars()
+    for spec, ref in CASES:
+        ind = get_plugin(spec.kind).factory(spec)
+        for i, bar in enumerate(bars):
+            got, want = ind.update(bar), ref(bars[:i + 1])
+            assert _close(got, want), f"{spec} bar {i}: {got} != {want}"
+        print(f"✅ {spec} streaming matches reference over {len(bars)} bars")
+
+def test_batch_matches_reference():
+    bars = _bars()
+    cols = {k: np.array([b[k] for b in bars]) for k in ("open", "high", "low", "close", "volume")}
+    for spec, ref in CASES:
+        plugin = get_plugin(spec.kind)
+        out = compute_batch(spec, cols)
+        assert set(out) == set(plugin.outputs)
+        for i in range(len(bars)):
+            want = ref(bars[:i + 1])
+            got = tuple(float(out[o][i]) for o in plugin.outputs)
+            got = None if any(math.isnan(g) for g in got) else (got if len(got) > 1 else got[0])
+            assert _close(got, want), f"{spec} batch bar {i}: {got} != {want}"
+        print(f"✅ {spec} batch matches reference")
+
+def test_recursive_batches_match_streaming_on_long_series():
+    # short lengths: ewm() works in blocks of a few hundred bars, so several block boundaries are crossed
+    bars = _bars(3000, seed=3)
+    cols = {k: np.array([b[k] for b in bars]) for k in ("open", "high", "low", "close", "volume")}
+    for spec in (ema_spec(2, "close"), ema_spec(1, "low"), atr_spec(3), rsi_spec(2), rsi_spec(14)):
+        ind = get_plugin(spec.kind).factory(spec)
+        streamed = [ind.update(b) for b in bars]
+        got = compute_batch(spec, cols)["value"]
+        for i, want in enumerate(streamed):
+            assert _close(None if math.isnan(got[i]) else float(got[i]), want), f"{spec} bar {i}: {got[i]} != {want}"
+
+def test_plugin_registration_and_storage_columns():
+    class LastClose:
+        def __init__(self, spec): pass
+        def update(self, bar): return bar["close"]
+
+    register_indicator("last", LastClose)
+    try:
+        set_plan([IndicatorSpec("last", 1), bb_spec(3), atr_spec(14)])
+        for bar in _bars(5):
+            update_all_for_bar(bar)
+        vals = storage_values("ind_ref")
+        assert set(vals) == {"last_1", "bb_3_close_mid", "bb_3_close_upper", "bb_3_close_lower", "atr_14"}
+        assert vals["last_1"] == _bars(5)[-1]["close"]
+    finally:
+        set_plan(config_specs())
+
+if __name__ == "__main__":
+    test_streaming_matches_reference()
+    test_batch_matches_reference()
+    test_recursive_batches_match_streaming_on_long_series()
+    test_plugin_registration_and_storage_columns()
+    print("\n✅ Streaming indicator tests completed!")
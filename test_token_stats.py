@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test that trigger-maintained token counters match full COUNT(*) scans
+"""
+
+import sys
+sys.path.append('.')
+
+from trading_bot.db import DB, upsert_safe_token, count_tokens, get_stats, rebuild_token_stats
+
+def _scan() -> dict:
+    q = lambda sql: DB.execute(sql).fetchone()[0]
+    by_dex = dict(DB.execute("SELECT coalesce(dex, ''), COUNT(*) FROM tokens GROUP BY 1").fetchall())
+    return {
+        'total': q("SELECT COUNT(*) FROM tokens"),
+        'low_risk_0_10': q("SELECT COUNT(*) FROM tokens WHERE risk <= 10"),
+        'medium_risk_11_20': q("SELECT COUNT(*) FROM tokens WHERE risk > 10 AND risk <= 20"),
+        'high_risk_21_plus': q("SELECT COUNT(*) FROM tokens WHERE risk > 20"),
+        'by_dex': by_dex,
+    }
+
+def _check():
+    stats, scan = get_stats(), _scan()
+    assert {k: stats[k] for k in scan} == scan, (stats, scan)
+    assert count_tokens() == scan['total']
+
+def test_counters_follow_insert_update_delete():
+    for i, (risk, dex) in enumerate([(3, "pumpfun"), (15, "raydium"), (40, "pumpfun"), (8, "meteora")]):
+        upsert_safe_token(address=f"stats_tok_{i}", name=f"T{i}", symbol=f"T{i}", dex=dex, risk=risk, signature="s")
+    _check()
+
+    # re-scoring and DEX migration move a token between buckets
+    upsert_safe_token(address="stats_tok_0", name="T0", symbol="T0", dex="raydium", risk=25, signature="s")
+    _check()
+
+    DB.execute("UPDATE tokens SET approved = 0 WHERE address = 'stats_tok_1'")
+    assert get_stats()['by_status'].get('rejected', 0) >= 1
+    DB.execute("DELETE FROM tokens WHERE address LIKE 'stats_tok_%'")
+    DB.commit()
+    _check()
+
+def test_rebuild_matches_triggers():
+    upsert_safe_token(address="stats_tok_rebuild", name="R", symbol="R", dex="pumpfun", risk=12, signature="s")
+    before = get_stats()
+    rebuild_token_stats()
+    assert get_stats() == before
+    _check()
+
+if __name__ == "__main__":
+    test_counters_follow_insert_update_delete()
+    test_rebuild_matches_triggers()
+    print("\n✅ Token stats tests completed!")
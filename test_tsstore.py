@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar time-series store
+"""
+
+import math
+import subprocess
+import sys
+import threading
+sys.path.append('.')
+
+import numpy as np
+from trading_bot.tsstore import TimeSeriesStore, ema_column, atr_column
+
+ADDR = "TS_TEST_TOKEN"
+
+def _bar(i):
+    c = 1.0 + i * 0.1
+    return {"address": ADDR, "ts_start": 1_700_000_000 + i * 60, "open": c - 0.05, "high": c + 0.1,
+            "low": c - 0.1, "close": c, "fdv_usd": 1e6 + i, "marketcap_usd": 5e5 + i, "samples": 30}
+
+def _fill(store, n):
+    for i in range(n):
+        assert store.append(ADDR, _bar(i), {ema_column(5, "low"): 0.5 + i, atr_column(14): 0.01 * i})
+
+def test_window_is_aligned_across_compacted_segments():
+    store = TimeSeriesStore(root=None, segment_bars=4)
+    _fill(store, 10)
+    assert store.compact() == 1                      # hot segment reached 4 bars → frozen
+    for i in range(10, 12):                          # new bars land in a fresh hot segment
+        assert store.append(ADDR, _bar(i), {atr_column(14): 0.01 * i})
+
+    w = store.window(ADDR)
+    print(f"📊 Stats: {store.stats()}")
+    assert w["ts"].tolist() == [_bar(i)["ts_start"] for i in range(12)]
+    assert np.allclose(w["close"], [_bar(i)["close"] for i in range(12)])
+    assert w[ema_column(5, "low")][9] == 9.5
+    assert math.isnan(w[ema_column(5, "low")][11])    # indicator missing for that bar
+    assert store.last(ADDR, atr_column(14)) == 0.11
+
+    last3 = store.window(ADDR, n=3, columns=["close"])
+    assert last3["ts"].tolist() == [_bar(i)["ts_start"] for i in (9, 10, 11)]
+    assert set(last3) == {"ts", "close"}
+
+    since = store.window(ADDR, since=_bar(7)["ts_start"])
+    assert since["ts"].size == 5
+
+def test_compaction_to_disk_and_drop(tmp_path):
+    store = TimeSeriesStore(root=str(tmp_path), segment_bars=5)
+    _fill(store, 12)
+    assert store.compact(force=True) == 1
+    files = list((tmp_path / ADDR).glob("*.npz"))
+    assert len(files) == 1
+    w = store.window(ADDR, n=12)
+    assert w["ts"].size == 12
+    assert w[atr_column(14)][-1] == 0.11
+
+    store.drop(ADDR)
+    assert ADDR not in store
+    assert not list((tmp_path / ADDR).glob("*.npz"))
+
+def test_rewritten_bar_overwrites_and_out_of_order_is_rejected():
+    store = TimeSeriesStore(root=None)
+    store.append(ADDR, _bar(1))
+    store.append(ADDR, {**_bar(1), "close": 9.0})
+    assert store.window(ADDR)["close"].tolist() == [9.0]
+    assert store.append(ADDR, _bar(0)) is False
+
+def test_ram_segments_are_capped_per_token():
+    store = TimeSeriesStore(root=None, segment_bars=2, max_segments=3)
+    for i in range(10):
+        store.append(ADDR, _bar(i))
+        store.compact()
+    # five frozen 2-bar segments, the oldest two aged out
+    assert store.stats()["cold_segments"] == 3 and store.stats()["aged_out"] == 2
+    assert store.window(ADDR)["ts"].tolist() == [_bar(i)["ts_start"] for i in range(4, 10)]
+
+def test_compaction_in_a_thread_loses_no_bars(tmp_path):
+    store = TimeSeriesStore(root=str(tmp_path), segment_bars=8)
+    tokens = [f"{ADDR}_{k}" for k in range(20)]
+    done = threading.Event()
+
+    def compact():
+        while not done.is_set():
+            store.compact()
+
+    worker = threading.Thread(target=compact)
+    worker.start()
+    try:
+        for i in range(200):                        # the loop side keeps appending and reading
+            for t in tokens:
+                assert store.append(t, _bar(i), {atr_column(14): i})
+            assert store.window(tokens[0], n=5)["ts"].size == min(i + 1, 5)
+    finally:
+        done.set()
+        worker.join()
+    store.compact(force=True)
+    for t in tokens:
+        assert store.window(t)[atr_column(14)].tolist() == list(range(200))
+    assert store.stats()["hot_bars"] == 0
+
+def test_numpy_is_not_imported_with_the_pipeline():
+    code = ("import sys, trading_bot.new_pairs, trading_bot.chain_feed, trading_bot.tsstore as t; "
+            "assert 'numpy' not in sys.modules; s = t.TimeSeriesStore(root=None); "
+            "s.append('a', {'ts_start': 60, 'close': 1.0}); assert s.last('a', 'close') == 1.0; "
+            "assert 'numpy' not in sys.modules; s.window('a'); assert 'numpy' in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for the warm start: seed bars for newly admitted tokens
+"""
+
+import sys
+import time
+import asyncio
+sys.path.append('.')
+
+import httpx
+from trading_bot import dexscreener_client
+from trading_bot.db import Database
+from trading_bot.indicators import get_values, reset_indicators
+from trading_bot.lifecycle import TokenLifecycle, pipeline_hooks
+from trading_bot.ohlc_agg import OHLCAggregator, SAMPLES_PER_BAR
+from trading_bot.records import Bar
+from trading_bot.sim.stubs import SimServers, sim_mint
+from trading_bot.tsstore import TimeSeriesStore
+from trading_bot.warmstart import HistorySource, WarmStart, PairWindowSource, CandleSource, bars_from_windows
+
+MINUTE = 1_699_999_980  # a minute boundary
+NOW = MINUTE + 30
+
+def _pair(**kw):
+    pair = {"priceUsd": "2.0", "fdv": 2e6, "marketCap": 1.6e6, "pairCreatedAt": (NOW - 20 * 60) * 1000,
+            "priceChange": {"m5": 0.0, "h1": 100.0}, "volume": {"m5": 500.0, "h1": 2000.0}}
+    pair.update(kw)
+    return pair
+
+class _Fixed(HistorySource):
+    name = "fixed"
+    def __init__(self, bars):
+        self.bars = bars
+    async def history(self, token, now, max_bars):
+        return self.bars
+
+def test_bars_from_windows():
+    bars = bars_from_windows("ws_tok", _pair(), NOW, max_bars=30)
+    # clipped at launch (20 min ago), ending at the last full minute
+    assert len(bars) == 20
+    assert bars[0].ts_start == MINUTE - 20 * 60 and bars[-1].ts_start == MINUTE - 60
+    assert all(b.samples == 0 and b.low <= min(b.open, b.close) <= max(b.open, b.close) <= b.high for b in bars)
+    # h1 +100% is the change since launch: 1.0 → 2.0, flat over the last 5 minutes
+    assert abs(bars[0].open - 1.0) < 1e-9 and abs(bars[-1].close - 2.0) < 1e-9
+    assert all(b.close > b.open for b in bars[:14]) and bars[-1].open == bars[-1].close
+    assert abs(bars[-1].volume - 100.0) < 1e-9 and abs(bars[0].volume - 1500 / 55) < 1e-9
+    assert abs(bars[-1].fdv_usd - 2e6) < 1e-3
+
+    assert len(bars_from_windows("ws_tok", _pair(), NOW, max_bars=5)) == 5
+    assert bars_from_windows("ws_tok", _pair(priceChange={}), NOW) == []
+    assert bars_from_windows("ws_tok", _pair(priceUsd=None), NOW) == []
+
+def test_apply_seeds_pipeline_and_primes_aggregator():
+    db = Database()
+    addr = "warmstart_tok_1"
+    db.upsert_safe_token(address=addr, name="Warm", symbol="W", dex="raydium", risk=1, signature="s", rc={})
+    agg, store = OHLCAggregator(), TimeSeriesStore(root=None)
+    lifecycle = TokenLifecycle(pipeline_hooks(agg, store), warm_bars=14)
+    lifecycle.admit(addr, now=NOW)
+    bars = bars_from_windows(addr, _pair(), NOW)
+    ws = WarmStart(_Fixed(bars), db=db, agg=agg, store=store, lifecycle=lifecycle, poll_interval=2)
+    try:
+        assert asyncio.run(ws.seed({"address": addr}, now=NOW)) == 20
+        assert get_values(addr) is not None
+        assert len(db.get_ohlc_1m(addr)) == 20
+        assert addr in store
+        assert lifecycle.tokens[addr].bars == 20
+
+        # the first live bar closes with the current minute: 30s left at 2s a sample
+        live = [agg.add_sample(addr, price=2.0, fdv=2e6, mc=1.6e6, ts=NOW + 2 * k) for k in range(15)]
+        assert live[:-1] == [None] * 14 and live[-1].samples == 15
+        assert agg.buffers[addr].need == SAMPLES_PER_BAR
+
+        # indicators exist now: older seed bars would corrupt them
+        assert asyncio.run(ws.seed({"address": addr}, now=NOW)) == 0
+        assert asyncio.run(WarmStart(_Fixed([]), db=db, agg=agg).seed({"address": "nothing"}, now=NOW)) == 0
+        assert ws.stats()["seeded"] == 1 and ws.stats()["late"] == 1
+    finally:
+        reset_indicators(addr)
+        db.close()
+
+def test_seed_bars_do_not_mark_a_pump_rugged():
+    # +100000% in the last 5 minutes: the seed bars climb from almost 0 to the live price
+    addr = "warmstart_pump"
+    agg, store = OHLCAggregator(), TimeSeriesStore(root=None)
+    lifecycle = TokenLifecycle(pipeline_hooks(agg, store), warm_bars=3)
+    lifecycle.admit(addr, now=NOW)
+    bars = bars_from_windows(addr, _pair(priceChange={"m5": 100000.0, "h1": 100000.0}), NOW)
+    db = Database()
+    try:
+        asyncio.run(WarmStart(_Fixed(bars), db=db, agg=agg, store=store, lifecycle=lifecycle).seed({"address": addr}, now=NOW))
+        t = lifecycle.tokens[addr]
+        assert t.state == "new" and t.bars == len(bars) and t.peak == 0.0
+        # live bars set the peak and can still rug
+        lifecycle.on_sample(addr, NOW)
+        assert t.state == "warming"
+        live = Bar(addr, MINUTE, 2.0, 2.2, 1.9, 2.0, None, None, 30)
+        lifecycle.on_bar(live)
+        assert t.peak == 2.2 and t.state == "active"      # the seed bars counted toward warm-up
+        lifecycle.on_bar(live._replace(ts_start=MINUTE + 60, high=2.0, close=0.1))
+        assert t.state == "dead" and t.reason == "rugged"
+    finally:
+        reset_indicators(addr)
+        db.close()
+
+def test_sources_against_sim(monkeypatch):
+    async def run():
+        servers = SimServers(dex_latency_ms=0, dex_jitter_ms=0)
+        await servers.start()
+        env = servers.env()
+        monkeypatch.setattr(dexscreener_client, "DEX_API", env["DEXSCREENER_API_URL"])
+        mint = sim_mint(7)
+        token = {"address": mint, "pool": f"Pool{mint[3:]}"}
+        try:
+            async with httpx.AsyncClient() as dex, httpx.AsyncClient(base_url=env["WARMSTART_CANDLES_URL"]) as hist:
+                now = time.time()
+                windows = await PairWindowSource(dex).history(token, now, 30)
+                candles = await CandleSource(hist).history(token, now, 30)
+                assert await CandleSource(hist).history({"address": mint}, now, 30) == []
+        finally:
+            await servers.close()
+        return now, windows, candles
+
+    now, windows, candles = asyncio.run(run())
+    end = now // 60 * 60
+    for bars in (windows, candles):
+        assert bars and all(isinstance(b, Bar) and b.samples == 0 for b in bars)
+        assert [b.ts_start for b in bars] == sorted(b.ts_start for b in bars) and bars[-1].ts_start < end
+    assert 19 <= len(windows) <= 21 and len(candles) == 30
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the websocket connection manager against a local server
+"""
+
+import asyncio
+import sys
+sys.path.append('.')
+
+import websockets
+from trading_bot.ws_manager import WSConnectionManager, detect_header_kwarg, backoff_delay
+
+def test_detect_header_kwarg():
+    """The header kwarg is read from the connect signature, never from TypeErrors."""
+    def new_style(uri, *, additional_headers=None, **kwargs): ...
+    def legacy(uri, *, extra_headers=None, **kwargs): ...
+    def bare(uri, **kwargs): ...
+    assert detect_header_kwarg(new_style) == "additional_headers"
+    assert detect_header_kwarg(legacy) == "extra_headers"
+    assert detect_header_kwarg(bare) is None
+    assert detect_header_kwarg() is not None
+
+def test_backoff_starts_in_milliseconds_and_is_capped():
+    assert backoff_delay(0, base=0.05, cap=5, rand=lambda: 1.0) == 0.05
+    assert backoff_delay(3, base=0.05, cap=5, rand=lambda: 1.0) == 0.4
+    assert backoff_delay(20, base=0.05, cap=5, rand=lambda: 1.0) == 5
+    assert backoff_delay(20, base=0.05, cap=5, rand=lambda: 0.0) == 0.0
+
+def _run_against_server(hot_standby: bool, sessions_wanted: int = 3):
+    seen_headers = []
+
+    async def server_handler(ws):
+        seen_headers.append(ws.request.headers.get("X-API-KEY"))
+        try:
+            msg = await asyncio.wait_for(ws.recv(), timeout=2)   # subscription
+        except asyncio.TimeoutError:
+            return                                                # idle standby socket
+        await ws.send(f"ack:{msg}")
+        await ws.close()                                          # force a reconnect
+
+    received = []
+
+    async def client_handler(ws):
+        await ws.send("subscribe")
+        async for raw in ws:
+            received.append(raw)
+
+    async def run():
+        async with websockets.serve(server_handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            mgr = WSConnectionManager(f"ws://127.0.0.1:{port}", client_handler,
+                                      headers={"X-API-KEY": "secret"}, hot_standby=hot_standby,
+                                      backoff_base=0.01, backoff_max=0.05)
+            task = asyncio.create_task(mgr.run())
+            for _ in range(300):
+                if mgr.sessions >= sessions_wanted and len(received) >= sessions_wanted:
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return mgr
+
+    mgr = asyncio.run(run())
+    return mgr, received, seen_headers
+
+def test_reconnects_quickly_and_records_downtime():
+    mgr, received, headers = _run_against_server(hot_standby=False)
+    stats = mgr.stats()
+    print(f"📊 Stats: {stats}")
+    assert stats["sessions"] >= 3
+    assert received[:3] == ["ack:subscribe"] * 3
+    assert set(headers) == {"secret"}
+    assert stats["downtime_windows"] >= 3           # startup gap + one per reconnect
+    assert stats["longest_gap_sec"] < 1.0
+
+def test_hot_standby_takes_over():
+    mgr, received, _ = _run_against_server(hot_standby=True)
+    stats = mgr.stats()
+    print(f"📊 Stats: {stats}")
+    assert stats["sessions"] >= 3
+    assert stats["standby_takeovers"] >= 1
+
+if __name__ == "__main__":
+    test_detect_header_kwarg()
+    test_backoff_starts_in_milliseconds_and_is_capped()
+    test_reconnects_quickly_and_records_downtime()
+    test_hot_standby_takes_over()
+    print("\n✅ Websocket manager tests completed!")
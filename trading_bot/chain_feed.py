@@ -0,0 +1,355 @@
+# Push-based prices from the chain: instead of polling DexScreener, subscribe
+# (Solana RPC accountSubscribe) to the reserve accounts of each token's pool
+# and compute the price locally.
+# - track(token, pool) reads the pool account once (getMultipleAccounts over
+#   HTTP) and decodes it by its owner program (LAYOUTS: Raydium AMM v4,
+#   PumpSwap) into the two vault token accounts, reads those and both mints,
+#   then subscribes to the vaults. Pools of other programs stay on polling.
+# - every vault notification updates that reserve; the USD price is the
+#   reserve ratio × the quote's USD price (USDC/USDT = 1, WSOL from a
+#   reference SOL/USDC pool tracked the same way, CHAIN_SOL_USD_POOL).
+# - run() samples every covered token each PRICE_POLL_INTERVAL_SEC into the
+#   poller's pipeline (price_watcher.ingest_batch), so 1m bars keep their
+#   30-sample meaning; a sample is as fresh as the last swap instead of up to
+#   a batch rotation old, and costs no request.
+# While the socket is down covers() is False and the poller takes the tokens
+# back on the next tick. Notifications are journaled as "chain" (key: the
+# account) and snapshots as "chain_rpc"; sim.rpc.RpcReplay replays both.
+import os, json, time, base64, struct, asyncio, itertools, typing
+from . import price_watcher
+from .db import Database, default_db
+from .env import settings
+from .http_clients import get_client
+from .journal import JOURNAL, Journal
+from .lifecycle import LIFECYCLE, TokenLifecycle, Hook
+from .ohlc_agg import AGGREGATOR, OHLCAggregator
+from .papertrading import PAPER_TRADER, PaperTrader
+from .price_watcher import ingest_batch
+from .tsstore import TS_STORE, TimeSeriesStore
+from .ws_manager import WSConnectionManager
+
+@settings
+def _read_settings() -> None:
+    global ENABLED, RPC_WS_URL, COMMITMENT, SOL_USD_POOL
+    ENABLED = os.getenv("CHAIN_FEED", "0") == "1"
+    RPC_WS_URL = os.getenv("SOLANA_RPC_WS_URL", "wss://api.mainnet-beta.solana.com")
+    COMMITMENT = os.getenv("SOLANA_RPC_COMMITMENT", "processed")
+    SOL_USD_POOL = os.getenv("CHAIN_SOL_USD_POOL", "58oQChx4yWmvKdwLLZzBi4ChoCc2fqCUWBkwMihLYQo2")  # Raydium SOL/USDC
+
+RAYDIUM_AMM_V4 = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+PUMPSWAP_AMM = "pAMMBay6oceH9fJKBRHGP5D4bD4sWpmSwMn52FMfXEA"
+WSOL = "So11111111111111111111111111111111111111112"
+USD_MINTS = frozenset(("EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",    # USDC
+                       "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB"))   # USDT
+
+# --- base58 (pubkeys) ---
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {c: i for i, c in enumerate(_B58)}
+
+def b58encode(raw: bytes) -> str:
+    n = int.from_bytes(raw, "big")
+    out = []
+    while n:
+        n, r = divmod(n, 58)
+        out.append(_B58[r])
+    return "1" * (len(raw) - len(raw.lstrip(b"\0"))) + "".join(reversed(out))
+
+def b58decode(s: str) -> bytes:
+    n = 0
+    for c in s:
+        n = n * 58 + _B58_INDEX[c]
+    return b"\0" * (len(s) - len(s.lstrip("1"))) + n.to_bytes((n.bit_length() + 7) // 8, "big")
+
+
+# --- account layouts ---
+class PoolKeys(typing.NamedTuple):
+    base_mint: str
+    quote_mint: str
+    base_vault: str
+    quote_vault: str
+    base_pnl: int = 0     # vault balance owed to the protocol, not part of the reserve
+    quote_pnl: int = 0
+
+def _pk(data: bytes, offset: int) -> str:
+    return b58encode(data[offset:offset + 32])
+
+def decode_raydium_amm_v4(data: bytes) -> PoolKeys:
+    """AmmInfo (752 bytes): need_take_pnl at 192/200, vaults at 336/368, mints at 400/432."""
+    if len(data) < 752:
+        raise ValueError(f"Raydium AMM v4 account too short ({len(data)} bytes)")
+    base_pnl, quote_pnl = struct.unpack_from("<QQ", data, 192)
+    return PoolKeys(_pk(data, 400), _pk(data, 432), _pk(data, 336), _pk(data, 368), base_pnl, quote_pnl)
+
+def decode_pumpswap(data: bytes) -> PoolKeys:
+    """Pool: discriminator, bump u8, index u16, creator, base/quote/lp mint (43/75/107), base/quote vault (139/171)."""
+    if len(data) < 203:
+        raise ValueError(f"PumpSwap pool account too short ({len(data)} bytes)")
+    return PoolKeys(_pk(data, 43), _pk(data, 75), _pk(data, 139), _pk(data, 171))
+
+LAYOUTS: dict[str, typing.Callable[[bytes], PoolKeys]] = {
+    RAYDIUM_AMM_V4: decode_raydium_amm_v4,
+    PUMPSWAP_AMM: decode_pumpswap,
+}
+
+def token_amount(data: bytes) -> int:
+    """SPL token account: mint, owner, amount u64 at 64."""
+    return struct.unpack_from("<Q", data, 64)[0]
+
+def mint_info(data: bytes) -> tuple[int, int]:
+    """SPL mint (also the Token-2022 base layout): (supply u64 at 36, decimals u8 at 44)."""
+    return struct.unpack_from("<Q", data, 36)[0], data[44]
+
+
+class _Pool:
+    """One tracked pool, oriented to the watched token (`vault`) and what it trades against (`other_*`)."""
+    __slots__ = ("token", "address", "vault", "other_vault", "other_mint", "decimals", "other_decimals",
+                 "pnl", "other_pnl", "supply", "amounts", "reference", "updated")
+
+    def __init__(self, token: str, address: str, keys: PoolKeys, mints: dict, amounts: dict, reference: bool):
+        side = keys.base_mint == token
+        if not side and keys.quote_mint != token:
+            raise ValueError(f"pool {address} does not trade {token}")
+        self.token, self.address, self.reference = token, address, reference
+        self.vault, self.other_vault = (keys.base_vault, keys.quote_vault) if side else (keys.quote_vault, keys.base_vault)
+        self.pnl, self.other_pnl = (keys.base_pnl, keys.quote_pnl) if side else (keys.quote_pnl, keys.base_pnl)
+        self.other_mint = keys.quote_mint if side else keys.base_mint
+        self.supply, self.decimals = mints[token]
+        self.other_decimals = mints[self.other_mint][1]
+        self.amounts = amounts   # vault → raw token amount
+        self.updated = time.time()
+
+    def ratio(self) -> typing.Optional[float]:
+        """Price of the token in units of the other mint."""
+        t = self.amounts[self.vault] - self.pnl
+        o = self.amounts[self.other_vault] - self.other_pnl
+        if t <= 0 or o <= 0:
+            return None
+        return (o / 10 ** self.other_decimals) / (t / 10 ** self.decimals)
+
+
+class ChainPriceFeed:
+    """Pool reserve subscriptions on one RPC websocket, sampled into a price pipeline."""
+
+    def __init__(self, *, ws_url: typing.Optional[str] = None, rpc=None, db: typing.Optional[Database] = None,
+                 agg: OHLCAggregator = AGGREGATOR, store: TimeSeriesStore = TS_STORE,
+                 lifecycle: TokenLifecycle = LIFECYCLE, interval: typing.Optional[float] = None,
+                 sol_usd_pool: typing.Optional[str] = None, journal: Journal = JOURNAL,
+                 enabled: typing.Optional[bool] = None, trader: PaperTrader = PAPER_TRADER):
+        # None: the module setting ("" for sol_usd_pool: no reference pool)
+        self._given = {"ws_url": ws_url, "interval": interval, "sol_usd_pool": sol_usd_pool, "enabled": enabled}
+        self.rpc = rpc   # httpx client for JSON-RPC; default: the shared "solana_rpc" one
+        self.db, self.agg, self.store, self.lifecycle = db, agg, store, lifecycle
+        self.trader = trader
+        self.journal = journal
+        self.configure()
+        self.pools: dict[str, _Pool] = {}      # token → pool
+        self._vaults: dict[str, _Pool] = {}    # vault account → pool
+        self._subs: dict[int, str] = {}        # subscription id → vault
+        self._sub_of: dict[str, int] = {}      # vault → subscription id
+        self._pending: dict[int, str] = {}     # accountSubscribe request id → vault
+        self._ids = itertools.count(1)
+        self._ws = None
+        self._tasks: set[asyncio.Task] = set()
+        self._hooked = False
+        self.manager: typing.Optional[WSConnectionManager] = None
+        self.counters = {"tracked": 0, "unsupported": 0, "errors": 0, "notifications": 0, "samples": 0}
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        given = self._given
+        self.ws_url = RPC_WS_URL if given["ws_url"] is None else given["ws_url"]
+        self.interval = price_watcher.INTERVAL if given["interval"] is None else given["interval"]
+        self.sol_usd_pool = SOL_USD_POOL if given["sol_usd_pool"] is None else given["sol_usd_pool"]
+        self.enabled = ENABLED if given["enabled"] is None else given["enabled"]
+
+    # --- tracking ---
+    async def _accounts(self, pubkeys: list[str]) -> list[typing.Optional[tuple[str, bytes]]]:
+        """getMultipleAccounts → (owner, data) per pubkey, None where the account does not exist."""
+        client = self.rpc or get_client("solana_rpc")
+        r = await client.post("", json={"jsonrpc": "2.0", "id": next(self._ids), "method": "getMultipleAccounts",
+                                        "params": [pubkeys, {"encoding": "base64", "commitment": COMMITMENT}]})
+        r.raise_for_status()
+        self.journal.record("chain_rpc", r.content, key=",".join(pubkeys))
+        msg = r.json()
+        if "error" in msg:
+            raise RuntimeError(f"getMultipleAccounts: {msg['error'].get('message')}")
+        return [(v["owner"], base64.b64decode(v["data"][0])) if v else None for v in msg["result"]["value"]]
+
+    async def track(self, token: str, pool: str, *, reference: bool = False) -> bool:
+        """Resolve `pool` and subscribe to its vaults; False if its program has no known layout."""
+        if token in self.pools:
+            return True
+        (acct,) = await self._accounts([pool])
+        if acct is None:
+            raise ValueError(f"pool account {pool} not found")
+        decode = LAYOUTS.get(acct[0])
+        if decode is None:
+            self.counters["unsupported"] += 1
+            return False
+        keys = decode(acct[1])
+        accts = await self._accounts([keys.base_vault, keys.quote_vault, keys.base_mint, keys.quote_mint])
+        if any(a is None for a in accts):
+            raise ValueError(f"pool {pool}: vault or mint account missing")
+        amounts = {keys.base_vault: token_amount(accts[0][1]), keys.quote_vault: token_amount(accts[1][1])}
+        mints = {keys.base_mint: mint_info(accts[2][1]), keys.quote_mint: mint_info(accts[3][1])}
+        p = _Pool(token, pool, keys, mints, amounts, reference)
+        if token in self.pools:  # tracked concurrently
+            return True
+        self.pools[token] = p
+        for vault in (p.vault, p.other_vault):
+            self._vaults[vault] = p
+            await self._subscribe(vault)
+        self.counters["tracked"] += not reference
+        return True
+
+    async def _track_logged(self, token: str, pool: str, **kw) -> None:
+        try:
+            await self.track(token, pool, **kw)
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"[chain] cannot track {token} (pool {pool}): {e}")
+
+    def spawn(self, token: dict) -> None:
+        """Track an admitted token (the dict dispatched to strategies) in the background."""
+        if not self.enabled or not token.get("pool"):
+            return
+        task = asyncio.create_task(self._track_logged(token["address"], token["pool"]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def untrack(self, token: str) -> None:
+        """Stop watching a token (lifecycle eviction hook)."""
+        p = self.pools.pop(token, None)
+        if p is None:
+            return
+        for vault in (p.vault, p.other_vault):
+            self._vaults.pop(vault, None)
+            sub = self._sub_of.pop(vault, None)
+            if sub is not None:
+                self._subs.pop(sub, None)
+                if self._ws is not None:
+                    await self._send("accountUnsubscribe", [sub])
+
+    # --- websocket ---
+    async def _send(self, method: str, params: list) -> int:
+        rid = next(self._ids)
+        await self._ws.send(json.dumps({"jsonrpc": "2.0", "id": rid, "method": method, "params": params}))
+        return rid
+
+    async def _subscribe(self, vault: str) -> None:
+        if self._ws is None:
+            return  # subscribed when the next session starts
+        rid = await self._send("accountSubscribe", [vault, {"encoding": "base64", "commitment": COMMITMENT}])
+        self._pending[rid] = vault
+
+    async def _session(self, ws) -> None:
+        """WSConnectionManager handler: (re)subscribe every vault, then apply notifications."""
+        self._subs.clear()
+        self._sub_of.clear()
+        self._pending.clear()
+        self._ws = ws
+        try:
+            for vault in list(self._vaults):
+                await self._subscribe(vault)
+            async for raw in ws:
+                try:
+                    await self._on_frame(raw)
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    print(f"[chain] bad frame: {e} -> {raw[:200]!r}")
+        finally:
+            self._ws = None
+            self._subs.clear()
+            self._sub_of.clear()
+
+    async def _on_frame(self, raw) -> None:
+        msg = json.loads(raw)
+        if msg.get("method") == "accountNotification":
+            params = msg["params"]
+            vault = self._subs.get(params["subscription"])
+            p = self._vaults.get(vault) if vault is not None else None
+            if p is None:
+                return
+            self.journal.record("chain", raw, key=vault)
+            p.amounts[vault] = token_amount(base64.b64decode(params["result"]["value"]["data"][0]))
+            p.updated = time.time()
+            self.counters["notifications"] += 1
+            return
+        vault = self._pending.pop(msg.get("id"), None)
+        if vault is None:
+            return  # unsubscribe ack
+        if "error" in msg:
+            self.counters["errors"] += 1
+            print(f"[chain] accountSubscribe {vault}: {msg['error'].get('message')}")
+        elif vault in self._vaults:
+            self._subs[msg["result"]] = vault
+            self._sub_of[vault] = msg["result"]
+        else:  # untracked while the request was in flight
+            await self._send("accountUnsubscribe", [msg["result"]])
+
+    # --- prices ---
+    def price_usd(self, token: str) -> typing.Optional[float]:
+        p = self.pools.get(token)
+        ratio = p.ratio() if p is not None else None
+        if ratio is None:
+            return None
+        if p.other_mint in USD_MINTS:
+            return ratio
+        quote = self.price_usd(p.other_mint) if p.other_mint != token else None
+        return ratio * quote if quote is not None else None
+
+    def covers(self, token: str) -> bool:
+        """True while the token's price arrives by push (connected, both vaults subscribed, priced)."""
+        p = self.pools.get(token)
+        return (p is not None and self._ws is not None and p.vault in self._sub_of
+                and p.other_vault in self._sub_of and self.price_usd(token) is not None)
+
+    async def tick(self, now: typing.Optional[float] = None) -> int:
+        """Feed one sample per covered token into the pipeline; returns how many."""
+        now = now or time.time()
+        db = self.db or default_db()
+        rows = []
+        for token, p in list(self.pools.items()):
+            if p.reference or not self.covers(token):
+                continue
+            price = self.price_usd(token)
+            fdv = price * p.supply / 10 ** p.decimals if p.supply else None
+            rows.append({"address": token, "price_usd": price, "fdv_usd": fdv, "marketcap_usd": fdv})
+        await ingest_batch(rows, now, db, self.agg, self.store, self.lifecycle,
+                           trader=self.trader)  # one writer command
+        self.counters["samples"] += len(rows)
+        return len(rows)
+
+    async def run(self) -> None:
+        """Keep the subscriptions up and sample covered tokens every `interval` (cancel to stop)."""
+        if not self._hooked:
+            self.lifecycle.register(Hook("chain_feed", self.untrack))
+            self._hooked = True
+        self.manager = WSConnectionManager(self.ws_url, self._session)
+        ws_task = asyncio.create_task(self.manager.run())
+        try:
+            if self.sol_usd_pool:
+                await self._track_logged(WSOL, self.sol_usd_pool, reference=True)
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.tick()
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    print(f"[chain] sampling error: {e}")
+        finally:
+            ws_task.cancel()
+            for t in list(self._tasks):
+                t.cancel()
+            await asyncio.gather(ws_task, *self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        tokens = [t for t, p in self.pools.items() if not p.reference]
+        return {**self.counters, "watching": len(tokens), "covered": sum(self.covers(t) for t in tokens),
+                "subscriptions": len(self._subs), "connected": self._ws is not None,
+                "sol_usd": self.price_usd(WSOL)}
+
+
+# Process-wide default instance on the default pipeline (CHAIN_FEED=1 enables it in new_pairs)
+CHAIN_FEED = ChainPriceFeed()
+settings(CHAIN_FEED.configure)
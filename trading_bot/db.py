@@ -1,52 +1,148 @@
 from __future__ import annotations
-import os, sqlite3, json
+import os, sqlite3, json, itertools, threading, weakref, typing
+from .migrations import EPOCH_NOW, migrate
+from .dbio import DBWriter, ReadPool, connect
 
 # Use a shared in-memory database; no data is persisted to disk
 DB_PATH = "file:memdb1?mode=memory&cache=shared"
-DB = sqlite3.connect(DB_PATH, uri=True, check_same_thread=False)
-
-# fast pragmas for performance
-DB.execute("PRAGMA journal_mode=WAL")
-DB.execute("PRAGMA synchronous=NORMAL")
-DB.execute("PRAGMA temp_store=MEMORY")
-DB.execute("PRAGMA cache_size=10000")
-DB.execute("PRAGMA mmap_size=268435456")
-
-DB.execute("""
-CREATE TABLE IF NOT EXISTS tokens (
-  address     TEXT PRIMARY KEY,               -- mint
-  chain       TEXT NOT NULL DEFAULT 'solana',
-  name        TEXT,
-  symbol      TEXT,
-  dex         TEXT,
-  risk        INTEGER,
-  signature   TEXT,
-  rc_json     TEXT NOT NULL,
-  approved    INTEGER NOT NULL DEFAULT 1,
-  created_at  DATETIME DEFAULT CURRENT_TIMESTAMP,
-  last_seen   DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-""")
-DB.execute("CREATE INDEX IF NOT EXISTS idx_tokens_seen ON tokens(last_seen)")
-DB.execute("CREATE INDEX IF NOT EXISTS idx_tokens_risk ON tokens(risk)")
-DB.commit()
+
+# --- Schema ---
+_TOKENS_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS tokens (
+      address     TEXT PRIMARY KEY,               -- mint
+      chain       TEXT NOT NULL DEFAULT 'solana',
+      name        TEXT,
+      symbol      TEXT,
+      dex         TEXT,
+      risk        INTEGER,
+      signature   TEXT,
+      rc_json     TEXT NOT NULL,
+      approved    INTEGER NOT NULL DEFAULT 1,
+      created_at  INTEGER NOT NULL DEFAULT (CAST(strftime('%s','now') AS INTEGER)),   -- epoch seconds (UTC)
+      last_seen   INTEGER NOT NULL DEFAULT (CAST(strftime('%s','now') AS INTEGER))
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tokens_seen ON tokens(last_seen)",
+    "CREATE INDEX IF NOT EXISTS idx_tokens_risk ON tokens(risk)",
+]
+
+# --- Token counters, kept current by triggers so stats never scan `tokens` ---
+# dims: total ('' key), risk bucket (low/medium/high/unknown), dex, status (approved/rejected)
+_RISK_BUCKET = """CASE WHEN {t}.risk IS NULL THEN 'unknown' WHEN {t}.risk <= 10 THEN 'low'
+                       WHEN {t}.risk <= 20 THEN 'medium' ELSE 'high' END"""
+_STATUS = "CASE WHEN {t}.approved THEN 'approved' ELSE 'rejected' END"
+
+def _count_sql(t: str, delta: int) -> str:
+    return f"""
+      INSERT INTO token_stats(dim, key, n) VALUES
+        ('total', '', {delta}),
+        ('risk', {_RISK_BUCKET.format(t=t)}, {delta}),
+        ('dex', coalesce({t}.dex, ''), {delta}),
+        ('status', {_STATUS.format(t=t)}, {delta})
+      ON CONFLICT(dim, key) DO UPDATE SET n = n + excluded.n;"""
+
+_TOKEN_STATS_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS token_stats (
+      dim  TEXT NOT NULL,
+      key  TEXT NOT NULL,
+      n    INTEGER NOT NULL,
+      PRIMARY KEY(dim, key)
+    );
+    """,
+    f"CREATE TRIGGER IF NOT EXISTS trg_tokens_stats_ins AFTER INSERT ON tokens BEGIN {_count_sql('NEW', 1)} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_tokens_stats_del AFTER DELETE ON tokens BEGIN {_count_sql('OLD', -1)} END",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_tokens_stats_upd AFTER UPDATE OF risk, dex, approved ON tokens
+      BEGIN {_count_sql('OLD', -1)} {_count_sql('NEW', 1)} END""",
+]
 
 # --- Minimal prices table (only price_usd, fdv_usd, marketcap_usd) ---
-DB.execute("""
-CREATE TABLE IF NOT EXISTS prices (
-  address        TEXT PRIMARY KEY,          -- token mint
-  price_usd      REAL,
+_PRICES_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS prices (
+      address        TEXT PRIMARY KEY,          -- token mint
+      price_usd      REAL,
+      fdv_usd        REAL,
+      marketcap_usd  REAL,
+      updated_at     INTEGER NOT NULL DEFAULT (CAST(strftime('%s','now') AS INTEGER))   -- epoch seconds (UTC)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_prices_updated_at ON prices(updated_at)",
+]
+
+# --- 1-minute OHLC storage; 5-minute / 1-hour rollups (filled by retention.py from older 1m bars) ---
+_OHLC_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+  address        TEXT NOT NULL,
+  ts_start       INTEGER NOT NULL,               -- epoch seconds (UTC) for bar/bucket start
+  open           REAL NOT NULL,
+  high           REAL NOT NULL,
+  low            REAL NOT NULL,
+  close          REAL NOT NULL,
   fdv_usd        REAL,
   marketcap_usd  REAL,
-  updated_at     DATETIME DEFAULT CURRENT_TIMESTAMP
+  samples        INTEGER NOT NULL,               -- price samples behind the bar (30 for 1m)
+  PRIMARY KEY(address, ts_start)
 );
-""")
-DB.commit()
+"""
+_OHLC_SQL = [
+    _OHLC_TABLE.format(table="ohlc_1m"),
+    "CREATE INDEX IF NOT EXISTS idx_ohlc_1m_addr_time ON ohlc_1m(address, ts_start)",
+    _OHLC_TABLE.format(table="ohlc_5m"),
+    _OHLC_TABLE.format(table="ohlc_1h"),
+]
+
+# --- EMA / ATR storage ---
+_INDICATOR_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+  address        TEXT NOT NULL,
+  ts_start       INTEGER NOT NULL,               -- epoch seconds (UTC) for minute start
+  length         INTEGER NOT NULL,               -- indicator period length
+  value          REAL NOT NULL,
+  PRIMARY KEY(address, ts_start, length)
+);
+"""
+_INDICATOR_SQL = [
+    _INDICATOR_TABLE.format(table="ema_1m"),
+    "CREATE INDEX IF NOT EXISTS idx_ema_1m_addr_time ON ema_1m(address, ts_start)",
+    _INDICATOR_TABLE.format(table="atr_1m"),
+    "CREATE INDEX IF NOT EXISTS idx_atr_1m_addr_time ON atr_1m(address, ts_start)",
+]
+
+SCHEMA_SQL = _TOKENS_SQL + _TOKEN_STATS_SQL + _PRICES_SQL + _OHLC_SQL + _INDICATOR_SQL
 
-def upsert_safe_token(*, address: str, name: str, symbol: str, dex: str,
-                      risk: int, signature: str, rc: dict | None = None):
-    """Insert or update a safe token in the database."""
-    DB.execute("""
+# Extra tables owned by other modules (e.g. papertrading); applied to every Database
+SchemaHook = typing.Callable[[sqlite3.Connection], None]
+_SCHEMA_HOOKS: list[SchemaHook] = []
+_INSTANCES: "weakref.WeakSet[Database]" = weakref.WeakSet()
+_memdb_ids = itertools.count(2)
+
+def register_schema(hook: SchemaHook) -> SchemaHook:
+    """Add tables to every Database: applied to open instances now and to new ones on creation."""
+    if hook not in _SCHEMA_HOOKS:
+        _SCHEMA_HOOKS.append(hook)
+        for db in list(_INSTANCES):
+            hook(db.conn)
+            db.conn.commit()
+    return hook
+
+
+# --- Row shaping shared by the write paths ---
+def _ohlc_params(bar) -> tuple:
+    if isinstance(bar, dict):
+        return (bar["address"], bar["ts_start"], bar["open"], bar["high"], bar["low"], bar["close"],
+                bar.get("fdv_usd"), bar.get("marketcap_usd"), bar.get("samples"))
+    return bar[:9]
+
+def _indicator_params(rows: list) -> list[tuple]:
+    # IndicatorValue records start with (address, ts_start, length, value)
+    return [r[:4] if isinstance(r, tuple) else (r["address"], r["ts_start"], r["length"], r["value"])
+            for r in rows]
+
+# --- Write commands (run on the writer thread's connection) ---
+def _upsert_safe_token(c: sqlite3.Connection, params: tuple) -> None:
+    c.execute("""
       INSERT INTO tokens(address, chain, name, symbol, dex, risk, signature, rc_json, approved)
       VALUES(?, 'solana', ?, ?, ?, ?, ?, ?, 1)
       ON CONFLICT(address) DO UPDATE SET
@@ -56,214 +152,453 @@ def upsert_safe_token(*, address: str, name: str, symbol: str, dex: str,
         risk=excluded.risk,
         signature=excluded.signature,
         rc_json=excluded.rc_json,
-        last_seen=CURRENT_TIMESTAMP;
-    """, (address, name, symbol, dex, risk, signature, json.dumps(rc or {})))
-    DB.commit()
+        last_seen=excluded.last_seen;
+    """, params)
+
+def _upsert_price(c: sqlite3.Connection, row: dict) -> None:
+    c.execute(f"""
+      INSERT INTO prices(address, price_usd, fdv_usd, marketcap_usd, updated_at)
+      VALUES(:address, :price_usd, :fdv_usd, :marketcap_usd, {EPOCH_NOW})
+      ON CONFLICT(address) DO UPDATE SET
+        price_usd=excluded.price_usd,
+        fdv_usd=excluded.fdv_usd,
+        marketcap_usd=excluded.marketcap_usd,
+        updated_at=excluded.updated_at;
+    """, row)
+
+def _insert_ohlc_1m(c: sqlite3.Connection, params: tuple) -> None:
+    c.execute("""
+      INSERT OR REPLACE INTO ohlc_1m
+        (address, ts_start, open, high, low, close, fdv_usd, marketcap_usd, samples)
+      VALUES
+        (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, params)
+
+def _insert_ema_1m(c: sqlite3.Connection, params: list[tuple]) -> None:
+    c.executemany("""
+      INSERT OR REPLACE INTO ema_1m
+        (address, ts_start, length, value)
+      VALUES
+        (?, ?, ?, ?)
+    """, params)
+
+def _insert_atr_1m(c: sqlite3.Connection, params: list[tuple]) -> None:
+    c.executemany("""
+      INSERT OR REPLACE INTO atr_1m
+        (address, ts_start, length, value)
+      VALUES
+        (?, ?, ?, ?)
+    """, params)
+
+_CLEAR_OLD_SQL = f"DELETE FROM tokens WHERE last_seen < {EPOCH_NOW} - ?"
+
+# --- Reads (shared by the sync helpers on `conn` and their *_async forms on the read pool) ---
+_COUNT_SQL = "SELECT n FROM token_stats WHERE dim='total' AND key=''"
+_BREAKDOWN_SQL = "SELECT dim, key, n FROM token_stats WHERE n != 0"
+_DBSTAT_SQL = "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"
+_RECENT_SQL = f"""
+    SELECT address, name, symbol, dex, risk, signature, created_at, last_seen
+    FROM tokens
+    WHERE last_seen >= {EPOCH_NOW} - ?
+    ORDER BY last_seen DESC
+    LIMIT ?
+"""
+
+def _breakdown(rows) -> dict[str, dict[str, int]]:
+    out: dict[str, dict[str, int]] = {"total": {}, "risk": {}, "dex": {}, "status": {}}
+    for dim, key, n in rows:
+        out.setdefault(dim, {})[key] = n
+    return out
+
+def _stats(b: dict[str, dict[str, int]]) -> dict:
+    risk = b["risk"]
+    return {
+        'total': b["total"].get("", 0),
+        'low_risk_0_10': risk.get("low", 0),
+        'medium_risk_11_20': risk.get("medium", 0),
+        'high_risk_21_plus': risk.get("high", 0),
+        'by_dex': b["dex"],
+        'by_status': b["status"],
+    }
+
+def _page_usage(page_size: int, pages: int, free: int, tables: list) -> dict:
+    return {"page_size": page_size, "pages": pages, "free_pages": free,
+            "bytes": page_size * pages, "tables": dict(tables)}
+
+
+class Database:
+    """
+    One isolated SQLite database: schema, a writer thread, a read pool and every
+    helper as a method. Without `path` each instance gets its own shared-cache
+    in-memory database, so backtests can run side by side in one process.
+    """
+
+    def __init__(self, path: typing.Optional[str] = None):
+        self.path = path or f"file:memdb{next(_memdb_ids)}?mode=memory&cache=shared"
+        self.conn = connect(self.path)
+        # Runtime writes go through `writer` (one thread, batched transactions); async
+        # reads can use `reads`. `conn` creates the schema and serves sync reads.
+        self.writer = DBWriter(self.path)
+        self.reads = ReadPool(self.path)
+        self._create_schema()
+        _INSTANCES.add(self)
+
+    def _create_schema(self) -> None:
+        conn = self.conn
+        # fast pragmas for performance
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=10000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        for sql in SCHEMA_SQL:
+            conn.execute(sql)
+        for hook in _SCHEMA_HOOKS:
+            hook(conn)
+        conn.commit()
+        if conn.execute("SELECT 1 FROM token_stats WHERE dim='total'").fetchone() is None:
+            self.rebuild_token_stats()
+        # Upgrade tables created by older versions of this module (see migrations.py)
+        migrate(conn)
+
+    def close(self) -> None:
+        """Flush queued writes and close every connection (an in-memory database is then gone)."""
+        self.writer.close()
+        self.reads.close()
+        self.conn.close()
+        _INSTANCES.discard(self)
+
+    # --- tokens ---
+    def rebuild_token_stats(self) -> None:
+        """Recompute token_stats from `tokens` (one full scan; triggers keep it current afterwards)."""
+        self.conn.execute("DELETE FROM token_stats")
+        self.conn.execute(f"""
+          INSERT INTO token_stats(dim, key, n)
+            SELECT 'total', '', COUNT(*) FROM tokens
+            UNION ALL SELECT 'risk', {_RISK_BUCKET.format(t='tokens')}, COUNT(*) FROM tokens GROUP BY 2
+            UNION ALL SELECT 'dex', coalesce(dex, ''), COUNT(*) FROM tokens GROUP BY 2
+            UNION ALL SELECT 'status', {_STATUS.format(t='tokens')}, COUNT(*) FROM tokens GROUP BY 2
+        """)
+        self.conn.commit()
+
+    def upsert_safe_token(self, *, address: str, name: str, symbol: str, dex: str,
+                          risk: int, signature: str, rc: dict | None = None):
+        """Insert or update a safe token in the database."""
+        params = (address, name, symbol, dex, risk, signature, json.dumps(rc or {}))
+        self.writer.run(lambda c: _upsert_safe_token(c, params))
+
+    async def upsert_safe_token_async(self, *, address: str, name: str, symbol: str, dex: str,
+                                      risk: int, signature: str, rc: dict | None = None):
+        """upsert_safe_token() for async callers: the loop keeps running while the writer commits."""
+        params = (address, name, symbol, dex, risk, signature, json.dumps(rc or {}))
+        await self.writer.arun(lambda c: _upsert_safe_token(c, params))
+
+    def count_tokens(self) -> int:
+        """Get total number of tokens in database."""
+        row = self.conn.execute(_COUNT_SQL).fetchone()
+        return row[0] if row else 0
+
+    async def count_tokens_async(self) -> int:
+        """count_tokens() on the read pool, for callers on the event loop."""
+        row = await self.reads.fetchone(_COUNT_SQL)
+        return row[0] if row else 0
+
+    def get_token_breakdown(self) -> dict[str, dict[str, int]]:
+        """Token counts per dimension: {"total": {"": n}, "risk": {...}, "dex": {...}, "status": {...}}."""
+        return _breakdown(self.conn.execute(_BREAKDOWN_SQL))
+
+    async def get_token_breakdown_async(self) -> dict[str, dict[str, int]]:
+        return _breakdown(await self.reads.fetchall(_BREAKDOWN_SQL))
+
+    def get_tokens_by_risk(self, max_risk: int = 20, limit: int = 50) -> list:
+        """Get tokens filtered by risk level."""
+        return self.conn.execute("""
+            SELECT address, name, symbol, dex, risk, signature, created_at, last_seen
+            FROM tokens
+            WHERE risk <= ?
+            ORDER BY last_seen DESC
+            LIMIT ?
+        """, (max_risk, limit)).fetchall()
+
+    def get_token_by_address(self, address: str) -> dict:
+        """Get specific token by address."""
+        row = self.conn.execute("""
+            SELECT address, name, symbol, dex, risk, signature, rc_json, created_at, last_seen
+            FROM tokens
+            WHERE address = ?
+        """, (address,)).fetchone()
+        if row:
+            return {
+                'address': row[0],
+                'name': row[1],
+                'symbol': row[2],
+                'dex': row[3],
+                'risk': row[4],
+                'signature': row[5],
+                'rc_json': json.loads(row[6]) if row[6] else {},
+                'created_at': row[7],
+                'last_seen': row[8]
+            }
+        return None
+
+    def get_recent_tokens(self, hours: int = 24, limit: int = 50) -> list:
+        """Get tokens seen in the last N hours."""
+        return self.conn.execute(_RECENT_SQL, (int(hours) * 3600, int(limit))).fetchall()
+
+    async def get_recent_tokens_async(self, hours: int = 24, limit: int = 50) -> list:
+        return await self.reads.fetchall(_RECENT_SQL, (int(hours) * 3600, int(limit)))
+
+    def clear_old_tokens(self, days: int = 7) -> int:
+        """Remove tokens older than N days. Returns the number removed."""
+        return self.writer.execute(_CLEAR_OLD_SQL, (int(days) * 86400,))
+
+    async def clear_old_tokens_async(self, days: int = 7) -> int:
+        """clear_old_tokens() for async callers."""
+        return await self.writer.aexecute(_CLEAR_OLD_SQL, (int(days) * 86400,))
+
+    def get_stats(self) -> dict:
+        """Get database statistics (O(1): read from the trigger-maintained token_stats)."""
+        return _stats(self.get_token_breakdown())
+
+    async def get_stats_async(self) -> dict:
+        """get_stats() on the read pool, for callers on the event loop."""
+        return _stats(await self.get_token_breakdown_async())
+
+    def list_all_addresses(self, limit: int = None) -> list[str]:
+        """Get all token addresses, optionally limited by count."""
+        sql = "SELECT address FROM tokens ORDER BY last_seen DESC"
+        cur = self.conn.execute(sql + (" LIMIT ?" if limit is not None else ""),
+                                ((int(limit),) if limit is not None else ()))
+        return [r[0] for r in cur.fetchall()]
+
+    async def retire_tokens_async(self, addresses: list[str]) -> int:
+        """Drop retired tokens from `tokens` (the watch list) and `prices`; candles are left to retention."""
+        params = [(a,) for a in addresses]
+        def retire(c: sqlite3.Connection) -> int:
+            c.executemany("DELETE FROM prices WHERE address=?", params)
+            return c.executemany("DELETE FROM tokens WHERE address=?", params).rowcount
+        return await self.writer.arun(retire)
+
+    def page_usage(self) -> dict:
+        """Pages in use and free, and bytes per table/index where SQLite has the dbstat table."""
+        conn = self.conn
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        try:
+            tables = conn.execute(_DBSTAT_SQL).fetchall()
+        except sqlite3.OperationalError:  # built without SQLITE_ENABLE_DBSTAT_VTAB
+            tables = []
+        return _page_usage(page_size, pages, free, tables)
+
+    async def page_usage_async(self) -> dict:
+        """page_usage() on the read pool, for callers on the event loop."""
+        reads = self.reads
+        page_size = (await reads.fetchone("PRAGMA page_size"))[0]
+        pages = (await reads.fetchone("PRAGMA page_count"))[0]
+        free = (await reads.fetchone("PRAGMA freelist_count"))[0]
+        try:
+            tables = await reads.fetchall(_DBSTAT_SQL)
+        except sqlite3.OperationalError:
+            tables = []
+        return _page_usage(page_size, pages, free, tables)
+
+    # --- prices ---
+    def upsert_price(self, row: dict) -> None:
+        """Insert or update price data for a token."""
+        self.writer.run(lambda c: _upsert_price(c, row))
+
+    async def upsert_price_async(self, row: dict) -> None:
+        """upsert_price() for async callers."""
+        await self.writer.arun(lambda c: _upsert_price(c, row))
+
+    async def upsert_prices_async(self, rows: list[dict]) -> None:
+        """Upsert a whole fetched batch as one writer command (one queue hop, one transaction)."""
+        def write(c: sqlite3.Connection) -> None:
+            for row in rows:
+                _upsert_price(c, row)
+        if rows:
+            await self.writer.arun(write)
+
+    def get_price_snapshot(self, limit: int = 20) -> list[tuple]:
+        """Get latest price snapshot with token details. SQLite-safe ordering."""
+        # SQLite has no "NULLS LAST" → emulate with CASE
+        return self.conn.execute("""
+          SELECT t.address, t.name, t.symbol, p.price_usd, p.fdv_usd, p.marketcap_usd, p.updated_at
+          FROM tokens t LEFT JOIN prices p ON t.address = p.address
+          ORDER BY (p.updated_at IS NULL) ASC, p.updated_at DESC, t.last_seen DESC
+          LIMIT ?
+        """, (int(limit),)).fetchall()
+
+    # --- candles & indicators ---
+    def insert_ohlc_1m(self, bar) -> None:
+        """Insert or replace a 1-minute OHLC bar (records.Bar or dict)."""
+        params = _ohlc_params(bar)
+        self.writer.run(lambda c: _insert_ohlc_1m(c, params))
+
+    def insert_ema_1m(self, ema_rows: list) -> None:
+        """Insert EMA values for a token."""
+        params = _indicator_params(ema_rows)
+        self.writer.run(lambda c: _insert_ema_1m(c, params))
+
+    def insert_atr_1m(self, atr_rows: list) -> None:
+        """Insert ATR values for a token."""
+        params = _indicator_params(atr_rows)
+        self.writer.run(lambda c: _insert_atr_1m(c, params))
+
+    async def store_bar_async(self, bar, ema_rows: list, atr_rows: list) -> None:
+        """Write a closed bar and its EMA/ATR rows as one writer command (all or nothing)."""
+        bar_p, ema_p, atr_p = _ohlc_params(bar), _indicator_params(ema_rows), _indicator_params(atr_rows)
+        def write(c: sqlite3.Connection) -> None:
+            _insert_ohlc_1m(c, bar_p)
+            _insert_ema_1m(c, ema_p)
+            _insert_atr_1m(c, atr_p)
+        await self.writer.arun(write)
+
+    def _bars(self, table: str, address: str, limit: int) -> list[tuple]:
+        return self.conn.execute(f"""
+          SELECT ts_start, open, high, low, close, fdv_usd, marketcap_usd, samples
+          FROM {table}
+          WHERE address = ?
+          ORDER BY ts_start DESC
+          LIMIT ?
+        """, (address, int(limit))).fetchall()
+
+    def get_ohlc_1m(self, address: str, limit: int = 120) -> list[tuple]:
+        """Get recent 1-minute OHLC bars for a token."""
+        return self._bars("ohlc_1m", address, limit)
+
+    def get_ohlc_5m(self, address: str, limit: int = 120) -> list[tuple]:
+        """Get recent 5-minute rollup bars for a token (same columns as get_ohlc_1m)."""
+        return self._bars("ohlc_5m", address, limit)
+
+    def get_ohlc_1h(self, address: str, limit: int = 120) -> list[tuple]:
+        """Get recent 1-hour rollup bars for a token (same columns as get_ohlc_1m)."""
+        return self._bars("ohlc_1h", address, limit)
+
+    def _indicator(self, table: str, address: str, length: int, limit: int) -> list[tuple]:
+        return self.conn.execute(f"""
+          SELECT ts_start, value
+          FROM {table}
+          WHERE address = ? AND length = ?
+          ORDER BY ts_start DESC
+          LIMIT ?
+        """, (address, length, int(limit))).fetchall()
+
+    def get_ema_1m(self, address: str, length: int, limit: int = 120) -> list[tuple]:
+        """Get recent EMA values for a token."""
+        return self._indicator("ema_1m", address, length, limit)
+
+    def get_atr_1m(self, address: str, length: int, limit: int = 120) -> list[tuple]:
+        """Get recent ATR values for a token."""
+        return self._indicator("atr_1m", address, length, limit)
+
+
+# --- Process-wide default instance (on DB_PATH) behind the module-level helpers ---
+_DEFAULT: typing.Optional[Database] = None
+_DEFAULT_LOCK = threading.Lock()
+
+def init(path: typing.Optional[str] = None) -> Database:
+    """Create the default database (schema, migrations) now rather than on first use. Idempotent."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = Database(path or DB_PATH)
+    return _DEFAULT
+
+def default_db() -> Database:
+    return _DEFAULT if _DEFAULT is not None else init()
+
+def __getattr__(name: str):
+    # DB / WRITER / READS: the default instance's connection, writer and read pool
+    if name == "DB":
+        return default_db().conn
+    if name == "WRITER":
+        return default_db().writer
+    if name == "READS":
+        return default_db().reads
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def rebuild_token_stats() -> None:
+    default_db().rebuild_token_stats()
+
+def upsert_safe_token(**kw):
+    default_db().upsert_safe_token(**kw)
+
+async def upsert_safe_token_async(**kw):
+    await default_db().upsert_safe_token_async(**kw)
 
 def count_tokens() -> int:
-    """Get total number of tokens in database."""
-    return DB.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+    return default_db().count_tokens()
+
+async def count_tokens_async() -> int:
+    return await default_db().count_tokens_async()
+
+def get_token_breakdown() -> dict[str, dict[str, int]]:
+    return default_db().get_token_breakdown()
 
 def get_tokens_by_risk(max_risk: int = 20, limit: int = 50) -> list:
-    """Get tokens filtered by risk level."""
-    cursor = DB.execute("""
-        SELECT address, name, symbol, dex, risk, signature, created_at, last_seen
-        FROM tokens 
-        WHERE risk <= ? 
-        ORDER BY last_seen DESC 
-        LIMIT ?
-    """, (max_risk, limit))
-    return cursor.fetchall()
+    return default_db().get_tokens_by_risk(max_risk, limit)
 
 def get_token_by_address(address: str) -> dict:
-    """Get specific token by address."""
-    cursor = DB.execute("""
-        SELECT address, name, symbol, dex, risk, signature, rc_json, created_at, last_seen
-        FROM tokens 
-        WHERE address = ?
-    """, (address,))
-    row = cursor.fetchone()
-    if row:
-        return {
-            'address': row[0],
-            'name': row[1],
-            'symbol': row[2],
-            'dex': row[3],
-            'risk': row[4],
-            'signature': row[5],
-            'rc_json': json.loads(row[6]) if row[6] else {},
-            'created_at': row[7],
-            'last_seen': row[8]
-        }
-    return None
+    return default_db().get_token_by_address(address)
 
 def get_recent_tokens(hours: int = 24, limit: int = 50) -> list:
-    """Get tokens seen in the last N hours."""
-    cursor = DB.execute(
-        """
-        SELECT address, name, symbol, dex, risk, signature, created_at, last_seen
-        FROM tokens
-        WHERE last_seen >= datetime('now', ?)
-        ORDER BY last_seen DESC
-        LIMIT ?
-        """,
-        (f'-{int(hours)} hours', int(limit)),
-    )
-    return cursor.fetchall()
-
-def clear_old_tokens(days: int = 7):
-    """Remove tokens older than N days."""
-    DB.execute(
-        "DELETE FROM tokens WHERE last_seen < datetime('now', ?)",
-        (f'-{int(days)} days',),
-    )
-    DB.commit()
+    return default_db().get_recent_tokens(hours, limit)
+
+async def get_recent_tokens_async(hours: int = 24, limit: int = 50) -> list:
+    return await default_db().get_recent_tokens_async(hours, limit)
+
+def clear_old_tokens(days: int = 7) -> int:
+    return default_db().clear_old_tokens(days)
+
+async def clear_old_tokens_async(days: int = 7) -> int:
+    return await default_db().clear_old_tokens_async(days)
 
 def get_stats() -> dict:
-    """Get database statistics."""
-    total = count_tokens()
-    low_risk = DB.execute("SELECT COUNT(*) FROM tokens WHERE risk <= 10").fetchone()[0]
-    medium_risk = DB.execute("SELECT COUNT(*) FROM tokens WHERE risk > 10 AND risk <= 20").fetchone()[0]
-    high_risk = DB.execute("SELECT COUNT(*) FROM tokens WHERE risk > 20").fetchone()[0]
-    
-    return {
-        'total': total,
-        'low_risk_0_10': low_risk,
-        'medium_risk_11_20': medium_risk,
-        'high_risk_21_plus': high_risk
-    }
+    return default_db().get_stats()
+
+async def get_stats_async() -> dict:
+    return await default_db().get_stats_async()
 
 def list_all_addresses(limit: int = None) -> list[str]:
-    """Get all token addresses, optionally limited by count."""
-    sql = "SELECT address FROM tokens ORDER BY last_seen DESC"
-    cur = DB.execute(sql + (" LIMIT ?" if limit is not None else ""), ((int(limit),) if limit is not None else ()))
-    return [r[0] for r in cur.fetchall()]
+    return default_db().list_all_addresses(limit)
 
 def upsert_price(row: dict) -> None:
-    """Insert or update price data for a token."""
-    DB.execute("""
-      INSERT INTO prices(address, price_usd, fdv_usd, marketcap_usd, updated_at)
-      VALUES(:address, :price_usd, :fdv_usd, :marketcap_usd, CURRENT_TIMESTAMP)
-      ON CONFLICT(address) DO UPDATE SET
-        price_usd=excluded.price_usd,
-        fdv_usd=excluded.fdv_usd,
-        marketcap_usd=excluded.marketcap_usd,
-        updated_at=CURRENT_TIMESTAMP;
-    """, row)
-    DB.commit()
+    default_db().upsert_price(row)
+
+async def upsert_price_async(row: dict) -> None:
+    await default_db().upsert_price_async(row)
+
+async def upsert_prices_async(rows: list[dict]) -> None:
+    await default_db().upsert_prices_async(rows)
 
 def get_price_snapshot(limit: int = 20) -> list[tuple]:
-    """Get latest price snapshot with token details. SQLite-safe ordering."""
-    # SQLite has no "NULLS LAST" → emulate with CASE
-    return DB.execute("""
-      SELECT t.address, t.name, t.symbol, p.price_usd, p.fdv_usd, p.marketcap_usd, p.updated_at
-      FROM tokens t LEFT JOIN prices p ON t.address = p.address
-      ORDER BY (p.updated_at IS NULL) ASC, p.updated_at DESC, t.last_seen DESC
-      LIMIT ?
-    """, (int(limit),)).fetchall()
-
-# --- 1-minute OHLC storage ---
-DB.execute("""
-CREATE TABLE IF NOT EXISTS ohlc_1m (
-  address        TEXT NOT NULL,
-  ts_start       INTEGER NOT NULL,               -- epoch seconds (UTC) for minute start
-  open           REAL NOT NULL,
-  high           REAL NOT NULL,
-  low            REAL NOT NULL,
-  close          REAL NOT NULL,
-  fdv_usd        REAL,
-  marketcap_usd  REAL,
-  samples        INTEGER NOT NULL,               -- should be 30
-  PRIMARY KEY(address, ts_start)
-);
-""")
-DB.execute("CREATE INDEX IF NOT EXISTS idx_ohlc_1m_addr_time ON ohlc_1m(address, ts_start)")
-DB.commit()
+    return default_db().get_price_snapshot(limit)
 
-def insert_ohlc_1m(bar: dict) -> None:
-    """Insert or replace a 1-minute OHLC bar."""
-    DB.execute("""
-      INSERT OR REPLACE INTO ohlc_1m
-        (address, ts_start, open, high, low, close, fdv_usd, marketcap_usd, samples)
-      VALUES
-        (:address, :ts_start, :open, :high, :low, :close, :fdv_usd, :marketcap_usd, :samples)
-    """, bar)
-    DB.commit()
+def insert_ohlc_1m(bar) -> None:
+    default_db().insert_ohlc_1m(bar)
+
+def insert_ema_1m(ema_rows: list) -> None:
+    default_db().insert_ema_1m(ema_rows)
+
+def insert_atr_1m(atr_rows: list) -> None:
+    default_db().insert_atr_1m(atr_rows)
+
+async def store_bar_async(bar, ema_rows: list, atr_rows: list) -> None:
+    await default_db().store_bar_async(bar, ema_rows, atr_rows)
 
 def get_ohlc_1m(address: str, limit: int = 120) -> list[tuple]:
-    """Get recent 1-minute OHLC bars for a token."""
-    return DB.execute("""
-      SELECT ts_start, open, high, low, close, fdv_usd, marketcap_usd, samples
-      FROM ohlc_1m
-      WHERE address = ?
-      ORDER BY ts_start DESC
-      LIMIT ?
-    """, (address, int(limit))).fetchall()
-
-# --- EMA storage ---
-DB.execute("""
-CREATE TABLE IF NOT EXISTS ema_1m (
-  address        TEXT NOT NULL,
-  ts_start       INTEGER NOT NULL,               -- epoch seconds (UTC) for minute start
-  length         INTEGER NOT NULL,               -- EMA period length
-  value          REAL NOT NULL,                  -- EMA value
-  PRIMARY KEY(address, ts_start, length)
-);
-""")
-DB.execute("CREATE INDEX IF NOT EXISTS idx_ema_1m_addr_time ON ema_1m(address, ts_start)")
-DB.commit()
+    return default_db().get_ohlc_1m(address, limit)
 
-def insert_ema_1m(ema_rows: list) -> None:
-    """Insert EMA values for a token."""
-    for row in ema_rows:
-        DB.execute("""
-          INSERT OR REPLACE INTO ema_1m
-            (address, ts_start, length, value)
-          VALUES
-            (:address, :ts_start, :length, :value)
-        """, row)
-    DB.commit()
+def get_ohlc_5m(address: str, limit: int = 120) -> list[tuple]:
+    return default_db().get_ohlc_5m(address, limit)
 
-def get_ema_1m(address: str, length: int, limit: int = 120) -> list[tuple]:
-    """Get recent EMA values for a token."""
-    return DB.execute("""
-      SELECT ts_start, value
-      FROM ema_1m
-      WHERE address = ? AND length = ?
-      ORDER BY ts_start DESC
-      LIMIT ?
-    """, (address, length, int(limit))).fetchall()
-
-# --- ATR storage ---
-DB.execute("""
-CREATE TABLE IF NOT EXISTS atr_1m (
-  address        TEXT NOT NULL,
-  ts_start       INTEGER NOT NULL,               -- epoch seconds (UTC) for minute start
-  length         INTEGER NOT NULL,               -- ATR period length
-  value          REAL NOT NULL,                  -- ATR value
-  PRIMARY KEY(address, ts_start, length)
-);
-""")
-DB.execute("CREATE INDEX IF NOT EXISTS idx_atr_1m_addr_time ON atr_1m(address, ts_start)")
-DB.commit()
+def get_ohlc_1h(address: str, limit: int = 120) -> list[tuple]:
+    return default_db().get_ohlc_1h(address, limit)
 
-def insert_atr_1m(atr_rows: list) -> None:
-    """Insert ATR values for a token."""
-    for row in atr_rows:
-        DB.execute("""
-          INSERT OR REPLACE INTO atr_1m
-            (address, ts_start, length, value)
-          VALUES
-            (:address, :ts_start, :length, :value)
-        """, row)
-    DB.commit()
+def get_ema_1m(address: str, length: int, limit: int = 120) -> list[tuple]:
+    return default_db().get_ema_1m(address, length, limit)
 
 def get_atr_1m(address: str, length: int, limit: int = 120) -> list[tuple]:
-    """Get recent ATR values for a token."""
-    return DB.execute("""
-      SELECT ts_start, value
-      FROM atr_1m
-      WHERE address = ? AND length = ?
-      ORDER BY ts_start DESC
-      LIMIT ?
-    """, (address, length, int(limit))).fetchall()
+    return default_db().get_atr_1m(address, length, limit)
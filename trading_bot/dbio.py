@@ -0,0 +1,232 @@
+# SQLite access layer: one writer thread + a small pool of reader threads.
+# Writes are commands (callables taking the writer's connection) queued to a
+# single thread that drains the queue into batched transactions, so commits
+# are amortised and transactions can never interleave. Reads run on pooled
+# connections in worker threads. Async code awaits both, so SQLite latency
+# never runs on the event loop; sync callers can still block on a result.
+import os, queue, sqlite3, asyncio, threading, time, typing
+from concurrent.futures import Future, ThreadPoolExecutor
+from .env import settings
+
+@settings
+def _read_settings() -> None:
+    global BATCH_MAX, READ_POOL_SIZE
+    BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", "256"))     # commands per transaction
+    READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "2"))
+
+LOCK_RETRY_SEC = 0.002
+
+WriteFn = typing.Callable[[sqlite3.Connection], typing.Any]
+_STOP = object()
+
+
+def _is_locked(e: Exception) -> bool:
+    return isinstance(e, sqlite3.OperationalError) and "locked" in str(e)
+
+
+def _retry_locked(fn: typing.Callable[[], typing.Any]):
+    # shared-cache table locks (SQLITE_LOCKED) don't honour busy_timeout: retry until the writer commits
+    while True:
+        try:
+            return fn()
+        except sqlite3.OperationalError as e:
+            if not _is_locked(e):
+                raise
+            time.sleep(LOCK_RETRY_SEC)
+
+
+class Connection(sqlite3.Connection):
+    """A connection whose execute() waits out another connection's table locks instead of failing."""
+
+    def execute(self, sql: str, params: typing.Any = ()) -> sqlite3.Cursor:
+        return _retry_locked(lambda: sqlite3.Connection.execute(self, sql, params))
+
+
+def connect(path: str, *, retry: bool = False) -> sqlite3.Connection:
+    """
+    Open a connection to `path` (a file or a shared-cache memory URI) with the repo's pragmas.
+    `retry` makes execute() sleep out other connections' table locks, which is only
+    acceptable off the event loop (the writer thread; ReadPool retries per query).
+    """
+    conn = sqlite3.connect(path, uri=path.startswith("file:"), check_same_thread=False,
+                           factory=Connection if retry else sqlite3.Connection)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class DBWriter:
+    """Single writer thread; each batch of queued commands is one transaction."""
+
+    def __init__(self, path: str, *, batch_max: typing.Optional[int] = None):
+        self.path = path
+        self.batch_max = max(1, int(BATCH_MAX if batch_max is None else batch_max))
+        self._q: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: typing.Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.conn: typing.Optional[sqlite3.Connection] = None
+        self.counters = {"commands": 0, "batches": 0, "errors": 0, "lock_retries": 0}
+        self.max_batch = 0
+        self.busy_sec = 0.0
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued commands and stop the thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self._q.put(_STOP)
+            self._thread.join(timeout)
+
+    def submit(self, fn: WriteFn) -> Future:
+        """Queue a command; the future resolves after its batch has committed."""
+        fut: Future = Future()
+        self.start()
+        self._q.put((fn, fut))
+        return fut
+
+    def run(self, fn: WriteFn):
+        """Run a command and wait for it (sync callers). Re-entrant on the writer thread."""
+        if threading.current_thread() is self._thread:
+            return fn(self.conn)
+        return self.submit(fn).result()
+
+    async def arun(self, fn: WriteFn):
+        """Awaitable run(): the event loop is free while the writer works."""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def execute(self, sql: str, params: typing.Any = ()):
+        return self.run(lambda c: c.execute(sql, params).rowcount)
+
+    async def aexecute(self, sql: str, params: typing.Any = ()):
+        return await self.arun(lambda c: c.execute(sql, params).rowcount)
+
+    def flush(self) -> None:
+        """Wait until every command queued so far has committed (commands run in queue order)."""
+        self.run(lambda c: None)
+
+    async def aflush(self) -> None:
+        await self.arun(lambda c: None)
+
+    # --- writer thread ---
+    def _run(self) -> None:
+        self.conn = connect(self.path, retry=True)
+        self.conn.isolation_level = None  # explicit BEGIN/COMMIT per batch
+        stop = False
+        while not stop:
+            batch = [self._q.get()]
+            while len(batch) < self.batch_max:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(b is _STOP for b in batch)
+            batch = [b for b in batch if b is not _STOP]
+            if batch:
+                self._commit_batch(batch)
+        self.conn.close()
+
+    def _commit_batch(self, batch: list) -> None:
+        t0 = time.perf_counter()
+        done = []
+        conn = self.conn
+        self._begin()
+        for fn, fut in batch:
+            if not fut.set_running_or_notify_cancel():
+                continue
+            conn.execute("SAVEPOINT cmd")
+            try:
+                res = fn(conn)
+                conn.execute("RELEASE cmd")
+                done.append((fut, res, None))
+            except Exception as e:  # one failing command must not discard the rest of the batch
+                conn.execute("ROLLBACK TO cmd")
+                conn.execute("RELEASE cmd")
+                self.counters["errors"] += 1
+                done.append((fut, None, e))
+        self._commit()
+        self.counters["commands"] += len(batch)
+        self.counters["batches"] += 1
+        self.max_batch = max(self.max_batch, len(batch))
+        self.busy_sec += time.perf_counter() - t0
+        for fut, res, err in done:  # results only after commit: waiters always see their write
+            if err is None:
+                fut.set_result(res)
+            else:
+                fut.set_exception(err)
+
+    def _begin(self) -> None:
+        # shared-cache table locks don't honour busy_timeout: retry while another connection writes
+        while True:
+            try:
+                self.conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                if not _is_locked(e):
+                    raise
+                self.counters["lock_retries"] += 1
+                time.sleep(LOCK_RETRY_SEC)
+
+    def _commit(self) -> None:
+        while True:
+            try:
+                self.conn.execute("COMMIT")
+                return
+            except sqlite3.OperationalError as e:
+                if not _is_locked(e):
+                    raise
+                self.counters["lock_retries"] += 1
+                time.sleep(LOCK_RETRY_SEC)
+
+    def stats(self) -> dict:
+        return {**self.counters, "queued": self._q.qsize(), "max_batch": self.max_batch,
+                "busy_ms": self.busy_sec * 1000}
+
+
+class ReadPool:
+    """Read-only queries on a few pooled connections, each owned by one worker thread."""
+
+    def __init__(self, path: str, size: typing.Optional[int] = None):
+        self.path = path
+        self.size = max(1, int(READ_POOL_SIZE if size is None else size))
+        self._local = threading.local()
+        self._executor: typing.Optional[ThreadPoolExecutor] = None
+        self._conns: list[sqlite3.Connection] = []
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+            self._conns.append(conn)
+        return conn
+
+    def _query(self, sql: str, params, one: bool):
+        def run():
+            cur = self._conn().execute(sql, params)
+            return cur.fetchone() if one else cur.fetchall()
+        return _retry_locked(run)   # only committed rows: a locked table is waited for, not read through
+
+    def _submit(self, sql: str, params, one: bool) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.size, thread_name_prefix="db-read")
+        return self._executor.submit(self._query, sql, params, one)
+
+    async def fetchall(self, sql: str, params: typing.Any = ()) -> list:
+        return await asyncio.wrap_future(self._submit(sql, params, False))
+
+    async def fetchone(self, sql: str, params: typing.Any = ()):
+        return await asyncio.wrap_future(self._submit(sql, params, True))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for conn in self._conns:
+            conn.close()
+        self._conns.clear()
+        self._local = threading.local()
@@ -1,6 +1,15 @@
-import httpx, asyncio, typing
+from __future__ import annotations
+import os, asyncio, typing
+from .env import settings
+from .journal import JOURNAL
 
-DEX_API = "https://api.dexscreener.com/latest/dex"
+if typing.TYPE_CHECKING:
+    import httpx
+
+@settings
+def _read_settings() -> None:
+    global DEX_API
+    DEX_API = os.getenv("DEXSCREENER_API_URL", "https://api.dexscreener.com/latest/dex")
 
 def _to_float(x, default=None):
     try:
@@ -16,18 +25,11 @@ def _safe(d: dict, path: str, default=None):
         cur = cur[k]
     return cur
 
-async def fetch_token_batch(client: httpx.AsyncClient, token_addrs: list[str]) -> list[dict]:
-    """
-    GET /latest/dex/tokens/{addr1,addr2,...}
-    Returns a list of 'pairs'. Choose best pair per token by highest liquidity.
-    Output fields (per token):
-      - address
-      - price_usd
-      - fdv_usd
-      - marketcap_usd
-    """
+async def fetch_best_pairs(client: httpx.AsyncClient, token_addrs: list[str]) -> dict[str, dict]:
+    """GET /tokens/{addr1,addr2,...}: the raw highest-liquidity pair object per base token."""
     url = f"{DEX_API}/tokens/{','.join(token_addrs)}"
     r = await client.get(url, timeout=10)
+    JOURNAL.record("dexscreener", r.content, key=f"{r.status_code} {url}")
     r.raise_for_status()
     data = r.json() or {}
     pairs: list[dict] = data.get("pairs") or []
@@ -42,7 +44,19 @@ async def fetch_token_batch(client: httpx.AsyncClient, token_addrs: list[str]) -
         cur_best = best.get(base)
         if not cur_best or _to_float(_safe(cur_best, "liquidity.usd"), 0.0) < liq:
             best[base] = p
+    return best
 
+async def fetch_token_batch(client: httpx.AsyncClient, token_addrs: list[str]) -> list[dict]:
+    """
+    GET /latest/dex/tokens/{addr1,addr2,...}
+    Returns a list of 'pairs'. Choose best pair per token by highest liquidity.
+    Output fields (per token):
+      - address
+      - price_usd
+      - fdv_usd
+      - marketcap_usd
+    """
+    best = await fetch_best_pairs(client, token_addrs)
     out = []
     for addr, p in best.items():
         out.append({
@@ -0,0 +1,33 @@
+# One place that reads .env for the whole package. Nothing loads it at import:
+# entry points call load_env() from their init(). Modules register the function
+# that reads their settings with @settings; it runs at once (the process
+# environment only) and again after load_env() has applied .env, so importing
+# the package never touches os.environ. .env is read once (python-dotenv is
+# imported then); every call re-reads the settings, so an init() sees
+# environment overrides made before it.
+import typing
+
+_loaded = False
+_READERS: list[typing.Callable[[], None]] = []
+
+
+class ConfigError(RuntimeError):
+    """A required setting is missing or invalid; raised by init() entry points."""
+
+
+def settings(read: typing.Callable[[], None]) -> typing.Callable[[], None]:
+    """Register `read` (re-reads module settings, or re-applies them to a default instance) and run it now."""
+    _READERS.append(read)
+    read()
+    return read
+
+
+def load_env() -> None:
+    """Load .env once (without overriding the environment) and re-read every registered setting."""
+    global _loaded
+    if not _loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _loaded = True
+    for read in list(_READERS):
+        read()
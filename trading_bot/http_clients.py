@@ -0,0 +1,174 @@
+# Shared registry of long-lived pooled HTTP clients, one per upstream.
+# Clients are created once at startup (or lazily on first use) and closed on
+# shutdown, so RugCheck and DexScreener calls reuse warm keep-alive (and, when
+# the `h2` package is installed, HTTP/2) connections instead of paying a fresh
+# TCP+TLS handshake per request. DNS is only resolved when the pool opens a new
+# connection, which reuse keeps rare. httpx itself is imported when the first
+# client is built, so importing this module stays cheap.
+from __future__ import annotations
+import os, time, typing, importlib.util
+from .env import settings
+
+if typing.TYPE_CHECKING:
+    import httpx
+
+# HTTP/2 needs the optional `h2` package (httpx[http2]); probing for it doesn't import it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+# Per-upstream pool settings
+@settings
+def _read_settings() -> None:
+    global UPSTREAMS, KEEPALIVE_EXPIRY_SEC
+    UPSTREAMS = {
+        "rugcheck": {
+            "base_url": os.getenv("RUGCHECK_BASE_URL", "https://api.rugcheck.xyz/v1"),
+            "headers": {"Accept": "application/json"},
+            "max_connections": _env_int("HTTP_RUGCHECK_MAX_CONN", 8),
+            "keepalive": _env_int("HTTP_RUGCHECK_KEEPALIVE", 8),
+            "timeout": 15.0,
+            "connect_timeout": 5.0,
+        },
+        "dexscreener": {
+            "base_url": os.getenv("DEXSCREENER_API_URL", "https://api.dexscreener.com/latest/dex"),
+            "headers": {"Accept": "application/json"},
+            "max_connections": _env_int("HTTP_DEX_MAX_CONN", 20),
+            "keepalive": _env_int("HTTP_DEX_KEEPALIVE", 20),
+            "timeout": 10.0,
+            "connect_timeout": 5.0,
+        },
+        "history": {  # warm-start candles (warmstart.CandleSource)
+            "base_url": os.getenv("WARMSTART_CANDLES_URL", "https://api.geckoterminal.com/api/v2"),
+            "headers": {"Accept": "application/json"},
+            "max_connections": _env_int("HTTP_HISTORY_MAX_CONN", 4),
+            "keepalive": _env_int("HTTP_HISTORY_KEEPALIVE", 4),
+            "timeout": 10.0,
+            "connect_timeout": 5.0,
+        },
+        "jupiter": {  # price_sources.JupiterProvider
+            "base_url": os.getenv("JUPITER_PRICE_URL", "https://lite-api.jup.ag/price/v2"),
+            "headers": {"Accept": "application/json"},
+            "max_connections": _env_int("HTTP_JUPITER_MAX_CONN", 20),
+            "keepalive": _env_int("HTTP_JUPITER_KEEPALIVE", 20),
+            "timeout": 10.0,
+            "connect_timeout": 5.0,
+        },
+        "solana_rpc": {  # pool/vault snapshots for chain_feed (subscriptions use SOLANA_RPC_WS_URL)
+            "base_url": os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com"),
+            "headers": {"Accept": "application/json"},
+            "max_connections": _env_int("HTTP_RPC_MAX_CONN", 4),
+            "keepalive": _env_int("HTTP_RPC_KEEPALIVE", 4),
+            "timeout": 10.0,
+            "connect_timeout": 5.0,
+        },
+    }
+    KEEPALIVE_EXPIRY_SEC = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SEC", "90"))
+
+
+class _PoolMetrics:
+    __slots__ = ("requests", "connections", "handshake_total", "handshake_max")
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.handshake_total = 0.0
+        self.handshake_max = 0.0
+
+    def add_handshake(self, dt: float, new_connection: bool) -> None:
+        if new_connection:
+            self.connections += 1
+        self.handshake_total += dt
+        self.handshake_max = max(self.handshake_max, dt)
+
+    def snapshot(self) -> dict:
+        reused = max(0, self.requests - self.connections)
+        return {
+            "requests": self.requests,
+            "new_connections": self.connections,
+            "reuse_rate": (reused / self.requests) if self.requests else 0.0,
+            "avg_handshake_ms": (self.handshake_total / self.connections * 1000) if self.connections else 0.0,
+            "max_handshake_ms": self.handshake_max * 1000,
+        }
+
+
+class _MeteredTransport:
+    """Wraps an httpx.AsyncHTTPTransport; counts requests and times TCP+TLS setup via httpcore traces."""
+    def __init__(self, metrics: _PoolMetrics, **kw):
+        import httpx
+        self._inner = httpx.AsyncHTTPTransport(**kw)
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = self._metrics
+        metrics.requests += 1
+        marks: dict[str, float] = {}
+
+        async def trace(event: str, info: dict) -> None:
+            # only requests that open a new connection see connect_tcp/start_tls events
+            now = time.perf_counter()
+            if event == "connection.connect_tcp.started":
+                marks["t0"] = now
+            elif event == "connection.connect_tcp.complete" and "t0" in marks:
+                marks["tcp"] = now
+                metrics.add_handshake(now - marks["t0"], new_connection=True)
+            elif event == "connection.start_tls.complete" and "tcp" in marks:
+                metrics.handshake_total += now - marks["tcp"]
+                metrics.handshake_max = max(metrics.handshake_max, now - marks["t0"])
+
+        request.extensions = {**request.extensions, "trace": trace}
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    async def __aenter__(self) -> "_MeteredTransport":
+        await self._inner.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._inner.__aexit__(*exc)
+
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_metrics: dict[str, _PoolMetrics] = {}
+
+
+def _build(name: str) -> httpx.AsyncClient:
+    import httpx
+    cfg = UPSTREAMS[name]
+    limits = httpx.Limits(max_connections=cfg["max_connections"],
+                          max_keepalive_connections=cfg["keepalive"],
+                          keepalive_expiry=KEEPALIVE_EXPIRY_SEC)
+    metrics = _metrics.setdefault(name, _PoolMetrics())
+    transport = _MeteredTransport(metrics, limits=limits, http2=HTTP2_AVAILABLE, retries=1)
+    return httpx.AsyncClient(base_url=cfg["base_url"], headers=cfg["headers"],
+                             timeout=httpx.Timeout(cfg["timeout"], connect=cfg["connect_timeout"]),
+                             transport=transport)
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """Return the shared client for an upstream, creating it on first use."""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _clients[name] = _build(name)
+    return client
+
+
+def start_clients(names: typing.Iterable[str] = None) -> None:
+    """Create the shared clients up front (call once at startup)."""
+    for name in (names or UPSTREAMS):
+        get_client(name)
+
+
+async def close_clients() -> None:
+    """Close every shared client (call once on shutdown)."""
+    while _clients:
+        _, client = _clients.popitem()
+        await client.aclose()
+
+
+def client_stats() -> dict[str, dict]:
+    return {name: m.snapshot() for name, m in _metrics.items()}
@@ -1,7 +1,25 @@
-from .config import EMA_LENGTHS, EMA_SOURCE, ATR_LENGTHS
-from .registry import update_all_for_bar, reset_indicators
+from . import config
+from .spec import (
+    IndicatorSpec, ema_spec, atr_spec, rsi_spec, vwap_spec, bb_spec,
+    donchian_spec, returns_spec, volume_z_spec,
+)
+from .plugins import register_indicator, get_plugin, available_indicators, compute_batch
+from .registry import (
+    IndicatorRegistry, INDICATORS, update_all_for_bar, reset_indicators, set_plan, get_plan, slot, get_values, storage_values,
+)
 
 __all__ = [
     "EMA_LENGTHS", "EMA_SOURCE", "ATR_LENGTHS",
-    "update_all_for_bar", "reset_indicators",
+    "IndicatorSpec", "ema_spec", "atr_spec", "rsi_spec", "vwap_spec", "bb_spec",
+    "donchian_spec", "returns_spec", "volume_z_spec",
+    "register_indicator", "get_plugin", "available_indicators", "compute_batch",
+    "IndicatorRegistry", "INDICATORS", "update_all_for_bar", "reset_indicators",
+    "set_plan", "get_plan", "slot", "get_values", "storage_values",
 ]
+
+
+def __getattr__(name: str):
+    # EMA_LENGTHS / EMA_SOURCE / ATR_LENGTHS: the current config (re-read once .env is loaded)
+    if name in ("EMA_LENGTHS", "EMA_SOURCE", "ATR_LENGTHS"):
+        return getattr(config, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
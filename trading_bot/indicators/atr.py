@@ -1,5 +1,9 @@
+from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
+from .ema import ewm
+if TYPE_CHECKING:
+    import numpy as np
 
 @dataclass
 class StreamingATR:
@@ -7,8 +11,8 @@ class StreamingATR:
     prev_atr: Optional[float] = None
     prev_close: Optional[float] = None
 
-    def update(self, bar: dict) -> float:
-        h, l, c = float(bar["high"]), float(bar["low"]), float(bar["close"])
+    def update(self, bar) -> float:
+        h, l, c = bar.high, bar.low, bar.close
         if self.prev_close is None:
             tr = h - l
         else:
@@ -19,4 +23,20 @@ class StreamingATR:
             atr = ((self.prev_atr * (self.length - 1)) + tr) / self.length  # Wilder
         self.prev_atr = atr
         self.prev_close = c
-        return float(atr)
+        return atr
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    import numpy as np
+    h, l, c = (np.asarray(a, dtype=float) for a in (high, low, close))
+    tr = h - l
+    if tr.size > 1:
+        pc = c[:-1]
+        tr[1:] = np.maximum.reduce([tr[1:], np.abs(h[1:] - pc), np.abs(l[1:] - pc)])
+    return tr
+
+def atr_batch(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int) -> np.ndarray:
+    """Wilder ATR over a whole series (seeded with the first TR, like StreamingATR)."""
+    tr = true_range(high, low, close)
+    if not tr.size:
+        return tr
+    return ewm(tr, 1.0 / length, tr[0])   # Wilder smoothing is an EMA with alpha = 1/length
@@ -0,0 +1,43 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Optional, TYPE_CHECKING
+from .rolling import RollingStats
+from .sources import src_getter
+if TYPE_CHECKING:
+    import numpy as np
+
+@dataclass
+class StreamingBollinger:
+    """Bollinger bands (mid ± k·σ, population σ) over `length` bars; returns (mid, upper, lower)."""
+    length: int
+    source: str = "close"
+    k: float = 2.0
+    stats: RollingStats = field(init=False)
+
+    def __post_init__(self):
+        self.stats = RollingStats(self.length)
+        self._src = src_getter(self.source)
+
+    def update(self, bar) -> Optional[tuple]:
+        self.stats.push(self._src(bar))
+        if not self.stats.full:
+            return None
+        mid, sd = self.stats.mean, self.stats.std
+        return (mid, mid + self.k * sd, mid - self.k * sd)
+
+def rolling_mean_std(x: np.ndarray, length: int) -> tuple:
+    """Rolling mean and population std; NaN until the window is full."""
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    mean = np.full(x.size, np.nan)
+    std = np.full(x.size, np.nan)
+    if x.size < length:
+        return mean, std
+    win = np.lib.stride_tricks.sliding_window_view(x, length)
+    mean[length - 1:] = win.mean(axis=1)
+    std[length - 1:] = win.std(axis=1)
+    return mean, std
+
+def bollinger_batch(x: np.ndarray, length: int, k: float = 2.0) -> dict:
+    mid, sd = rolling_mean_std(x, length)
+    return {"mid": mid, "upper": mid + k * sd, "lower": mid - k * sd}
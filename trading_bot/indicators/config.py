@@ -1,8 +1,5 @@
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+from ..env import settings
 
 def _parse_lengths(val: str, default: str) -> list[int]:
     raw = (val or default).replace(";", ",")
@@ -16,6 +13,9 @@ def _parse_lengths(val: str, default: str) -> list[int]:
         except: pass
     return out
 
-EMA_LENGTHS = _parse_lengths(os.getenv("EMA_1M_LENGTHS"), "20")
-EMA_SOURCE  = (os.getenv("EMA_1M_SOURCE") or "close").lower()
-ATR_LENGTHS = _parse_lengths(os.getenv("ATR_1M_LENGTHS"), "14")
+@settings
+def _read_settings() -> None:
+    global EMA_LENGTHS, EMA_SOURCE, ATR_LENGTHS
+    EMA_LENGTHS = _parse_lengths(os.getenv("EMA_1M_LENGTHS"), "20")
+    EMA_SOURCE  = (os.getenv("EMA_1M_SOURCE") or "close").lower()
+    ATR_LENGTHS = _parse_lengths(os.getenv("ATR_1M_LENGTHS"), "14")
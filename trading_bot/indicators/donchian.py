@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from collections import deque
+from dataclasses import dataclass, field
+if TYPE_CHECKING:
+    import numpy as np
+
+@dataclass
+class StreamingDonchian:
+    """Donchian channel over `length` bars via monotonic deques; returns (upper, lower)."""
+    length: int
+    i: int = 0
+    highs: deque = field(default_factory=deque)   # (idx, high), decreasing
+    lows: deque = field(default_factory=deque)    # (idx, low), increasing
+
+    def update(self, bar) -> tuple:
+        h, l = bar.high, bar.low
+        i = self.i; self.i += 1
+        while self.highs and self.highs[-1][1] <= h: self.highs.pop()
+        while self.lows and self.lows[-1][1] >= l: self.lows.pop()
+        self.highs.append((i, h)); self.lows.append((i, l))
+        cutoff = i - self.length
+        if self.highs[0][0] <= cutoff: self.highs.popleft()
+        if self.lows[0][0] <= cutoff: self.lows.popleft()
+        return (self.highs[0][1], self.lows[0][1])
+
+def donchian_batch(high: np.ndarray, low: np.ndarray, length: int) -> dict:
+    """Rolling max(high)/min(low); the first length-1 bars use the partial window like the streaming form."""
+    import numpy as np
+    h, l = np.asarray(high, float), np.asarray(low, float)
+    upper, lower = np.empty_like(h), np.empty_like(l)
+    head = min(length - 1, h.size)
+    upper[:head] = np.maximum.accumulate(h[:head]); lower[:head] = np.minimum.accumulate(l[:head])
+    if h.size >= length:
+        upper[length - 1:] = np.lib.stride_tricks.sliding_window_view(h, length).max(axis=1)
+        lower[length - 1:] = np.lib.stride_tricks.sliding_window_view(l, length).min(axis=1)
+    return {"upper": upper, "lower": lower}
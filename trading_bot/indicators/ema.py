@@ -1,15 +1,9 @@
+from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
-
-def _src_value(bar: dict, source: str) -> float:
-    o,h,l,c = bar["open"], bar["high"], bar["low"], bar["close"]
-    if source == "open":  return o
-    if source == "high":  return h
-    if source == "low":   return l
-    if source == "hl2":   return (h + l) / 2.0
-    if source == "hlc3":  return (h + l + c) / 3.0
-    if source == "ohlc4": return (o + h + l + c) / 4.0
-    return c  # default close
+from typing import Optional, TYPE_CHECKING
+from .sources import src_getter
+if TYPE_CHECKING:
+    import numpy as np
 
 @dataclass
 class StreamingEMA:
@@ -19,11 +13,43 @@ class StreamingEMA:
 
     def __post_init__(self):
         self.alpha = 2.0 / (self.length + 1.0)
+        self._src = src_getter(self.source)
 
-    def update(self, bar: dict) -> float:
-        x = float(_src_value(bar, self.source))
+    def update(self, bar) -> float:
+        x = self._src(bar)
         if self.prev is None:
             self.prev = x
         else:
             self.prev = self.prev + self.alpha * (x - self.prev)
-        return float(self.prev)
+        return self.prev
+
+_SCALE_MAX = 1e100   # largest d^-k used by ewm(); blocks are cut so it stays finite
+
+def ewm(x: np.ndarray, alpha: float, prev: float) -> np.ndarray:
+    """
+    y[i] = y[i-1] + alpha * (x[i] - y[i-1]) over a whole series, y[-1] = `prev`.
+    Vectorized from the closed form y[i] = d^(i+1) * (prev + alpha * sum_{k<=i} x[k] / d^(k+1))
+    with d = 1 - alpha, in blocks short enough for d^-k to stay finite.
+    """
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    d = 1.0 - alpha
+    if d <= 0.0:
+        return x.copy()
+    out = np.empty_like(x)
+    block = max(1, int(np.log(_SCALE_MAX) / -np.log(d))) if d < 1.0 else x.size
+    powers = d ** np.arange(1, min(block, x.size) + 1)
+    for s in range(0, x.size, block):
+        seg = x[s:s + block]
+        p = powers[:seg.size]
+        out[s:s + seg.size] = p * (prev + alpha * np.cumsum(seg / p))
+        prev = out[s + seg.size - 1]
+    return out
+
+def ema_batch(x: np.ndarray, length: int) -> np.ndarray:
+    """EMA over a whole series (seeded with the first value, like StreamingEMA)."""
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    if not x.size:
+        return np.empty_like(x)
+    return ewm(x, 2.0 / (length + 1.0), x[0])
@@ -0,0 +1,74 @@
+# Pluggable indicator registry: each indicator type registers a streaming
+# factory, an optional vectorized batch form, and its named outputs (which
+# also define its storage columns, e.g. "bb_20_close_upper"). Only the batch
+# forms use NumPy, and import it when called: the live path never loads it.
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from .spec import IndicatorSpec
+from .sources import src_array
+from .ema import StreamingEMA, ema_batch
+from .atr import StreamingATR, atr_batch
+from .rsi import StreamingRSI, rsi_batch
+from .vwap import StreamingVWAP, vwap_batch
+from .bollinger import StreamingBollinger, bollinger_batch
+from .donchian import StreamingDonchian, donchian_batch
+from .returns import StreamingReturn, returns_batch
+from .volume_z import StreamingVolumeZ, volume_z_batch
+
+@dataclass(frozen=True)
+class IndicatorPlugin:
+    kind: str
+    factory: Callable[[IndicatorSpec], Any]            # -> object with update(bar)
+    batch: Optional[Callable[[IndicatorSpec, dict], dict]] = None  # (spec, columns) -> {output: ndarray}
+    outputs: tuple = ("value",)
+
+    def columns(self, spec: IndicatorSpec) -> list[str]:
+        """Storage column names for this spec, one per output."""
+        base = f"{spec.kind}_{spec.length}" + (f"_{spec.source}" if spec.source else "")
+        return [base] if self.outputs == ("value",) else [f"{base}_{o}" for o in self.outputs]
+
+_PLUGINS: dict[str, IndicatorPlugin] = {}
+
+def register_indicator(kind: str, factory: Callable[[IndicatorSpec], Any], *,
+                       batch: Optional[Callable[[IndicatorSpec, dict], dict]] = None,
+                       outputs: tuple = ("value",)) -> IndicatorPlugin:
+    """Register (or replace) an indicator type usable in IndicatorSpec(kind, ...)."""
+    plugin = IndicatorPlugin(kind, factory, batch, tuple(outputs))
+    _PLUGINS[kind] = plugin
+    return plugin
+
+def get_plugin(kind: str) -> IndicatorPlugin:
+    try:
+        return _PLUGINS[kind]
+    except KeyError:
+        raise ValueError(f"unknown indicator type: {kind!r}") from None
+
+def available_indicators() -> list[str]:
+    return list(_PLUGINS)
+
+def compute_batch(spec: IndicatorSpec, cols: dict) -> dict:
+    """Vectorized full-series form: cols holds open/high/low/close[/volume] arrays."""
+    plugin = get_plugin(spec.kind)
+    if plugin.batch is None:
+        raise ValueError(f"indicator {spec.kind!r} has no batch form")
+    return plugin.batch(spec, cols)
+
+# --- built-ins ---
+register_indicator("ema", lambda s: StreamingEMA(s.length, s.source or "close"),
+                   batch=lambda s, c: {"value": ema_batch(src_array(c, s.source), s.length)})
+register_indicator("atr", lambda s: StreamingATR(s.length),
+                   batch=lambda s, c: {"value": atr_batch(c["high"], c["low"], c["close"], s.length)})
+register_indicator("rsi", lambda s: StreamingRSI(s.length, s.source or "close"),
+                   batch=lambda s, c: {"value": rsi_batch(src_array(c, s.source), s.length)})
+register_indicator("vwap", lambda s: StreamingVWAP(s.length),
+                   batch=lambda s, c: {"value": vwap_batch(c["high"], c["low"], c["close"], c.get("volume"), s.length)})
+register_indicator("bb", lambda s: StreamingBollinger(s.length, s.source or "close"),
+                   batch=lambda s, c: bollinger_batch(src_array(c, s.source), s.length),
+                   outputs=("mid", "upper", "lower"))
+register_indicator("donchian", lambda s: StreamingDonchian(s.length),
+                   batch=lambda s, c: donchian_batch(c["high"], c["low"], s.length),
+                   outputs=("upper", "lower"))
+register_indicator("ret", lambda s: StreamingReturn(s.length, s.source or "close"),
+                   batch=lambda s, c: {"value": returns_batch(src_array(c, s.source), s.length)})
+register_indicator("vol_z", lambda s: StreamingVolumeZ(s.length),
+                   batch=lambda s, c: {"value": volume_z_batch(c["volume"], s.length)})
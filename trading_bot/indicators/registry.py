@@ -1,93 +1,154 @@
-from collections import defaultdict
-from typing import Optional
-from .config import EMA_LENGTHS, EMA_SOURCE, ATR_LENGTHS
-from .ema import StreamingEMA
-from .atr import StreamingATR
-
-# Global registry of indicators per token
-_indicators: dict[str, dict] = defaultdict(dict)
-
-def _ensure_indicators(address: str):
-    """Ensure all required indicators exist for a token."""
-    if address not in _indicators:
-        _indicators[address] = {}
-    
-    token_indicators = _indicators[address]
-    
-    # Create EMA indicators
-    for length in EMA_LENGTHS:
-        ema_key = f"ema_{length}"
-        if ema_key not in token_indicators:
-            token_indicators[ema_key] = StreamingEMA(length, EMA_SOURCE)
-    
-    # Create ATR indicators
-    for length in ATR_LENGTHS:
-        atr_key = f"atr_{length}"
-        if atr_key not in token_indicators:
-            token_indicators[atr_key] = StreamingATR(length)
-
-def update_all_for_bar(bar: dict) -> tuple[list, list]:
+from typing import Iterable, Optional
+from .spec import IndicatorSpec, config_specs
+from .plugins import get_plugin
+from ..records import IndicatorValue, as_bar
+from ..env import settings
+
+class _TokenIndicators:
+    __slots__ = ("objs", "values")
+    def __init__(self, plan: list[IndicatorSpec]):
+        self.objs = [get_plugin(s.kind).factory(s) for s in plan]
+        self.values: list[Optional[float]] = [None] * len(plan)
+
+class IndicatorRegistry:
     """
-    Update all indicators for a completed OHLC bar.
-    Returns (ema_rows, atr_rows) for database insertion.
+    Streaming indicators per token for one pipeline: a computation plan
+    (deduplicated specs, each with a fixed slot index) and every token's
+    indicator objects and latest values.
     """
-    address = bar["address"]
-    _ensure_indicators(address)
-    
-    token_indicators = _indicators[address]
-    ema_rows = []
-    atr_rows = []
-    
-    # Update EMAs
-    for length in EMA_LENGTHS:
-        ema_key = f"ema_{length}"
-        ema = token_indicators[ema_key]
-        value = ema.update(bar)
-        
-        ema_rows.append({
-            "address": address,
-            "ts_start": bar["ts_start"],
-            "length": length,
-            "source": ema.source,
-            "value": value
-        })
-    
-    # Update ATRs
-    for length in ATR_LENGTHS:
-        atr_key = f"atr_{length}"
-        atr = token_indicators[atr_key]
-        value = atr.update(bar)
-        
-        atr_rows.append({
-            "address": address,
-            "ts_start": bar["ts_start"],
-            "length": length,
-            "value": value
-        })
-    
-    return ema_rows, atr_rows
 
-def reset_indicators(address: str = None):
-    """Reset indicators for a specific token or all tokens."""
-    if address:
-        if address in _indicators:
-            del _indicators[address]
-    else:
-        _indicators.clear()
-
-def get_indicator_value(address: str, indicator_type: str, length: int) -> Optional[float]:
-    """Get current value of a specific indicator."""
-    if address not in _indicators:
-        return None
-    
-    key = f"{indicator_type}_{length}"
-    if key not in _indicators[address]:
+    def __init__(self, specs: Optional[Iterable[IndicatorSpec]] = None):
+        self.plan: list[IndicatorSpec] = []
+        self.slots: dict[IndicatorSpec, int] = {}
+        self.tokens: dict[str, _TokenIndicators] = {}
+        self.set_plan(config_specs() if specs is None else specs)
+
+    def set_plan(self, specs: Iterable[IndicatorSpec]) -> list[IndicatorSpec]:
+        """
+        Replace the computation plan with the deduplicated union of `specs`
+        (insertion order kept). Per-token state is reset since slots change.
+        """
+        plan, slots = [], {}
+        for spec in specs:
+            get_plugin(spec.kind)  # ValueError for unknown types
+            if spec not in slots:
+                slots[spec] = len(plan)
+                plan.append(spec)
+        self.plan, self.slots = plan, slots
+        self.tokens.clear()
+        return list(plan)
+
+    def get_plan(self) -> list[IndicatorSpec]:
+        return list(self.plan)
+
+    def slot(self, spec: IndicatorSpec) -> int:
+        """Index of `spec` in every token's value list; KeyError if it is not planned."""
+        return self.slots[spec]
+
+    def _ensure(self, address: str) -> _TokenIndicators:
+        """Ensure all planned indicators exist for a token."""
+        st = self.tokens.get(address)
+        if st is None:
+            st = self.tokens[address] = _TokenIndicators(self.plan)
+        return st
+
+    def update(self, bar) -> tuple[list, list]:
+        """
+        Update all planned indicators for a completed OHLC bar (Bar, or a dict
+        which is converted once). Returns (ema_rows, atr_rows) as IndicatorValue
+        records for database insertion; every planned value (including other
+        indicator types) is available by slot via get_values(address) and by
+        storage column via storage_values(address).
+        """
+        bar = as_bar(bar)
+        address, ts = bar.address, bar.ts_start
+        st = self._ensure(address)
+        values = st.values
+        ema_rows = []
+        atr_rows = []
+
+        for i, (spec, ind) in enumerate(zip(self.plan, st.objs)):
+            value = ind.update(bar)
+            values[i] = value
+            if spec.kind == "ema":
+                ema_rows.append(IndicatorValue(address, ts, spec.length, value, spec.source))
+            elif spec.kind == "atr":
+                atr_rows.append(IndicatorValue(address, ts, spec.length, value))
+
+        return ema_rows, atr_rows
+
+    def get_values(self, address: str) -> Optional[list]:
+        """Latest indicator values for a token, indexed by slot(spec)."""
+        st = self.tokens.get(address)
+        return st.values if st is not None else None
+
+    def storage_values(self, address: str) -> dict:
+        """Latest values as {storage column: value} (multi-output indicators expand to one column each)."""
+        st = self.tokens.get(address)
+        if st is None:
+            return {}
+        out = {}
+        for spec, value in zip(self.plan, st.values):
+            cols = get_plugin(spec.kind).columns(spec)
+            if len(cols) == 1:
+                out[cols[0]] = value
+            else:
+                for col, v in zip(cols, value or (None,) * len(cols)):
+                    out[col] = v
+        return out
+
+    def reset(self, address: str = None):
+        """Reset indicators for a specific token or all tokens."""
+        if address:
+            self.tokens.pop(address, None)
+        else:
+            self.tokens.clear()
+
+    def get_indicator_value(self, address: str, indicator_type: str, length: int,
+                            source: Optional[str] = None) -> Optional[float]:
+        """Get current value of a specific indicator."""
+        st = self.tokens.get(address)
+        if st is None:
+            return None
+        for spec, i in self.slots.items():
+            if spec.kind == indicator_type and spec.length == length and (source is None or spec.source == source):
+                return st.values[i]
         return None
-    
-    indicator = _indicators[address][key]
-    if indicator_type == "ema":
-        return indicator.prev
-    elif indicator_type == "atr":
-        return indicator.prev_atr
-    
-    return None
+
+
+# Process-wide default instance (the default pipeline's); the functions below use it
+INDICATORS = IndicatorRegistry()
+_config_plan = INDICATORS.get_plan()
+
+@settings
+def _follow_config() -> None:
+    # the default registry follows EMA_1M_*/ATR_1M_* until a plan is set on it
+    global _config_plan
+    if INDICATORS.plan == _config_plan:
+        INDICATORS.set_plan(config_specs())
+        _config_plan = INDICATORS.get_plan()
+
+def set_plan(specs: Iterable[IndicatorSpec]) -> list[IndicatorSpec]:
+    return INDICATORS.set_plan(specs)
+
+def get_plan() -> list[IndicatorSpec]:
+    return INDICATORS.get_plan()
+
+def slot(spec: IndicatorSpec) -> int:
+    return INDICATORS.slot(spec)
+
+def update_all_for_bar(bar) -> tuple[list, list]:
+    return INDICATORS.update(bar)
+
+def get_values(address: str) -> Optional[list]:
+    return INDICATORS.get_values(address)
+
+def storage_values(address: str) -> dict:
+    return INDICATORS.storage_values(address)
+
+def reset_indicators(address: str = None):
+    INDICATORS.reset(address)
+
+def get_indicator_value(address: str, indicator_type: str, length: int,
+                        source: Optional[str] = None) -> Optional[float]:
+    return INDICATORS.get_indicator_value(address, indicator_type, length, source)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, TYPE_CHECKING
+from .sources import src_getter
+if TYPE_CHECKING:
+    import numpy as np
+
+@dataclass
+class StreamingReturn:
+    """Rolling simple return over `length` bars: x[t] / x[t-length] - 1."""
+    length: int
+    source: str = "close"
+    window: deque = field(default_factory=deque)
+
+    def __post_init__(self):
+        self._src = src_getter(self.source)
+
+    def update(self, bar) -> Optional[float]:
+        x = self._src(bar)
+        self.window.append(x)
+        if len(self.window) <= self.length:
+            return None
+        base = self.window.popleft()
+        return (x / base - 1.0) if base else None
+
+def returns_batch(x: np.ndarray, length: int) -> np.ndarray:
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    out = np.full(x.size, np.nan)
+    if x.size > length:
+        base = x[:-length]
+        out[length:] = np.divide(x[length:], base, out=np.full(base.size, np.nan), where=base != 0) - 1.0
+    return out
@@ -0,0 +1,37 @@
+from collections import deque
+import math
+
+class RollingStats:
+    """Mean/variance over the last `length` values; Welford add/remove, O(1) per update."""
+    __slots__ = ("length", "window", "mean", "m2")
+
+    def __init__(self, length: int):
+        self.length = length
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x: float) -> None:
+        self.window.append(x)
+        n = len(self.window)
+        d = x - self.mean
+        self.mean += d / n
+        self.m2 += d * (x - self.mean)
+        if n > self.length:
+            y = self.window.popleft()
+            n -= 1
+            old = self.mean
+            self.mean -= (y - old) / n
+            self.m2 -= (y - old) * (y - self.mean)
+            if self.m2 < 0.0:  # rounding guard
+                self.m2 = 0.0
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) >= self.length
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation of the window."""
+        n = len(self.window)
+        return math.sqrt(self.m2 / n) if n else 0.0
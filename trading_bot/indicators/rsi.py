@@ -0,0 +1,65 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Optional, TYPE_CHECKING
+from .ema import ewm
+from .sources import src_getter
+if TYPE_CHECKING:
+    import numpy as np
+
+@dataclass
+class StreamingRSI:
+    """Wilder RSI: SMA seed over the first `length` changes, then Wilder smoothing."""
+    length: int
+    source: str = "close"
+    prev_x: Optional[float] = None
+    avg_gain: float = 0.0
+    avg_loss: float = 0.0
+    changes: int = 0
+    value: Optional[float] = field(default=None)
+
+    def __post_init__(self):
+        self._src = src_getter(self.source)
+
+    def update(self, bar) -> Optional[float]:
+        x = self._src(bar)
+        if self.prev_x is None:
+            self.prev_x = x
+            return None
+        ch = x - self.prev_x
+        self.prev_x = x
+        gain, loss = max(ch, 0.0), max(-ch, 0.0)
+        self.changes += 1
+        n = self.length
+        if self.changes <= n:
+            self.avg_gain += gain / n
+            self.avg_loss += loss / n
+            if self.changes < n:
+                return None
+        else:
+            self.avg_gain = (self.avg_gain * (n - 1) + gain) / n
+            self.avg_loss = (self.avg_loss * (n - 1) + loss) / n
+        self.value = _rsi(self.avg_gain, self.avg_loss)
+        return self.value
+
+def _rsi(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0.0:
+        return 100.0 if avg_gain > 0.0 else 50.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+def rsi_batch(x: np.ndarray, length: int) -> np.ndarray:
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    out = np.full(x.size, np.nan)
+    if x.size <= length:
+        return out
+    ch = np.diff(x)
+    gains, losses = np.clip(ch, 0, None), np.clip(-ch, 0, None)
+    # SMA seed over the first `length` changes, then Wilder smoothing (alpha = 1/length)
+    ag = np.concatenate(([gains[:length].sum() / length], gains[length:]))
+    al = np.concatenate(([losses[:length].sum() / length], losses[length:]))
+    ag[1:] = ewm(ag[1:], 1.0 / length, ag[0])
+    al[1:] = ewm(al[1:], 1.0 / length, al[0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + ag / al)
+    out[length:] = np.where(al == 0.0, np.where(ag > 0.0, 100.0, 50.0), rsi)
+    return out
@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from operator import attrgetter
+if TYPE_CHECKING:
+    import numpy as np
+
+# Per-source accessors on a Bar; indicators resolve one at construction
+# so the per-bar update is a single call instead of a string dispatch.
+_SOURCES = {
+    "open":  attrgetter("open"),
+    "high":  attrgetter("high"),
+    "low":   attrgetter("low"),
+    "close": attrgetter("close"),
+    "hl2":   lambda b: (b.high + b.low) / 2.0,
+    "hlc3":  lambda b: (b.high + b.low + b.close) / 3.0,
+    "ohlc4": lambda b: (b.open + b.high + b.low + b.close) / 4.0,
+}
+
+def src_getter(source: str):
+    """Accessor for a price source of a Bar (unknown sources read close)."""
+    return _SOURCES.get(source, _SOURCES["close"])
+
+def src_value(bar, source: str) -> float:
+    """Price source of a Bar (records.Bar; values are already floats)."""
+    return src_getter(source)(bar)
+
+def src_array(cols: dict, source: str) -> np.ndarray:
+    """Vectorized src_value over column arrays {"open","high","low","close"}."""
+    import numpy as np
+    o, h, l, c = (np.asarray(cols[k], dtype=float) for k in ("open", "high", "low", "close"))
+    if source == "open":  return o
+    if source == "high":  return h
+    if source == "low":   return l
+    if source == "hl2":   return (h + l) / 2.0
+    if source == "hlc3":  return (h + l + c) / 3.0
+    if source == "ohlc4": return (o + h + l + c) / 4.0
+    return c
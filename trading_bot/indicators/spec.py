@@ -0,0 +1,39 @@
+from typing import NamedTuple
+from . import config
+
+class IndicatorSpec(NamedTuple):
+    """One indicator requirement: type, period length and price source."""
+    kind: str            # registered type: "ema", "atr", "rsi", "vwap", "bb", "donchian", "ret", "vol_z", ...
+    length: int
+    source: str = ""     # price source for single-input indicators ("close", "low", ...)
+
+    def __str__(self) -> str:
+        return f"{self.kind}({self.length},{self.source})" if self.source else f"{self.kind}({self.length})"
+
+def ema_spec(length: int, source: str = "close") -> IndicatorSpec:
+    return IndicatorSpec("ema", int(length), (source or "close").lower())
+
+def atr_spec(length: int) -> IndicatorSpec:
+    return IndicatorSpec("atr", int(length))
+
+def rsi_spec(length: int = 14, source: str = "close") -> IndicatorSpec:
+    return IndicatorSpec("rsi", int(length), (source or "close").lower())
+
+def vwap_spec(length: int) -> IndicatorSpec:
+    return IndicatorSpec("vwap", int(length))
+
+def bb_spec(length: int = 20, source: str = "close") -> IndicatorSpec:
+    return IndicatorSpec("bb", int(length), (source or "close").lower())
+
+def donchian_spec(length: int) -> IndicatorSpec:
+    return IndicatorSpec("donchian", int(length))
+
+def returns_spec(length: int, source: str = "close") -> IndicatorSpec:
+    return IndicatorSpec("ret", int(length), (source or "close").lower())
+
+def volume_z_spec(length: int) -> IndicatorSpec:
+    return IndicatorSpec("vol_z", int(length))
+
+def config_specs() -> list[IndicatorSpec]:
+    """Specs from EMA_1M_LENGTHS / EMA_1M_SOURCE / ATR_1M_LENGTHS (used when no strategy declares any)."""
+    return [ema_spec(n, config.EMA_SOURCE) for n in config.EMA_LENGTHS] + [atr_spec(n) for n in config.ATR_LENGTHS]
@@ -0,0 +1,33 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Optional, TYPE_CHECKING
+from .rolling import RollingStats
+from .bollinger import rolling_mean_std
+if TYPE_CHECKING:
+    import numpy as np
+
+@dataclass
+class StreamingVolumeZ:
+    """z-score of the bar's volume against the last `length` volumes (current bar included)."""
+    length: int
+    stats: RollingStats = field(init=False)
+
+    def __post_init__(self):
+        self.stats = RollingStats(self.length)
+
+    def update(self, bar) -> Optional[float]:
+        v = bar.volume
+        if v is None:
+            return None
+        v = float(v)
+        self.stats.push(v)
+        if not self.stats.full:
+            return None
+        sd = self.stats.std
+        return (v - self.stats.mean) / sd if sd > 0 else 0.0
+
+def volume_z_batch(volume: np.ndarray, length: int) -> np.ndarray:
+    import numpy as np
+    v = np.asarray(volume, dtype=float)
+    mean, sd = rolling_mean_std(v, length)
+    return np.divide(v - mean, sd, out=np.where(np.isnan(mean), np.nan, 0.0), where=sd > 0)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from collections import deque
+from dataclasses import dataclass, field
+if TYPE_CHECKING:
+    import numpy as np
+
+@dataclass
+class StreamingVWAP:
+    """
+    Rolling VWAP of the typical price (h+l+c)/3 over the last `length` bars.
+    Bars without a volume count with weight 1 (plain rolling mean).
+    """
+    length: int
+    window: deque = field(default_factory=deque)
+    pv: float = 0.0
+    vol: float = 0.0
+
+    def update(self, bar) -> float:
+        tp = (bar.high + bar.low + bar.close) / 3.0
+        v = bar.volume
+        v = 1.0 if v is None else float(v)
+        self.window.append((tp * v, v))
+        self.pv += tp * v
+        self.vol += v
+        if len(self.window) > self.length:
+            opv, ov = self.window.popleft()
+            self.pv -= opv
+            self.vol -= ov
+        return self.pv / self.vol if self.vol > 0 else tp
+
+def vwap_batch(high, low, close, volume, length: int) -> np.ndarray:
+    import numpy as np
+    tp = (np.asarray(high, float) + np.asarray(low, float) + np.asarray(close, float)) / 3.0
+    v = np.ones_like(tp) if volume is None else np.where(np.isnan(np.asarray(volume, float)), 1.0, volume)
+    pv = np.cumsum(tp * v)
+    cv = np.cumsum(v)
+    pv[length:] = pv[length:] - pv[:-length]
+    cv[length:] = cv[length:] - cv[:-length]
+    return np.divide(pv, cv, out=tp.copy(), where=cv > 0)
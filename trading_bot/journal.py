@@ -0,0 +1,254 @@
+# Append-only journal of the raw inputs the bot reacts to: websocket frames,
+# RugCheck and DexScreener responses. record() only timestamps the payload
+# and queues it (never blocks the event loop; drops once the queue holds
+# JOURNAL_QUEUE_MAX_BYTES). A background thread appends records to gzip
+# segments under JOURNAL_DIR, rotated by size and age. read_journal() walks
+# segments sequentially for incident reproduction and disk-speed replays.
+#
+# Record layout (little-endian, inside the gzip stream):
+#   u32 payload length | i64 ts (epoch ns, strictly increasing) |
+#   u8 source length | u16 key length | source | key | payload
+import os, gzip, glob, zlib, queue, struct, threading, time, typing
+from .env import settings
+
+
+@settings
+def _read_settings() -> None:
+    global JOURNAL_DIR, SEGMENT_MB, SEGMENT_SEC, QUEUE_MAX_BYTES, COMPRESS_LEVEL
+    JOURNAL_DIR = os.getenv("JOURNAL_DIR") or None                  # unset → journaling disabled
+    SEGMENT_MB = float(os.getenv("JOURNAL_SEGMENT_MB", "64"))       # uncompressed bytes per segment
+    SEGMENT_SEC = float(os.getenv("JOURNAL_SEGMENT_SEC", "3600"))
+    QUEUE_MAX_BYTES = int(float(os.getenv("JOURNAL_QUEUE_MAX_MB", "32")) * 1024 * 1024)
+    COMPRESS_LEVEL = int(os.getenv("JOURNAL_COMPRESS_LEVEL", "3"))  # favour throughput over ratio
+
+
+HEADER = struct.Struct("<IqBH")
+SUFFIX = ".jrn.gz"
+_STOP = object()
+_SETTING = object()   # directory default: JOURNAL_DIR (None disables the journal)
+_READ_CHUNK = 1 << 20
+
+
+class JournalRecord(typing.NamedTuple):
+    ts_ns: int
+    source: str
+    key: str
+    payload: bytes
+
+
+def _encode(ts_ns: int, source: str, key: str, payload: bytes) -> bytes:
+    s = source.encode()[:255]
+    k = key.encode()[:65535]
+    return HEADER.pack(len(payload), ts_ns, len(s), len(k)) + s + k + payload
+
+
+class Journal:
+    """Raw input journal under `directory` (None: record() is a no-op)."""
+
+    def __init__(self, directory: typing.Any = _SETTING, *,
+                 segment_bytes: typing.Optional[int] = None, segment_sec: typing.Optional[float] = None,
+                 queue_max_bytes: typing.Optional[int] = None, level: typing.Optional[int] = None):
+        self._given = (directory, segment_bytes, segment_sec, queue_max_bytes, level)
+        self.configure()
+        self._q: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._queued_bytes = 0
+        self._last_ts = 0
+        self._thread: typing.Optional[threading.Thread] = None
+        self._file: typing.Optional[gzip.GzipFile] = None
+        self._seg_bytes = 0
+        self._seg_opened = 0.0
+        self.counters = {"records": 0, "bytes": 0, "dropped": 0, "segments": 0, "errors": 0}
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        directory, segment_bytes, segment_sec, queue_max_bytes, level = self._given
+        self.directory: typing.Optional[str] = JOURNAL_DIR if directory is _SETTING else directory
+        self.segment_bytes = max(1, int(SEGMENT_MB * 1024 * 1024 if segment_bytes is None else segment_bytes))
+        self.segment_sec = SEGMENT_SEC if segment_sec is None else segment_sec
+        self.queue_max_bytes = QUEUE_MAX_BYTES if queue_max_bytes is None else queue_max_bytes
+        self.level = COMPRESS_LEVEL if level is None else level
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def record(self, source: str, payload: typing.Union[bytes, str], key: str = "") -> bool:
+        """Queue one raw input. Thread-safe; returns False if disabled or dropped (queue full)."""
+        if self.directory is None:
+            return False
+        if isinstance(payload, str):
+            payload = payload.encode()
+        rec_bytes = HEADER.size + len(source) + len(key) + len(payload)
+        with self._lock:
+            if self._queued_bytes + rec_bytes > self.queue_max_bytes:
+                self.counters["dropped"] += 1
+                return False
+            self._queued_bytes += rec_bytes
+            ts = max(time.time_ns(), self._last_ts + 1)  # strictly increasing even if the clock steps back
+            self._last_ts = ts
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        self._q.put(_encode(ts, source, key, payload))
+        return True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+                self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write out queued records and close the current segment."""
+        if self._thread is not None and self._thread.is_alive():
+            self._q.put(_STOP)
+            self._thread.join(timeout)
+
+    # --- writer thread ---
+    def _run(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        stop = False
+        while not stop:
+            try:
+                batch = [self._q.get(timeout=1.0)]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(b is _STOP for b in batch)
+            self._write([b for b in batch if b is not _STOP])
+        self._close_segment()
+
+    def _write(self, batch: list[bytes]) -> None:
+        # a batch may span segments: cut it where the current segment fills up
+        start = 0
+        while True:
+            if self._file is not None and (self._seg_bytes >= self.segment_bytes or
+                                           time.monotonic() - self._seg_opened >= self.segment_sec):
+                self._close_segment()
+            if start >= len(batch):
+                return
+            room = self.segment_bytes - (self._seg_bytes if self._file is not None else 0)
+            end, size = start + 1, len(batch[start])
+            while end < len(batch) and size + len(batch[end]) <= room:
+                size += len(batch[end])
+                end += 1
+            self._append(batch[start:end])
+            start = end
+
+    def _append(self, batch: list[bytes]) -> None:
+        n = sum(len(b) for b in batch)
+        try:
+            if self._file is None:
+                self._open_segment(struct.unpack_from("<q", batch[0], 4)[0])
+            data = b"".join(batch)
+            self._file.write(data)
+            self._file.flush()  # sync-flush per batch: a crash loses at most the batch in flight
+            self._seg_bytes += len(data)
+            self.counters["records"] += len(batch)
+            self.counters["bytes"] += len(data)
+        except OSError as e:
+            self.counters["errors"] += 1
+            print(f"[journal] write error: {e}")
+        finally:
+            with self._lock:
+                self._queued_bytes = max(0, self._queued_bytes - n)
+
+    def _open_segment(self, first_ts: int) -> None:
+        path = os.path.join(self.directory, f"journal-{first_ts:019d}{SUFFIX}")
+        self._file = gzip.GzipFile(path, "ab", compresslevel=self.level)
+        self._seg_bytes = 0
+        self._seg_opened = time.monotonic()
+        self.counters["segments"] += 1
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError as e:
+                self.counters["errors"] += 1
+                print(f"[journal] close error: {e}")
+            self._file = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = self._queued_bytes
+        return {**self.counters, "queued_bytes": queued, "enabled": self.enabled}
+
+
+# --- reading ---
+def segments(directory: str) -> list[str]:
+    """Segment files of a journal, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, f"journal-*{SUFFIX}")))
+
+
+def _inflate(path: str) -> typing.Iterator[bytes]:
+    # zlib directly rather than GzipFile: a segment cut short by a crash (no
+    # gzip trailer) still yields everything that was flushed before it
+    d = zlib.decompressobj(wbits=31)
+    with open(path, "rb") as f:
+        while True:
+            raw = f.read(_READ_CHUNK)
+            if not raw:
+                return
+            while raw:
+                out = d.decompress(raw)
+                if out:
+                    yield out
+                raw = b""
+                if d.eof:  # appended segments hold several gzip members
+                    raw = d.unused_data
+                    d = zlib.decompressobj(wbits=31)
+
+
+def _read_segment(path: str) -> typing.Iterator[JournalRecord]:
+    buf = b""
+    pos = 0
+    for chunk in _inflate(path):
+        buf = buf[pos:] + chunk
+        pos = 0
+        end = len(buf)
+        while end - pos >= HEADER.size:
+            plen, ts, slen, klen = HEADER.unpack_from(buf, pos)
+            start = pos + HEADER.size
+            stop = start + slen + klen + plen
+            if stop > end:
+                break  # record continues in the next chunk
+            k0 = start + slen
+            yield JournalRecord(ts, buf[start:k0].decode(), buf[k0:k0 + klen].decode(), buf[k0 + klen:stop])
+            pos = stop
+
+
+def read_journal(directory: str, *, sources: typing.Optional[typing.Iterable[str]] = None,
+                 since_ns: typing.Optional[int] = None,
+                 until_ns: typing.Optional[int] = None) -> typing.Iterator[JournalRecord]:
+    """
+    Every record under `directory` in write order, optionally filtered by
+    source tag and [since_ns, until_ns). Segments that start at or after
+    until_ns are not opened.
+    """
+    wanted = set(sources) if sources is not None else None
+    paths = segments(directory)
+    for i, path in enumerate(paths):
+        first = int(os.path.basename(path)[len("journal-"):-len(SUFFIX)])
+        if until_ns is not None and first >= until_ns:
+            return
+        if since_ns is not None and i + 1 < len(paths):
+            nxt = int(os.path.basename(paths[i + 1])[len("journal-"):-len(SUFFIX)])
+            if nxt <= since_ns:
+                continue  # the whole segment predates the window
+        for rec in _read_segment(path):
+            if since_ns is not None and rec.ts_ns < since_ns:
+                continue
+            if until_ns is not None and rec.ts_ns >= until_ns:
+                return
+            if wanted is None or rec.source in wanted:
+                yield rec
+
+
+# Process-wide journal fed by new_pairs, rugcheck_client and dexscreener_client
+JOURNAL = Journal()
+settings(JOURNAL.configure)
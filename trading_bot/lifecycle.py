@@ -0,0 +1,267 @@
+# Per-token lifecycle: one place that knows which stage every watched token
+# is in, and retires it from every module at once.
+#
+#   new ─sample─▶ warming ─WARM_BARS bars─▶ active ◀─position opened/closed─▶ position
+#                    │                         │
+#                    └── no sample for COLD_SEC ┴─▶ cold ─sample─▶ warming/active
+#   new/cold ── no sample for DEAD_SEC ──▶ dead        (retired)
+#   warming/active ── close ≤ (1-DEAD_DRAWDOWN)×peak ──▶ dead   (rugged; retired)
+#   any but position ── blacklisted by a strategy ──▶ blacklisted (retired)
+#
+# Modules holding per-token state register a Hook: cold tokens drop the
+# state that rebuilds from fresh samples (the aggregator's partial window),
+# retired tokens drop everything (aggregator, indicators, strategy state,
+# columnar store) and their `tokens`/`prices` rows, so they leave the watch
+# list; candles and indicator rows are left to retention. The price watcher
+# feeds samples/bars and runs sweep() every SWEEP_SEC: timers, positions and
+# blacklist are reconciled there and evictions happen in one batch.
+import os, time, random, inspect, typing
+from .risk_cache import TTLCache
+from .ohlc_agg import AGGREGATOR, OHLCAggregator, INACTIVITY_SEC
+from .papertrading.loader import PAPER_TRADER, PaperTrader
+from .tsstore import TS_STORE, TimeSeriesStore
+from .env import settings
+
+
+@settings
+def _read_settings() -> None:
+    global WARM_BARS, COLD_SEC, DEAD_SEC, DEAD_DRAWDOWN, SWEEP_SEC
+    WARM_BARS = int(os.getenv("LIFECYCLE_WARM_BARS", "14"))
+    COLD_SEC = float(os.getenv("LIFECYCLE_COLD_SEC", str(INACTIVITY_SEC)))
+    DEAD_SEC = float(os.getenv("LIFECYCLE_DEAD_SEC", "3600"))
+    DEAD_DRAWDOWN = float(os.getenv("LIFECYCLE_DEAD_DRAWDOWN", "0.9"))
+    SWEEP_SEC = float(os.getenv("LIFECYCLE_SWEEP_SEC", "30"))
+
+
+RETIRED_TTL_SEC = 600   # late samples of a retired token (polls in flight) are ignored this long
+RETIRED_MAX = 50_000
+SIZE_SAMPLE = 50        # tokens measured per state for memory_by_state()
+
+STATES = ("new", "warming", "active", "position", "cold", "dead", "blacklisted")
+RETIRED = ("dead", "blacklisted")
+
+
+class Hook(typing.NamedTuple):
+    name: str
+    evict: typing.Callable[[str], typing.Any]                     # drop the token's state (may return an awaitable)
+    size: typing.Optional[typing.Callable[[str], int]] = None     # approximate bytes held for the token
+    cold: bool = False                                            # also evicted when the token goes cold
+
+
+class _Token:
+    __slots__ = ("state", "since", "last_sample", "bars", "peak", "reason")
+    def __init__(self, state: str, now: float):
+        self.state, self.since = state, now
+        self.last_sample: typing.Optional[float] = None
+        self.bars = 0
+        self.peak = 0.0
+        self.reason = ""
+
+
+class TokenLifecycle:
+    """State of every tracked token plus the hooks that evict it; one per independent pipeline."""
+
+    def __init__(self, hooks: typing.Iterable[Hook] = (), *, warm_bars: typing.Optional[int] = None,
+                 cold_sec: typing.Optional[float] = None, dead_sec: typing.Optional[float] = None,
+                 dead_drawdown: typing.Optional[float] = None, sweep_sec: typing.Optional[float] = None):
+        self.hooks: list[Hook] = list(hooks)
+        self._given = (warm_bars, cold_sec, dead_sec, dead_drawdown, sweep_sec)   # None: the module setting
+        self.configure()
+        self.tokens: dict[str, _Token] = {}
+        self._retired = TTLCache(RETIRED_MAX)
+        self._blacklist_since = 0
+        self.counters = {"admitted": 0, "cold": 0, "revived": 0, "dead": 0, "rugged": 0,
+                         "blacklisted": 0, "retired": 0, "hook_errors": 0, "sweeps": 0}
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        warm_bars, cold_sec, dead_sec, dead_drawdown, sweep_sec = self._given
+        self.warm_bars = WARM_BARS if warm_bars is None else warm_bars
+        self.cold_sec = COLD_SEC if cold_sec is None else cold_sec
+        self.dead_sec = DEAD_SEC if dead_sec is None else dead_sec
+        self.dead_drawdown = DEAD_DRAWDOWN if dead_drawdown is None else dead_drawdown
+        self.sweep_sec = SWEEP_SEC if sweep_sec is None else sweep_sec
+
+    def register(self, hook: Hook) -> Hook:
+        self.hooks.append(hook)
+        return hook
+
+    def state(self, address: str) -> typing.Optional[str]:
+        t = self.tokens.get(address)
+        return t.state if t is not None else None
+
+    def _set(self, t: _Token, state: str, now: float) -> None:
+        t.state, t.since = state, now
+
+    # --- events ---
+    def admit(self, address: str, now: typing.Optional[float] = None) -> None:
+        """A token passed the risk check and is about to be watched."""
+        if address in self.tokens:
+            return
+        self._retired.pop(address)
+        self.tokens[address] = _Token("new", now or time.time())
+        self.counters["admitted"] += 1
+
+    def on_sample(self, address: str, ts: float) -> bool:
+        """A price sample arrived; False if the token is retired and the sample should be dropped."""
+        t = self.tokens.get(address)
+        if t is None:
+            if address in self._retired:
+                return False
+            t = self.tokens[address] = _Token("warming", ts)  # watched since before this process
+        elif t.state in RETIRED:
+            return False
+        elif t.state == "new":
+            self._set(t, "warming", ts)
+        elif t.state == "cold":
+            self._set(t, "active" if t.bars >= self.warm_bars else "warming", ts)
+            self.counters["revived"] += 1
+        t.last_sample = ts
+        return True
+
+    def on_bar(self, bar) -> None:
+        """A 1m bar closed: count warm-up bars and catch rugs."""
+        t = self.tokens.get(bar.address)
+        if t is None or t.state in RETIRED:
+            return
+        t.bars += 1
+        if t.state == "warming" and t.bars >= self.warm_bars:
+            self._set(t, "active", bar.ts_start)
+        if not bar.samples:
+            return    # a warm-start seed bar: synthesized highs are no peak to measure a rug against
+        t.peak = max(t.peak, bar.high)
+        if t.state != "position" and self.dead_drawdown and bar.close <= (1 - self.dead_drawdown) * t.peak:
+            self._set(t, "dead", bar.ts_start)
+            t.reason = "rugged"
+            self.counters["rugged"] += 1
+
+    def blacklist(self, address: str, now: typing.Optional[float] = None) -> None:
+        t = self.tokens.get(address)
+        if t is not None and t.state not in RETIRED and t.state != "position":
+            self._set(t, "blacklisted", now or time.time())
+            self.counters["blacklisted"] += 1
+
+    def set_positions(self, open_addresses: typing.Iterable[str], now: float) -> None:
+        """Reconcile with the open paper positions: those tokens are never cooled or retired."""
+        open_set = set(open_addresses)
+        for addr in open_set:
+            t = self.tokens.get(addr)
+            if t is None:
+                t = self.tokens[addr] = _Token("position", now)
+            elif t.state != "position":
+                self._set(t, "position", now)
+        for addr, t in self.tokens.items():
+            if t.state == "position" and addr not in open_set:
+                self._set(t, "active" if t.bars >= self.warm_bars else "warming", now)
+
+    def watchable(self, addresses: list[str]) -> list[str]:
+        """`addresses` without tokens that are retired or waiting to be."""
+        tokens, retired = self.tokens, self._retired
+        return [a for a in addresses
+                if not ((t := tokens.get(a)) is not None and t.state in RETIRED) and a not in retired]
+
+    # --- sweep ---
+    def _expire(self, now: float) -> list[str]:
+        cold = []
+        for addr, t in self.tokens.items():
+            if t.state in ("position",) + RETIRED:
+                continue
+            idle = now - (t.last_sample if t.last_sample is not None else t.since)
+            if t.state in ("warming", "active") and idle >= self.cold_sec:
+                self._set(t, "cold", now)
+                self.counters["cold"] += 1
+                cold.append(addr)
+            elif t.state in ("new", "cold") and idle >= self.dead_sec:
+                self._set(t, "dead", now)
+                t.reason = "idle"
+                self.counters["dead"] += 1
+        return cold
+
+    async def _run_hooks(self, addresses: list[str], cold: bool) -> None:
+        for hook in self.hooks:
+            if cold and not hook.cold:
+                continue
+            for addr in addresses:
+                try:
+                    res = hook.evict(addr)
+                    if inspect.isawaitable(res):
+                        await res
+                except Exception as e:
+                    self.counters["hook_errors"] += 1
+                    print(f"[lifecycle] {hook.name} eviction error for {addr}: {e}")
+
+    async def sweep(self, db=None, now: typing.Optional[float] = None) -> dict:
+        """
+        Reconcile with `db` (open positions, new blacklist entries), apply the
+        cold/dead timers, then run the hooks: cold ones for newly cold tokens,
+        all of them for retired tokens, which are then forgotten here and
+        deleted from `tokens`/`prices`. Returns {"cold": n, "retired": n}.
+        """
+        now = now or time.time()
+        if db is not None:
+            await db.writer.aflush()      # strategies don't wait for their writes: let them commit first
+            rows = await db.reads.fetchall("SELECT address FROM paper_positions WHERE status='long'")
+            self.set_positions((r[0] for r in rows), now)
+            rows = await db.reads.fetchall(
+                "SELECT address, created_at FROM paper_blacklist WHERE created_at >= ?", (self._blacklist_since,))
+            for addr, created in rows:
+                self.blacklist(addr, now)
+                self._blacklist_since = max(self._blacklist_since, created)
+        cold = self._expire(now)
+        retired = [a for a, t in self.tokens.items() if t.state in RETIRED]
+        await self._run_hooks(cold, cold=True)
+        await self._run_hooks(retired, cold=False)
+        for addr in retired:
+            del self.tokens[addr]
+            self._retired.put(addr, True, RETIRED_TTL_SEC)
+        if retired and db is not None:
+            await db.retire_tokens_async(retired)
+        self.counters["retired"] += len(retired)
+        self.counters["sweeps"] += 1
+        return {"cold": len(cold), "retired": len(retired)}
+
+    # --- reporting ---
+    def counts(self) -> dict[str, int]:
+        out = dict.fromkeys(STATES, 0)
+        for t in self.tokens.values():
+            out[t.state] += 1
+        return out
+
+    def memory_by_state(self, sample: int = SIZE_SAMPLE) -> dict[str, dict]:
+        """Tokens and approximate bytes held across all hooks, per state (extrapolated from a sample)."""
+        by_state: dict[str, list[str]] = {s: [] for s in STATES}
+        for addr, t in self.tokens.items():
+            by_state[t.state].append(addr)
+        sizers = [h.size for h in self.hooks if h.size is not None]
+        out = {}
+        for state, addrs in by_state.items():
+            picked = random.sample(addrs, min(len(addrs), sample))
+            per = sum(size(a) for a in picked for size in sizers) / len(picked) if picked else 0.0
+            out[state] = {"tokens": len(addrs), "bytes": int(per * len(addrs))}
+        return out
+
+    def stats(self) -> dict:
+        return {**self.counters, "tracked": len(self.tokens), "states": self.counts()}
+
+
+def _size(obj) -> int:
+    from .profiling import deep_size  # profiling reports on this module
+    return deep_size(obj) if obj is not None else 0
+
+
+def pipeline_hooks(agg: OHLCAggregator = AGGREGATOR, store: TimeSeriesStore = TS_STORE,
+                   trader: PaperTrader = PAPER_TRADER) -> list[Hook]:
+    """Eviction hooks for the watcher's per-token state: aggregator, indicators and strategies (`trader`), columnar store."""
+    return [
+        Hook("ohlc_agg", agg.evict, lambda a: _size(agg.buffers.get(a)), cold=True),
+        Hook("indicators", trader.indicators.reset, lambda a: _size(trader.indicators.tokens.get(a))),
+        Hook("strategies", trader.dispatch_evict,
+             lambda a: sum(_size(s._state.get(a)) for s in trader.strategies
+                           if isinstance(getattr(s, "_state", None), dict))),
+        Hook("tsstore", store.drop, lambda a: _size(store._series.get(a))),
+    ]
+
+
+# Process-wide default instance, wired to the default aggregator and store
+LIFECYCLE = TokenLifecycle(pipeline_hooks())
+settings(LIFECYCLE.configure)
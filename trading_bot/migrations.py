@@ -0,0 +1,106 @@
+# Versioned schema migrations for the SQLite database.
+# Each step has a version number and runs once, in order, inside a savepoint;
+# the applied versions are recorded in `schema_version`. Tables are still
+# declared with CREATE TABLE IF NOT EXISTS in their modules (the current
+# schema), so steps only have to upgrade tables created by older code.
+import re, sqlite3, typing
+
+EPOCH_NOW = "CAST(strftime('%s','now') AS INTEGER)"   # SQL: current UTC epoch seconds
+
+
+class Migration(typing.NamedTuple):
+    version: int
+    name: str
+    apply: typing.Callable[[sqlite3.Connection], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+def migration(version: int, name: str):
+    """Register a migration step; versions must be unique and increasing."""
+    def deco(fn):
+        if any(m.version >= version for m in MIGRATIONS):
+            raise ValueError(f"migration {version} must be newer than {MIGRATIONS[-1].version}")
+        MIGRATIONS.append(Migration(version, name, fn))
+        return fn
+    return deco
+
+
+def _ensure_version_table(db: sqlite3.Connection) -> None:
+    db.execute(f"""
+    CREATE TABLE IF NOT EXISTS schema_version (
+      version     INTEGER PRIMARY KEY,
+      name        TEXT NOT NULL,
+      applied_at  INTEGER NOT NULL DEFAULT ({EPOCH_NOW})
+    );
+    """)
+
+def current_version(db: sqlite3.Connection) -> int:
+    _ensure_version_table(db)
+    return db.execute("SELECT coalesce(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def migrate(db: sqlite3.Connection, target: typing.Optional[int] = None) -> list[int]:
+    """Apply every pending migration up to `target` (default: latest). Returns the versions applied."""
+    db.commit()
+    have = current_version(db)
+    applied = []
+    for m in MIGRATIONS:
+        if m.version <= have or (target is not None and m.version > target):
+            continue
+        db.execute("SAVEPOINT migrate")
+        try:
+            m.apply(db)
+            db.execute("INSERT INTO schema_version(version, name) VALUES(?, ?)", (m.version, m.name))
+            db.execute("RELEASE migrate")
+        except Exception:
+            db.execute("ROLLBACK TO migrate")
+            db.execute("RELEASE migrate")
+            raise
+        applied.append(m.version)
+    db.commit()
+    return applied
+
+
+# --- helpers for steps ---
+def _columns(db: sqlite3.Connection, table: str) -> list[tuple[str, str]]:
+    return [(r[1], (r[2] or "").upper()) for r in db.execute(f"PRAGMA table_info({table})")]
+
+def rebuild_table(db: sqlite3.Connection, table: str, create_sql: str, select: dict[str, str]) -> None:
+    """
+    SQLite can't change column types in place: create `create_sql` (for `table`)
+    under a temporary name, copy rows through the `select` expressions
+    ({column: expr}), swap it in and re-create the table's indexes and triggers.
+    """
+    extras = [r[0] for r in db.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name=? AND type IN ('index','trigger') AND sql IS NOT NULL",
+        (table,))]
+    tmp = f"{table}__migrating"
+    db.execute(re.sub(rf"\b{table}\b", tmp, create_sql, count=1))
+    cols = ", ".join(select)
+    db.execute(f"INSERT INTO {tmp} ({cols}) SELECT {', '.join(select.values())} FROM {table}")
+    db.execute(f"DROP TABLE {table}")
+    db.execute(f"ALTER TABLE {tmp} RENAME TO {table}")
+    for sql in extras:
+        db.execute(sql)
+
+
+# --- steps ---
+@migration(1, "DATETIME text timestamps -> integer epoch seconds")
+def _epoch_timestamps(db: sqlite3.Connection) -> None:
+    # tokens.created_at/last_seen, prices.updated_at, paper_positions.updated_at, paper_blacklist.created_at
+    tables = [r[0] for r in db.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+    for table in tables:
+        cols = _columns(db, table)
+        legacy = [name for name, decl in cols if decl in ("DATETIME", "TIMESTAMP")]
+        if not legacy:
+            continue
+        sql = db.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()[0]
+        for name in legacy:
+            sql = re.sub(rf"\b{name}\s+(DATETIME|TIMESTAMP)(\s+DEFAULT\s+CURRENT_TIMESTAMP)?",
+                         f"{name} INTEGER NOT NULL DEFAULT ({EPOCH_NOW})", sql, flags=re.I)
+        select = {name: name for name, _ in cols}
+        for name in legacy:
+            select[name] = (f"coalesce(CASE WHEN typeof({name}) = 'text' "
+                            f"THEN CAST(strftime('%s', {name}) AS INTEGER) ELSE {name} END, {EPOCH_NOW})")
+        rebuild_table(db, table, sql, select)
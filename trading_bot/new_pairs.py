@@ -1,39 +1,81 @@
 import asyncio, json, os, sys, signal
-from dotenv import load_dotenv
-import websockets
-from .rugcheck_client import get_risk_level
+from . import risk_cache
+from .env import ConfigError, load_env, settings
+from .ws_manager import WSConnectionManager
+from .risk_cache import get_risk_level_cached, risk_cache_stats, TTLCache, RISK_CACHE
+from .recheck_queue import RecheckQueue
 from .db import (
-    upsert_safe_token, count_tokens, get_stats,
-    get_recent_tokens, get_tokens_by_risk, clear_old_tokens
+    upsert_safe_token_async, count_tokens_async, get_stats, get_stats_async,
+    get_recent_tokens, get_recent_tokens_async, clear_old_tokens_async, default_db, init as init_db
 )
 from .price_watcher import watch_prices
-from .papertrading import load_strategies, dispatch_new_token, is_blacklisted
+from .http_clients import start_clients, close_clients, client_stats
+from .tsstore import TS_STORE
+from .retention import RETENTION
+from .journal import JOURNAL
+from .profiling import PROFILER, memory_report, format_memory_report
+from .lifecycle import LIFECYCLE
+from .warmstart import WARMSTART
+from .chain_feed import CHAIN_FEED
+from .price_sources import PRICE_ROUTER
+from .poll_cadence import POLL_CADENCE
+from .papertrading import load_strategies, dispatch_new_token, is_blacklisted, get_screener
+from .papertrading.db import paper_db
+
+# Set by init() from the environment / .env
+API_KEY = None
+URL = None
+SKIP_RISK_CHECK = False
+
+# Mints admitted recently; repeat announcements within the TTL are dropped (sized by init())
+ADMIT_TTL_SEC = risk_cache.TTL_SEC
+_ADMITTED = TTLCache(risk_cache.CACHE_SIZE)
+_DUPES = {"suppressed": 0}
+_PAIR_TASKS: set[asyncio.Task] = set()
+_REPORT_TASKS: set[asyncio.Task] = set()
+WS_MANAGER = None
 
-load_dotenv()
-API_KEY = os.getenv("SOLANASTREAM_API_KEY")
-if not API_KEY:
-    print("Missing SOLANASTREAM_API_KEY in .env")
-    sys.exit(1)
-
-SKIP_RISK_CHECK = os.getenv("SKIP_RISK_CHECK", "0") == "1"
-
-# Signal handler for database queries
-def signal_handler(signum, frame):
-    """Handle SIGUSR1 to show database summary."""
-    if signum == signal.SIGUSR1:
-        show_database_summary()
-
-# Register signal handler
-signal.signal(signal.SIGUSR1, signal_handler)
-
-URL = "wss://api.solanastreaming.com"
 MSG = {
     "jsonrpc": "2.0",
     "id": 1,
     "method": "newPairSubscribe",
-    "params": {"include_pumpfun": True, "api_key": API_KEY}
+    "params": {"include_pumpfun": True, "api_key": None}   # filled in by init()
 }
 
+def init() -> None:
+    """
+    Process setup, done by main() rather than at import: load .env, read the
+    API key and settings, create the database and load its paper positions and
+    blacklist into memory. Raises ConfigError if SOLANASTREAM_API_KEY is missing.
+    """
+    global API_KEY, URL, SKIP_RISK_CHECK, ADMIT_TTL_SEC
+    load_env()
+    API_KEY = os.getenv("SOLANASTREAM_API_KEY")
+    if not API_KEY:
+        raise ConfigError("Missing SOLANASTREAM_API_KEY in .env")
+    MSG["params"]["api_key"] = API_KEY
+    URL = os.getenv("SOLANASTREAM_WS_URL", "wss://api.solanastreaming.com")
+    SKIP_RISK_CHECK = os.getenv("SKIP_RISK_CHECK", "0") == "1"
+    ADMIT_TTL_SEC = float(os.getenv("DUPLICATE_MINT_TTL_SEC", str(risk_cache.TTL_SEC)))
+    _ADMITTED.maxsize = max(1, risk_cache.CACHE_SIZE)
+    paper_db(init_db()).load()
+
+def install_signal_handlers() -> None:
+    """
+    SIGUSR1 prints the database summary and memory report, SIGUSR2 starts or
+    stops a profiling round (see profiling.py). Both run as callbacks on the
+    running loop, never inside the signal handler itself; the summary is a task
+    because its SQLite reads go through the read pool.
+    """
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGUSR1, _spawn_database_summary)
+    loop.add_signal_handler(signal.SIGUSR2, PROFILER.toggle)
+
+def _spawn_database_summary() -> None:
+    task = asyncio.create_task(show_database_summary())
+    _REPORT_TASKS.add(task)
+    task.add_done_callback(_REPORT_TASKS.discard)
+
 async def send_heartbeat(ws):
     """Optional app-level heartbeat (JSON message)."""
     while True:
@@ -51,38 +93,94 @@ async def periodic_maintenance():
             await asyncio.sleep(300)  # Every 5 minutes
             
             # Clean old tokens (older than 7 days)
-            old_count = count_tokens()
-            clear_old_tokens(days=7)
-            new_count = count_tokens()
-            
-            if old_count != new_count:
-                print(f"🧹 Cleaned {old_count - new_count} old tokens from database")
+            removed = await clear_old_tokens_async(days=7)
+            if removed:
+                print(f"🧹 Cleaned {removed} old tokens from database")
+
+            # Roll up / age out candles, indicators, prices and trades in small chunks
+            await RETENTION.run_pass()
+            print(_format_retention_stats())
+            print(_format_writer_stats())
+
+            # Freeze full in-memory candle/indicator segments (to TSSTORE_DIR if set) off the loop
+            compacted = await asyncio.to_thread(TS_STORE.compact)
+            if compacted:
+                print(f"🗜️  Compacted {compacted} time-series segments")
             
             # Show periodic stats
-            stats = get_stats()
+            stats = await get_stats_async()
             print(f"📊 Periodic Stats - Total: {stats['total']} | Low: {stats['low_risk_0_10']} | Med: {stats['medium_risk_11_20']} | High: {stats['high_risk_21_plus']}")
+            print(f"   By DEX: {_format_counts(stats['by_dex'])}")
+            print(_format_risk_cache_stats())
+            print(_format_recheck_stats())
+            print(_format_ws_stats())
+            print(_format_http_stats())
+            print(_format_price_source_stats())
+            print(_format_poll_cadence_stats())
+            print(_format_journal_stats())
+            print(_format_lifecycle_stats())
+            print(_format_warmstart_stats())
+            if CHAIN_FEED.enabled:
+                print(_format_chain_feed_stats())
+            if get_screener() is not None:
+                print(_format_screener_stats())
             
         except Exception as e:
             print(f"[maintenance] Error: {e}")
             continue
 
-def show_database_summary():
+def _format_risk_cache_stats() -> str:
+    rc = risk_cache_stats()
+    return (f"🧠 RugCheck cache - hit rate: {rc['hit_rate']:.1%} | saved requests: {rc['saved_requests']} "
+            f"(hits {rc['hits']}, coalesced {rc['coalesced']}) | misses: {rc['misses']} | "
+            f"cached: {rc['size']} | duplicates suppressed: {_DUPES['suppressed']}")
+
+def _format_counts(counts: dict) -> str:
+    return " | ".join(f"{k or 'unknown'}: {n}" for k, n in sorted(counts.items(), key=lambda kv: -kv[1])) or "none"
+
+def _format_retention_stats() -> str:
+    r = RETENTION.stats()
+    return (f"🗄️  Retention - rolled up: {r['rolled_up']} | expired: {r['expired']} | orphans: {r['orphans']} | "
+            f"passes: {r['passes']} | steps: {r['steps']} | max step: {r['max_step_ms']:.1f}ms")
+
+def _format_writer_stats() -> str:
+    w = default_db().writer.stats()
+    avg = w["commands"] / w["batches"] if w["batches"] else 0.0
+    return (f"✍️  DB writer - commands: {w['commands']} | batches: {w['batches']} (avg {avg:.1f}, max {w['max_batch']}) | "
+            f"queued: {w['queued']} | errors: {w['errors']} | lock retries: {w['lock_retries']} | busy: {w['busy_ms']:.0f}ms")
+
+def _format_recheck_stats() -> str:
+    q = RECHECK.stats()
+    return (f"⏳ Deferred re-checks - queued: {q['queued']} | scheduled: {q['scheduled']} | "
+            f"rechecks: {q['rechecks']} | scored: {q['scored']} | expired: {q['expired']} | evicted: {q['evicted']}")
+
+async def show_database_summary():
     """Show a comprehensive database summary."""
-    stats = get_stats()
+    stats = await get_stats_async()
     print(f"\n📊 DATABASE SUMMARY")
     print("=" * 50)
     print(f"Total tokens stored: {stats['total']}")
     print(f"🟢 Low risk (0-10): {stats['low_risk_0_10']}")
     print(f"🟡 Medium risk (11-20): {stats['medium_risk_11_20']}")
     print(f"🔴 High risk (21+): {stats['high_risk_21_plus']}")
+    print(f"🏦 By DEX: {_format_counts(stats['by_dex'])}")
+    print(f"🏷️  By status: {_format_counts(stats['by_status'])}")
     
     if stats['total'] > 0:
         print(f"\n🕐 Recent tokens (last 24h):")
-        recent = get_recent_tokens(hours=24, limit=5)
+        recent = await get_recent_tokens_async(hours=24, limit=5)
         for i, token in enumerate(recent, 1):
             risk_emoji = "🟢" if token[4] <= 10 else "🟡" if token[4] <= 20 else "🔴"
             print(f"  {i}. {risk_emoji} {token[1]} ({token[2]}) - Risk: {token[4]} - DEX: {token[3]}")
     
+    print(_format_risk_cache_stats())
+    print(_format_recheck_stats())
+    print(_format_retention_stats())
+    print(_format_writer_stats())
+    print(_format_ws_stats())
+    print(_format_http_stats())
+    print(_format_lifecycle_stats())
+    print(await _format_memory_stats())
     print("=" * 50)
 
 def show_recent_tokens():
@@ -103,6 +201,109 @@ def show_recent_tokens():
     else:
         print("📭 No recent tokens found in database")
 
+async def process_new_pair(*, mint: str, name: str, symbol: str, dex: str,
+                           signature: str, legacy: bool = False, pool: str = ""):
+    """Risk-check one announced pair and admit it into `tokens` if safe."""
+    if not mint:
+        return
+    if mint in _ADMITTED:
+        _DUPES["suppressed"] += 1
+        return
+
+    if SKIP_RISK_CHECK:
+        risk, rc = 0, {"risk": 0, "summary": "Risk check skipped"}
+    else:
+        risk, rc = await get_risk_level_cached(mint)
+        if risk is None:
+            # RugCheck can't score brand-new tokens yet → retry in the background
+            if RECHECK.schedule(mint, {"mint": mint, "name": name, "symbol": symbol,
+                                       "dex": dex, "signature": signature, "legacy": legacy, "pool": pool}):
+                print(f"⏳ Deferred risk check: {name} ({symbol}) | mint={mint} | queued={len(RECHECK)}")
+            return
+
+    await admit_pair(mint=mint, name=name, symbol=symbol, dex=dex, signature=signature,
+                     risk=risk, rc=rc, legacy=legacy, pool=pool)
+
+async def admit_pair(*, mint: str, name: str, symbol: str, dex: str, signature: str,
+               risk: int, rc: dict, legacy: bool = False, pool: str = ""):
+    """Store a scored pair in `tokens` and hand it to strategies if within the risk threshold."""
+    if risk > int(os.getenv("RUGCHECK_MIN_RISK", "20")):
+        return
+    if mint in _ADMITTED:  # admitted by a concurrent duplicate while we awaited
+        _DUPES["suppressed"] += 1
+        return
+
+    if not legacy:
+        print(
+            f"✅ SAFE COIN: {name} ({symbol}) | mint={mint} | DEX={dex} | risk={risk} | tx=https://solscan.io/tx/{signature}"
+        )
+
+    # claim the mint before awaiting the write so a concurrent duplicate is suppressed
+    _ADMITTED.put(mint, True, ADMIT_TTL_SEC)
+    try:
+        await upsert_safe_token_async(
+            address=mint,
+            name=name,
+            symbol=symbol,
+            dex=dex,
+            risk=risk,
+            signature=signature,
+            rc=rc,
+        )
+
+        if legacy:
+            print(f"💾 Stored old format token in database")
+        else:
+            current_count = await count_tokens_async()
+            print(f"💾 Stored in database (Total: {current_count})")
+
+        if not is_blacklisted(mint):
+            LIFECYCLE.admit(mint)
+            token = {
+                "address": mint,
+                "name": name,
+                "symbol": symbol,
+                "dex": dex,
+                "risk": risk,
+                "signature": signature,
+                "pool": pool,
+            }
+            dispatch_new_token(token)
+            # fetch seed bars in the background so indicators are warm by the first live bar
+            WARMSTART.spawn(token)
+            # push prices from the pool's reserve accounts when CHAIN_FEED=1 (polling otherwise)
+            CHAIN_FEED.spawn(token)
+
+        if not legacy:
+            if risk <= 10:
+                risk_cat = "🟢 LOW RISK"
+            elif risk <= 15:
+                risk_cat = "🟡 MEDIUM-LOW"
+            else:
+                risk_cat = "🟠 MEDIUM"
+
+            print(f"   {risk_cat} | {name} ({symbol}) | DEX: {dex}")
+    except Exception as e:
+        _ADMITTED.pop(mint)
+        print(f"❌ Database error{' for old format' if legacy else ''}: {e}")
+
+async def _recheck_risk(mint: str):
+    RISK_CACHE.invalidate(mint)  # bypass the cached "unable to generate report"
+    return await get_risk_level_cached(mint)
+
+async def _admit_rechecked(token: dict, risk: int, rc: dict):
+    print(f"🔁 Re-check scored {token['name']} ({token['symbol']}) | mint={token['mint']} | risk={risk}")
+    await admit_pair(**token, risk=risk, rc=rc)
+
+RECHECK = RecheckQueue(_recheck_risk, _admit_rechecked)
+settings(RECHECK.configure)
+
+def _spawn_pair_task(**kw):
+    """Run process_new_pair in the background so the websocket loop never waits on RugCheck."""
+    task = asyncio.create_task(process_new_pair(**kw))
+    _PAIR_TASKS.add(task)
+    task.add_done_callback(_PAIR_TASKS.discard)
+
 async def handle_connection(ws):
     """Handle the websocket connection and message processing."""
     print("[ws] connected")
@@ -115,6 +316,7 @@ async def handle_connection(ws):
         message_count = 0
         async for raw in ws:
             message_count += 1
+            JOURNAL.record("ws", raw)
 
             try:
                 msg = json.loads(raw)
@@ -141,60 +343,15 @@ async def handle_connection(ws):
 
                     base = pair.get("baseToken", {})
                     meta = (base.get("info") or {}).get("metadata") or {}
-                    name = meta.get("name", "Unknown")
-                    symbol = meta.get("symbol", "")
-                    mint = base.get("account", "")
-
-                    MIN_RISK = int(os.getenv("RUGCHECK_MIN_RISK", "20"))
-                    if SKIP_RISK_CHECK:
-                        risk = 0
-                        rc = {"risk": 0, "summary": "Risk check skipped"}
-                    else:
-                        risk, rc = get_risk_level(mint)
-                        if risk is None or risk > MIN_RISK:
-                            continue
-
-                    print(
-                        f"✅ SAFE COIN: {name} ({symbol}) | mint={mint} | DEX={dex} | risk={risk} | tx=https://solscan.io/tx/{signature}"
+                    _spawn_pair_task(
+                        mint=base.get("account", ""),
+                        name=meta.get("name", "Unknown"),
+                        symbol=meta.get("symbol", ""),
+                        dex=dex,
+                        signature=signature,
+                        pool=pair.get("ammAccount", ""),
                     )
 
-                    try:
-                        upsert_safe_token(
-                            address=mint,
-                            name=name,
-                            symbol=symbol,
-                            dex=dex,
-                            risk=risk,
-                            signature=signature,
-                            rc=rc,
-                        )
-
-                        current_count = count_tokens()
-                        print(f"💾 Stored in database (Total: {current_count})")
-
-                        if not is_blacklisted(mint):
-                            dispatch_new_token(
-                                {
-                                    "address": mint,
-                                    "name": name,
-                                    "symbol": symbol,
-                                    "dex": dex,
-                                    "risk": risk,
-                                    "signature": signature,
-                                }
-                            )
-
-                        if risk <= 10:
-                            risk_cat = "🟢 LOW RISK"
-                        elif risk <= 15:
-                            risk_cat = "🟡 MEDIUM-LOW"
-                        else:
-                            risk_cat = "🟠 MEDIUM"
-
-                        print(f"   {risk_cat} | {name} ({symbol}) | DEX: {dex}")
-                    except Exception as e:
-                        print(f"❌ Database error: {e}")
-
                 elif msg.get("pair") and msg.get("signature"):
                     pair = msg["pair"]
                     dex = pair.get("sourceExchange", "unknown")
@@ -209,40 +366,10 @@ async def handle_connection(ws):
                     print(
                         f"🆕 NEW COIN: {name} ({symbol}) | mint={mint} | DEX={dex} | tx=https://solscan.io/tx/{sig}"
                     )
-
-                    try:
-                        if SKIP_RISK_CHECK:
-                            risk = 0
-                            rc = {"risk": 0, "summary": "Risk check skipped"}
-                        else:
-                            risk, rc = get_risk_level(mint)
-                            if risk is None or risk > int(os.getenv("RUGCHECK_MIN_RISK", "20")):
-                                continue
-
-                        upsert_safe_token(
-                            address=mint,
-                            name=name,
-                            symbol=symbol,
-                            dex=dex,
-                            risk=risk,
-                            signature=sig,
-                            rc=rc,
-                        )
-                        print(f"💾 Stored old format token in database")
-
-                        if not is_blacklisted(mint):
-                            dispatch_new_token(
-                                {
-                                    "address": mint,
-                                    "name": name,
-                                    "symbol": symbol,
-                                    "dex": dex,
-                                    "risk": risk,
-                                    "signature": sig,
-                                }
-                            )
-                    except Exception as e:
-                        print(f"❌ Database error for old format: {e}")
+                    _spawn_pair_task(
+                        mint=mint, name=name, symbol=symbol, dex=dex,
+                        signature=sig, legacy=True,
+                    )
                 elif msg.get("result") and msg.get("result", {}).get("message"):
                     print(
                         f"[INFO] {msg['result']['message']} (ID: {msg['result'].get('subscription_id', 'unknown')})"
@@ -259,7 +386,7 @@ async def handle_connection(ws):
         except asyncio.CancelledError:
             pass
 
-async def listen():
+def make_ws_manager() -> WSConnectionManager:
     # Allow the client to participate in server heartbeats
     connect_kwargs = {
         "ping_interval": 20,  # default ping interval
@@ -267,37 +394,88 @@ async def listen():
         "close_timeout": 10,  # Wait 10 seconds for close
         "max_size": None      # No message size limit
     }
-
-    print(f"[debug] Connecting to {URL} with API key: {API_KEY[:10]}...")
-    
-    # Try different header parameter names for different websockets versions
+    manager = WSConnectionManager(URL, handle_connection, headers={"X-API-KEY": API_KEY},
+                                  connect_kwargs=connect_kwargs)
+    print(f"[debug] Connecting to {URL} with API key: {API_KEY[:10]}... "
+          f"(header kwarg: {manager.header_kwarg}, hot standby: {manager.hot_standby})")
+    return manager
+
+def _format_http_stats() -> str:
+    parts = [f"{name}: reuse {m['reuse_rate']:.1%} of {m['requests']} req, "
+             f"{m['new_connections']} conns, handshake avg {m['avg_handshake_ms']:.0f}ms"
+             for name, m in client_stats().items()]
+    return "🌐 HTTP pools - " + (" | ".join(parts) if parts else "no requests yet")
+
+def _format_price_source_stats() -> str:
+    r = PRICE_ROUTER.stats()
+    parts = [f"{name} {p['state']}: won {p['wins']}/{p['requests']}, {p['errors']} err, p95 {p['p95_ms']:.0f}ms"
+             for name, p in r["providers"].items()]
+    return (f"💱 Price sources ({r['mode']}) - p50 {r['p50_ms']:.0f}ms | p99 {r['p99_ms']:.0f}ms | "
+            f"hedged: {r['hedged']} | failovers: {r['failovers']} | failed: {r['failed']} | " + " | ".join(parts))
+
+def _format_poll_cadence_stats() -> str:
+    c = POLL_CADENCE.stats()
+    return (f"⏱️  Poll cadence - useful samples/request: {c['useful_per_request']:.1f} "
+            f"({c['useful_share']:.0%} of {c['polled']} polled rows changed) | requests: {c['requests']} | "
+            f"carried: {c['carried']} | tokens every tick: {c['fast']}/{c['tokens']} | "
+            f"at {POLL_CADENCE.max_sec:.0f}s: {c['slowest']} | median interval {c['median_interval']:.1f}s")
+
+def _format_journal_stats() -> str:
+    j = JOURNAL.stats()
+    if not j["enabled"]:
+        return "📼 Journal - off (set JOURNAL_DIR)"
+    return (f"📼 Journal - records: {j['records']} | {j['bytes'] / 1e6:.1f}MB raw | segments: {j['segments']} | "
+            f"queued: {j['queued_bytes'] / 1e3:.0f}kB | dropped: {j['dropped']} | errors: {j['errors']}")
+
+def _format_lifecycle_stats() -> str:
+    s = LIFECYCLE.stats()
+    states = " | ".join(f"{k}: {n}" for k, n in s["states"].items())
+    return (f"🧬 Lifecycle - {states} | cold evictions: {s['cold']} | retired: {s['retired']} "
+            f"(idle {s['dead']}, rugged {s['rugged']}, blacklisted {s['blacklisted']})")
+
+def _format_warmstart_stats() -> str:
+    w = WARMSTART.stats()
+    if not WARMSTART.enabled:
+        return "🔥 Warm start - off (WARMSTART_SOURCE)"
+    return (f"🔥 Warm start ({w['source']}) - seeded: {w['seeded']} ({w['bars']} bars) | no history: {w['empty']} | "
+            f"too late: {w['late']} | errors: {w['errors']} | avg {w['avg_ms']:.0f}ms")
+
+def _format_chain_feed_stats() -> str:
+    c = CHAIN_FEED.stats()
+    sol = f"${c['sol_usd']:.2f}" if c["sol_usd"] else "n/a"
+    return (f"⛓️  Chain feed - {'connected' if c['connected'] else 'DOWN'} | pushed: {c['covered']}/{c['watching']} tokens "
+            f"({c['subscriptions']} subscriptions) | updates: {c['notifications']} | samples: {c['samples']} | "
+            f"unsupported pools: {c['unsupported']} | errors: {c['errors']} | SOL {sol}")
+
+def _format_screener_stats() -> str:
+    s = get_screener().stats()
+    return (f"🔎 Screener - {s['conditions']} conditions over {s['tokens']} tokens | screens: {s['screens']} "
+            f"({s['screened']} new bars, avg {s['avg_screen_ms']:.2f}ms) | matches: {s['matches']}")
+
+async def _format_memory_stats() -> str:
     try:
-        # Try extra_headers first
-        async with websockets.connect(URL, extra_headers={"X-API-KEY": API_KEY}, **connect_kwargs) as ws:
-            await handle_connection(ws)
-    except TypeError:
-        try:
-            # Try additional_headers
-            async with websockets.connect(URL, additional_headers={"X-API-KEY": API_KEY}, **connect_kwargs) as ws:
-                await handle_connection(ws)
-        except TypeError:
-            try:
-                # Try headers
-                async with websockets.connect(URL, headers={"X-API-KEY": API_KEY}, **connect_kwargs) as ws:
-                    await handle_connection(ws)
-            except TypeError:
-                # Last resort: try without headers and send API key in the subscription message
-                print("[ws] Trying connection without custom headers...")
-                async with websockets.connect(URL, **connect_kwargs) as ws:
-                    await handle_connection(ws)
+        return format_memory_report(memory_report(sqlite=await default_db().page_usage_async()))
+    except Exception as e:
+        return f"🧮 Memory - unavailable: {e}"
+
+def _format_ws_stats() -> str:
+    if WS_MANAGER is None:
+        return "🔌 Websocket - not started"
+    w = WS_MANAGER.stats()
+    return (f"🔌 Websocket - sessions: {w['sessions']} | downtime windows: {w['downtime_windows']} | "
+            f"total downtime: {w['total_downtime_sec']:.2f}s | longest gap: {w['longest_gap_sec']:.2f}s | "
+            f"standby takeovers: {w['standby_takeovers']}")
 
 async def main():
+    init()
+    install_signal_handlers()
+
     # Show comprehensive startup information
     print("🚀 SOLANA MEMECOIN SNIPER - NEW PAIRS MONITOR")
     print("=" * 60)
     
     # Database statistics
-    stats = get_stats()
+    stats = await get_stats_async()
     print(f"📊 DATABASE STATUS:")
     print(f"   Total tokens: {stats['total']}")
     print(f"   Low risk (0-10): {stats['low_risk_0_10']}")
@@ -311,7 +489,7 @@ async def main():
     print(f"   Chain: Solana")
     
     # Recent activity
-    recent = get_recent_tokens(hours=24, limit=5)
+    recent = await get_recent_tokens_async(hours=24, limit=5)
     if recent:
         print(f"\n🕐 RECENT ACTIVITY (Last 24h):")
         for token in recent:
@@ -323,36 +501,51 @@ async def main():
     
     # Load paper trading strategies
     load_strategies()
+
+    # Long-lived pooled HTTP clients for RugCheck and DexScreener
+    start_clients()
     
     # Start periodic maintenance and price watching tasks
     maintenance_task = asyncio.create_task(periodic_maintenance())
-    prices_task = asyncio.create_task(watch_prices())
+    prices_task = asyncio.create_task(watch_prices(push_feed=CHAIN_FEED if CHAIN_FEED.enabled else None))
+    recheck_task = asyncio.create_task(RECHECK.run())
+    chain_task = asyncio.create_task(CHAIN_FEED.run()) if CHAIN_FEED.enabled else None
+
+    global WS_MANAGER
+    WS_MANAGER = make_ws_manager()
 
     try:
-        while True:
-            try:
-                await listen()
-            except websockets.ConnectionClosed as e:
-                print(f"[ws] closed: close_code={e.code} close_reason={e.reason}")
-            except Exception as e:
-                print(f"[ws] error: {e}")
-            print("[ws] reconnecting in 5s...")
-            await asyncio.sleep(5)
+        await WS_MANAGER.run()
     finally:
-        for t in (maintenance_task, prices_task):
+        for t in list(_PAIR_TASKS):
+            t.cancel()
+        await WARMSTART.close()
+        for t in (maintenance_task, prices_task, recheck_task, chain_task):
+            if t is None:
+                continue
             t.cancel()
             try:
                 await t
             except asyncio.CancelledError:
                 pass
+        await close_clients()
+        JOURNAL.close()
+        PROFILER.finish()
         
         # Shutdown paper trading strategies
         from .papertrading import shutdown
         shutdown()
 
+        # Flush queued writes and stop the DB threads
+        default_db().writer.close()
+        default_db().reads.close()
+
 if __name__ == "__main__":
     try:
         asyncio.run(main())
+    except ConfigError as e:
+        print(e)
+        sys.exit(1)
     except KeyboardInterrupt:
         print("\n\n🛑 Shutting down...")
         print("=" * 60)
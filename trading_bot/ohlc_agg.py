@@ -2,89 +2,115 @@
 # Non-overlapping windows (exactly 30 samples each).
 import time
 from collections import defaultdict, deque
+from .records import Bar
 
 SAMPLES_PER_BAR = 30  # 30 samples × 2s interval ≈ 60s
 INACTIVITY_SEC = 300  # cleanup buffers for tokens inactive >5m
+CLEANUP_EVERY_SEC = 30  # idle scan at most this often (sample time): add_sample stays O(1) per token
 
 class _Buf:
-    __slots__ = ("samples", "first_ts")
+    __slots__ = ("samples", "first_ts", "need")
     def __init__(self):
-        self.samples = deque()  # each item: (ts, price, fdv, mc)
+        self.samples = deque()  # each item: plain (ts, price, fdv, mc) tuple in records.Sample field order
         self.first_ts = None
+        self.need = SAMPLES_PER_BAR  # samples that close the current window (fewer after prime())
 
-_buffers: dict[str, _Buf] = defaultdict(_Buf)
+class OHLCAggregator:
+    """Per-token sample buffers; one instance per independent feed (the live watcher, a backtest...)."""
 
-
-def _cleanup(now: float) -> None:
-    stale = [addr for addr, buf in _buffers.items() if buf.samples and (now - buf.samples[-1][0] > INACTIVITY_SEC)]
-    for addr in stale:
-        del _buffers[addr]
+    def __init__(self):
+        self.buffers: dict[str, _Buf] = defaultdict(_Buf)
+        self._last_cleanup = float("-inf")
+
+    def _cleanup(self, now: float) -> None:
+        if self._last_cleanup <= now < self._last_cleanup + CLEANUP_EVERY_SEC:
+            return
+        self._last_cleanup = now
+        stale = [addr for addr, buf in self.buffers.items()
+                 if buf.samples and (now - buf.samples[-1][0] > INACTIVITY_SEC)]
+        for addr in stale:
+            del self.buffers[addr]
+
+    def prime(self, address: str, samples: int) -> None:
+        """
+        Close this token's next bar after `samples` samples instead of 30 (warm
+        start: seed bars end at the last full minute, so the first live bar
+        only has to cover what is left of the current one).
+        """
+        buf = self.buffers[address]
+        buf.need = max(1, min(SAMPLES_PER_BAR, int(samples)))
+
+    def evict(self, address: str) -> None:
+        """Drop a token's partial window (lifecycle eviction)."""
+        self.buffers.pop(address, None)
+
+    def add_sample(self, address: str, *, price: float = None, fdv: float = None, mc: float = None,
+                   ts: float = None):
+        """
+        Add one sample for a token. Returns a Bar when 30 samples (or a primed count) are collected, else None.
+        Bar fields: address, ts_start (epoch sec, floored to minute), open, high, low, close, fdv_usd, marketcap_usd, samples.
+        """
+        if price is None:
+            return None  # don't count missing price
+
+        ts = ts or time.time()
+        self._cleanup(ts)
+        buf = self.buffers[address]
+        if buf.first_ts is None:
+            buf.first_ts = ts
+
+        buf.samples.append((ts, price, fdv, mc))
+    
+        # DEBUG: Show progress towards OHLC bar
+        current_samples = len(buf.samples)
+        need = buf.need
+        if current_samples % 5 == 0:  # Show progress every 5 samples
+            remaining = need - current_samples
+            print(f"📊 OHLC Progress for {address}: {current_samples}/{need} samples ({remaining} remaining)")
+
+        if len(buf.samples) < need:
+            return None
+
+        # Build bar from exactly `need` (normally 30) most-recent samples
+        items = [buf.samples.popleft() for _ in range(need)]
+        buf.need = SAMPLES_PER_BAR
+        # Reset first_ts for next window
+        buf.first_ts = None if not buf.samples else buf.samples[0][0]
+
+        prices = [p for (_, p, _, _) in items]
+        fdvs = [f for (_, _, f, _) in items if f is not None]
+        mcs  = [m for (_, _, _, m) in items if m is not None]
+
+        open_ = prices[0]
+        high_ = max(prices)
+        low_  = min(prices)
+        close_= prices[-1]
+
+        # Use last observed FDV/MC in the window (common convention for candles)
+        fdv_last = fdvs[-1] if fdvs else None
+        mc_last  = mcs[-1] if mcs else None
+
+        # Floor to the minute of the first sample in the window
+        first_ts = items[0][0]
+        ts_start = int(first_ts // 60 * 60)
+
+        # DEBUG: Show detailed OHLC bar creation
+        print(f"🎯 OHLC BAR CREATED for {address}:")
+        print(f"   📅 Time: {time.strftime('%H:%M:%S', time.gmtime(ts_start))}")
+        print(f"   💰 O:{open_:.6f} H:{high_:.6f} L:{low_:.6f} C:{close_:.6f}")
+        print(f"   📈 Price Range: {((high_ - low_) / low_ * 100):.2f}%")
+        print(f"   💎 FDV: ${fdv_last:,.0f}" if fdv_last else "   💎 FDV: N/A")
+        print(f"   🏦 MC: ${mc_last:,.0f}" if mc_last else "   🏦 MC: N/A")
+        print(f"   📊 Samples: {len(items)}")
+        print("-" * 50)
+
+        return Bar(address, ts_start, open_, high_, low_, close_, fdv_last, mc_last, need)
+
+
+# Process-wide default instance behind the module-level helper
+AGGREGATOR = OHLCAggregator()
+_buffers = AGGREGATOR.buffers
 
 def add_sample(address: str, *, price: float = None, fdv: float = None, mc: float = None, ts: float = None):
-    """
-    Add one sample for a token. Returns a dict bar when 30 samples are collected, else None.
-    Bar fields: address, ts_start (epoch sec, floored to minute), open, high, low, close, fdv_usd, marketcap_usd, samples.
-    """
-    if price is None:
-        return None  # don't count missing price
-
-    ts = ts or time.time()
-    _cleanup(ts)
-    buf = _buffers[address]
-    if buf.first_ts is None:
-        buf.first_ts = ts
-
-    buf.samples.append((ts, price, fdv, mc))
-    
-    # DEBUG: Show progress towards OHLC bar
-    current_samples = len(buf.samples)
-    if current_samples % 5 == 0:  # Show progress every 5 samples
-        remaining = SAMPLES_PER_BAR - current_samples
-        print(f"📊 OHLC Progress for {address}: {current_samples}/{SAMPLES_PER_BAR} samples ({remaining} remaining)")
-
-    if len(buf.samples) < SAMPLES_PER_BAR:
-        return None
-
-    # Build bar from exactly 30 most-recent samples
-    items = [buf.samples.popleft() for _ in range(SAMPLES_PER_BAR)]
-    # Reset first_ts for next window
-    buf.first_ts = None if not buf.samples else buf.samples[0][0]
-
-    prices = [p for (_, p, _, _) in items]
-    fdvs = [f for (_, _, f, _) in items if f is not None]
-    mcs  = [m for (_, _, _, m) in items if m is not None]
-
-    open_ = prices[0]
-    high_ = max(prices)
-    low_  = min(prices)
-    close_= prices[-1]
-
-    # Use last observed FDV/MC in the window (common convention for candles)
-    fdv_last = fdvs[-1] if fdvs else None
-    mc_last  = mcs[-1] if mcs else None
-
-    # Floor to the minute of the first sample in the window
-    first_ts = items[0][0]
-    ts_start = int(first_ts // 60 * 60)
-
-    # DEBUG: Show detailed OHLC bar creation
-    print(f"🎯 OHLC BAR CREATED for {address}:")
-    print(f"   📅 Time: {time.strftime('%H:%M:%S', time.gmtime(ts_start))}")
-    print(f"   💰 O:{open_:.6f} H:{high_:.6f} L:{low_:.6f} C:{close_:.6f}")
-    print(f"   📈 Price Range: {((high_ - low_) / low_ * 100):.2f}%")
-    print(f"   💎 FDV: ${fdv_last:,.0f}" if fdv_last else "   💎 FDV: N/A")
-    print(f"   🏦 MC: ${mc_last:,.0f}" if mc_last else "   🏦 MC: N/A")
-    print(f"   📊 Samples: {len(items)}")
-    print("-" * 50)
-
-    return {
-        "address": address,
-        "ts_start": ts_start,
-        "open": open_,
-        "high": high_,
-        "low":  low_,
-        "close": close_,
-        "fdv_usd": fdv_last,
-        "marketcap_usd": mc_last,
-        "samples": SAMPLES_PER_BAR,
-    }
+    """OHLCAggregator.add_sample on the default instance."""
+    return AGGREGATOR.add_sample(address, price=price, fdv=fdv, mc=mc, ts=ts)
@@ -1,11 +1,18 @@
-from .loader import load_strategies, dispatch_new_token, dispatch_bar_1m, shutdown
-from .db import get_watchable_addresses, is_blacklisted
+from .loader import (PaperTrader, PAPER_TRADER, load_strategies, dispatch_new_token, dispatch_bar_1m, dispatch_screen, dispatch_evict,
+                     get_screener, shutdown)
+from .db import get_watchable_addresses, get_watchable_addresses_async, is_blacklisted
 
 __all__ = [
+    "PaperTrader",
+    "PAPER_TRADER",
     "load_strategies",
     "dispatch_new_token", 
     "dispatch_bar_1m",
+    "dispatch_screen",
+    "dispatch_evict",
+    "get_screener",
     "shutdown",
     "get_watchable_addresses",
+    "get_watchable_addresses_async",
     "is_blacklisted"
 ]
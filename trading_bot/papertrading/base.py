@@ -1,14 +1,47 @@
+from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from ..db import Database, default_db
+from ..indicators import IndicatorRegistry, INDICATORS
+from ..indicators.spec import IndicatorSpec
+from ..records import Bar, IndicatorValue
+from ..tsstore import TS_STORE, TimeSeriesStore
+from .db import PaperDB, paper_db
+if TYPE_CHECKING:
+    from .screener import Screener   # NumPy: loaded only once a strategy screens
 
 @dataclass
 class StrategyContext:
+    db: Optional[Database] = None   # None → the process-wide default database
+    screener: Optional[Screener] = None  # set by the loader when a strategy declares screens()
+    indicators: IndicatorRegistry = INDICATORS   # the pipeline's indicator values (get_values/slot)
+    store: TimeSeriesStore = TS_STORE   # the pipeline's closed bars (window/last), current bar included
+
+    @property
+    def database(self) -> Database:
+        return self.db or default_db()
+
+    @property
+    def paper(self) -> PaperDB:
+        """Paper positions/trades/blacklist helpers on this context's database."""
+        return paper_db(self.db)
+
     def emit_alert(self, title: str, data: Optional[Dict[str, Any]] = None):
         print(f"[PAPER][ALERT] {title} | {data or {}}")
 
 class Strategy:
+    def indicators(self) -> List[IndicatorSpec]:
+        """Indicators this strategy reads; the registry computes only the union of these."""
+        return []
     def on_start(self, ctx: StrategyContext): ...
+    def screens(self) -> Dict[str, str]:
+        """Named screener conditions ({name: expression}) evaluated over all tokens at once."""
+        return {}
     def on_new_token(self, ctx: StrategyContext, token: Dict[str, Any]): ...
-    def on_bar_1m(self, ctx: StrategyContext, bar: Dict[str, Any],
-                  ema_rows: list[Dict[str,Any]], atr_rows: list[Dict[str,Any]]): ...
+    def on_bar_1m(self, ctx: StrategyContext, bar: Bar,
+                  ema_rows: list[IndicatorValue], atr_rows: list[IndicatorValue]): ...
+    def on_screen(self, ctx: StrategyContext, name: str, addresses: List[str]):
+        """Tokens whose new bar matched screen `name` (values: ctx.screener.latest(address))."""
+    def on_evict(self, ctx: StrategyContext, address: str):
+        """The token was retired (dead/blacklisted): forget any per-token state."""
     def on_shutdown(self, ctx: StrategyContext): ...
@@ -1,111 +1,221 @@
-# Paper-only tables & helpers, built on top of the main in-RAM SQLite connection.
+# Paper-only tables & helpers, built on top of a core Database (tables, writer thread, candles).
+import sqlite3, weakref
+from concurrent.futures import Future
 from typing import Any, Optional
-from ..db import DB, get_ohlc_1m  # reuse core DB + candles
+from ..db import Database, default_db, register_schema
+from ..migrations import EPOCH_NOW
+from ..tsstore import TS_STORE, TimeSeriesStore
 
 # --- Paper schema ---
-DB.execute("""
-CREATE TABLE IF NOT EXISTS paper_blacklist (
-  address TEXT PRIMARY KEY,
-  reason  TEXT,
-  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-""")
-DB.execute("""
-CREATE TABLE IF NOT EXISTS paper_positions (
-  address              TEXT PRIMARY KEY,
-  status               TEXT NOT NULL,                 -- 'flat'|'long'|'ended'|'dropped'
-  entry_ts             INTEGER,
-  entry_price          REAL,
-  stop_price           REAL,
-  breakeven_price      REAL,
-  high_since_entry     REAL,
-  half_sold            INTEGER DEFAULT 0,
-  entry_marketcap_usd  REAL,                          -- <- NEW: MC at entry
-  updated_at           DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-""")
-DB.execute("""
-CREATE TABLE IF NOT EXISTS paper_trades (
-  id        INTEGER PRIMARY KEY AUTOINCREMENT,
-  address   TEXT NOT NULL,
-  side      TEXT NOT NULL,                        -- 'buy'|'sell'
-  qty       REAL,
-  price     REAL,
-  ts_start  INTEGER,
-  note      TEXT
-);
-""")
-DB.execute("CREATE INDEX IF NOT EXISTS idx_paper_positions_status ON paper_positions(status)")
-DB.execute("CREATE INDEX IF NOT EXISTS idx_paper_trades_addr ON paper_trades(address)")
-DB.commit()
+@register_schema
+def create_paper_schema(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS paper_blacklist (
+      address TEXT PRIMARY KEY,
+      reason  TEXT,
+      created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s','now') AS INTEGER))   -- epoch seconds (UTC)
+    );
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS paper_positions (
+      address              TEXT PRIMARY KEY,
+      status               TEXT NOT NULL,                 -- 'flat'|'long'|'ended'|'dropped'
+      entry_ts             INTEGER,
+      entry_price          REAL,
+      stop_price           REAL,
+      breakeven_price      REAL,
+      high_since_entry     REAL,
+      half_sold            INTEGER DEFAULT 0,
+      entry_marketcap_usd  REAL,                          -- <- NEW: MC at entry
+      updated_at           INTEGER NOT NULL DEFAULT (CAST(strftime('%s','now') AS INTEGER))   -- epoch seconds (UTC)
+    );
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS paper_trades (
+      id        INTEGER PRIMARY KEY AUTOINCREMENT,
+      address   TEXT NOT NULL,
+      side      TEXT NOT NULL,                        -- 'buy'|'sell'
+      qty       REAL,
+      price     REAL,
+      ts_start  INTEGER,
+      note      TEXT
+    );
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_paper_positions_status ON paper_positions(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_paper_positions_updated ON paper_positions(updated_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_paper_trades_addr ON paper_trades(address)")
+
+_PURGE_TABLES = ("prices", "ohlc_1m", "ohlc_5m", "ohlc_1h", "ema_1m", "atr_1m",
+                 "paper_positions", "paper_trades", "tokens")
+
+_WATCHABLE_SQL = """
+  SELECT address FROM tokens
+  WHERE address NOT IN (SELECT address FROM paper_blacklist)
+  ORDER BY last_seen DESC
+"""
+
+_POS_COLS = ["status","entry_ts","entry_price","stop_price","breakeven_price","high_since_entry","half_sold","entry_marketcap_usd"]
+
 
 # --- Paper helpers ---
-def blacklist_add(address: str, reason: str = ""):
-    DB.execute("INSERT OR REPLACE INTO paper_blacklist(address, reason) VALUES(?, ?)", (address, reason))
-    DB.commit()
+def _report(fut: Future) -> None:
+    if fut.exception() is not None:
+        print(f"[paper] write failed: {fut.exception()}")
+
+
+class PaperDB:
+    """
+    Paper helpers bound to one Database (and the time-series store purged alongside it).
+    Writes are queued to the writer thread without waiting for them: strategies
+    run on the event loop. Positions and the blacklist are mirrored in memory
+    (loaded on first use), so reads see a write before it has committed.
+    Each write returns its Future; flush() waits for all of them.
+    """
+
+    def __init__(self, db: Database, store: TimeSeriesStore = TS_STORE):
+        self.db = db
+        self.store = store
+        self._positions: Optional[dict[str, tuple]] = None
+        self._blacklist: Optional[set[str]] = None
+
+    def _submit(self, fn) -> Future:
+        fut = self.db.writer.submit(fn)
+        fut.add_done_callback(_report)
+        return fut
+
+    def _load(self) -> None:
+        if self._positions is None:
+            rows = self.db.conn.execute(f"SELECT address,{','.join(_POS_COLS)} FROM paper_positions").fetchall()
+            self._blacklist = {r[0] for r in self.db.conn.execute("SELECT address FROM paper_blacklist")}
+            self._positions = {r[0]: tuple(r) for r in rows}
+
+    def load(self) -> None:
+        """Mirror positions and the blacklist now rather than on first use (before the event loop writes)."""
+        self._load()
+
+    def flush(self) -> None:
+        """Wait until every write queued so far has committed."""
+        self.db.writer.flush()
+
+    def blacklist_add(self, address: str, reason: str = "") -> Future:
+        self._load()
+        self._blacklist.add(address)
+        return self._submit(lambda c: c.execute(
+            "INSERT OR REPLACE INTO paper_blacklist(address, reason) VALUES(?, ?)", (address, reason)))
+
+    def is_blacklisted(self, address: str) -> bool:
+        self._load()
+        return address in self._blacklist
+
+    def purge_token_data(self, address: str) -> Future:
+        # remove all runtime data for this token (paper scope + core) in one writer command
+        def purge(c):
+            for table in _PURGE_TABLES:
+                c.execute(f"DELETE FROM {table} WHERE address=?", (address,))
+        self._load()
+        self._positions.pop(address, None)
+        self.store.drop(address)
+        return self._submit(purge)
+
+    async def get_watchable_addresses_async(self) -> list[str]:
+        # full-table scan: run it on the read pool instead of the event loop
+        return [r[0] for r in await self.db.reads.fetchall(_WATCHABLE_SQL)]
+
+    def get_watchable_addresses(self, limit: Optional[int] = None) -> list[str]:
+        if limit is None:
+            rows = self.db.conn.execute(_WATCHABLE_SQL).fetchall()
+        else:
+            rows = self.db.conn.execute(_WATCHABLE_SQL + " LIMIT ?", (int(limit),)).fetchall()
+        return [r[0] for r in rows]
+
+    def pos_get(self, address: str):
+        """(address, status, entry_ts, entry_price, stop_price, breakeven_price, high_since_entry,
+        half_sold, entry_marketcap_usd), or None."""
+        self._load()
+        return self._positions.get(address)
+
+    def pos_upsert(self, address: str, **kw: Any) -> Future:
+        vals = [kw.get(c) for c in _POS_COLS]
+        self._load()
+        self._positions[address] = (address, *vals)
+        return self._submit(lambda c: c.execute(f"""
+          INSERT INTO paper_positions(address,{','.join(_POS_COLS)},updated_at)
+          VALUES(?,?,?,?,?,?,?,?,?,{EPOCH_NOW})
+          ON CONFLICT(address) DO UPDATE SET
+            {', '.join([f"{c}=excluded.{c}" for c in _POS_COLS])},
+            updated_at=excluded.updated_at
+        """, (address, *vals)))
+
+    def trade_log(self, address: str, side: str, qty: Optional[float], price: float, ts_start: int,
+                  note: str = "") -> Future:
+        return self._submit(lambda c: c.execute("""
+          INSERT INTO paper_trades(address, side, qty, price, ts_start, note)
+          VALUES(?,?,?,?,?,?)
+        """, (address, side, qty, price, ts_start, note)))
+
+    def pos_set_entry_marketcap(self, address: str, mc_usd: Optional[float]) -> Future:
+        self._load()
+        row = self._positions.get(address)
+        if row is not None:
+            self._positions[address] = row[:-1] + (mc_usd,)
+        return self._submit(lambda c: c.execute(
+            "UPDATE paper_positions SET entry_marketcap_usd=? WHERE address=?", (mc_usd, address)))
+
+    def get_token_meta(self, address: str) -> tuple[Optional[str], Optional[str]]:
+        row = self.db.conn.execute("SELECT name, symbol FROM tokens WHERE address=?", (address,)).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def get_entry_marketcap(self, address: str) -> Optional[float]:
+        row = self.pos_get(address)
+        return float(row[8]) if row and row[8] is not None else None
+
+
+_PAPER: "weakref.WeakKeyDictionary[Database, PaperDB]" = weakref.WeakKeyDictionary()
+
+def paper_db(db: Optional[Database] = None) -> PaperDB:
+    """The PaperDB of `db` (default: the process-wide Database)."""
+    db = db or default_db()
+    p = _PAPER.get(db)
+    if p is None:
+        p = _PAPER[db] = PaperDB(db)
+    return p
+
+
+# --- Module-level helpers on the default database ---
+def __getattr__(name: str):
+    if name == "DB":  # the default connection, as this module used to re-export it
+        return default_db().conn
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def blacklist_add(address: str, reason: str = "") -> Future:
+    return paper_db().blacklist_add(address, reason)
 
 def is_blacklisted(address: str) -> bool:
-    return bool(DB.execute("SELECT 1 FROM paper_blacklist WHERE address=?", (address,)).fetchone())
-
-def purge_token_data(address: str):
-    # remove all runtime data for this token (paper scope + core)
-    DB.execute("DELETE FROM prices      WHERE address=?", (address,))
-    DB.execute("DELETE FROM ohlc_1m     WHERE address=?", (address,))
-    DB.execute("DELETE FROM ema_1m      WHERE address=?", (address,))
-    DB.execute("DELETE FROM atr_1m      WHERE address=?", (address,))
-    DB.execute("DELETE FROM paper_positions WHERE address=?", (address,))
-    DB.execute("DELETE FROM paper_trades    WHERE address=?", (address,))
-    DB.execute("DELETE FROM tokens      WHERE address=?", (address,))
-    DB.commit()
+    return paper_db().is_blacklisted(address)
+
+def purge_token_data(address: str) -> Future:
+    return paper_db().purge_token_data(address)
+
+async def get_watchable_addresses_async() -> list[str]:
+    return await paper_db().get_watchable_addresses_async()
 
 def get_watchable_addresses(limit: Optional[int] = None) -> list[str]:
-    if limit is None:
-        rows = DB.execute("""
-          SELECT address FROM tokens
-          WHERE address NOT IN (SELECT address FROM paper_blacklist)
-          ORDER BY last_seen DESC
-        """).fetchall()
-    else:
-        rows = DB.execute("""
-          SELECT address FROM tokens
-          WHERE address NOT IN (SELECT address FROM paper_blacklist)
-          ORDER BY last_seen DESC
-          LIMIT ?
-        """, (int(limit),)).fetchall()
-    return [r[0] for r in rows]
+    return paper_db().get_watchable_addresses(limit)
 
 def pos_get(address: str):
-    return DB.execute("""
-      SELECT address,status,entry_ts,entry_price,stop_price,breakeven_price,high_since_entry,half_sold,entry_marketcap_usd
-      FROM paper_positions WHERE address=?""", (address,)).fetchone()
-
-def pos_upsert(address: str, **kw: Any):
-    cols = ["status","entry_ts","entry_price","stop_price","breakeven_price","high_since_entry","half_sold","entry_marketcap_usd"]
-    vals = [kw.get(c) for c in cols]
-    DB.execute(f"""
-      INSERT INTO paper_positions(address,{','.join(cols)},updated_at)
-      VALUES(?,?,?,?,?,?,?,?,?,CURRENT_TIMESTAMP)
-      ON CONFLICT(address) DO UPDATE SET
-        {', '.join([f"{c}=excluded.{c}" for c in cols])},
-        updated_at=CURRENT_TIMESTAMP
-    """, (address, *vals))
-    DB.commit()
-
-def trade_log(address: str, side: str, qty: Optional[float], price: float, ts_start: int, note: str = ""):
-    DB.execute("""
-      INSERT INTO paper_trades(address, side, qty, price, ts_start, note)
-      VALUES(?,?,?,?,?,?)
-    """, (address, side, qty, price, ts_start, note))
-    DB.commit()
-
-def pos_set_entry_marketcap(address: str, mc_usd: Optional[float]):
-    DB.execute("UPDATE paper_positions SET entry_marketcap_usd=? WHERE address=?", (mc_usd, address))
-    DB.commit()
+    return paper_db().pos_get(address)
+
+def pos_upsert(address: str, **kw: Any) -> Future:
+    return paper_db().pos_upsert(address, **kw)
+
+def trade_log(address: str, side: str, qty: Optional[float], price: float, ts_start: int, note: str = "") -> Future:
+    return paper_db().trade_log(address, side, qty, price, ts_start, note)
+
+def pos_set_entry_marketcap(address: str, mc_usd: Optional[float]) -> Future:
+    return paper_db().pos_set_entry_marketcap(address, mc_usd)
 
 def get_token_meta(address: str) -> tuple[Optional[str], Optional[str]]:
-    row = DB.execute("SELECT name, symbol FROM tokens WHERE address=?", (address,)).fetchone()
-    return (row[0], row[1]) if row else (None, None)
+    return paper_db().get_token_meta(address)
 
 def get_entry_marketcap(address: str) -> Optional[float]:
-    row = DB.execute("SELECT entry_marketcap_usd FROM paper_positions WHERE address=?", (address,)).fetchone()
-    return float(row[0]) if row and row[0] is not None else None
+    return paper_db().get_entry_marketcap(address)
@@ -1,39 +1,156 @@
+from __future__ import annotations
 import os, importlib
-from typing import List, Type
+from typing import List, Optional, Tuple, Type, TYPE_CHECKING
 from .base import Strategy, StrategyContext
+from ..indicators import IndicatorRegistry, INDICATORS, get_plugin
+from ..indicators.spec import config_specs
+from ..records import as_bar
+from ..tsstore import BAR_COLUMNS, TS_STORE, TimeSeriesStore
+if TYPE_CHECKING:
+    from .screener import Screener
 
-_CTX = StrategyContext()
-_STRATS: List[Strategy] = []
-
-def load_strategies():
-    if _STRATS: return _STRATS
-    raw = os.getenv("PAPER_STRATEGIES", "").strip()
-    if not raw: return []
-    for path in [p.strip() for p in raw.split(",") if p.strip()]:
-        try:
-            mod_path, cls_name = path.rsplit(".", 1)
-            mod = importlib.import_module(mod_path)
-            cls: Type[Strategy] = getattr(mod, cls_name)
-        except Exception as e:
-            print(f"[paper] failed to load strategy '{path}': {e}")
-            continue
-        _STRATS.append(cls())
-    for s in _STRATS:
-        try: s.on_start(_CTX)
-        except Exception as e: print(f"[paper] on_start error: {e}")
-    return _STRATS
+
+class PaperTrader:
+    """
+    The paper strategies of one price pipeline: their context (database,
+    screener, indicator registry, time-series store) and dispatch. Pass one per
+    pipeline alongside db/agg/store/lifecycle, built on that same `store`; the
+    module functions below use PAPER_TRADER.
+    """
+
+    def __init__(self, db=None, indicators: Optional[IndicatorRegistry] = None,
+                 store: Optional[TimeSeriesStore] = None):
+        self.ctx = StrategyContext(db=db, indicators=indicators if indicators is not None else IndicatorRegistry(),
+                                   store=store if store is not None else TS_STORE)
+        self.strategies: List[Strategy] = []
+        self.screens: List[Tuple[Strategy, str, str]] = []   # (strategy, its screen name, screener key)
+
+    @property
+    def indicators(self) -> IndicatorRegistry:
+        return self.ctx.indicators
+
+    @property
+    def store(self) -> TimeSeriesStore:
+        return self.ctx.store
+
+    @property
+    def screener(self) -> Optional[Screener]:
+        return self.ctx.screener
+
+    def load(self, db=None, paths: Optional[str] = None) -> List[Strategy]:
+        """
+        Instantiate the strategies (`paths`, default PAPER_STRATEGIES) once; `db`
+        (a Database) is what their context reads and writes, and can be rebound later.
+        """
+        if db is not None:
+            self.ctx.db = db
+        if self.strategies:
+            return self.strategies
+        raw = (os.getenv("PAPER_STRATEGIES", "") if paths is None else paths).strip()
+        if not raw: return []
+        for path in [p.strip() for p in raw.split(",") if p.strip()]:
+            try:
+                mod_path, cls_name = path.rsplit(".", 1)
+                mod = importlib.import_module(mod_path)
+                cls: Type[Strategy] = getattr(mod, cls_name)
+            except Exception as e:
+                print(f"[paper] failed to load strategy '{path}': {e}")
+                continue
+            self.strategies.append(cls())
+        plan = self._plan_indicators()
+        self._plan_screens(plan)
+        for s in self.strategies:
+            try: s.on_start(self.ctx)
+            except Exception as e: print(f"[paper] on_start error: {e}")
+        return self.strategies
+
+    def _plan_indicators(self):
+        # compute only what strategies consume; fall back to EMA_1M_*/ATR_1M_* config
+        specs = []
+        for s in self.strategies:
+            try: specs.extend(s.indicators())
+            except Exception as e: print(f"[paper] indicators() error: {e}")
+        plan = self.indicators.set_plan(specs or config_specs())
+        print(f"[paper] indicator plan: {', '.join(map(str, plan)) or 'none'}")
+        return plan
+
+    def _plan_screens(self, plan):
+        # one screener over bar + planned indicator columns, only if some strategy screens
+        wanted = []
+        for s in self.strategies:
+            try: wanted.extend((s, name, condition) for name, condition in s.screens().items())
+            except Exception as e: print(f"[paper] screens() error: {e}")
+        if not wanted:
+            return
+        from .screener import Screener
+        columns = list(BAR_COLUMNS) + [c for spec in plan for c in get_plugin(spec.kind).columns(spec)]
+        screener = Screener(columns)
+        for s, name, condition in wanted:
+            key = f"{type(s).__name__}.{name}"
+            try: screener.add(key, condition)
+            except ValueError as e: print(f"[paper] screen {key} skipped: {e}"); continue
+            self.screens.append((s, name, key))
+        self.ctx.screener = screener if self.screens else None
+        if self.screens:
+            print(f"[paper] screens: {', '.join(k for _, _, k in self.screens)}")
+
+    def dispatch_new_token(self, token: dict):
+        for s in self.strategies:
+            try: s.on_new_token(self.ctx, token)
+            except Exception as e: print(f"[paper] on_new_token error: {e}")
+
+    def dispatch_bar_1m(self, bar, ema_rows: list, atr_rows: list):
+        bar = as_bar(bar)
+        if self.ctx.screener is not None:
+            self.ctx.screener.update(bar, self.indicators.storage_values(bar.address))
+        for s in self.strategies:
+            try: s.on_bar_1m(self.ctx, bar, ema_rows, atr_rows)
+            except Exception as e: print(f"[paper] on_bar_1m error: {e}")
+
+    def dispatch_screen(self):
+        """Screen the tokens with new bars since the last call; each strategy gets its matches."""
+        if self.ctx.screener is None:
+            return
+        hits = self.ctx.screener.screen()
+        for s, name, key in self.screens:
+            if key in hits:
+                try: s.on_screen(self.ctx, name, hits[key])
+                except Exception as e: print(f"[paper] on_screen error: {e}")
+
+    def dispatch_evict(self, address: str):
+        if self.ctx.screener is not None:
+            self.ctx.screener.drop(address)
+        for s in self.strategies:
+            try: s.on_evict(self.ctx, address)
+            except Exception as e: print(f"[paper] on_evict error: {e}")
+
+    def shutdown(self):
+        for s in self.strategies:
+            try: s.on_shutdown(self.ctx)
+            except Exception as e: print(f"[paper] on_shutdown error: {e}")
+
+
+# Process-wide default instance, on the default indicator registry
+PAPER_TRADER = PaperTrader(indicators=INDICATORS)
+
+def load_strategies(db=None):
+    """Instantiate PAPER_STRATEGIES once; `db` (a Database) is what their context reads and writes."""
+    return PAPER_TRADER.load(db)
+
+def get_screener() -> Optional[Screener]:
+    return PAPER_TRADER.screener
 
 def dispatch_new_token(token: dict):
-    for s in _STRATS:
-        try: s.on_new_token(_CTX, token)
-        except Exception as e: print(f"[paper] on_new_token error: {e}")
+    PAPER_TRADER.dispatch_new_token(token)
+
+def dispatch_bar_1m(bar, ema_rows: list, atr_rows: list):
+    PAPER_TRADER.dispatch_bar_1m(bar, ema_rows, atr_rows)
+
+def dispatch_screen():
+    PAPER_TRADER.dispatch_screen()
 
-def dispatch_bar_1m(bar: dict, ema_rows: list[dict], atr_rows: list[dict]):
-    for s in _STRATS:
-        try: s.on_bar_1m(_CTX, bar, ema_rows, atr_rows)
-        except Exception as e: print(f"[paper] on_bar_1m error: {e}")
+def dispatch_evict(address: str):
+    PAPER_TRADER.dispatch_evict(address)
 
 def shutdown():
-    for s in _STRATS:
-        try: s.on_shutdown(_CTX)
-        except Exception as e: print(f"[paper] on_shutdown error: {e}")
+    PAPER_TRADER.shutdown()
@@ -0,0 +1,247 @@
+# Cross-sectional screening: the last SCREENER_HISTORY_BARS bars and indicator
+# values of every token in one array (column × token × lag, lag 0 = the bar
+# that just closed), and declarative entry conditions evaluated over all tokens
+# at once instead of one on_bar_1m call (and SQL lookup) per token.
+# A condition is a Python-syntax expression over storage column names
+# (open/high/low/close/fdv_usd/marketcap_usd/samples, indicator columns such as
+# ema_5_low or atr_14, and `bars`, the bars seen), e.g.
+#     close > ema_5_low and close > fill(rolling_max(prev(high), 3), open)
+# Functions: prev(col, k=1) (the column k bars back), rolling_max / rolling_min
+# / rolling_mean(col, n) over the last n bars (missing bars are skipped),
+# fill(x, y) (y where x is missing), abs(x). Missing values (NaN) never match.
+# screen() evaluates every condition once over the array and returns, per
+# condition, the tokens among those with a new bar since the last screen.
+import os, ast, time, typing
+import numpy as np
+from ..env import settings
+
+
+@settings
+def _read_settings() -> None:
+    global HISTORY
+    HISTORY = int(os.getenv("SCREENER_HISTORY_BARS", "16"))
+
+
+INITIAL_ROWS = 256
+NAN = float("nan")
+
+
+class _Series:
+    """A column with its lags ((rows, lags) view); used as a value it is lag 0."""
+    __slots__ = ("hist",)
+    def __init__(self, hist: np.ndarray):
+        self.hist = hist
+
+
+def _now(x):
+    return x.hist[:, 0] if isinstance(x, _Series) else x
+
+def _series(x, fn: str) -> _Series:
+    if not isinstance(x, _Series):
+        raise ValueError(f"{fn}() needs a column")
+    return x
+
+def _window(x, n: int, fn: str) -> np.ndarray:
+    return _series(x, fn).hist[:, :max(1, int(n))]
+
+def _prev(x, k: int = 1) -> _Series:
+    return _Series(_series(x, "prev").hist[:, int(k):])
+
+def _rolling_mean(x, n: int) -> np.ndarray:
+    w = _window(x, n, "rolling_mean")
+    count = np.sum(~np.isnan(w), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, np.nansum(w, axis=1) / count, NAN)
+
+def _reduce(ufunc, w: np.ndarray) -> np.ndarray:
+    # fmax/fmin skip NaN (all-NaN stays NaN) without nanmax's warning; no lags left → NaN
+    return ufunc.reduce(w, axis=1) if w.shape[1] else np.full(w.shape[0], NAN)
+
+FUNCTIONS: dict[str, typing.Callable] = {
+    "prev": _prev,
+    "rolling_max": lambda x, n: _reduce(np.fmax, _window(x, n, "rolling_max")),
+    "rolling_min": lambda x, n: _reduce(np.fmin, _window(x, n, "rolling_min")),
+    "rolling_mean": _rolling_mean,
+    "fill": lambda x, y: np.where(np.isnan(_now(x)), _now(y), _now(x)),
+    "abs": lambda x: np.abs(_now(x)),
+}
+_BINOPS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+_COMPARE = {ast.Gt: np.greater, ast.GtE: np.greater_equal, ast.Lt: np.less, ast.LtE: np.less_equal,
+            ast.Eq: np.equal, ast.NotEq: np.not_equal}
+
+
+class Condition:
+    """A parsed condition; ValueError for syntax outside the small grammar or unknown columns."""
+
+    def __init__(self, source: str, columns: typing.Container[str] = ()):
+        self.source = source
+        try:
+            self.tree = ast.parse(source.strip(), mode="eval").body
+        except SyntaxError as e:
+            raise ValueError(f"condition {source!r}: {e.msg}") from None
+        self.names: set[str] = set()
+        self._check(self.tree)
+        unknown = sorted(n for n in self.names if n != "bars" and n not in columns)
+        if columns and unknown:
+            raise ValueError(f"condition {source!r}: unknown column(s) {', '.join(unknown)}")
+
+    def _check(self, node) -> None:
+        if isinstance(node, ast.Name):
+            self.names.add(node.id)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+                and not isinstance(node.value, bool):
+            pass
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS \
+                and not node.keywords:
+            for arg in node.args:
+                self._check(arg)
+        elif isinstance(node, ast.BoolOp) or isinstance(node, ast.Compare) and \
+                all(type(op) in _COMPARE for op in node.ops):
+            for child in getattr(node, "values", None) or [node.left, *node.comparators]:
+                self._check(child)
+        elif isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            self._check(node.left); self._check(node.right)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            self._check(node.operand)
+        else:
+            raise ValueError(f"condition {self.source!r}: unsupported {ast.dump(node)[:40]}")
+
+    def evaluate(self, env: typing.Callable[[str], typing.Any]) -> np.ndarray:
+        """Boolean mask over the rows; `env(name)` returns a column as _Series or an array."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.asarray(_now(self._eval(self.tree, env)), dtype=bool)
+
+    def _eval(self, node, env):
+        if isinstance(node, ast.Name):
+            return env(node.id)
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Call):
+            return FUNCTIONS[node.func.id](*(self._eval(a, env) for a in node.args))
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            out = _now(self._eval(node.values[0], env))
+            for v in node.values[1:]:
+                out = combine(out, _now(self._eval(v, env)))
+            return out
+        if isinstance(node, ast.Compare):
+            left, out = _now(self._eval(node.left, env)), True
+            for op, right in zip(node.ops, node.comparators):
+                right = _now(self._eval(right, env))
+                out = np.logical_and(out, _COMPARE[type(op)](left, right))
+                left = right
+            return out
+        if isinstance(node, ast.BinOp):
+            return _BINOPS[type(node.op)](_now(self._eval(node.left, env)), _now(self._eval(node.right, env)))
+        if isinstance(node.op, ast.Not):
+            return np.logical_not(_now(self._eval(node.operand, env)))
+        return np.negative(_now(self._eval(node.operand, env)))
+
+
+class Screener:
+    """Latest bars/indicators of every token in column arrays, screened by named conditions."""
+
+    def __init__(self, columns: typing.Iterable[str], history: typing.Optional[int] = None):
+        self.columns = list(dict.fromkeys(columns))
+        self._col = {c: i for i, c in enumerate(self.columns)}
+        self.history = max(1, HISTORY if history is None else history)   # None: SCREENER_HISTORY_BARS
+        self.conditions: dict[str, Condition] = {}
+        self.rows: dict[str, int] = {}
+        self._alloc(INITIAL_ROWS)
+        self._free = list(range(INITIAL_ROWS - 1, -1, -1))
+        self.counters = {"updates": 0, "screens": 0, "screened": 0, "matches": 0, "dropped": 0}
+        self._sec = 0.0
+
+    def _alloc(self, n: int) -> None:
+        self.hist = np.full((len(self.columns), n, self.history), NAN)
+        self.bars = np.zeros(n, dtype=np.int64)
+        self.ts = np.zeros(n, dtype=np.int64)
+        self.pending = np.zeros(n, dtype=bool)
+        self.addresses = np.full(n, None, dtype=object)
+
+    def _grow(self) -> None:
+        old = (self.hist, self.bars, self.ts, self.pending, self.addresses)
+        n = len(self.bars)
+        self._alloc(2 * n)
+        self.hist[:, :n] = old[0]
+        self.bars[:n], self.ts[:n], self.pending[:n], self.addresses[:n] = old[1:]
+        self._free.extend(range(2 * n - 1, n - 1, -1))
+
+    def add(self, name: str, condition: str) -> Condition:
+        """Register (or replace) a named condition; ValueError if it doesn't parse or names unknown columns."""
+        self.conditions[name] = Condition(condition, self._col)
+        return self.conditions[name]
+
+    def update(self, bar, values: typing.Optional[dict] = None) -> None:
+        """A closed bar (Bar) and the token's indicator values ({storage column: value})."""
+        row = self.rows.get(bar.address)
+        if row is None:
+            if not self._free:
+                self._grow()
+            row = self.rows[bar.address] = self._free.pop()
+            self.addresses[row] = bar.address
+        h = self.hist[:, row]
+        if self.bars[row] and self.ts[row] == bar.ts_start:
+            pass                      # the same minute again: replace it
+        else:
+            h[:, 1:] = h[:, :-1]
+            self.bars[row] += 1
+        values = values or {}
+        h[:, 0] = [NAN if v is None else v
+                   for v in (getattr(bar, c, None) if c not in values else values[c] for c in self.columns)]
+        self.ts[row] = bar.ts_start
+        self.pending[row] = True
+        self.counters["updates"] += 1
+
+    def drop(self, address: str) -> None:
+        row = self.rows.pop(address, None)
+        if row is None:
+            return
+        self.hist[:, row] = NAN
+        self.bars[row] = self.ts[row] = 0
+        self.pending[row] = False
+        self.addresses[row] = None
+        self._free.append(row)
+        self.counters["dropped"] += 1
+
+    def _env(self, name: str):
+        if name == "bars":
+            return self.bars.astype(float)
+        return _Series(self.hist[self._col[name]])
+
+    def evaluate(self, condition: typing.Union[str, Condition]) -> list[str]:
+        """Every token (not only new bars) matching `condition`, now."""
+        cond = condition if isinstance(condition, Condition) else Condition(condition, self._col)
+        return self.addresses[cond.evaluate(self._env) & (self.bars > 0)].tolist()
+
+    def screen(self) -> dict[str, list[str]]:
+        """{condition name: matching tokens} among those with a new bar since the last screen."""
+        if not self.pending.any():
+            return {}
+        t = time.perf_counter()
+        pending = self.pending.copy()
+        self.pending[:] = False
+        out = {}
+        for name, cond in self.conditions.items():
+            hits = self.addresses[cond.evaluate(self._env) & pending].tolist()
+            if hits:
+                out[name] = hits
+            self.counters["matches"] += len(hits)
+        self.counters["screens"] += 1
+        self.counters["screened"] += int(pending.sum())
+        self._sec += time.perf_counter() - t
+        return out
+
+    def latest(self, address: str) -> typing.Optional[dict]:
+        """Lag-0 values of a token ({column: value or None}, plus ts_start and bars)."""
+        row = self.rows.get(address)
+        if row is None:
+            return None
+        out = {c: (None if np.isnan(v) else float(v)) for c, v in zip(self.columns, self.hist[:, row, 0])}
+        out["ts_start"], out["bars"] = int(self.ts[row]), int(self.bars[row])
+        return out
+
+    def stats(self) -> dict:
+        c = self.counters
+        return {**c, "tokens": len(self.rows), "conditions": len(self.conditions),
+                "avg_screen_ms": self._sec / c["screens"] * 1000 if c["screens"] else 0.0}
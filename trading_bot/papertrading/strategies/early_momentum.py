@@ -1,17 +1,19 @@
 import os
 from typing import Dict, Any, List
 from ..base import Strategy, StrategyContext
-from ..db import (
-    pos_get, pos_upsert, purge_token_data, blacklist_add, is_blacklisted,
-    pos_set_entry_marketcap, get_token_meta, get_entry_marketcap
-)
-from ...db import get_ohlc_1m  # reuse candles
+from ...env import settings
+from ...indicators import ema_spec, atr_spec, INDICATORS
+from ...records import Bar, IndicatorValue
+from ...tsstore import ema_column, atr_column
 
-def _find_ema(rows: List[Dict[str, Any]], length: int, source: str = "low"):
-    return next((r["value"] for r in rows if r.get("length")==length and r.get("source")==source), None)
+EMA5_LOW = ema_spec(5, "low")
+ATR14 = atr_spec(14)
 
-def _find_atr(rows: List[Dict[str, Any]], length: int):
-    return next((r["value"] for r in rows if r.get("length")==length), None)
+def _find_ema(rows: List[IndicatorValue], length: int, source: str = "low"):
+    return next((r.value for r in rows if r.length==length and r.source==source), None)
+
+def _find_atr(rows: List[IndicatorValue], length: int):
+    return next((r.value for r in rows if r.length==length), None)
 
 def _fmt_pct(x):
     return f"{x:.2f}%" if x is not None else "N/A"
@@ -25,26 +27,87 @@ def _fmt_usd(x):
     if absx >= 1_000:         return f"${x/1_000:.2f}K"
     return f"${x:.2f}"
 
-LOOKBACK = int(os.getenv("LOOKBACK_BREAKOUT_BARS", "3"))
-ATR_K    = float(os.getenv("ATR_STOP_MULT", "2"))
-TRAIL_P  = float(os.getenv("TRAIL_PCT", "0.20"))
+@settings
+def _read_settings() -> None:
+    global LOOKBACK, ATR_K, TRAIL_P, ENTRY
+    LOOKBACK = int(os.getenv("LOOKBACK_BREAKOUT_BARS", "3"))
+    ATR_K    = float(os.getenv("ATR_STOP_MULT", "2"))
+    TRAIL_P  = float(os.getenv("TRAIL_PCT", "0.20"))
+    # close above EMA(5, low) and above the highs of the previous LOOKBACK bars (the open while there are none)
+    ENTRY = (f"close > {ema_column(5, 'low')} and {atr_column(14)} >= 0 "
+             f"and close > fill(rolling_max(prev(high), {LOOKBACK}), open)")
 
 class EarlyMomentum(Strategy):
     def __init__(self):
         self._state: Dict[str, Dict[str, Any]] = {}
+        self._ema_slot = self._atr_slot = None
+        self._indicators = INDICATORS
+        self._screened = False
+
+    def indicators(self):
+        return [EMA5_LOW, ATR14]
+
+    def screens(self):
+        return {"entry": ENTRY}
+
+    def on_start(self, ctx: StrategyContext):
+        self._indicators = getattr(ctx, "indicators", INDICATORS)
+        self._ema_slot, self._atr_slot = self._indicators.slot(EMA5_LOW), self._indicators.slot(ATR14)
+        # started via the loader with a screener: entries come from on_screen, not per bar
+        self._screened = getattr(ctx, "screener", None) is not None
+
+    def _indicator_values(self, addr, ema_rows, atr_rows):
+        vals = self._indicators.get_values(addr)
+        if vals is not None and self._ema_slot is not None:
+            return vals[self._ema_slot], vals[self._atr_slot]
+        # not started via the loader: scan the rows instead
+        return _find_ema(ema_rows, 5, "low"), _find_atr(atr_rows, 14)
 
     def on_new_token(self, ctx: StrategyContext, token: Dict[str, Any]):
         addr = token["address"]
-        if is_blacklisted(addr): return
-        self._state[addr] = {"first_open": None, "first_ts": None, "bars_seen": 0, "dropped": False}
+        paper = ctx.paper
+        if paper.is_blacklisted(addr): return
+        # name/symbol kept for the exit log, so it needs no query on the event loop
+        self._state[addr] = {"first_open": None, "first_ts": None, "bars_seen": 0, "dropped": False,
+                             "name": token.get("name"), "symbol": token.get("symbol")}
         print(f"[DEBUG] New token: {addr}")
 
-    def on_bar_1m(self, ctx: StrategyContext, bar: Dict[str, Any],
-                  ema_rows: List[Dict[str, Any]], atr_rows: List[Dict[str, Any]]):
-        addr = bar["address"]; ts = bar["ts_start"]
-        if is_blacklisted(addr): return
-
-        o, h, l, c = float(bar["open"]), float(bar["high"]), float(bar["low"]), float(bar["close"])
+    def on_evict(self, ctx: StrategyContext, address: str):
+        self._state.pop(address, None)
+
+    def _enter(self, ctx: StrategyContext, addr, ts, close, high, marketcap_usd, atr14):
+        paper = ctx.paper
+        entry = close
+        stop  = entry - float(ATR_K) * float(atr14)
+        paper.pos_upsert(addr, status="long", entry_ts=ts, entry_price=entry,
+                   stop_price=stop, breakeven_price=None, high_since_entry=high, half_sold=0,
+                   entry_marketcap_usd=marketcap_usd)  # <- save entry MC
+        # ensure entry MC is set (if separate write needed)
+        paper.pos_set_entry_marketcap(addr, marketcap_usd)
+        ctx.emit_alert("ENTRY", {"addr": addr, "ts": ts, "entry": entry, "stop": stop})
+        print(f"[DEBUG] {addr}: Trade executed! Entry: {entry}, Stop: {stop}")
+
+    def on_screen(self, ctx: StrategyContext, name: str, addresses: List[str]):
+        # the entry screen matched these tokens' new bars; only flat ones that weren't dropped enter
+        paper = ctx.paper
+        for addr in addresses:
+            st = self._state.get(addr)
+            if (st and st["dropped"]) or paper.is_blacklisted(addr):
+                continue
+            row = paper.pos_get(addr)
+            if (row[1] if row else "flat") not in (None, "flat", "ended"):
+                continue
+            v = ctx.screener.latest(addr)
+            self._enter(ctx, addr, v["ts_start"], v["close"], v["high"], v["marketcap_usd"],
+                        v[atr_column(14)])
+
+    def on_bar_1m(self, ctx: StrategyContext, bar: Bar,
+                  ema_rows: List[IndicatorValue], atr_rows: List[IndicatorValue]):
+        addr = bar.address; ts = bar.ts_start
+        paper = ctx.paper
+        if paper.is_blacklisted(addr): return
+
+        o, h, l, c = bar.open, bar.high, bar.low, bar.close
         st = self._state.setdefault(addr, {"first_open": None, "first_ts": None, "bars_seen": 0, "dropped": False})
 
         if st["first_open"] is None:
@@ -53,30 +116,29 @@ class EarlyMomentum(Strategy):
         # 80% dump in first 10 bars → blacklist & purge
         if not st["dropped"] and st["bars_seen"] < 10 and c <= 0.2 * float(st["first_open"]):
             st["dropped"] = True
-            blacklist_add(addr, "dump>=80%_first10m")
-            purge_token_data(addr)
+            paper.blacklist_add(addr, "dump>=80%_first10m")
+            paper.purge_token_data(addr)
             ctx.emit_alert("DROP & PURGE (>=80% in first 10m)", {"addr": addr})
             return
         st["bars_seen"] += 1
         if st["dropped"]: return
 
-        row = pos_get(addr)
+        row = paper.pos_get(addr)
         status = row[1] if row else "flat"
 
-        ema5_low = _find_ema(ema_rows, 5, "low")
-        atr14 = _find_atr(atr_rows, 14)
+        ema5_low, atr14 = self._indicator_values(addr, ema_rows, atr_rows)
 
         print(f"[DEBUG] {addr}: status={status}, ema5_low={ema5_low}, atr14={atr14}, close={c}")
 
-        # Entry
-        if status in (None, "flat", "ended") and ema5_low is not None and atr14 is not None:
+        # Entry (screened: on_screen handles it for all tokens at once)
+        if not self._screened and status in (None, "flat", "ended") and ema5_low is not None and atr14 is not None:
             print(f"[DEBUG] {addr}: Checking entry conditions...")
-            prev = get_ohlc_1m(addr, LOOKBACK + 1)
-            print(f"[DEBUG] {addr}: Got {len(prev) if prev else 0} previous bars")
-            if prev and len(prev) >= 2:
-                prev_only = prev[1:LOOKBACK+1]
-                recent_high = max(p[2] for p in prev_only) if prev_only else o
-                print(f"[DEBUG] {addr}: Recent high from {len(prev_only)} bars: {recent_high}")
+            w = ctx.store.window(addr, n=LOOKBACK + 1, columns=["high"])  # the pipeline's own bars
+            prev_highs = w["high"][w["ts"] < ts][-LOOKBACK:]
+            print(f"[DEBUG] {addr}: Got {prev_highs.size} previous bars")
+            if prev_highs.size:
+                recent_high = float(prev_highs.max())
+                print(f"[DEBUG] {addr}: Recent high from {prev_highs.size} bars: {recent_high}")
             else:
                 recent_high = o
                 print(f"[DEBUG] {addr}: Using open as recent high: {recent_high}")
@@ -84,19 +146,11 @@ class EarlyMomentum(Strategy):
             print(f"[DEBUG] {addr}: Entry check: {c} > {ema5_low} AND {c} > {recent_high}?")
             if c > float(ema5_low) and c > float(recent_high):
                 print(f"[DEBUG] {addr}: ENTRY CONDITIONS MET! Executing trade...")
-                entry = c
-                stop  = entry - float(ATR_K) * float(atr14)
-                pos_upsert(addr, status="long", entry_ts=ts, entry_price=entry,
-                           stop_price=stop, breakeven_price=None, high_since_entry=h, half_sold=0,
-                           entry_marketcap_usd=bar.get("marketcap_usd"))  # <- save entry MC
-                # ensure entry MC is set (if separate write needed)
-                pos_set_entry_marketcap(addr, bar.get("marketcap_usd"))
-                ctx.emit_alert("ENTRY", {"addr": addr, "ts": ts, "entry": entry, "stop": stop})
-                print(f"[DEBUG] {addr}: Trade executed! Entry: {entry}, Stop: {stop}")
+                self._enter(ctx, addr, ts, c, h, bar.marketcap_usd, atr14)
                 return
             else:
                 print(f"[DEBUG] {addr}: Entry conditions NOT met")
-        else:
+        elif not self._screened:
             print(f"[DEBUG] {addr}: Not checking entry - status={status}, ema5_low={ema5_low}, atr14={atr14}")
 
         # Manage position
@@ -123,14 +177,14 @@ class EarlyMomentum(Strategy):
 
             # Exit
             if c <= stop_price:
-                pos_upsert(addr, status="ended", entry_ts=entry_ts, entry_price=entry_price,
+                paper.pos_upsert(addr, status="ended", entry_ts=entry_ts, entry_price=entry_price,
                            stop_price=stop_price, breakeven_price=breakeven_price,
                            high_since_entry=high_since_entry, half_sold=half_sold)
 
                 # >>> Console log for COMPLETED TRADE
-                name, sym = get_token_meta(addr)
-                start_mc = get_entry_marketcap(addr)
-                end_mc   = bar.get("marketcap_usd")
+                name, sym = st.get("name"), st.get("symbol")
+                start_mc = paper.get_entry_marketcap(addr)
+                end_mc   = bar.marketcap_usd
                 pct_gain = (c / entry_price - 1.0) * 100.0 if entry_price else None
                 label = f"{name} ({sym})" if name or sym else addr
                 print(
@@ -141,6 +195,6 @@ class EarlyMomentum(Strategy):
                 ctx.emit_alert("EXIT (stop hit)", {"addr": addr, "ts": ts, "exit": c, "stop": stop_price})
                 return
             else:
-                pos_upsert(addr, status="long", entry_ts=entry_ts, entry_price=entry_price,
+                paper.pos_upsert(addr, status="long", entry_ts=entry_ts, entry_price=entry_price,
                            stop_price=stop_price, breakeven_price=breakeven_price,
                            high_since_entry=high_since_entry, half_sold=half_sold, entry_marketcap_usd=entry_marketcap_usd)
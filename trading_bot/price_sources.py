@@ -0,0 +1,290 @@
+# Price providers behind one interface, and a router that spreads a batch
+# request across them so one slow or failing upstream neither delays samples
+# nor stops bars.
+# - PriceProvider.fetch(addrs) returns rows in fetch_token_batch's shape
+#   ({address, price_usd, fdv_usd, marketcap_usd}); DexScreener and Jupiter's
+#   price API are built in (PRICE_PROVIDERS, in order of preference).
+# - PriceRouter ranks the providers that are up by health: p95 latency over
+#   the last requests divided by a success-rate EWMA. PRICE_SOURCE_MODE:
+#     failover  ask the best one; on error the next one
+#     hedge     as failover, plus: no answer after the best one's own p95 →
+#               ask the next one too; first answer wins, the other is
+#               cancelled (at most PRICE_HEDGE_BUDGET of requests are hedged)
+#     race      ask every provider that is up at once; first answer wins
+#   PRICE_FAIL_THRESHOLD consecutive errors take a provider down for a
+#   cooldown that doubles while it keeps failing; afterwards one request is
+#   sent to it alongside the normal one (a probe) and success brings it back.
+# - Providers without fdv/market cap (Jupiter) get them scaled from the last
+#   row that had both (supply doesn't change between samples).
+import os, time, asyncio, typing
+from collections import deque
+from .dexscreener_client import fetch_token_batch, _to_float
+from .http_clients import get_client
+from .journal import JOURNAL
+from .risk_cache import TTLCache
+from .env import settings
+
+
+@settings
+def _read_settings() -> None:
+    global PROVIDERS, MODE, HEDGE_DEFAULT_MS, HEDGE_MIN_MS, HEDGE_BUDGET, FAIL_THRESHOLD, COOLDOWN_SEC, COOLDOWN_MAX_SEC
+    PROVIDERS = [p.strip() for p in os.getenv("PRICE_PROVIDERS", "dexscreener").split(",") if p.strip()]
+    MODE = os.getenv("PRICE_SOURCE_MODE", "hedge")                                # failover | hedge | race
+    HEDGE_DEFAULT_MS = float(os.getenv("PRICE_HEDGE_DEFAULT_MS", "500"))          # until a provider has a p95
+    HEDGE_MIN_MS = float(os.getenv("PRICE_HEDGE_MIN_MS", "20"))
+    HEDGE_BUDGET = float(os.getenv("PRICE_HEDGE_BUDGET", "0.1"))                  # share of requests hedged
+    FAIL_THRESHOLD = int(os.getenv("PRICE_FAIL_THRESHOLD", "3"))
+    COOLDOWN_SEC = float(os.getenv("PRICE_COOLDOWN_SEC", "5"))
+    COOLDOWN_MAX_SEC = float(os.getenv("PRICE_COOLDOWN_MAX_SEC", "120"))
+
+
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20       # latencies before a provider's own p95 is trusted
+HEDGE_BURST = 5        # hedges allowed on top of the budget (startup)
+SUCCESS_ALPHA = 0.1
+SCALE_TTL_SEC = 3600   # fdv/mc per price kept for providers that don't report them
+SCALE_MAX = 50_000
+
+
+def _pct(values: typing.Iterable[float], q: float) -> float:
+    v = sorted(values)
+    return v[min(len(v) - 1, int(q / 100 * len(v)))] if v else 0.0
+
+
+class PriceProvider:
+    """A batch price upstream; fetch() returns fetch_token_batch-shaped rows for the tokens it knows."""
+    name = "none"
+
+    async def fetch(self, addrs: list[str]) -> list[dict]:
+        return []
+
+
+class DexScreenerProvider(PriceProvider):
+    name = "dexscreener"
+
+    def __init__(self, client=None):
+        self.client = client
+
+    async def fetch(self, addrs: list[str]) -> list[dict]:
+        return await fetch_token_batch(self.client or get_client("dexscreener"), addrs)
+
+
+class JupiterProvider(PriceProvider):
+    """Jupiter price API v2 (GET ?ids=a,b): USD price only, fast and with no per-pair payload."""
+    name = "jupiter"
+
+    def __init__(self, client=None):
+        self.client = client
+
+    async def fetch(self, addrs: list[str]) -> list[dict]:
+        client = self.client or get_client("jupiter")
+        r = await client.get("", params={"ids": ",".join(addrs)})
+        JOURNAL.record("jupiter", r.content, key=f"{r.status_code} {','.join(addrs)}")
+        r.raise_for_status()
+        rows = []
+        for addr, d in ((r.json() or {}).get("data") or {}).items():
+            price = _to_float((d or {}).get("price"))
+            if price:
+                rows.append({"address": addr, "price_usd": price, "fdv_usd": None, "marketcap_usd": None})
+        return rows
+
+
+BACKENDS: dict[str, typing.Callable[[], PriceProvider]] = {
+    "dexscreener": DexScreenerProvider,
+    "jupiter": JupiterProvider,
+}
+
+
+class ProviderHealth:
+    """Latency window, success EWMA and circuit state of one provider."""
+
+    def __init__(self):
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.success = 1.0
+        self.failures = 0          # consecutive
+        self.opens = 0             # consecutive circuit openings (cooldown doubles)
+        self.down_until = 0.0      # 0: up
+        self.probing = False
+        self.counters = {"requests": 0, "errors": 0, "wins": 0, "cancelled": 0}
+
+    def p95(self) -> float:
+        if len(self.latencies) < MIN_SAMPLES:
+            return HEDGE_DEFAULT_MS / 1000
+        return _pct(self.latencies, 95)
+
+    def score(self) -> float:
+        """Lower is better: expected latency inflated by the error rate."""
+        return self.p95() / max(self.success, 0.05)
+
+    def state(self, now: float) -> str:
+        if not self.down_until:
+            return "up"
+        return "probe" if now >= self.down_until else "down"
+
+    def ok(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.success += SUCCESS_ALPHA * (1 - self.success)
+        self.failures = self.opens = 0
+        self.down_until = 0.0
+
+    def failed(self, now: float) -> None:
+        self.counters["errors"] += 1
+        self.success -= SUCCESS_ALPHA * self.success
+        self.failures += 1
+        if self.down_until or self.failures >= FAIL_THRESHOLD:  # a failed probe reopens at once
+            self.down_until = now + min(COOLDOWN_MAX_SEC, COOLDOWN_SEC * 2 ** self.opens)
+            self.opens += 1
+
+
+class PriceRouter:
+    """Routes batch requests over several providers (failover / hedge / race)."""
+
+    def __init__(self, providers: typing.Optional[list[PriceProvider]] = None, *, mode: typing.Optional[str] = None,
+                 hedge_budget: typing.Optional[float] = None):
+        self._given = (providers, mode, hedge_budget)   # None: the module setting
+        self.health: dict[str, ProviderHealth] = {}
+        self.configure()
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)   # end to end, what the watcher waits
+        self._scale = TTLCache(SCALE_MAX)
+        self._probes: set[asyncio.Task] = set()
+        self.counters = {"requests": 0, "hedged": 0, "probes": 0, "failovers": 0, "failed": 0, "filled": 0}
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        providers, mode, hedge_budget = self._given
+        if providers is None:
+            providers = [BACKENDS[name]() for name in PROVIDERS if name in BACKENDS]
+        mode = MODE if mode is None else mode
+        if mode not in ("failover", "hedge", "race"):
+            raise ValueError(f"unknown price source mode {mode!r}")
+        self.providers = providers
+        self.mode = mode
+        self.hedge_budget = HEDGE_BUDGET if hedge_budget is None else hedge_budget
+        self.health = {p.name: self.health.get(p.name) or ProviderHealth() for p in providers}
+
+    def ranked(self, now: float) -> list[PriceProvider]:
+        """Providers that are up, best first; if none is, all of them by soonest recovery."""
+        up = [p for p in self.providers if self.health[p.name].state(now) == "up"]
+        if up:
+            return sorted(up, key=lambda p: self.health[p.name].score())  # stable: ties keep config order
+        return sorted(self.providers, key=lambda p: self.health[p.name].down_until)
+
+    def _may_hedge(self) -> bool:
+        return self.counters["hedged"] < self.hedge_budget * self.counters["requests"] + HEDGE_BURST
+
+    async def _call(self, provider: PriceProvider, addrs: list[str]) -> list[dict]:
+        h = self.health[provider.name]
+        h.counters["requests"] += 1
+        t = time.monotonic()
+        try:
+            rows = await provider.fetch(addrs)
+        except asyncio.CancelledError:
+            h.counters["cancelled"] += 1
+            h.latencies.append(time.monotonic() - t)  # lost the race: at least this slow
+            raise
+        except Exception:
+            h.failed(time.monotonic())
+            raise
+        h.ok(time.monotonic() - t)
+        return rows
+
+    async def fetch(self, addrs: list[str]) -> list[dict]:
+        """Rows for `addrs` from whichever provider answers first; raises the last error if all fail."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        now = time.monotonic()
+        order = self.ranked(now)
+        probes = [p for p in self.providers if self.health[p.name].state(now) == "probe"
+                  and not self.health[p.name].probing and p not in order[:1]]
+        self.counters["requests"] += 1
+        pending: dict[asyncio.Task, PriceProvider] = {}
+        queue = list(order)
+
+        def launch(provider: PriceProvider) -> None:
+            pending[asyncio.create_task(self._call(provider, addrs))] = provider
+            if provider in queue:
+                queue.remove(provider)
+
+        launch(queue[0])
+        for p in probes[:1]:  # the same request to a provider whose cooldown ended; never waited for
+            self._probe(p, addrs)
+        if self.mode == "race":
+            for p in [p for p in queue if self.health[p.name].state(now) == "up"]:
+                launch(p)
+        hedge_at = start + max(HEDGE_MIN_MS / 1000, self.health[order[0].name].p95())
+        hedged = self.mode != "hedge"
+        last_exc: typing.Optional[BaseException] = None
+        try:
+            while pending:
+                timeout = None
+                if not hedged and queue:
+                    timeout = max(0.0, hedge_at - loop.time())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    if self._may_hedge():
+                        self.counters["hedged"] += 1
+                        launch(queue[0])
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        self.health[provider.name].counters["wins"] += 1
+                        self.latencies.append(loop.time() - start)
+                        return self._fill(task.result())
+                    last_exc = task.exception()
+                if not pending and queue:
+                    self.counters["failovers"] += 1
+                    launch(queue[0])
+            self.counters["failed"] += 1
+            raise last_exc
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _probe(self, provider: PriceProvider, addrs: list[str]) -> None:
+        h = self.health[provider.name]
+        h.probing = True
+        self.counters["probes"] += 1
+
+        async def run():
+            try:
+                await self._call(provider, addrs)  # success brings it back up, failure reopens the circuit
+            except Exception:
+                pass
+            finally:
+                h.probing = False
+
+        task = asyncio.create_task(run())
+        self._probes.add(task)
+        task.add_done_callback(self._probes.discard)
+
+    def _fill(self, rows: list[dict]) -> list[dict]:
+        for r in rows:
+            price = r.get("price_usd")
+            if not price:
+                continue
+            if r.get("fdv_usd") is not None:
+                self._scale.put(r["address"], (r["fdv_usd"] / price, (r.get("marketcap_usd") or 0) / price),
+                                SCALE_TTL_SEC)
+                continue
+            scale = self._scale.get(r["address"])
+            if scale is not None:
+                r["fdv_usd"], r["marketcap_usd"] = scale[0] * price, (scale[1] * price) or None
+                self.counters["filled"] += 1
+        return rows
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        providers = {}
+        for p in self.providers:
+            h = self.health[p.name]
+            providers[p.name] = {**h.counters, "state": h.state(now), "success": h.success,
+                                 "p50_ms": _pct(h.latencies, 50) * 1000, "p95_ms": _pct(h.latencies, 95) * 1000}
+        return {**self.counters, "mode": self.mode, "providers": providers,
+                "p50_ms": _pct(self.latencies, 50) * 1000, "p99_ms": _pct(self.latencies, 99) * 1000}
+
+
+# Process-wide router over PRICE_PROVIDERS (the price watcher's default source)
+PRICE_ROUTER = PriceRouter()
+settings(PRICE_ROUTER.configure)
@@ -1,16 +1,24 @@
-import os, math, asyncio, itertools
+from __future__ import annotations
+import os, asyncio, itertools
 import time
-import httpx
 import logging
-from .db import upsert_price, insert_ohlc_1m, insert_ema_1m, insert_atr_1m
-from .dexscreener_client import fetch_token_batch
-from .ohlc_agg import add_sample
-from .indicators import update_all_for_bar
-from .papertrading import get_watchable_addresses, dispatch_bar_1m
+from .db import Database, default_db
+from .price_sources import PRICE_ROUTER, PriceProvider
+from .http_clients import close_clients
+from .ohlc_agg import OHLCAggregator, AGGREGATOR
+from .tsstore import TS_STORE, TimeSeriesStore
+from .lifecycle import LIFECYCLE, TokenLifecycle
+from .poll_cadence import POLL_CADENCE, PollCadence
+from .papertrading import PAPER_TRADER, PaperTrader
+from .papertrading.db import paper_db
+from .env import settings
 
-INTERVAL = float(os.getenv("PRICE_POLL_INTERVAL_SEC", "2"))
-BATCH_SIZE = int(os.getenv("DEXSCREENER_BATCH_SIZE", "30"))
-MAX_REQ_PER_MIN = int(os.getenv("DEXSCREENER_MAX_REQ_PER_MIN", "300"))
+@settings
+def _read_settings() -> None:
+    global INTERVAL, BATCH_SIZE, MAX_REQ_PER_MIN
+    INTERVAL = float(os.getenv("PRICE_POLL_INTERVAL_SEC", "2"))
+    BATCH_SIZE = int(os.getenv("DEXSCREENER_BATCH_SIZE", "30"))
+    MAX_REQ_PER_MIN = int(os.getenv("DEXSCREENER_MAX_REQ_PER_MIN", "300"))
 
 def _chunk(lst, size):
     it = iter(lst)
@@ -25,46 +33,54 @@ def _batches_per_tick(interval_s: float) -> int:
     per_sec = MAX_REQ_PER_MIN / 60.0
     return max(1, int((per_sec * interval_s) // 1))
 
-async def _poll_once(client: httpx.AsyncClient, addr_batches):
+async def ingest_batch(rows: list[dict], now: float, db: Database, agg: OHLCAggregator = AGGREGATOR,
+                       store: TimeSeriesStore = TS_STORE, lifecycle: TokenLifecycle = LIFECYCLE,
+                       fresh: bool = True, trader: PaperTrader = PAPER_TRADER) -> None:
+    """
+    Price samples ({address, price_usd, fdv_usd, marketcap_usd}) through the whole pipeline:
+    the batch is persisted as one writer command, then fed to the aggregator; closed
+    bars go through `trader`'s indicators and strategies.
+    `fresh=False` (carried-forward rows, already persisted) only feeds the aggregator.
+    """
+    live = [r for r in rows if lifecycle.on_sample(r["address"], now)]  # drop retired tokens' samples
+    # 1) persist latest points (price/fdv/mc); the writer thread commits them in one go
+    if fresh:
+        await db.upsert_prices_async(live)
+    # 2) feed the OHLC aggregator; write a candle when ready
+    for r in live:
+        bar = agg.add_sample(
+            r["address"],
+            price=r.get("price_usd"),
+            fdv=r.get("fdv_usd"),
+            mc=r.get("marketcap_usd"),
+            ts=now
+        )
+        if bar:
+            lifecycle.on_bar(bar)
+            ema_rows, atr_rows = trader.indicators.update(bar)
+            await db.store_bar_async(bar, ema_rows, atr_rows)
+            # columnar copy: aligned bar+indicator windows in one read
+            store.append(bar.address, bar, trader.indicators.storage_values(bar.address))
+
+            # the Bar record carries market cap so strategies can log PnL with MC
+            trader.dispatch_bar_1m(bar, ema_rows, atr_rows)
+
+async def _poll_once(source: PriceProvider, addr_batches, db: Database = None,
+                     agg: OHLCAggregator = AGGREGATOR, store: TimeSeriesStore = TS_STORE,
+                     lifecycle: TokenLifecycle = LIFECYCLE, cadence: PollCadence = None,
+                     tick: float = 0.0, trader: PaperTrader = PAPER_TRADER):
+    import httpx
+    db = db or default_db()
+
     async def one(batch):
         try:
-            rows = await fetch_token_batch(client, batch)
-            now = time.time()
-            for r in rows:
-                # 1) persist latest point (price/fdv/mc)
-                upsert_price(r)
-                # 2) feed the OHLC aggregator; write a candle when ready
-                bar = add_sample(
-                    r["address"],
-                    price=r.get("price_usd"),
-                    fdv=r.get("fdv_usd"),
-                    mc=r.get("marketcap_usd"),
-                    ts=now
-                )
-                if bar:
-                    insert_ohlc_1m(bar)
-                    ema_rows, atr_rows = update_all_for_bar({
-                        "address": bar["address"],
-                        "ts_start": bar["ts_start"],
-                        "open":  bar["open"],
-                        "high":  bar["high"],
-                        "low":   bar["low"],
-                        "close": bar["close"],
-                    })
-                    insert_ema_1m(ema_rows)
-                    insert_atr_1m(atr_rows)
-
-                    # >>> add market cap so strategies can log PnL with MC
-                    bar_for_strat = {
-                        "address": bar["address"],
-                        "ts_start": bar["ts_start"],
-                        "open":  bar["open"],
-                        "high":  bar["high"],
-                        "low":   bar["low"],
-                        "close": bar["close"],
-                        "marketcap_usd": bar.get("marketcap_usd"),   # <- NEW
-                    }
-                    dispatch_bar_1m(bar_for_strat, ema_rows, atr_rows)
+            rows = await source.fetch(batch)
+            await ingest_batch(rows, time.time(), db, agg, store, lifecycle, trader=trader)
+            if cadence is not None:
+                for r in rows:
+                    cadence.observe(r, tick)
+                for addr in set(batch).difference(r["address"] for r in rows):
+                    cadence.missing(addr, tick)
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 429:
                 await asyncio.sleep(1.5)  # brief backoff
@@ -73,39 +89,62 @@ async def _poll_once(client: httpx.AsyncClient, addr_batches):
 
     await asyncio.gather(*(one(b) for b in addr_batches))
 
-async def watch_prices(refresh_addrs_every: float = 10.0):
-    limit_per_tick = _batches_per_tick(INTERVAL)
-    timeout = httpx.Timeout(10.0, read=10.0, connect=5.0)
-    limits = httpx.Limits(max_connections=limit_per_tick * 2, max_keepalive_connections=limit_per_tick * 2)
-
-    async with httpx.AsyncClient(timeout=timeout, limits=limits, http2=True) as client:
-        addrs = get_watchable_addresses()
-        last_refresh = 0.0
-        all_batches = list(_chunk(addrs, BATCH_SIZE))
-        idx = 0
-        loop = asyncio.get_event_loop()
+async def _poll_tick(source: PriceProvider, cadence: PollCadence, tick: float, limit_per_tick: int,
+                     db: Database, agg: OHLCAggregator = AGGREGATOR, store: TimeSeriesStore = TS_STORE,
+                     lifecycle: TokenLifecycle = LIFECYCLE, trader: PaperTrader = PAPER_TRADER,
+                     push_feed=None) -> int:
+    """
+    One watcher tick: request the tokens `cadence` says are due (within the
+    request budget), then carry the last row forward for the others so every
+    token still gets its sample this tick. Tokens `push_feed` covers right now
+    are neither requested nor carried (it samples them). Returns the requests sent.
+    """
+    pushed = set() if push_feed is None else {a for a in cadence.tokens if push_feed.covers(a)}
+    due = cadence.due(tick, limit_per_tick * BATCH_SIZE, skip=pushed)
+    batches = list(_chunk(due, BATCH_SIZE))
+    cadence.requested(len(batches))
+    await _poll_once(source, batches, db, agg, store, lifecycle, cadence, tick, trader)
+    await ingest_batch(cadence.carry(tick, pushed.union(due)), time.time(), db, agg, store, lifecycle,
+                       fresh=False, trader=trader)
+    return len(batches)
 
-        while True:
-            now = loop.time()
-            if (now - last_refresh) >= refresh_addrs_every:
-                addrs = get_watchable_addresses()
-                all_batches = list(_chunk(addrs, BATCH_SIZE))
-                idx = 0 if idx >= len(all_batches) else idx
-                last_refresh = now
+async def watch_prices(refresh_addrs_every: float = 10.0, *, db: Database = None,
+                       agg: OHLCAggregator = AGGREGATOR, store: TimeSeriesStore = TS_STORE,
+                       lifecycle: TokenLifecycle = LIFECYCLE, push_feed=None,
+                       source: PriceProvider = PRICE_ROUTER, cadence: PollCadence = POLL_CADENCE,
+                       trader: PaperTrader = PAPER_TRADER):
+    """
+    Poll prices for every watchable token of `db` (default database) into `agg`
+    and `store`; `lifecycle` tracks each token and retires dead ones from all of them.
+    `trader` holds the indicators and paper strategies closed bars are dispatched to
+    (its lifecycle hooks must be the same: pipeline_hooks(agg, store, trader)).
+    Tokens that `push_feed` (e.g. chain_feed.CHAIN_FEED) covers are not polled, checked
+    every tick so they move between the two as coverage changes;
+    `source` is a provider or a price_sources.PriceRouter over several; `cadence`
+    decides per token how often it is actually requested (poll_cadence).
+    """
+    db = db or default_db()
+    paper = paper_db(db)
+    limit_per_tick = _batches_per_tick(INTERVAL)
+    async def targets() -> list[str]:
+        return lifecycle.watchable(await paper.get_watchable_addresses_async())
 
-            if not all_batches:
-                await asyncio.sleep(INTERVAL); continue
+    last_refresh = last_sweep = 0.0
+    loop = asyncio.get_event_loop()
 
-            end = min(idx + limit_per_tick, len(all_batches))
-            cur = all_batches[idx:end]
-            if len(cur) < limit_per_tick and idx != 0:
-                cur += all_batches[0:max(0, limit_per_tick - len(cur))]
-                idx = (idx + limit_per_tick) % len(all_batches)
-            else:
-                idx = end % len(all_batches)
+    while True:
+        now = loop.time()
+        if (now - last_sweep) >= lifecycle.sweep_sec:
+            await lifecycle.sweep(db)
+            last_sweep = now
+        if (now - last_refresh) >= refresh_addrs_every:
+            cadence.sync(await targets())
+            last_refresh = now
 
-            await _poll_once(client, cur)
-            await asyncio.sleep(INTERVAL)
+        await _poll_tick(source, cadence, now, limit_per_tick, db, agg, store, lifecycle, trader, push_feed)
+        # bars closed this tick (and by push_feed since the last one): one screen over all of them
+        trader.dispatch_screen()
+        await asyncio.sleep(INTERVAL)
 
 if __name__ == "__main__":
     print("💰 Starting price watcher...")
@@ -114,7 +153,14 @@ if __name__ == "__main__":
     print(f"   Max requests/min: {MAX_REQ_PER_MIN}")
     print("-" * 50)
     
+    async def _run():
+        try:
+            await watch_prices()
+        finally:
+            await close_clients()
+            default_db().writer.close()
+
     try:
-        asyncio.run(watch_prices())
+        asyncio.run(_run())
     except KeyboardInterrupt:
         print("\n🛑 Price watcher stopped")
@@ -0,0 +1,289 @@
+# Runtime profiling of the running monitor; new_pairs wires it to signals:
+#   SIGUSR1  database summary + sizes of the big in-memory structures
+#   SIGUSR2  start a profiling round, or end the running one early
+# A round samples every thread's stack PROFILE_HZ times a second for
+# PROFILE_CPU_SEC and writes the counts as collapsed stacks ("root;frame;frame N"
+# per line: input for flamegraph.pl or speedscope), and traces allocations
+# with tracemalloc for the same window, reporting what is still alive at the
+# end. Signal handlers only schedule work on the event loop; the sampler is
+# a thread reading sys._current_frames(), so it also sees a stuck loop.
+import os, sys, time, random, asyncio, threading, tracemalloc, collections, typing
+from .ohlc_agg import AGGREGATOR, OHLCAggregator
+from .papertrading.loader import PAPER_TRADER, PaperTrader
+from .lifecycle import LIFECYCLE, TokenLifecycle
+from .env import settings
+
+
+@settings
+def _read_settings() -> None:
+    global PROFILE_DIR, PROFILE_CPU_SEC, PROFILE_HZ, TRACEMALLOC_FRAMES
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_CPU_SEC = float(os.getenv("PROFILE_CPU_SEC", "30"))
+    PROFILE_HZ = float(os.getenv("PROFILE_HZ", "100"))
+    TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "10"))
+
+
+TOP_N = 15
+SIZE_SAMPLE = 200   # entries measured per structure; the total is extrapolated
+
+
+def _collapse(frame, root: str) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    stack.append(root)
+    return ";".join(reversed(stack))
+
+
+class StackSampler:
+    """Wall-clock stack sampler: a thread counting collapsed stacks of every other thread."""
+
+    def __init__(self, hz: typing.Optional[float] = None):
+        self.interval = 1.0 / max(1.0, PROFILE_HZ if hz is None else hz)
+        self.counts: collections.Counter = collections.Counter()
+        self.ticks = 0
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.counts.clear()
+        self.ticks = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> collections.Counter:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self.counts
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self.counts[_collapse(frame, names.get(ident, str(ident)))] += 1
+            self.ticks += 1
+
+
+def write_collapsed(counts: collections.Counter, path: str) -> None:
+    with open(path, "w") as f:
+        for stack, n in counts.most_common():
+            f.write(f"{stack} {n}\n")
+
+
+def top_functions(counts: collections.Counter, thread: str = "MainThread", n: int = TOP_N) -> list[tuple[str, int]]:
+    """Leaf frames of `thread` by sample count (where it spends its own time)."""
+    leaves: collections.Counter = collections.Counter()
+    prefix = thread + ";"
+    for stack, c in counts.items():
+        if stack.startswith(prefix):
+            leaves[stack.rsplit(";", 1)[-1]] += c
+    return leaves.most_common(n)
+
+
+class MemoryTracker:
+    """tracemalloc over a window: start() begins tracing, finish() returns what is still allocated."""
+
+    def __init__(self, frames: typing.Optional[int] = None):
+        self.frames = TRACEMALLOC_FRAMES if frames is None else frames
+        self._base: typing.Optional[tracemalloc.Snapshot] = None
+        self._owns_tracing = False
+
+    @staticmethod
+    def _take() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+
+    def start(self) -> None:
+        # PYTHONTRACEMALLOC may already be tracing the whole process; leave that on
+        self._owns_tracing = not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start(self.frames)
+        self._base = self._take()
+
+    def finish(self, dump_path: typing.Optional[str] = None) -> list:
+        """StatisticDiffs (by line) against the snapshot taken at start(), largest growth first."""
+        if self._base is None:
+            return []
+        snap = self._take()
+        if dump_path:
+            snap.dump(dump_path)  # tracemalloc.Snapshot.load() for offline comparisons
+        diff = snap.compare_to(self._base, "lineno")
+        self._base = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+        return diff
+
+
+class Profiler:
+    """One profiling round at a time: CPU stacks + allocations over the same window."""
+
+    def __init__(self, directory: typing.Optional[str] = None, seconds: typing.Optional[float] = None,
+                 hz: typing.Optional[float] = None):
+        self._given = (directory, seconds, hz)   # None: the module setting
+        self.sampler = StackSampler(hz)
+        self.memory = MemoryTracker()
+        self.rounds = 0
+        self._timer: typing.Optional[asyncio.TimerHandle] = None
+        self._started = 0.0
+        self.configure()
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        directory, seconds, hz = self._given
+        self.directory = PROFILE_DIR if directory is None else directory
+        self.seconds = PROFILE_CPU_SEC if seconds is None else seconds
+        self.sampler.interval = 1.0 / max(1.0, PROFILE_HZ if hz is None else hz)
+        self.memory.frames = TRACEMALLOC_FRAMES
+
+    @property
+    def running(self) -> bool:
+        return self.sampler.running
+
+    def toggle(self) -> None:
+        """Signal entry point: start a round, or finish the running one now."""
+        if self.running:
+            self.finish()
+        else:
+            self.start()
+
+    def start(self, seconds: typing.Optional[float] = None) -> None:
+        """Start a round on the running loop; it finishes itself after `seconds`."""
+        if self.running:
+            return
+        seconds = self.seconds if seconds is None else seconds
+        self.memory.start()
+        self.sampler.start()
+        self._started = time.time()
+        self._timer = asyncio.get_running_loop().call_later(seconds, self.finish)
+        print(f"🔬 Profiling for {seconds:g}s (SIGUSR2 again to stop early)")
+
+    def finish(self) -> typing.Optional[dict]:
+        """Stop the round, write cpu-*.collapsed / mem-*.tracemalloc and print a report."""
+        if not self.running:
+            return None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        counts = self.sampler.stop()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(self._started))
+        cpu_path = os.path.join(self.directory, f"cpu-{stamp}.collapsed")
+        mem_path = os.path.join(self.directory, f"mem-{stamp}.tracemalloc")
+        write_collapsed(counts, cpu_path)
+        diff = self.memory.finish(mem_path)
+        self.rounds += 1
+        report = {
+            "seconds": time.time() - self._started,
+            "ticks": self.sampler.ticks,
+            "cpu_path": cpu_path,
+            "mem_path": mem_path,
+            "top": top_functions(counts),
+            "memory": [(str(d.traceback[0]), d.size_diff, d.count_diff) for d in diff[:TOP_N]],
+            "memory_total": sum(d.size_diff for d in diff),
+        }
+        print(format_profile(report))
+        return report
+
+
+def format_profile(report: dict) -> str:
+    lines = [f"🔬 Profile - {report['seconds']:.1f}s, {report['ticks']} samples → {report['cpu_path']}",
+             "   Event loop thread, own time:"]
+    ticks = max(1, report["ticks"])
+    lines += [f"   {n / ticks:6.1%}  {fn}" for fn, n in report["top"]] or ["   (no samples)"]
+    lines.append(f"   Allocated and still alive: {report['memory_total'] / 1e6:+.2f}MB → {report['mem_path']}")
+    lines += [f"   {size / 1e3:+10.1f}kB {count:+8d} blocks  {where}" for where, size, count in report["memory"]]
+    return "\n".join(lines)
+
+
+# --- structure sizes ---
+_ATOMIC = (int, float, complex, str, bytes, bool, type(None))
+
+def deep_size(obj, seen: typing.Optional[set] = None) -> int:
+    """getsizeof of `obj` and everything it holds (containers, __dict__, __slots__), each object once."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC) or callable(obj):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+        return size + sum(deep_size(x, seen) for x in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    for name in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, name):
+            size += deep_size(getattr(obj, name), seen)
+    return size
+
+
+def estimate_size(mapping: dict, sample: int = SIZE_SAMPLE) -> int:
+    """Approximate deep size of a per-token dict, extrapolated from `sample` random entries."""
+    n = len(mapping)
+    if n == 0:
+        return sys.getsizeof(mapping)
+    keys = random.sample(list(mapping), min(n, sample))
+    per = sum(deep_size(k) + deep_size(mapping[k]) for k in keys) / len(keys)
+    return int(sys.getsizeof(mapping) + per * n)
+
+
+def memory_report(agg: OHLCAggregator = AGGREGATOR, db=None, lifecycle: TokenLifecycle = LIFECYCLE,
+                  trader: PaperTrader = PAPER_TRADER, sqlite: typing.Optional[dict] = None) -> dict:
+    """
+    Entries and approximate bytes of the per-token structures (also per lifecycle state), plus SQLite
+    page usage: `sqlite` if given (callers on the event loop pass `await db.page_usage_async()`).
+    """
+    from .db import default_db
+    buffers = agg.buffers
+    out = {
+        "ohlc_agg": {"tokens": len(buffers), "samples": sum(len(b.samples) for b in buffers.values()),
+                     "bytes": estimate_size(buffers)},
+        "indicators": {"tokens": len(trader.indicators.tokens), "per_token": len(trader.indicators.plan),
+                       "bytes": estimate_size(trader.indicators.tokens)},
+        "strategies": {},
+        "sqlite": sqlite if sqlite is not None else (db or default_db()).page_usage(),
+        "states": lifecycle.memory_by_state(),
+    }
+    for s in trader.strategies:
+        state = getattr(s, "_state", None)
+        if isinstance(state, dict):
+            out["strategies"][type(s).__name__] = {"tokens": len(state), "bytes": estimate_size(state)}
+    return out
+
+
+def format_memory_report(r: dict) -> str:
+    mb = lambda b: f"{b / 1e6:.1f}MB"
+    a, i, q = r["ohlc_agg"], r["indicators"], r["sqlite"]
+    parts = [f"aggregator: {a['tokens']} tokens, {a['samples']} samples, {mb(a['bytes'])}",
+             f"indicators: {i['tokens']} tokens × {i['per_token']}, {mb(i['bytes'])}"]
+    parts += [f"{name}: {s['tokens']} tokens, {mb(s['bytes'])}" for name, s in r["strategies"].items()]
+    parts.append(f"sqlite: {mb(q['bytes'])} ({q['pages']} pages, {q['free_pages']} free)")
+    states = [f"{state} {s['tokens']} ({mb(s['bytes'])})" for state, s in r["states"].items() if s["tokens"]]
+    if states:
+        parts.append("by state: " + ", ".join(states))
+    largest = sorted(q["tables"].items(), key=lambda kv: -kv[1])[:5]
+    if largest:
+        parts.append("largest: " + ", ".join(f"{name} {mb(b)}" for name, b in largest))
+    return "🧮 Memory - " + " | ".join(parts)
+
+
+PROFILER = Profiler()
+settings(PROFILER.configure)
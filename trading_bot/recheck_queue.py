@@ -0,0 +1,181 @@
+# Deferred re-check queue for mints RugCheck can't score yet.
+# "unable to generate report" is normal for brand-new tokens, so instead of
+# dropping them we retry on an exponential schedule in the background.
+import os, time, heapq, asyncio, typing
+from .env import settings
+
+
+@settings
+def _read_settings() -> None:
+    global BASE_DELAY_SEC, MAX_ATTEMPTS, MAX_QUEUE, CONCURRENCY
+    BASE_DELAY_SEC = float(os.getenv("RUGCHECK_RECHECK_BASE_SEC", "5"))
+    MAX_ATTEMPTS = int(os.getenv("RUGCHECK_RECHECK_MAX_ATTEMPTS", "6"))      # 5s,10s,20s,40s,80s,160s
+    MAX_QUEUE = int(os.getenv("RUGCHECK_RECHECK_MAX_QUEUE", "500"))
+    CONCURRENCY = int(os.getenv("RUGCHECK_RECHECK_CONCURRENCY", "4"))
+
+
+CheckFn = typing.Callable[[str], typing.Awaitable[typing.Tuple[typing.Optional[int], typing.Optional[dict]]]]
+AdmitFn = typing.Callable[[dict, int, dict], typing.Any]
+
+
+class _Entry:
+    __slots__ = ("mint", "token", "first_seen", "attempt", "due")
+    def __init__(self, mint: str, token: dict, first_seen: float, due: float):
+        self.mint = mint
+        self.token = token
+        self.first_seen = first_seen
+        self.attempt = 0
+        self.due = due
+
+
+class RecheckQueue:
+    """
+    Delay heap of unscored mints.
+      - attempt n is retried after base_delay * 2**n seconds
+      - bounded (retries included): when full, the oldest (least fresh) mint is evicted
+      - when several are due at once the freshest mints are checked first
+    `check` is the async risk pipeline; `admit` is called with (token, risk, rc)
+    once a mint gets a score.
+    """
+
+    def __init__(self, check: CheckFn, admit: AdmitFn, *, base_delay: typing.Optional[float] = None,
+                 max_attempts: typing.Optional[int] = None, max_size: typing.Optional[int] = None,
+                 concurrency: typing.Optional[int] = None, clock: typing.Callable[[], float] = time.monotonic):
+        self._check = check
+        self._admit = admit
+        self._given = (base_delay, max_attempts, max_size, concurrency)   # None: the module setting
+        self.configure()
+        self._clock = clock
+        self._entries: dict[str, _Entry] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._ages: list[tuple[float, int, str]] = []   # (first_seen, seq, mint): oldest on top, for eviction
+        self._seq = 0
+        self._wakeup: typing.Optional[asyncio.Event] = None
+        self.counters = {"scheduled": 0, "rechecks": 0, "scored": 0, "expired": 0, "evicted": 0}
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        base_delay, max_attempts, max_size, concurrency = self._given
+        self.base_delay = BASE_DELAY_SEC if base_delay is None else base_delay
+        self.max_attempts = MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.max_size = max(1, int(MAX_QUEUE if max_size is None else max_size))
+        self.concurrency = max(1, int(CONCURRENCY if concurrency is None else concurrency))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, mint: str) -> bool:
+        return mint in self._entries
+
+    def _push(self, entry: _Entry) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (entry.due, self._seq, entry.mint))
+
+    def _oldest(self) -> typing.Optional[_Entry]:
+        # drop stale age items (scored, expired, evicted or popped mints) lazily
+        while self._ages:
+            first_seen, _, mint = self._ages[0]
+            entry = self._entries.get(mint)
+            if entry is not None and entry.first_seen == first_seen:
+                return entry
+            heapq.heappop(self._ages)
+        return None
+
+    def _insert(self, entry: _Entry) -> bool:
+        """Queue `entry` within max_size, evicting the oldest mint (possibly `entry` itself)."""
+        if len(self._entries) >= self.max_size:
+            oldest = self._oldest()
+            self.counters["evicted"] += 1
+            if oldest is None or entry.first_seen < oldest.first_seen:
+                return False
+            del self._entries[oldest.mint]  # heap items are skipped lazily
+        self._entries[entry.mint] = entry
+        self._push(entry)
+        heapq.heappush(self._ages, (entry.first_seen, self._seq, entry.mint))
+        if len(self._ages) > 2 * self.max_size:
+            self._ages = [a for a in self._ages if a[2] in self._entries and self._entries[a[2]].first_seen == a[0]]
+            heapq.heapify(self._ages)
+        return True
+
+    def schedule(self, mint: str, token: dict) -> bool:
+        """Queue a mint for a later re-check. Returns False if already queued."""
+        if not mint or mint in self._entries:
+            return False
+        now = self._clock()
+        self._insert(_Entry(mint, token, now, now + self.base_delay))
+        self.counters["scheduled"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def pop_due(self, now: float = None) -> list[_Entry]:
+        """Remove and return all entries due at `now`, freshest first."""
+        now = self._clock() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            ts, _, mint = heapq.heappop(self._heap)
+            entry = self._entries.get(mint)
+            if entry is None or entry.due != ts:
+                continue  # evicted or rescheduled
+            del self._entries[mint]
+            due.append(entry)
+        due.sort(key=lambda e: e.first_seen, reverse=True)
+        return due
+
+    def next_due_in(self, now: float = None) -> typing.Optional[float]:
+        now = self._clock() if now is None else now
+        while self._heap:
+            ts, _, mint = self._heap[0]
+            entry = self._entries.get(mint)
+            if entry is None or entry.due != ts:
+                heapq.heappop(self._heap)
+                continue
+            return max(0.0, ts - now)
+        return None
+
+    async def _recheck(self, entry: _Entry) -> None:
+        self.counters["rechecks"] += 1
+        try:
+            risk, rc = await self._check(entry.mint)
+        except Exception as e:
+            print(f"[recheck] error checking {entry.mint}: {e}")
+            risk, rc = None, None
+
+        if risk is not None:
+            self.counters["scored"] += 1
+            try:
+                res = self._admit(entry.token, risk, rc)
+                if asyncio.iscoroutine(res):
+                    await res
+            except Exception as e:
+                print(f"[recheck] admit error for {entry.mint}: {e}")
+            return
+
+        entry.attempt += 1
+        if entry.attempt >= self.max_attempts or entry.mint in self._entries:
+            self.counters["expired"] += 1
+            return
+        entry.due = self._clock() + self.base_delay * (2 ** entry.attempt)
+        self._insert(entry)   # the bound holds for re-queued mints too
+
+    async def run_once(self, now: float = None) -> int:
+        """Re-check everything that is due; returns the number of mints checked."""
+        due = self.pop_due(now)
+        for i in range(0, len(due), self.concurrency):
+            await asyncio.gather(*(self._recheck(e) for e in due[i:i + self.concurrency]))
+        return len(due)
+
+    async def run(self) -> None:
+        """Background loop; sleeps until the next entry is due or a new one is scheduled."""
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            await self.run_once()
+            delay = self.next_due_in()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {"queued": len(self._entries), **self.counters}
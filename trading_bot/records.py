@@ -0,0 +1,84 @@
+# Typed, tuple-backed records passed through the whole price pipeline
+# (aggregator → indicators → DB writer → strategies). They are NamedTuples,
+# so they're cheap to build and bind positionally to SQLite, and they also
+# accept `rec["field"]` / `rec.get("field")` so dict-style callers keep working.
+from typing import NamedTuple, Optional
+
+
+class _Record:
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self._fields else default
+
+    def keys(self):
+        return self._fields
+
+
+class _SampleFields(NamedTuple):
+    ts: float
+    price: float
+    fdv: Optional[float] = None
+    mc: Optional[float] = None
+
+class Sample(_Record, _SampleFields):
+    """
+    One price observation for a token. ohlc_agg buffers plain tuples in this
+    field order (a NamedTuple constructor costs ~10x a tuple literal per sample).
+    """
+    __slots__ = ()
+
+
+class _BarFields(NamedTuple):
+    address: str
+    ts_start: int
+    open: float
+    high: float
+    low: float
+    close: float
+    fdv_usd: Optional[float] = None
+    marketcap_usd: Optional[float] = None
+    samples: int = 0
+    volume: Optional[float] = None
+
+class Bar(_Record, _BarFields):
+    """A closed 1-minute OHLC bar; field order matches the ohlc_1m columns."""
+    __slots__ = ()
+
+
+class _IndicatorValueFields(NamedTuple):
+    address: str
+    ts_start: int
+    length: int
+    value: float
+    source: str = ""
+
+class IndicatorValue(_Record, _IndicatorValueFields):
+    """One indicator output for one bar (an ema_1m / atr_1m row)."""
+    __slots__ = ()
+
+
+def as_bar(bar) -> Bar:
+    """Return `bar` as a Bar, converting a dict (legacy callers, tests) once."""
+    if isinstance(bar, Bar):
+        return bar
+    return Bar(
+        address=bar["address"],
+        ts_start=int(bar["ts_start"]),
+        open=float(bar["open"]),
+        high=float(bar["high"]),
+        low=float(bar["low"]),
+        close=float(bar["close"]),
+        fdv_usd=bar.get("fdv_usd"),
+        marketcap_usd=bar.get("marketcap_usd"),
+        samples=int(bar.get("samples") or 0),
+        volume=bar.get("volume"),
+    )
@@ -0,0 +1,234 @@
+# Retention for the in-memory SQLite tables.
+# Every table gets a policy: rows older than `keep_sec` are either rolled up
+# into a coarser table (ohlc_1m → ohlc_5m → ohlc_1h) or deleted, and rows of
+# tokens no longer in `tokens` are dropped. Work is done in chunks of at most
+# `chunk_rows` rows and a pass yields to the event loop between steps, so a
+# multi-day run stays bounded in RAM without ever stalling the loop. Each
+# step runs as one command on the database's writer thread.
+import os, time, asyncio, sqlite3, typing
+from .db import Database, default_db
+from .env import settings
+
+
+@settings
+def _read_settings() -> None:
+    global CHUNK_ROWS, STEP_BUDGET_MS, OHLC_1M_HOURS, OHLC_5M_HOURS, OHLC_1H_DAYS
+    global INDICATOR_HOURS, PRICES_STALE_HOURS, TRADES_DAYS
+    CHUNK_ROWS = int(os.getenv("RETENTION_CHUNK_ROWS", "500"))
+    STEP_BUDGET_MS = float(os.getenv("RETENTION_STEP_BUDGET_MS", "5"))
+    OHLC_1M_HOURS = float(os.getenv("RETENTION_OHLC_1M_HOURS", "6"))       # then rolled up to 5m
+    OHLC_5M_HOURS = float(os.getenv("RETENTION_OHLC_5M_HOURS", "48"))      # then rolled up to 1h
+    OHLC_1H_DAYS = float(os.getenv("RETENTION_OHLC_1H_DAYS", "14"))
+    INDICATOR_HOURS = float(os.getenv("RETENTION_INDICATOR_HOURS", "6"))   # ema_1m / atr_1m (recomputable)
+    PRICES_STALE_HOURS = float(os.getenv("RETENTION_PRICES_STALE_HOURS", "24"))
+    TRADES_DAYS = float(os.getenv("RETENTION_TRADES_DAYS", "7"))
+
+
+HOUR = 3600
+ORPHAN_ROWS_PER_TOKEN = 20   # orphan sweeps check chunk_rows // this addresses per step
+OHLC_COLS = "address, ts_start, open, high, low, close, fdv_usd, marketcap_usd, samples"
+
+
+class RetentionPolicy(typing.NamedTuple):
+    table: str
+    keep_sec: float                       # rows older than this expire
+    rollup: typing.Optional[str] = None   # OHLC table expired rows are merged into (else deleted)
+    bucket_sec: int = 0                   # bucket size of the rollup table
+    orphans: bool = True                  # drop rows whose address is no longer in `tokens`
+    time_col: str = "ts_start"            # integer epoch seconds
+
+
+def default_policies() -> list[RetentionPolicy]:
+    return [
+        RetentionPolicy("ohlc_1m", OHLC_1M_HOURS * HOUR, rollup="ohlc_5m", bucket_sec=300),
+        RetentionPolicy("ohlc_5m", OHLC_5M_HOURS * HOUR, rollup="ohlc_1h", bucket_sec=HOUR),
+        RetentionPolicy("ohlc_1h", OHLC_1H_DAYS * 24 * HOUR),
+        RetentionPolicy("ema_1m", INDICATOR_HOURS * HOUR),
+        RetentionPolicy("atr_1m", INDICATOR_HOURS * HOUR),
+        RetentionPolicy("prices", PRICES_STALE_HOURS * HOUR, time_col="updated_at"),
+        # closed paper trades are the run's record: aged out, but kept after their token is gone
+        RetentionPolicy("paper_trades", TRADES_DAYS * 24 * HOUR, orphans=False),
+    ]
+
+
+class _TableState:
+    __slots__ = ("expire_done", "orphan_cursor", "orphans_done")
+    def __init__(self):
+        self.expire_done = False
+        self.orphan_cursor = ""
+        self.orphans_done = False
+
+
+class RetentionManager:
+    """
+    Incremental retention over `db` (default: the process-wide Database).
+    step() does at most one chunk per table until its time budget is spent;
+    run_pass() repeats steps (yielding to the loop in between) until every
+    policy is caught up.
+    """
+
+    def __init__(self, policies: typing.Optional[list[RetentionPolicy]] = None, *,
+                 db: typing.Optional[Database] = None, chunk_rows: typing.Optional[int] = None,
+                 budget_ms: typing.Optional[float] = None):
+        self._db = db
+        self._given = (policies, chunk_rows, budget_ms)   # None: the module settings
+        self.configure()
+        self._indexed: set[str] = set()
+        self._live: typing.Optional[list[RetentionPolicy]] = None   # policies of the current pass
+        self._state: dict[str, _TableState] = {}
+        self._rr = 0
+        self.counters = {"passes": 0, "steps": 0, "rolled_up": 0, "expired": 0, "orphans": 0}
+        self.max_step_ms = 0.0
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        policies, chunk_rows, budget_ms = self._given
+        self.policies = list(policies) if policies is not None else default_policies()
+        self.chunk_rows = max(1, int(CHUNK_ROWS if chunk_rows is None else chunk_rows))
+        self.budget_ms = STEP_BUDGET_MS if budget_ms is None else budget_ms
+
+    @property
+    def db(self) -> Database:
+        return self._db or default_db()
+
+    def _exists(self, c: sqlite3.Connection, table: str) -> bool:
+        return c.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone() is not None
+
+    def _ensure_index(self, c: sqlite3.Connection, p: RetentionPolicy) -> None:
+        # expiry walks each table oldest-first; an index on the time column keeps every chunk O(chunk)
+        if p.table in self._indexed:
+            return
+        c.execute(f"CREATE INDEX IF NOT EXISTS idx_{p.table}_{p.time_col} ON {p.table}({p.time_col})")
+        self._indexed.add(p.table)
+
+    # --- one chunk of work per call; each returns the number of rows touched ---
+    def _expire_chunk(self, c: sqlite3.Connection, p: RetentionPolicy, now: float) -> int:
+        cutoff = now - p.keep_sec
+        if p.rollup:
+            cutoff -= cutoff % p.bucket_sec  # only whole buckets are rolled up
+            return self._rollup_chunk(c, p, int(cutoff))
+        cur = c.execute(f"""
+          DELETE FROM {p.table} WHERE rowid IN (
+            SELECT rowid FROM {p.table} WHERE {p.time_col} < ? ORDER BY {p.time_col} LIMIT ?)
+        """, (int(cutoff), self.chunk_rows))
+        self.counters["expired"] += cur.rowcount
+        return cur.rowcount
+
+    def _rollup_chunk(self, c: sqlite3.Connection, p: RetentionPolicy, cutoff: int) -> int:
+        rows = c.execute(f"""
+          SELECT rowid, {OHLC_COLS} FROM {p.table}
+          WHERE ts_start < ? ORDER BY ts_start LIMIT ?
+        """, (cutoff, self.chunk_rows)).fetchall()
+        if not rows:
+            return 0
+        # rows arrive oldest-first, so a bucket split across chunks merges correctly below
+        buckets: dict[tuple, list] = {}
+        for _, addr, ts, o, h, l, cl, fdv, mc, n in rows:
+            key = (addr, ts - ts % p.bucket_sec)
+            b = buckets.get(key)
+            if b is None:
+                buckets[key] = [addr, key[1], o, h, l, cl, fdv, mc, n]
+            else:
+                b[3] = max(b[3], h); b[4] = min(b[4], l); b[5] = cl
+                b[6] = fdv if fdv is not None else b[6]
+                b[7] = mc if mc is not None else b[7]
+                b[8] += n
+        c.executemany(f"""
+          INSERT INTO {p.rollup} ({OHLC_COLS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+          ON CONFLICT(address, ts_start) DO UPDATE SET
+            high = max(high, excluded.high),
+            low = min(low, excluded.low),
+            close = excluded.close,
+            fdv_usd = coalesce(excluded.fdv_usd, fdv_usd),
+            marketcap_usd = coalesce(excluded.marketcap_usd, marketcap_usd),
+            samples = samples + excluded.samples
+        """, list(buckets.values()))
+        c.executemany(f"DELETE FROM {p.table} WHERE rowid = ?", [(r[0],) for r in rows])
+        self.counters["rolled_up"] += len(rows)
+        return len(rows)
+
+    def _orphan_chunk(self, c: sqlite3.Connection, p: RetentionPolicy, st: _TableState) -> int:
+        # walk the table's distinct addresses in order, a bounded slice per call;
+        # a token holds up to a few hundred rows per table, so slice addresses, not rows
+        addrs = [r[0] for r in c.execute(f"""
+          SELECT DISTINCT address FROM {p.table} WHERE address > ? ORDER BY address LIMIT ?
+        """, (st.orphan_cursor, max(1, self.chunk_rows // ORPHAN_ROWS_PER_TOKEN)))]
+        if not addrs:
+            st.orphans_done = True
+            return 0
+        st.orphan_cursor = addrs[-1]
+        marks = ",".join("?" * len(addrs))
+        live = {r[0] for r in c.execute(f"SELECT address FROM tokens WHERE address IN ({marks})", addrs)}
+        dead = [(a,) for a in addrs if a not in live]
+        if dead:
+            cur = c.executemany(f"DELETE FROM {p.table} WHERE address = ?", dead)
+            self.counters["orphans"] += cur.rowcount
+        return len(addrs)
+
+    def _begin_pass(self, c: sqlite3.Connection) -> None:
+        self._live = []
+        self._state = {}
+        self._rr = 0
+        for p in self.policies:
+            if self._exists(c, p.table):  # e.g. paper_trades only exists once paper trading is imported
+                self._ensure_index(c, p)
+                self._live.append(p)
+                self._state[p.table] = _TableState()
+
+    def _feeding(self, p: RetentionPolicy) -> bool:
+        return any(q.rollup == p.table and not self._state[q.table].expire_done for q in self._live)
+
+    def _pending(self, p: RetentionPolicy) -> bool:
+        st = self._state[p.table]
+        return not st.expire_done or (p.orphans and not st.orphans_done)
+
+    def step(self, now: typing.Optional[float] = None) -> bool:
+        """Run chunks round-robin until the budget is spent. Returns False once a pass is complete."""
+        now = time.time() if now is None else now
+        return self.db.writer.run(lambda c: self._step(c, now))
+
+    def _step(self, c: sqlite3.Connection, now: float) -> bool:
+        if self._live is None:
+            self._begin_pass(c)
+        t0 = time.perf_counter()
+        live = self._live
+        for i in range(len(live)):
+            p = live[(self._rr + i) % len(live)]
+            st = self._state[p.table]
+            if self._feeding(p):
+                continue  # a rollup target is swept only after its source is caught up
+            if not st.expire_done:
+                if self._expire_chunk(c, p, now) < self.chunk_rows:
+                    st.expire_done = True
+            elif p.orphans and not st.orphans_done:
+                self._orphan_chunk(c, p, st)
+            if (time.perf_counter() - t0) * 1000 >= self.budget_ms:
+                self._rr = (self._rr + i + 1) % len(live)  # next step resumes with the following table
+                break
+        self.counters["steps"] += 1
+        self.max_step_ms = max(self.max_step_ms, (time.perf_counter() - t0) * 1000)
+        pending = any(self._pending(p) for p in live)
+        if not pending:
+            self._live = None  # the next step starts a new pass
+        return pending
+
+    async def run_pass(self, now: typing.Optional[float] = None, pause: float = 0.0) -> dict:
+        """Catch every policy up, yielding to the event loop between steps."""
+        self._live = None  # start a fresh pass
+        while await self._astep(now):
+            await asyncio.sleep(pause)
+        self.counters["passes"] += 1
+        return self.stats()
+
+    async def _astep(self, now: typing.Optional[float]) -> bool:
+        now = time.time() if now is None else now
+        return await self.db.writer.arun(lambda c: self._step(c, now))
+
+    def stats(self) -> dict:
+        return {**self.counters, "max_step_ms": self.max_step_ms}
+
+
+# Process-wide default run from periodic_maintenance
+RETENTION = RetentionManager()
+settings(RETENTION.configure)
@@ -0,0 +1,138 @@
+# LRU+TTL cache of RugCheck results with in-flight request coalescing.
+# The same mint can arrive several times (reconnects, both message shapes),
+# so results are cached and concurrent checks of one mint share one request.
+import os, time, asyncio, typing
+from collections import OrderedDict
+from .env import settings
+from .rugcheck_client import get_risk_level_async, RiskResult
+
+
+@settings
+def _read_settings() -> None:
+    global CACHE_SIZE, TTL_SEC, NEG_TTL_SEC
+    CACHE_SIZE = int(os.getenv("RUGCHECK_CACHE_SIZE", "5000"))
+    TTL_SEC = float(os.getenv("RUGCHECK_CACHE_TTL_SEC", "1800"))          # scored results
+    NEG_TTL_SEC = float(os.getenv("RUGCHECK_CACHE_NEG_TTL_SEC", "60"))    # "unable to generate report"
+
+
+class TTLCache:
+    """Small LRU cache where every entry carries its own expiry."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(1, int(maxsize))
+        self._data: "OrderedDict[str, tuple[float, typing.Any]]" = OrderedDict()
+
+    def get(self, key: str, now: float = None):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if (time.monotonic() if now is None else now) >= expires:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value, ttl: float, now: float = None) -> None:
+        self._data[key] = ((time.monotonic() if now is None else now) + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RiskCache:
+    """
+    Async front-end for get_risk_level_async (blocking fetchers run in a thread):
+      - positive (scored) results cached for TTL_SEC
+      - negative results (None) cached for NEG_TTL_SEC so they are retried sooner
+      - concurrent lookups of the same mint await one shared future
+    """
+
+    def __init__(self, fetch: typing.Callable[[str], typing.Any] = get_risk_level_async,
+                 maxsize: typing.Optional[int] = None, ttl: typing.Optional[float] = None,
+                 neg_ttl: typing.Optional[float] = None):
+        self._fetch = fetch
+        self._given = (maxsize, ttl, neg_ttl)   # None: the module setting
+        self._cache = TTLCache()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.configure()
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        maxsize, ttl, neg_ttl = self._given
+        self._cache.maxsize = max(1, int(CACHE_SIZE if maxsize is None else maxsize))
+        self.ttl = TTL_SEC if ttl is None else ttl
+        self.neg_ttl = NEG_TTL_SEC if neg_ttl is None else neg_ttl
+
+    async def get(self, mint: str) -> RiskResult:
+        cached = self._cache.get(mint)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        fut = self._inflight.get(mint)
+        if fut is not None:
+            self.coalesced += 1
+            return await asyncio.shield(fut)
+
+        self.misses += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[mint] = fut
+        try:
+            if asyncio.iscoroutinefunction(self._fetch):
+                result = await self._fetch(mint)
+            else:
+                result = await asyncio.to_thread(self._fetch, mint)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            print(f"[rugcheck] cache fetch error for {mint}: {e}")
+            result = (None, None)
+        finally:
+            self._inflight.pop(mint, None)
+
+        risk = result[0]
+        self._cache.put(mint, result, self.ttl if risk is not None else self.neg_ttl)
+        fut.set_result(result)
+        return result
+
+    def invalidate(self, mint: str) -> None:
+        self._cache.pop(mint)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        saved = self.hits + self.coalesced
+        return {
+            "size": len(self._cache),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "saved_requests": saved,
+            "hit_rate": (saved / lookups) if lookups else 0.0,
+        }
+
+
+# Process-wide default used by new_pairs
+RISK_CACHE = RiskCache()
+settings(RISK_CACHE.configure)
+
+async def get_risk_level_cached(mint: str) -> RiskResult:
+    """Cached, coalesced, non-blocking variant of get_risk_level."""
+    return await RISK_CACHE.get(mint)
+
+def risk_cache_stats() -> dict:
+    return RISK_CACHE.stats()
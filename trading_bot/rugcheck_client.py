@@ -1,16 +1,37 @@
-import os, time, typing, requests
-from dotenv import load_dotenv
+# requests (blocking path) and httpx (async path) are imported on first use:
+# the bot only needs the async path, and both are slow to import.
+import os, time, typing, asyncio
+from .env import settings
+from .http_clients import get_client
+from .journal import JOURNAL
 
-load_dotenv()
-BASE_URL = "https://api.rugcheck.xyz/v1"
-API_KEY = os.getenv("RUGCHECK_API_KEY")
+@settings
+def _read_settings() -> None:
+    global BASE_URL, API_KEY
+    BASE_URL = os.getenv("RUGCHECK_BASE_URL", "https://api.rugcheck.xyz/v1")
+    API_KEY = os.getenv("RUGCHECK_API_KEY")
 
 # Remove API key requirement since endpoint works without it
 HEADERS = {"Accept": "application/json"}
 
+# Keep-alive session for the blocking path (the async path uses http_clients)
+_SESSION = None
+
+def _session():
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        _SESSION = requests.Session()
+        _SESSION.headers.update(HEADERS)
+    return _SESSION
+
+RiskResult = typing.Tuple[typing.Optional[int], typing.Optional[dict]]
+
 def _req(url: str, params: typing.Optional[dict] = None) -> typing.Optional[dict]:
+    import requests
     try:
-        r = requests.get(url, headers=HEADERS, params=params, timeout=15)
+        r = _session().get(url, params=params, timeout=15)
+        JOURNAL.record("rugcheck", r.content, key=f"{r.status_code} {url}")
         
         if r.status_code == 429:
             # rate limited: let caller retry
@@ -25,7 +46,46 @@ def _req(url: str, params: typing.Optional[dict] = None) -> typing.Optional[dict
         print(f"[rugcheck] Request exception: {e}")
         return None
 
-def get_risk_level(contract: str, retries: int = 2, sleep_s: float = 0.6) -> typing.Tuple[typing.Optional[int], typing.Optional[dict]]:
+async def _areq(url: str, params: typing.Optional[dict] = None) -> typing.Optional[dict]:
+    import httpx
+    try:
+        r = await get_client("rugcheck").get(url, params=params)
+        JOURNAL.record("rugcheck", r.content, key=f"{r.status_code} {url}")
+
+        if r.status_code == 429:
+            print("[rugcheck] Rate limited (429)")
+            return {"__rate_limited__": True}
+        r.raise_for_status()
+        return r.json()
+    except httpx.HTTPStatusError as e:
+        if "unable to generate report" in e.response.text:
+            # This is normal for new tokens
+            return None
+        print(f"[rugcheck] Request exception: {e}")
+        return None
+    except (httpx.HTTPError, ValueError) as e:
+        print(f"[rugcheck] Request exception: {e}")
+        return None
+
+def _parse_risk(data: dict) -> typing.Optional[int]:
+    # riskLevel may be int or nested; support common shapes
+    risk = data.get("score_normalised")  # Use normalized score instead of raw score
+    if risk is None:
+        # fallback to raw score if normalized is not available
+        risk = data.get("score")
+    if risk is None:
+        # some responses nest scoring; attempt trustScore.value as fallback
+        ts = (data.get("trustScore") or {}).get("value")
+        try:
+            risk = int(ts) if ts is not None else None
+        except Exception:
+            risk = None
+    try:
+        return int(risk) if risk is not None else None
+    except Exception:
+        return None
+
+def get_risk_level(contract: str, retries: int = 2, sleep_s: float = 0.6) -> RiskResult:
     """
     Returns (riskLevel, full_json) for the token. None if unavailable.
     """
@@ -46,22 +106,29 @@ def get_risk_level(contract: str, retries: int = 2, sleep_s: float = 0.6) -> typ
                 time.sleep(sleep_s * (i + 1))
                 continue
             return None, None
-        # riskLevel may be int or nested; support common shapes
-        risk = data.get("score_normalised")  # Use normalized score instead of raw score
-        if risk is None:
-            # fallback to raw score if normalized is not available
-            risk = data.get("score")
-        if risk is None:
-            # some responses nest scoring; attempt trustScore.value as fallback
-            ts = (data.get("trustScore") or {}).get("value")
-            try:
-                risk = int(ts) if ts is not None else None
-            except Exception:
-                risk = None
-        try:
-            risk = int(risk) if risk is not None else None
-        except Exception:
-            risk = None
-        return risk, data
+        return _parse_risk(data), data
     
     return None, None
+
+async def get_risk_level_async(contract: str, retries: int = 2, sleep_s: float = 0.6) -> RiskResult:
+    """
+    Non-blocking get_risk_level over the shared pooled RugCheck client.
+    """
+    url = f"{BASE_URL}/tokens/{contract}/report/summary"
+
+    for i in range(retries + 1):
+        data = await _areq(url)
+
+        if data is None:
+            if i < retries:
+                await asyncio.sleep(sleep_s)
+                continue
+            return None, None
+        if data.get("__rate_limited__"):
+            if i < retries:
+                await asyncio.sleep(sleep_s * (i + 1))
+                continue
+            return None, None
+        return _parse_risk(data), data
+
+    return None, None
@@ -0,0 +1,6 @@
+"""Offline simulation: local upstream stand-ins, synthetic price paths and the load-test harness."""
+from .stubs import SimServers, percentiles, serve_in_process
+from .paths import PathGenerator, PathParams, PricePaths, generate_paths
+
+__all__ = ["SimServers", "percentiles", "serve_in_process",
+           "PathGenerator", "PathParams", "PricePaths", "generate_paths"]
@@ -0,0 +1,175 @@
+# End-to-end load test: the real new_pairs.main() against local stand-ins.
+# The stubs run in a child process (serve_in_process) and the bot is pointed
+# at them through the URL env overrides, so no API quota is used. While the
+# bot runs, the harness samples event-loop lag and times new-pair admission
+# (frame sent → dispatched to strategies) and DexScreener batch round trips;
+# afterwards it prints throughput and latency percentiles.
+# Usage: python -m trading_bot.sim.loadtest --pairs 2000 --pair-rate 50 --duration 120
+#        (bot settings such as PRICE_POLL_INTERVAL_SEC / DEXSCREENER_* come from the env)
+import os, sys, json, time, asyncio, argparse, contextlib
+from .stubs import percentiles, serve_in_process
+
+LAG_TICK_SEC = 0.05
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Run new_pairs.main() against local upstream stand-ins.")
+    ap.add_argument("--duration", type=float, default=60.0, help="seconds to run the bot")
+    ap.add_argument("--pairs", type=int, default=500, help="new pairs announced in total")
+    ap.add_argument("--pair-rate", type=float, default=20.0, help="announcements per second")
+    ap.add_argument("--dex-latency-ms", type=float, default=60.0)
+    ap.add_argument("--dex-jitter-ms", type=float, default=30.0)
+    ap.add_argument("--dex-429", type=float, default=0.0, help="fraction of DexScreener requests answered 429")
+    ap.add_argument("--rug-latency-ms", type=float, default=100.0)
+    ap.add_argument("--rug-unscored", type=float, default=0.1, help="fraction of RugCheck 'unable to generate report'")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", help="also write the report to this file")
+    ap.add_argument("--verbose", action="store_true", help="keep the bot's own output")
+    return ap.parse_args(argv)
+
+
+class _Probe:
+    """Timings collected inside the bot's process."""
+    def __init__(self):
+        self.lag: list[float] = []
+        self.admit: list[float] = []
+        self.dex_rtt: list[float] = []
+        self.dex_rows = 0
+        self.dex_errors = 0
+
+    async def loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            t = loop.time()
+            await asyncio.sleep(LAG_TICK_SEC)
+            self.lag.append(max(0.0, loop.time() - t - LAG_TICK_SEC))
+
+    def wrap_dispatch(self, dispatch):
+        def wrapped(token: dict):
+            sig = token.get("signature") or ""
+            if sig.startswith("sim") and ":" in sig:
+                self.admit.append((time.time_ns() - int(sig.split(":")[1])) / 1e9)
+            return dispatch(token)
+        return wrapped
+
+    def wrap_fetch(self, fetch):
+        async def wrapped(client, addrs):
+            t = time.perf_counter()
+            try:
+                rows = await fetch(client, addrs)
+            except Exception:
+                self.dex_errors += 1
+                raise
+            finally:
+                self.dex_rtt.append(time.perf_counter() - t)
+            self.dex_rows += len(rows)
+            return rows
+        return wrapped
+
+
+async def _run_bot(duration: float, probe: _Probe, quiet: bool) -> dict:
+    from .. import new_pairs, price_sources
+    from ..db import default_db
+    new_pairs.dispatch_new_token = probe.wrap_dispatch(new_pairs.dispatch_new_token)
+    price_sources.fetch_token_batch = probe.wrap_fetch(price_sources.fetch_token_batch)
+
+    lag_task = asyncio.create_task(probe.loop_lag())
+    out = open(os.devnull, "w") if quiet else sys.stdout
+    with contextlib.redirect_stdout(out):
+        bot = asyncio.create_task(new_pairs.main())
+        t0 = time.perf_counter()
+        done, _ = await asyncio.wait({bot}, timeout=duration)
+        elapsed = time.perf_counter() - t0
+        if bot in done:
+            bot.result()  # main() only returns by raising: surface it
+        db = default_db()
+        bot_stats = {
+            "elapsed_sec": elapsed,
+            "tokens_stored": db.count_tokens(),
+            "bars_1m": db.conn.execute("SELECT count(*) FROM ohlc_1m").fetchone()[0],
+            "writer": db.writer.stats(),
+            "ws": new_pairs.WS_MANAGER.stats() if new_pairs.WS_MANAGER else {},
+            "recheck": new_pairs.RECHECK.stats(),
+        }
+        bot.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await bot
+    lag_task.cancel()
+    if quiet:
+        out.close()
+    return bot_stats
+
+
+def _ms(p: dict) -> dict:
+    return {k: round(v * 1000, 2) for k, v in p.items()}
+
+
+def run(args: argparse.Namespace) -> dict:
+    env, stub_stats, stop = serve_in_process(
+        pair_rate=args.pair_rate, pair_limit=args.pairs, dex_latency_ms=args.dex_latency_ms,
+        dex_jitter_ms=args.dex_jitter_ms, dex_429_rate=args.dex_429, rug_latency_ms=args.rug_latency_ms,
+        rug_unscored_rate=args.rug_unscored, seed=args.seed)
+    try:
+        # new_pairs.init() re-reads the settings from the environment: override before it
+        os.environ.update(env)
+        os.environ["SOLANASTREAM_API_KEY"] = "sim"   # never send the real key, even to a stub
+        probe = _Probe()
+        bot = asyncio.run(_run_bot(args.duration, probe, quiet=not args.verbose))
+        stubs = stub_stats()
+    finally:
+        stop()
+
+    from ..price_watcher import INTERVAL
+    secs = bot["elapsed_sec"]
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("json", "verbose")},
+        "poll_interval_sec": INTERVAL,
+        "throughput": {
+            "pairs_sent_per_sec": stubs["pairs_sent"] / secs,
+            "tokens_admitted_per_sec": len(probe.admit) / secs,
+            "price_samples_per_sec": probe.dex_rows / secs,
+            "dex_requests_per_sec": stubs["dex_requests"] / secs,
+            "tokens_priced": stubs["tokens_priced"],
+            "tokens_stored": bot["tokens_stored"],
+            "bars_1m": bot["bars_1m"],
+        },
+        "latency_ms": {
+            "admission": _ms(percentiles(probe.admit)),
+            "dex_batch_rtt": _ms(percentiles(probe.dex_rtt)),
+            "event_loop_lag": _ms(percentiles(probe.lag, (50, 99, 100))),
+        },
+        # how often each token actually got a fresh price (target: the poll interval)
+        "token_refresh_sec": stubs["refresh_interval_sec"],
+        "errors": {"dex_fetch": probe.dex_errors, "dex_429": stubs["dex_429"],
+                   "rug_unscored": stubs["rug_unscored"], "writer": bot["writer"]["errors"]},
+        "stubs": stubs,
+        "bot": bot,
+    }
+
+
+def _print(report: dict) -> None:
+    t, lat = report["throughput"], report["latency_ms"]
+    print(f"⏱️  Load test - {report['bot']['elapsed_sec']:.0f}s, poll interval {report['poll_interval_sec']}s")
+    print(f"   pairs sent: {t['pairs_sent_per_sec']:.1f}/s | admitted: {t['tokens_admitted_per_sec']:.1f}/s "
+          f"(stored {t['tokens_stored']})")
+    print(f"   price samples: {t['price_samples_per_sec']:.0f}/s over {t['tokens_priced']} tokens | "
+          f"DexScreener requests: {t['dex_requests_per_sec']:.1f}/s | 1m bars: {t['bars_1m']}")
+    r = report["token_refresh_sec"]
+    print(f"   per-token refresh: p50 {r['p50']:.2f}s | p90 {r['p90']:.2f}s | p99 {r['p99']:.2f}s")
+    for name, p in lat.items():
+        print(f"   {name}: " + " | ".join(f"{k} {v:.1f}ms" for k, v in p.items()))
+    print(f"   errors: {report['errors']}")
+
+
+def main(argv=None) -> dict:
+    args = _parse_args(argv)
+    report = run(args)
+    _print(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Synthetic memecoin price paths for benchmarks, backtests and the stubs.
+# Every token follows a log-price random walk plus:
+# - a launch pump: a share of tokens gain `pump_size` over their first steps
+# - jump diffusion: rare large moves (either sign, skewed down)
+# - liquidity rugs: a one-step crash of `rug_drop`, after which the token is dead
+# - dead tokens: launched flat and never trade
+# - missing samples: NaN, as when DexScreener leaves a token out of a batch
+# Paths are generated a chunk of steps at a time, vectorized over tokens and
+# steps, so millions of samples take well under a second each; a generator
+# carries its state across chunks and is reproducible for a given seed and
+# chunk size. Rows come out in the exact shape fetch_token_batch returns.
+import os, glob, typing
+import numpy as np
+from .stubs import sim_mint
+
+
+class PathParams(typing.NamedTuple):
+    dt_sec: float = 2.0             # one step = one poll interval
+    start_price: float = 1e-4
+    vol: float = 0.015              # per-step log-return sd
+    drift: float = -0.0002          # per-step log drift (most memecoins bleed)
+    pump_prob: float = 0.3          # share of tokens with a launch pump
+    pump_size: float = 4.0          # total gain of a pump (4.0 → 5x)
+    pump_steps: int = 60
+    jump_rate: float = 0.002        # per-step jump probability
+    jump_mu: float = -0.05          # mean log size of a jump
+    jump_sigma: float = 0.25
+    rug_prob: float = 0.2           # share of tokens rugged at a random step of their life
+    rug_drop: float = 0.95          # price lost in the rug
+    rug_horizon: int = 3600         # rug step is uniform in [pump_steps, rug_horizon)
+    dead_prob: float = 0.1          # share of tokens that never trade (flat price)
+    dead_vol_mult: float = 0.02     # remaining noise after a rug
+    missing_rate: float = 0.02      # share of samples dropped (NaN)
+    launch_spread: int = 0          # launches uniform in [0, launch_spread) steps; NaN before launch
+    supply: float = 1e9
+    circulating: tuple = (0.6, 1.0)  # circulating share of supply (marketcap vs fdv)
+
+
+class PricePaths(typing.NamedTuple):
+    """Prices of `addresses` at `ts` (one row per token, NaN = no sample)."""
+    addresses: list
+    ts: np.ndarray          # float64 [steps] epoch seconds
+    price: np.ndarray       # float64 [tokens, steps]
+    fdv: np.ndarray         # float64 [tokens, steps]
+    mc: np.ndarray          # float64 [tokens, steps]
+
+    @property
+    def samples(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.price)))
+
+    def rows(self, step: int) -> list[dict]:
+        """One poll's worth of fetch_token_batch rows; tokens without a sample are left out."""
+        col = self.price[:, step]
+        idx = np.flatnonzero(~np.isnan(col)).tolist()
+        price, fdv, mc = col.tolist(), self.fdv[:, step].tolist(), self.mc[:, step].tolist()
+        addrs = self.addresses
+        return [{"address": addrs[i], "price_usd": price[i], "fdv_usd": fdv[i], "marketcap_usd": mc[i]}
+                for i in idx]
+
+    def iter_rows(self) -> typing.Iterator[tuple[float, list[dict]]]:
+        for step, t in enumerate(self.ts.tolist()):
+            yield t, self.rows(step)
+
+    def feed(self, agg) -> list:
+        """Push every sample through an OHLCAggregator in time order; returns the closed bars."""
+        bars = []
+        for t, rows in self.iter_rows():
+            for r in rows:
+                bar = agg.add_sample(r["address"], price=r["price_usd"], fdv=r["fdv_usd"],
+                                     mc=r["marketcap_usd"], ts=t)
+                if bar:
+                    bars.append(bar)
+        return bars
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, addresses=np.array(self.addresses), ts=self.ts,
+                            price=self.price, fdv=self.fdv, mc=self.mc)
+
+    @classmethod
+    def load(cls, path: str) -> "PricePaths":
+        with np.load(path) as z:
+            return cls(z["addresses"].tolist(), z["ts"], z["price"], z["fdv"], z["mc"])
+
+
+class PathGenerator:
+    """Stateful generator for `n_tokens` tokens; next_chunk() continues every path."""
+
+    def __init__(self, n_tokens: int, params: PathParams = PathParams(), *, seed: int = 0,
+                 start_ts: float = 1_700_000_000.0, addresses: typing.Optional[list] = None):
+        p = self.params = params
+        self.rng = np.random.default_rng(seed)
+        rng = self.rng
+        self.addresses = list(addresses) if addresses is not None else [sim_mint(i) for i in range(n_tokens)]
+        n = self.n_tokens = len(self.addresses)
+        self.start_ts = start_ts
+        self.step = 0
+        self.logp = np.full(n, np.log(p.start_price))
+        self.launch = (rng.integers(0, p.launch_spread, n) if p.launch_spread > 0
+                       else np.zeros(n, dtype=np.int64))
+        self.pumped = rng.random(n) < p.pump_prob
+        self.dead = rng.random(n) < p.dead_prob
+        rugged = (rng.random(n) < p.rug_prob) & ~self.dead
+        self.rug_at = np.where(rugged, rng.integers(p.pump_steps, max(p.pump_steps + 1, p.rug_horizon), n), -1)
+        circ = rng.uniform(*p.circulating, n)
+        self.fdv_mult = np.full(n, p.supply)
+        self.mc_mult = p.supply * circ
+
+    def next_chunk(self, steps: int) -> PricePaths:
+        p, rng, n = self.params, self.rng, self.n_tokens
+        age = np.arange(self.step, self.step + steps)[None, :] - self.launch[:, None]   # [n, steps]
+        live = age >= 0
+
+        r = p.drift + p.vol * rng.standard_normal((n, steps))
+        jumps = rng.random((n, steps)) < p.jump_rate
+        r += np.where(jumps, rng.normal(p.jump_mu, p.jump_sigma, (n, steps)), 0.0)
+        pumping = self.pumped[:, None] & (age >= 0) & (age < p.pump_steps)
+        r += np.where(pumping, np.log1p(p.pump_size) / p.pump_steps, 0.0)
+
+        rug_age = self.rug_at[:, None]
+        after_rug = (rug_age >= 0) & (age > rug_age)
+        r = np.where(after_rug, r * p.dead_vol_mult, r)
+        r = np.where((rug_age >= 0) & (age == rug_age), np.log1p(-p.rug_drop), r)
+        r = np.where(self.dead[:, None] | ~live, 0.0, r)
+
+        logp = self.logp[:, None] + np.cumsum(r, axis=1)
+        self.logp = logp[:, -1].copy()
+        price = np.exp(logp)
+        price[~live | (rng.random((n, steps)) < p.missing_rate)] = np.nan
+        ts = self.start_ts + p.dt_sec * np.arange(self.step, self.step + steps, dtype=np.float64)
+        self.step += steps
+        return PricePaths(self.addresses, ts, price, price * self.fdv_mult[:, None], price * self.mc_mult[:, None])
+
+
+def generate_paths(n_tokens: int, steps: int, params: PathParams = PathParams(), *,
+                   seed: int = 0, start_ts: float = 1_700_000_000.0) -> PricePaths:
+    """All `steps` steps of `n_tokens` paths at once."""
+    return PathGenerator(n_tokens, params, seed=seed, start_ts=start_ts).next_chunk(steps)
+
+
+def stream_to_disk(directory: str, n_tokens: int, steps: int, *, chunk_steps: int = 1800,
+                   params: PathParams = PathParams(), seed: int = 0) -> list[str]:
+    """Write `steps` steps in chunks of `chunk_steps` as paths-NNNNN.npz; memory stays one chunk."""
+    os.makedirs(directory, exist_ok=True)
+    gen = PathGenerator(n_tokens, params, seed=seed)
+    out = []
+    for i, start in enumerate(range(0, steps, chunk_steps)):
+        path = os.path.join(directory, f"paths-{i:05d}.npz")
+        gen.next_chunk(min(chunk_steps, steps - start)).save(path)
+        out.append(path)
+    return out
+
+
+def read_chunks(directory: str) -> typing.Iterator[PricePaths]:
+    """Chunks written by stream_to_disk, in order."""
+    for path in sorted(glob.glob(os.path.join(directory, "paths-*.npz"))):
+        yield PricePaths.load(path)
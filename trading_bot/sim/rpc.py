@@ -0,0 +1,215 @@
+# Local stand-in for a Solana RPC node, for tests and offline runs of chain_feed
+# (not re-exported from sim/: importing it loads the bot modules, which read
+# their settings at import, so the load test can still override them first):
+# - HTTP JSON-RPC getMultipleAccounts, served from an account snapshot
+# - websocket accountSubscribe/accountUnsubscribe; play() replays recorded
+#   account updates to the subscribers of each account, with their original
+#   spacing (scaled by `speed`) and advancing the snapshot as it goes
+# A recording is the snapshot {pubkey: (owner, data)} plus the updates
+# [(delay_sec, pubkey, data)]: built with the account encoders below, or read
+# back from a journal a live feed wrote (from_journal).
+import json, base64, struct, asyncio, hashlib, itertools, typing
+from ..chain_feed import b58encode, b58decode
+from ..journal import read_journal
+
+TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+
+Update = tuple[float, str, bytes]
+
+
+# --- account encoders (the layouts chain_feed decodes) ---
+def pubkey(seed: str) -> str:
+    """Deterministic fake pubkey."""
+    return b58encode(hashlib.sha256(seed.encode()).digest())
+
+def token_account(mint: str, amount: int) -> bytes:
+    data = bytearray(165)
+    data[0:32] = b58decode(mint)
+    struct.pack_into("<Q", data, 64, amount)
+    return bytes(data)
+
+def mint_account(supply: int, decimals: int) -> bytes:
+    data = bytearray(82)
+    struct.pack_into("<QB?", data, 36, supply, decimals, True)
+    return bytes(data)
+
+def raydium_amm_v4_account(base_mint: str, quote_mint: str, base_vault: str, quote_vault: str,
+                           base_decimals: int = 6, quote_decimals: int = 9,
+                           base_pnl: int = 0, quote_pnl: int = 0) -> bytes:
+    data = bytearray(752)
+    struct.pack_into("<QQ", data, 32, base_decimals, quote_decimals)
+    struct.pack_into("<QQ", data, 192, base_pnl, quote_pnl)
+    for offset, key in ((336, base_vault), (368, quote_vault), (400, base_mint), (432, quote_mint)):
+        data[offset:offset + 32] = b58decode(key)
+    return bytes(data)
+
+def pumpswap_account(base_mint: str, quote_mint: str, base_vault: str, quote_vault: str) -> bytes:
+    data = bytearray(243)
+    data[0:8] = hashlib.sha256(b"account:Pool").digest()[:8]
+    for offset, key in ((43, base_mint), (75, quote_mint), (139, base_vault), (171, quote_vault)):
+        data[offset:offset + 32] = b58decode(key)
+    return bytes(data)
+
+
+def _value(owner: str, data: bytes) -> dict:
+    return {"data": [base64.b64encode(data).decode(), "base64"], "executable": False,
+            "lamports": 2039280, "owner": owner, "rentEpoch": 18446744073709551615, "space": len(data)}
+
+
+class RpcReplay:
+    """Stub Solana RPC (HTTP + websocket) serving a snapshot and replaying account updates."""
+
+    def __init__(self, accounts: dict[str, tuple[str, bytes]], updates: typing.Iterable[Update] = ()):
+        self.accounts = dict(accounts)
+        self.updates: list[Update] = list(updates)
+        self.slot = 1
+        self._ids = itertools.count(1)
+        self._subs: dict[int, tuple[typing.Any, str]] = {}   # subscription id → (websocket, account)
+        self._sessions: set = set()
+        self._ws_server = None
+        self._http_server = None
+        self.host = "127.0.0.1"
+        self.ws_port = 0
+        self.http_port = 0
+        self.counters = {"rpc_requests": 0, "subscribes": 0, "unsubscribes": 0, "notifications": 0}
+
+    @classmethod
+    def from_journal(cls, directory: str) -> "RpcReplay":
+        """
+        Rebuild a recording from a chain_feed journal: the first snapshot of
+        each account ("chain_rpc") and every notification ("chain", in order).
+        """
+        accounts, updates, last = {}, [], None
+        for rec in read_journal(directory, sources=("chain_rpc", "chain")):
+            if rec.source == "chain_rpc":
+                values = json.loads(rec.payload).get("result", {}).get("value") or []
+                for key, v in zip(rec.key.split(","), values):
+                    if v and key not in accounts:
+                        accounts[key] = (v["owner"], base64.b64decode(v["data"][0]))
+            else:
+                v = json.loads(rec.payload)["params"]["result"]["value"]
+                updates.append((0.0 if last is None else (rec.ts_ns - last) / 1e9, rec.key,
+                                base64.b64decode(v["data"][0])))
+                last = rec.ts_ns
+        return cls(accounts, updates)
+
+    # --- lifecycle ---
+    async def start(self, host: str = "127.0.0.1") -> None:
+        import websockets
+        self._ws_server = await websockets.serve(self._ws_handler, host, 0)
+        self.ws_port = self._ws_server.sockets[0].getsockname()[1]
+        self._http_server = await asyncio.start_server(self._http_handler, host, 0)
+        self.http_port = self._http_server.sockets[0].getsockname()[1]
+        self.host = host
+
+    async def close(self) -> None:
+        for srv in (self._ws_server, self._http_server):
+            if srv is not None:
+                srv.close()
+                await srv.wait_closed()
+
+    def env(self) -> dict[str, str]:
+        return {"SOLANA_RPC_URL": f"http://{self.host}:{self.http_port}",
+                "SOLANA_RPC_WS_URL": f"ws://{self.host}:{self.ws_port}"}
+
+    def subscribed(self) -> set[str]:
+        return {account for _, account in self._subs.values()}
+
+    async def wait_subscribed(self, accounts: typing.Iterable[str], timeout: float = 5.0) -> None:
+        wanted = set(accounts)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not wanted <= self.subscribed():
+            if loop.time() > deadline:
+                raise TimeoutError(f"not subscribed: {sorted(wanted - self.subscribed())}")
+            await asyncio.sleep(0.01)
+
+    async def drop_connections(self) -> None:
+        """Close every websocket session (clients must reconnect and resubscribe)."""
+        for ws in list(self._sessions):
+            await ws.close()
+
+    # --- replay ---
+    async def play(self, speed: float = 1.0) -> int:
+        """Apply every update in order, notifying subscribers; returns notifications sent."""
+        sent = 0
+        for delay, account, data in self.updates:
+            if delay > 0 and speed > 0:
+                await asyncio.sleep(delay / speed)
+            sent += await self.apply(account, data)
+        return sent
+
+    async def apply(self, account: str, data: bytes) -> int:
+        owner = self.accounts.get(account, (TOKEN_PROGRAM, b""))[0]
+        self.accounts[account] = (owner, data)
+        self.slot += 1
+        sent = 0
+        for sid, (ws, acct) in list(self._subs.items()):
+            if acct != account:
+                continue
+            try:
+                await ws.send(json.dumps({"jsonrpc": "2.0", "method": "accountNotification", "params": {
+                    "result": {"context": {"slot": self.slot}, "value": _value(owner, data)}, "subscription": sid}}))
+                sent += 1
+            except Exception:
+                pass  # session went away
+        self.counters["notifications"] += sent
+        return sent
+
+    # --- websocket ---
+    async def _ws_handler(self, ws) -> None:
+        self._sessions.add(ws)
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                method, params = msg.get("method"), msg.get("params") or []
+                if method == "accountSubscribe":
+                    sid = next(self._ids)
+                    self._subs[sid] = (ws, params[0])
+                    self.counters["subscribes"] += 1
+                    result = sid
+                elif method == "accountUnsubscribe":
+                    result = self._subs.pop(params[0], None) is not None
+                    self.counters["unsubscribes"] += result
+                else:
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": msg.get("id"),
+                                              "error": {"code": -32601, "message": "Method not found"}}))
+                    continue
+                await ws.send(json.dumps({"jsonrpc": "2.0", "id": msg.get("id"), "result": result}))
+        except Exception:
+            pass  # client went away
+        finally:
+            self._sessions.discard(ws)
+            for sid in [s for s, (w, _) in self._subs.items() if w is ws]:
+                del self._subs[sid]
+
+    # --- HTTP JSON-RPC ---
+    async def _http_handler(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                length = 0
+                while (header := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = header.decode().partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                status, body = self._rpc(json.loads(await reader.readexactly(length)) if length else {})
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _rpc(self, msg: dict) -> tuple[int, bytes]:
+        self.counters["rpc_requests"] += 1
+        if msg.get("method") != "getMultipleAccounts":
+            return 200, json.dumps({"jsonrpc": "2.0", "id": msg.get("id"),
+                                    "error": {"code": -32601, "message": "Method not found"}}).encode()
+        values = [_value(*self.accounts[k]) if k in self.accounts else None for k in msg["params"][0]]
+        return 200, json.dumps({"jsonrpc": "2.0", "id": msg.get("id"),
+                                "result": {"context": {"slot": self.slot}, "value": values}}).encode()
@@ -0,0 +1,259 @@
+# Local stand-ins for the three upstreams, for load tests and offline runs:
+# - SolanaStream: a websocket server that answers newPairSubscribe and then
+#   emits newPairNotification frames at `pair_rate` per second
+# - DexScreener: GET /latest/dex/tokens/{a,b,...} serving a random-walk price
+#   per token, with configurable latency, jitter and 429 rate
+# - RugCheck: GET /v1/tokens/{mint}/report/summary, scored or "unable to
+#   generate report" at `rug_unscored_rate`
+# - Candles: GET /history/networks/solana/pools/{pool}/ohlcv/minute, the
+#   last `limit` 1m candles in GeckoTerminal's shape (warm start)
+# - Jupiter: GET /jup/price/v2?ids=a,b, the same random walk in Jupiter's
+#   price API shape, with its own latency (`jup_latency_ms`)
+# The HTTP side is a minimal keep-alive HTTP/1.1 server on asyncio streams, so
+# the stubs can serve thousands of requests per second from one process.
+# GET /__stats returns request counters and per-token refresh intervals.
+import json, math, time, random, asyncio, hashlib, typing
+from urllib.parse import unquote
+from collections import deque
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests"}
+MAX_INTERVALS = 100_000
+
+
+def percentiles(values: typing.Sequence[float], qs: typing.Iterable[float] = (50, 90, 99)) -> dict:
+    """{"p50": ..., ...} by nearest rank; empty input gives zeros."""
+    v = sorted(values)
+    if not v:
+        return {f"p{q:g}": 0.0 for q in qs}
+    return {f"p{q:g}": v[min(len(v) - 1, max(0, math.ceil(q / 100 * len(v)) - 1))] for q in qs}
+
+
+def sim_mint(seq: int) -> str:
+    """Deterministic 44-char fake mint address for the seq-th simulated pair."""
+    return f"Sim{seq:06d}" + hashlib.sha256(str(seq).encode()).hexdigest()[:35]
+
+
+class SimServers:
+    """Stub SolanaStream websocket + DexScreener/RugCheck HTTP servers on one event loop."""
+
+    def __init__(self, *, pair_rate: float = 5.0, pair_limit: int = 100,
+                 dex_latency_ms: float = 50.0, dex_jitter_ms: float = 20.0, dex_429_rate: float = 0.0,
+                 rug_latency_ms: float = 80.0, rug_unscored_rate: float = 0.1,
+                 jup_latency_ms: float = 30.0, volatility: float = 0.01, seed: int = 1):
+        self.pair_rate = pair_rate
+        self.pair_limit = pair_limit
+        self.dex_latency = dex_latency_ms / 1000
+        self.dex_jitter = dex_jitter_ms / 1000
+        self.dex_429_rate = dex_429_rate
+        self.rug_latency = rug_latency_ms / 1000
+        self.rug_unscored_rate = rug_unscored_rate
+        self.jup_latency = jup_latency_ms / 1000
+        self.volatility = volatility
+        self._rng = random.Random(seed)
+        self._prices: dict[str, float] = {}
+        self._last_served: dict[str, float] = {}
+        self._intervals: deque = deque(maxlen=MAX_INTERVALS)
+        self._seq = 0
+        self._ws_server = None
+        self._http_server = None
+        self.host = "127.0.0.1"
+        self.ws_port = 0
+        self.http_port = 0
+        self.counters = {"pairs_sent": 0, "ws_sessions": 0, "dex_requests": 0, "dex_429": 0,
+                         "dex_tokens": 0, "rug_requests": 0, "rug_unscored": 0, "candle_requests": 0,
+                         "jup_requests": 0}
+
+    # --- lifecycle ---
+    async def start(self, host: str = "127.0.0.1") -> None:
+        import websockets
+        self._ws_server = await websockets.serve(self._ws_handler, host, 0, max_size=None)
+        self.ws_port = self._ws_server.sockets[0].getsockname()[1]
+        self._http_server = await asyncio.start_server(self._http_handler, host, 0)
+        self.http_port = self._http_server.sockets[0].getsockname()[1]
+        self.host = host
+
+    async def close(self) -> None:
+        for srv in (self._ws_server, self._http_server):
+            if srv is not None:
+                srv.close()
+                await srv.wait_closed()
+
+    def env(self) -> dict[str, str]:
+        """Environment overrides pointing the bot at these stubs."""
+        http = f"http://{self.host}:{self.http_port}"
+        return {"SOLANASTREAM_WS_URL": f"ws://{self.host}:{self.ws_port}",
+                "DEXSCREENER_API_URL": f"{http}/latest/dex",
+                "RUGCHECK_BASE_URL": f"{http}/v1",
+                "WARMSTART_CANDLES_URL": f"{http}/history",
+                "JUPITER_PRICE_URL": f"{http}/jup/price/v2"}
+
+    def stats(self) -> dict:
+        return {**self.counters, "tokens_priced": len(self._prices),
+                "refresh_interval_sec": percentiles(self._intervals)}
+
+    # --- SolanaStream ---
+    def _pair_frame(self, seq: int) -> str:
+        mint = sim_mint(seq)
+        return json.dumps({"jsonrpc": "2.0", "method": "newPairNotification", "params": {
+            # the send time rides in the signature so the harness can measure admission latency
+            "signature": f"sim{seq}:{time.time_ns()}",
+            "pair": {"sourceExchange": "raydium", "ammAccount": f"Pool{mint[3:]}",
+                     "baseToken": {"account": mint,
+                                   "info": {"metadata": {"name": f"Sim {seq}", "symbol": f"S{seq}"}}},
+                     "quoteToken": {"account": "So11111111111111111111111111111111111111112"}}}})
+
+    async def _ws_handler(self, ws) -> None:
+        self.counters["ws_sessions"] += 1
+        try:
+            await ws.recv()  # newPairSubscribe
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": 1,
+                                      "result": {"message": "subscribed (sim)", "subscription_id": 1}}))
+            reader = asyncio.create_task(self._drain(ws))  # heartbeats / pongs
+            try:
+                step = 1.0 / self.pair_rate if self.pair_rate > 0 else 0.0
+                nxt = time.monotonic()
+                while self._seq < self.pair_limit:
+                    nxt += step
+                    await ws.send(self._pair_frame(self._seq))
+                    self._seq += 1
+                    self.counters["pairs_sent"] += 1
+                    await asyncio.sleep(max(0.0, nxt - time.monotonic()))
+                await reader
+            finally:
+                reader.cancel()
+        except Exception:
+            pass  # client went away
+
+    @staticmethod
+    async def _drain(ws) -> None:
+        async for _ in ws:
+            pass
+
+    # --- HTTP ---
+    async def _http_handler(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                target = line.split(b" ")[1].decode()
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # headers are ignored; requests carry no body
+                path, _, query = target.partition("?")
+                status, body = await self._route(path, query)
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+        except (ConnectionError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, path: str, query: str = "") -> tuple[int, bytes]:
+        if path.startswith("/latest/dex/tokens/"):
+            return await self._dex(path[len("/latest/dex/tokens/"):].split(","))
+        if path.startswith("/v1/tokens/") and path.endswith("/report/summary"):
+            return await self._rug(path.split("/")[3])
+        if path.startswith("/history/networks/solana/pools/") and path.endswith("/ohlcv/minute"):
+            params = dict(kv.partition("=")[::2] for kv in query.split("&") if kv)
+            return await self._candles(path.split("/")[5], int(params.get("limit") or 30))
+        if path.rstrip("/") == "/jup/price/v2":
+            params = dict(kv.partition("=")[::2] for kv in query.split("&") if kv)
+            return await self._jup(unquote(params.get("ids", "")).split(","))
+        if path == "/__stats":
+            return 200, json.dumps(self.stats()).encode()
+        return 404, b"{}"
+
+    async def _dex(self, addrs: list[str]) -> tuple[int, bytes]:
+        self.counters["dex_requests"] += 1
+        await asyncio.sleep(max(0.0, self.dex_latency + self._rng.uniform(-1, 1) * self.dex_jitter))
+        if self._rng.random() < self.dex_429_rate:
+            self.counters["dex_429"] += 1
+            return 429, b'{"error": "rate limited"}'
+        now = time.monotonic()
+        pairs = []
+        for a in addrs:
+            p = self._prices.get(a)
+            p = 1e-4 if p is None else p * math.exp(self._rng.gauss(0, self.volatility))
+            self._prices[a] = p
+            last = self._last_served.get(a)
+            if last is not None:
+                self._intervals.append(now - last)
+            self._last_served[a] = now
+            pairs.append({"baseToken": {"address": a}, "pairAddress": f"Pool{a[3:]}", "priceUsd": f"{p:.10f}",
+                          "fdv": p * 1e9, "marketCap": p * 8e8, "liquidity": {"usd": 25_000},
+                          # every sim token launched 20 minutes ago at 1e-4 (the warm start reads these)
+                          "pairCreatedAt": int((time.time() - 1200) * 1000),
+                          "priceChange": {"m5": 0.0, "h1": round((p / 1e-4 - 1) * 100, 4)},
+                          "volume": {"m5": 500.0, "h1": 2000.0}})
+        self.counters["dex_tokens"] += len(addrs)
+        return 200, json.dumps({"pairs": pairs}).encode()
+
+    async def _jup(self, addrs: list[str]) -> tuple[int, bytes]:
+        self.counters["jup_requests"] += 1
+        await asyncio.sleep(self.jup_latency)
+        data = {}
+        for a in addrs:
+            p = self._prices.get(a)
+            p = 1e-4 if p is None else p * math.exp(self._rng.gauss(0, self.volatility))
+            self._prices[a] = p
+            data[a] = {"id": a, "type": "derivedPrice", "price": f"{p:.10f}"}
+        return 200, json.dumps({"data": data, "timeTaken": self.jup_latency}).encode()
+
+    async def _candles(self, pool: str, limit: int) -> tuple[int, bytes]:
+        """A random walk from 1e-4 over the last `limit` minutes, newest first like GeckoTerminal."""
+        self.counters["candle_requests"] += 1
+        await asyncio.sleep(max(0.0, self.dex_latency))
+        end = int(time.time() // 60 * 60)
+        rows, p = [], 1e-4
+        for ts in range(end - limit * 60, end + 60, 60):  # the last one is the unfinished minute
+            c = p * math.exp(self._rng.gauss(0, self.volatility))
+            rows.append([ts, p, max(p, c) * 1.01, min(p, c) * 0.99, c, 100.0])
+            p = c
+        rows.reverse()
+        return 200, json.dumps({"data": {"id": pool, "attributes": {"ohlcv_list": rows}}}).encode()
+
+    async def _rug(self, mint: str) -> tuple[int, bytes]:
+        self.counters["rug_requests"] += 1
+        await asyncio.sleep(self.rug_latency)
+        if self._rng.random() < self.rug_unscored_rate:
+            self.counters["rug_unscored"] += 1
+            return 400, b'{"error": "unable to generate report"}'
+        return 200, json.dumps({"mint": mint, "score_normalised": self._rng.randint(0, 30)}).encode()
+
+
+# --- out-of-process serving (keeps the stubs off the bot's event loop and GIL) ---
+def _serve(kwargs: dict, conn) -> None:
+    async def run():
+        servers = SimServers(**kwargs)
+        await servers.start()
+        conn.send(servers.env())
+        await asyncio.Event().wait()
+    asyncio.run(run())
+
+
+def serve_in_process(**kwargs) -> tuple[dict, typing.Callable[[], dict], typing.Callable[[], None]]:
+    """
+    Run SimServers(**kwargs) in a child process. Returns (env overrides,
+    stats() fetching /__stats, stop()).
+    """
+    import multiprocessing, urllib.request
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_serve, args=(kwargs, child), daemon=True)
+    proc.start()
+    if not parent.poll(30):
+        proc.terminate()
+        raise RuntimeError("sim servers did not start")
+    env = parent.recv()
+    stats_url = env["RUGCHECK_BASE_URL"][:-len("/v1")] + "/__stats"
+
+    def stats() -> dict:
+        with urllib.request.urlopen(stats_url, timeout=5) as r:
+            return json.loads(r.read())
+
+    def stop() -> None:
+        proc.terminate()
+        proc.join(5)
+
+    return env, stats, stop
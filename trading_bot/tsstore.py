@@ -0,0 +1,261 @@
+# Columnar time-series store for 1m candles and indicator series.
+# Each token has an append-only "hot" segment of typed columns (array('d')),
+# so one closed bar with N indicators is a handful of O(1) appends instead of
+# 1+N SQLite inserts. compact() freezes hot segments into immutable NumPy
+# segments — in memory, or as compressed .npz files under TSSTORE_DIR — and
+# window() returns aligned bar+indicator columns for one token in one call.
+# NumPy is imported on first compaction or window(), not with the package.
+# compact() may run in a worker thread (asyncio.to_thread) while the loop
+# appends and reads: segment swaps are short critical sections under a lock,
+# and .npz files are written outside it.
+# Without TSSTORE_DIR, compacted segments stay in RAM: only the newest
+# TSSTORE_MAX_SEGMENTS per token are kept there.
+from __future__ import annotations
+import os, math, threading, typing
+from array import array
+from .env import settings
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+
+@settings
+def _read_settings() -> None:
+    global TSSTORE_DIR, SEGMENT_BARS, MAX_SEGMENTS
+    TSSTORE_DIR = os.getenv("TSSTORE_DIR") or None        # unset → keep compacted segments in RAM
+    SEGMENT_BARS = int(os.getenv("TSSTORE_SEGMENT_BARS", "240"))
+    MAX_SEGMENTS = int(os.getenv("TSSTORE_MAX_SEGMENTS", "12"))    # per token, in RAM only (0 = no limit)
+
+
+_SETTING = object()   # root default: TSSTORE_DIR (None keeps segments in RAM)
+
+BAR_COLUMNS = ("open", "high", "low", "close", "fdv_usd", "marketcap_usd", "samples")
+NAN = float("nan")
+
+
+def ema_column(length: int, source: str = "close") -> str:
+    return f"ema_{length}_{source}"
+
+def atr_column(length: int) -> str:
+    return f"atr_{length}"
+
+
+class _Segment:
+    """Append-only hot segment; every column has the same length as `ts`."""
+    __slots__ = ("ts", "cols")
+    def __init__(self, columns: typing.Iterable[str]):
+        self.ts = array("q")
+        self.cols: dict[str, array] = {c: array("d") for c in columns}
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def add_column(self, name: str) -> None:
+        self.cols[name] = array("d", [NAN]) * len(self.ts)
+
+    def append(self, ts: int, values: dict) -> bool:
+        for name in values:
+            if name not in self.cols:
+                self.add_column(name)
+        if self.ts and ts <= self.ts[-1]:
+            if ts < self.ts[-1]:
+                return False  # out-of-order bars are not supported by an append-only segment
+            for c, col in self.cols.items():  # re-written bar → overwrite in place
+                if c in values:
+                    col[-1] = _num(values[c])
+            return True
+        self.ts.append(ts)
+        for c, col in self.cols.items():
+            col.append(_num(values.get(c)))
+        return True
+
+    def freeze(self, columns: typing.Optional[typing.Container[str]] = None,
+               tail: typing.Optional[int] = None) -> dict[str, np.ndarray]:
+        """Copies of the columns (all, or those in `columns`), of the last `tail` rows if given."""
+        import numpy as np
+        start = max(0, len(self.ts) - tail) if tail is not None else 0
+        out = {"ts": np.frombuffer(self.ts, dtype=np.int64)[start:].copy()}
+        for c, col in self.cols.items():
+            if columns is None or c in columns:
+                out[c] = np.frombuffer(col, dtype=np.float64)[start:].copy()
+        return out
+
+
+def _num(v) -> float:
+    if v is None:
+        return NAN
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class _Series:
+    __slots__ = ("hot", "cold", "columns")
+    def __init__(self):
+        self.columns: list[str] = list(BAR_COLUMNS)
+        self.hot = _Segment(self.columns)
+        self.cold: list = []  # frozen dicts of arrays, or .npz paths, oldest first
+
+
+class TimeSeriesStore:
+    def __init__(self, root: typing.Any = _SETTING, segment_bars: typing.Optional[int] = None,
+                 max_segments: typing.Optional[int] = None):
+        self._given = (root, segment_bars, max_segments)
+        self.configure()
+        self._series: dict[str, _Series] = {}
+        self._lock = threading.Lock()
+        self.aged_out = 0
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        root, segment_bars, max_segments = self._given
+        self.root: typing.Optional[str] = TSSTORE_DIR if root is _SETTING else root
+        self.segment_bars = max(1, int(SEGMENT_BARS if segment_bars is None else segment_bars))
+        self.max_segments = max(0, int(MAX_SEGMENTS if max_segments is None else max_segments))
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._series
+
+    def addresses(self) -> list[str]:
+        return list(self._series)
+
+    # --- writes ---
+    def append(self, address: str, bar: dict, indicators: typing.Optional[dict] = None) -> bool:
+        """
+        Append one closed bar plus any indicator values ({column: value}) at bar['ts_start'].
+        Returns False if the bar is older than the last stored one.
+        """
+        values = {c: bar.get(c) for c in BAR_COLUMNS}
+        if indicators:
+            values.update(indicators)
+        with self._lock:
+            s = self._series.get(address)
+            if s is None:
+                s = self._series[address] = _Series()
+            for name in values:
+                if name not in s.columns:
+                    s.columns.append(name)
+            return s.hot.append(int(bar["ts_start"]), values)
+
+    def drop(self, address: str) -> None:
+        with self._lock:
+            s = self._series.pop(address, None)
+        if s is None:
+            return
+        for seg in s.cold:
+            if isinstance(seg, str):
+                try:
+                    os.remove(seg)
+                except OSError:
+                    pass
+
+    # --- compaction ---
+    def compact(self, address: typing.Optional[str] = None, force: bool = False) -> int:
+        """
+        Freeze hot segments that reached segment_bars (or any non-empty one if force). Returns segments written.
+        In RAM (no root), a token's oldest segments beyond max_segments are dropped.
+        """
+        import numpy as np
+        written = 0
+        with self._lock:
+            addresses = [address] if address else list(self._series)
+        for addr in addresses:
+            with self._lock:
+                s = self._series.get(addr)
+                if s is None or not len(s.hot) or (len(s.hot) < self.segment_bars and not force):
+                    continue
+                frozen = s.hot.freeze()
+                s.hot = _Segment(s.columns)
+                s.cold.append(frozen)   # readable at once; swapped for its .npz path once written
+                if not self.root and self.max_segments and len(s.cold) > self.max_segments:
+                    self.aged_out += len(s.cold) - self.max_segments
+                    del s.cold[:-self.max_segments]
+            written += 1
+            if self.root:
+                d = os.path.join(self.root, addr)
+                os.makedirs(d, exist_ok=True)
+                path = os.path.join(d, f"{int(frozen['ts'][0])}-{int(frozen['ts'][-1])}.npz")
+                np.savez_compressed(path, **frozen)
+                with self._lock:
+                    kept = self._series.get(addr) is s
+                    if kept:
+                        s.cold[next(i for i, seg in enumerate(s.cold) if seg is frozen)] = path
+                if not kept:   # dropped while the file was written
+                    os.remove(path)
+        return written
+
+    # --- reads ---
+    def _load(self, seg) -> dict[str, np.ndarray]:
+        import numpy as np
+        if isinstance(seg, str):
+            with np.load(seg) as z:
+                return {k: z[k] for k in z.files}
+        return seg
+
+    def window(self, address: str, n: typing.Optional[int] = None, since: typing.Optional[int] = None,
+               columns: typing.Optional[typing.Iterable[str]] = None) -> dict[str, np.ndarray]:
+        """
+        Aligned columns for one token, oldest → newest: {"ts": int64[], col: float64[], ...}.
+        `n` keeps the last n bars, `since` keeps bars with ts >= since; missing values are NaN.
+        """
+        import numpy as np
+        with self._lock:
+            s = self._series.get(address)
+            cols = list(columns) if columns is not None else list(s.columns if s else BAR_COLUMNS)
+            if s is None:
+                return {"ts": np.empty(0, dtype=np.int64), **{c: np.empty(0) for c in cols}}
+            # only the requested columns, and with `n` only the hot rows that can be returned
+            parts = [s.hot.freeze(cols, n if since is None else None)] if len(s.hot) else []
+            cold = list(s.cold)
+
+        have = parts[0]["ts"].size if parts else 0
+        for seg in reversed(cold):
+            if n is not None and have >= n and since is None:
+                break
+            if since is not None and parts and parts[-1]["ts"].size and parts[-1]["ts"][0] < since:
+                break
+            part = self._load(seg)
+            parts.append(part)
+            have += part["ts"].size
+        parts.reverse()
+
+        def col(part, name):
+            if name in part:
+                return part[name]
+            return np.full(part["ts"].size, np.nan)
+
+        out = {"ts": np.concatenate([p["ts"] for p in parts]) if parts else np.empty(0, dtype=np.int64)}
+        for c in cols:
+            out[c] = np.concatenate([col(p, c) for p in parts]) if parts else np.empty(0)
+        if since is not None:
+            start = int(np.searchsorted(out["ts"], since, side="left"))
+            out = {k: v[start:] for k, v in out.items()}
+        if n is not None:
+            out = {k: v[-n:] if n else v[:0] for k, v in out.items()}
+        return out
+
+    def last(self, address: str, column: str) -> typing.Optional[float]:
+        """Most recent value of one column (from the hot segment when possible)."""
+        with self._lock:
+            s = self._series.get(address)
+            if s is None:
+                return None
+            hot = s.hot
+            v = hot.cols[column][-1] if len(hot) and column in hot.cols else None
+        if v is None:
+            w = self.window(address, n=1, columns=[column])
+            if not w["ts"].size:
+                return None
+            v = float(w[column][-1])
+        return None if math.isnan(v) else v
+
+    def stats(self) -> dict:
+        with self._lock:
+            hot = sum(len(s.hot) for s in self._series.values())
+            cold = sum(len(s.cold) for s in self._series.values())
+            return {"tokens": len(self._series), "hot_bars": hot, "cold_segments": cold, "aged_out": self.aged_out}
+
+
+# Process-wide default used by the price watcher
+TS_STORE = TimeSeriesStore()
+settings(TS_STORE.configure)
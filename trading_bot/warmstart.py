@@ -0,0 +1,238 @@
+# Warm start: seed a newly admitted token with whatever history is cheap to
+# get, so indicators are stable and strategies can act on the first live bar
+# instead of ~15 minutes later.
+# A HistorySource returns 1m seed bars ending at the last full minute:
+# - PairWindowSource (default): one DexScreener /tokens call; the pair's
+#   priceChange windows (m5/h1/h6/h24) give the price 5 min, 1 h, ... ago,
+#   which is interpolated per minute, with bar ranges from the volatility
+#   between those anchors and volume from the volume windows. Coarse, but
+#   enough to warm an EMA/ATR.
+# - CandleSource: real 1m OHLCV from a candles endpoint (GeckoTerminal-shaped
+#   by default) for the pair's pool.
+# Seed bars go through the same path as live bars (indicators, lifecycle,
+# DB, columnar store) except strategies, which only see live bars, and carry
+# samples=0 so they can be told apart. The aggregator is primed to close the
+# first live bar at the end of the current minute.
+import os, math, time, asyncio, typing
+from .db import Database, default_db
+from .dexscreener_client import fetch_best_pairs, _to_float, _safe
+from .http_clients import get_client
+from .indicators import INDICATORS, IndicatorRegistry
+from .lifecycle import LIFECYCLE, TokenLifecycle
+from .ohlc_agg import AGGREGATOR, OHLCAggregator
+from .records import Bar
+from .tsstore import TS_STORE, TimeSeriesStore
+from .env import settings
+
+
+@settings
+def _read_settings() -> None:
+    global SOURCE, MAX_BARS, CANDLES_PATH, POLL_INTERVAL_SEC
+    SOURCE = os.getenv("WARMSTART_SOURCE", "dexscreener")   # dexscreener | candles | off
+    MAX_BARS = int(os.getenv("WARMSTART_BARS", "30"))
+    CANDLES_PATH = os.getenv("WARMSTART_CANDLES_PATH", "/networks/solana/pools/{pool}/ohlcv/minute?aggregate=1&limit={limit}")
+    POLL_INTERVAL_SEC = float(os.getenv("PRICE_POLL_INTERVAL_SEC", "2"))
+
+
+WINDOWS = (("m5", 5), ("h1", 60), ("h6", 360), ("h24", 1440))
+
+
+class HistorySource:
+    """Where seed bars come from; `token` is the dict dispatched to strategies (address, pool, ...)."""
+    name = "none"
+
+    async def history(self, token: dict, now: float, max_bars: int) -> list[Bar]:
+        return []
+
+
+def _interp(anchors: list[tuple[float, float]], t: float) -> float:
+    """Log-linear price at `t` between (ts, price) anchors sorted by ts; flat outside them."""
+    if t <= anchors[0][0]:
+        return anchors[0][1]
+    for (t0, p0), (t1, p1) in zip(anchors, anchors[1:]):
+        if t <= t1:
+            w = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+            return math.exp(math.log(p0) + w * (math.log(p1) - math.log(p0)))
+    return anchors[-1][1]
+
+
+def bars_from_windows(address: str, pair: dict, now: float, max_bars: typing.Optional[int] = None) -> list[Bar]:
+    """Synthesize 1m bars up to the last full minute from a DexScreener pair's change/volume windows."""
+    max_bars = MAX_BARS if max_bars is None else max_bars
+    price = _to_float(pair.get("priceUsd"))
+    if not price or price <= 0:
+        return []
+    created = (_to_float(pair.get("pairCreatedAt")) or 0) / 1000 or None
+    anchors = {now: price}
+    for key, minutes in WINDOWS:
+        change = _to_float(_safe(pair, f"priceChange.{key}"))
+        if change is None or change <= -100:
+            continue
+        t = now - minutes * 60
+        if created and t < created:
+            t = created  # a window longer than the pair's life is the change since launch
+        anchors.setdefault(t, price / (1 + change / 100))
+        if created and t == created:
+            break
+    if len(anchors) < 2:
+        return []
+    pts = sorted(anchors.items())
+    # per-minute log volatility: the steepest move between anchors, spread as a random walk would
+    sigma = max(abs(math.log(p1 / p0)) / math.sqrt(max(1.0, (t1 - t0) / 60))
+                for (t0, p0), (t1, p1) in zip(pts, pts[1:]))
+    vols = [(minutes, _to_float(_safe(pair, f"volume.{key}"))) for key, minutes in WINDOWS]
+    fdv, mc = _to_float(pair.get("fdv")), _to_float(pair.get("marketCap"))
+
+    end = int(now // 60 * 60)
+    start = end - max_bars * 60
+    if created:
+        start = max(start, int(created // 60 * 60))
+    bars = []
+    for ts in range(start, end, 60):
+        o, c = _interp(pts, ts), _interp(pts, ts + 60)
+        age_min = (now - ts) / 60
+        prev_m, prev_v, volume = 0, 0.0, None
+        for minutes, v in vols:  # the shortest window that covers this minute, net of the shorter one
+            if v is None:
+                continue
+            if age_min <= minutes:
+                volume = max(0.0, (v - prev_v) / (minutes - prev_m))
+                break
+            prev_m, prev_v = minutes, v
+        k = c / price
+        bars.append(Bar(address, ts, o, max(o, c) * math.exp(sigma / 2), min(o, c) * math.exp(-sigma / 2), c,
+                        fdv * k if fdv else None, mc * k if mc else None, 0, volume))
+    return bars
+
+
+class PairWindowSource(HistorySource):
+    """Seed bars from one DexScreener /tokens request (the pooled client)."""
+    name = "dexscreener"
+
+    def __init__(self, client=None):
+        self.client = client
+
+    async def history(self, token: dict, now: float, max_bars: int) -> list[Bar]:
+        address = token["address"]
+        pair = (await fetch_best_pairs(self.client or get_client("dexscreener"), [address])).get(address)
+        return bars_from_windows(address, pair, now, max_bars) if pair else []
+
+
+def parse_ohlcv(address: str, data, end: float, max_bars: int) -> list[Bar]:
+    """[[ts, o, h, l, c, v], ...] (bare or in GeckoTerminal's data.attributes.ohlcv_list) → bars before `end`."""
+    rows = _safe(data, "data.attributes.ohlcv_list") if isinstance(data, dict) else data
+    bars = [Bar(address, int(r[0]) // 60 * 60, float(r[1]), float(r[2]), float(r[3]), float(r[4]),
+                None, None, 0, float(r[5]) if len(r) > 5 and r[5] is not None else None)
+            for r in rows or () if int(r[0]) < end]
+    bars.sort(key=lambda b: b.ts_start)
+    return bars[-max_bars:]
+
+
+class CandleSource(HistorySource):
+    """Seed bars from a 1m OHLCV endpoint keyed by the pair's pool account."""
+    name = "candles"
+
+    def __init__(self, client=None, path: typing.Optional[str] = None):
+        self.client = client
+        self.path = CANDLES_PATH if path is None else path
+
+    async def history(self, token: dict, now: float, max_bars: int) -> list[Bar]:
+        pool = token.get("pool")
+        if not pool:
+            return []
+        client = self.client or get_client("history")
+        r = await client.get(self.path.format(pool=pool, address=token["address"], limit=max_bars + 1))
+        r.raise_for_status()
+        return parse_ohlcv(token["address"], r.json(), now // 60 * 60, max_bars)
+
+
+SOURCES: dict[str, typing.Callable[[], HistorySource]] = {
+    "dexscreener": PairWindowSource,
+    "candles": CandleSource,
+    "off": HistorySource,
+}
+
+
+class WarmStart:
+    """Fetches seed bars in the background and applies them before the token's first live bar."""
+
+    def __init__(self, source: typing.Optional[HistorySource] = None, *, db: typing.Optional[Database] = None,
+                 agg: OHLCAggregator = AGGREGATOR, store: TimeSeriesStore = TS_STORE,
+                 lifecycle: TokenLifecycle = LIFECYCLE, max_bars: typing.Optional[int] = None,
+                 poll_interval: typing.Optional[float] = None, indicators: IndicatorRegistry = INDICATORS):
+        self._given = (source, max_bars, poll_interval)   # None: the module setting
+        self.db, self.agg, self.store, self.lifecycle = db, agg, store, lifecycle
+        self.indicators = indicators    # the pipeline's (PaperTrader.indicators)
+        self.configure()
+        self._tasks: set[asyncio.Task] = set()
+        self.counters = {"seeded": 0, "bars": 0, "empty": 0, "late": 0, "errors": 0}
+        self.latency_total = 0.0
+
+    def configure(self) -> None:
+        """Resolve the settings not given to the constructor from the current module ones."""
+        source, max_bars, poll_interval = self._given
+        self.source = source if source is not None else SOURCES.get(SOURCE, HistorySource)()
+        self.max_bars = MAX_BARS if max_bars is None else max_bars
+        self.poll_interval = POLL_INTERVAL_SEC if poll_interval is None else poll_interval
+
+    @property
+    def enabled(self) -> bool:
+        return type(self.source) is not HistorySource
+
+    def spawn(self, token: dict) -> None:
+        """Seed `token` in the background (admission never waits on the history request)."""
+        if not self.enabled:
+            return
+        task = asyncio.create_task(self.seed(token))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def seed(self, token: dict, now: typing.Optional[float] = None) -> int:
+        """Fetch and apply seed bars; returns how many were applied."""
+        t0 = time.perf_counter()
+        now = now or time.time()
+        try:
+            bars = await self.source.history(token, now, self.max_bars)
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"[warmstart] {self.source.name} history error for {token.get('address')}: {e}")
+            return 0
+        n = await self.apply(token["address"], bars, now)
+        self.latency_total += time.perf_counter() - t0
+        return n
+
+    async def apply(self, address: str, bars: list[Bar], now: float) -> int:
+        if not bars:
+            self.counters["empty"] += 1
+            return 0
+        if self.indicators.get_values(address) is not None:
+            self.counters["late"] += 1  # a live bar got there first; older bars would corrupt its indicators
+            return 0
+        rows = []
+        for bar in bars:  # no awaits until the indicators are seeded, so no live bar can interleave
+            self.lifecycle.on_bar(bar)
+            ema_rows, atr_rows = self.indicators.update(bar)
+            self.store.append(address, bar, self.indicators.storage_values(address))
+            rows.append((bar, ema_rows, atr_rows))
+        next_minute = (now // 60 + 1) * 60
+        self.agg.prime(address, math.ceil((next_minute - now) / self.poll_interval))
+        db = self.db or default_db()
+        await asyncio.gather(*(db.store_bar_async(*r) for r in rows))
+        self.counters["seeded"] += 1
+        self.counters["bars"] += len(bars)
+        return len(bars)
+
+    async def close(self) -> None:
+        for t in list(self._tasks):
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        seeded = self.counters["seeded"] + self.counters["empty"] + self.counters["late"]
+        return {**self.counters, "source": self.source.name, "in_flight": len(self._tasks),
+                "avg_ms": self.latency_total / seeded * 1000 if seeded else 0.0}
+
+
+# Process-wide default instance on the default pipeline (new_pairs spawns it per admitted token)
+WARMSTART = WarmStart()
+settings(WARMSTART.configure)
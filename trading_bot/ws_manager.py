@@ -0,0 +1,172 @@
+# Resilient websocket connection manager for the new-pairs stream.
+# - detects which header kwarg websockets.connect supports once, at startup
+# - reconnects with jittered exponential backoff starting in milliseconds
+# - optionally keeps a connected hot-standby socket ready to take over
+# - records downtime windows so missed-listing gaps can be quantified
+# `websockets` is imported when a manager is created, not with this module.
+import os, time, random, asyncio, inspect, typing
+from collections import deque
+from .env import settings
+
+
+@settings
+def _read_settings() -> None:
+    global BACKOFF_BASE_SEC, BACKOFF_MAX_SEC, STABLE_AFTER_SEC, HOT_STANDBY
+    BACKOFF_BASE_SEC = float(os.getenv("WS_BACKOFF_BASE_SEC", "0.05"))
+    BACKOFF_MAX_SEC = float(os.getenv("WS_BACKOFF_MAX_SEC", "5"))
+    STABLE_AFTER_SEC = float(os.getenv("WS_STABLE_AFTER_SEC", "30"))   # reset backoff once a session lasts this long
+    HOT_STANDBY = os.getenv("WS_HOT_STANDBY", "0") == "1"
+
+
+MAX_WINDOWS = 200
+
+Handler = typing.Callable[[typing.Any], typing.Awaitable[None]]
+
+
+def detect_header_kwarg(connect=None) -> typing.Optional[str]:
+    """Return the name of the custom-headers kwarg accepted by websockets.connect (or None)."""
+    if connect is None:
+        import websockets
+        connect = websockets.connect
+    try:
+        params = inspect.signature(connect).parameters
+    except (TypeError, ValueError):
+        return None
+    for name in ("additional_headers", "extra_headers", "headers"):
+        p = params.get(name)
+        if p is not None and p.kind is not inspect.Parameter.VAR_KEYWORD:
+            return name
+    return None
+
+
+def backoff_delay(attempt: int, base: typing.Optional[float] = None, cap: typing.Optional[float] = None,
+                  rand: typing.Callable[[], float] = random.random) -> float:
+    """'Full jitter' exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    base = BACKOFF_BASE_SEC if base is None else base
+    cap = BACKOFF_MAX_SEC if cap is None else cap
+    return rand() * min(cap, base * (2 ** attempt))
+
+
+class WSConnectionManager:
+    def __init__(self, url: str, handler: Handler, *, headers: typing.Optional[dict] = None,
+                 connect_kwargs: typing.Optional[dict] = None, hot_standby: typing.Optional[bool] = None,
+                 backoff_base: typing.Optional[float] = None, backoff_max: typing.Optional[float] = None,
+                 stable_after: typing.Optional[float] = None, connect=None):
+        self.url = url
+        self.handler = handler
+        # None: the module setting
+        self.hot_standby = HOT_STANDBY if hot_standby is None else hot_standby
+        self.backoff_base = BACKOFF_BASE_SEC if backoff_base is None else backoff_base
+        self.backoff_max = BACKOFF_MAX_SEC if backoff_max is None else backoff_max
+        self.stable_after = STABLE_AFTER_SEC if stable_after is None else stable_after
+        import websockets
+        self._closed_exc = websockets.ConnectionClosed
+        self._connect = connect or websockets.connect
+        self._kwargs = dict(connect_kwargs or {})
+        self.header_kwarg = detect_header_kwarg(self._connect) if headers else None
+        if headers and self.header_kwarg:
+            self._kwargs[self.header_kwarg] = headers
+        elif headers:
+            print("[ws] websockets.connect accepts no custom headers; relying on the subscription message")
+
+        self._standby: typing.Optional[asyncio.Task] = None
+        self._down_since: typing.Optional[float] = None
+        self.windows: deque = deque(maxlen=MAX_WINDOWS)   # (start, end) wall-clock seconds
+        self.sessions = 0
+        self.failures = 0
+        self.standby_takeovers = 0
+        self.total_downtime = 0.0
+
+    async def _open(self):
+        return await self._connect(self.url, **self._kwargs)
+
+    def _start_standby(self) -> None:
+        if self.hot_standby and (self._standby is None or self._standby.done()):
+            self._standby = asyncio.create_task(self._open())
+
+    async def _take_standby(self):
+        """Return an open standby connection if one is ready, else None."""
+        task, self._standby = self._standby, None
+        if task is None or not task.done() or task.cancelled():
+            if task is not None:
+                task.cancel()
+            return None
+        if task.exception() is not None:
+            return None
+        ws = task.result()
+        if getattr(ws, "close_code", None) is not None:
+            return None
+        return ws
+
+    def _mark_up(self) -> None:
+        if self._down_since is not None:
+            end = time.time()
+            self.windows.append((self._down_since, end))
+            self.total_downtime += end - self._down_since
+            self._down_since = None
+
+    def _mark_down(self) -> None:
+        if self._down_since is None:
+            self._down_since = time.time()
+
+    async def _session(self, ws) -> None:
+        self.sessions += 1
+        self._mark_up()
+        self._start_standby()
+        try:
+            await self.handler(ws)
+        finally:
+            self._mark_down()
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+    async def run(self) -> None:
+        """Connect, run the handler, and reconnect forever."""
+        attempt = 0
+        self._mark_down()  # not subscribed yet: startup counts as a gap too
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    ws = await self._take_standby()
+                    if ws is not None:
+                        self.standby_takeovers += 1
+                        print("[ws] promoted hot standby connection")
+                    else:
+                        ws = await self._open()
+                    await self._session(ws)
+                except self._closed_exc as e:
+                    print(f"[ws] closed: close_code={e.code} close_reason={e.reason}")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.failures += 1
+                    print(f"[ws] error: {e}")
+
+                if time.monotonic() - started >= self.stable_after:
+                    attempt = 0
+                if self._standby is not None and self._standby.done():
+                    continue  # standby ready → reconnect immediately
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                attempt += 1
+                print(f"[ws] reconnecting in {delay * 1000:.0f}ms...")
+                await asyncio.sleep(delay)
+        finally:
+            ws = await self._take_standby()
+            if ws is not None:
+                await ws.close()
+
+    def stats(self) -> dict:
+        current = (time.time() - self._down_since) if self._down_since is not None else 0.0
+        return {
+            "connected": self._down_since is None,
+            "sessions": self.sessions,
+            "failures": self.failures,
+            "standby_takeovers": self.standby_takeovers,
+            "downtime_windows": len(self.windows),
+            "total_downtime_sec": self.total_downtime + current,
+            "longest_gap_sec": max((e - s for s, e in self.windows), default=0.0),
+            "header_kwarg": self.header_kwarg,
+        }